@@ -1,130 +1,311 @@
+import asyncio
+import time
 from fastapi import Request, Response
-from api_router.exceptions import RouteNotFoundException, MethodNotAllowedException
-from aiohttp import ClientSession, ClientTimeout
+from fastapi.responses import StreamingResponse
+from api_router.exceptions import RouteNotFoundException, MethodNotAllowedException, BackendUnavailableException
+from api_router.cache import CachedResponse, ResponseCache, parse_cache_control
+from api_router.routes import RouteTable, routes_signature
+from api_router.resilience import BackendGuard
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout, TCPConnector
+from multidict import CIMultiDict
 from config import config
 from Logging import logger
 import json as json_module
 
+# Respuestas del backend que cuentan como fallo para su circuit breaker
+FAILURE_STATUSES = {502, 503, 504}
+# Cabeceras propias de cada conexion (RFC 7230 6.1): no se reenvian, p.ej. un
+# "Connection: close" del cliente cerraria la conexion reutilizable con el backend
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+              "te", "trailer", "transfer-encoding", "upgrade"}
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+CHUNK_SIZE = 64 * 1024
+
 class APIRouter:
+    """Reenvia cada peticion al microservicio de su prefijo.
+
+    Se crea una sola vez por aplicacion (ver lifespan en main.py): start() abre
+    una ClientSession por backend, con su pool de conexiones keep-alive y cache
+    DNS, que comparten todas las peticiones hasta close().
+
+    Las rutas salen de una RouteTable (arbol de prefijos ya compilado) que se
+    carga una vez de ROUTES_FILE o de las URL de config y se recarga sola cuando
+    el fichero cambia.
+
+    Los GET de las rutas con TTL en CACHE_TTL_SECONDS pasan por self.cache (ver
+    ResponseCache), salvo los que llevan Authorization o Cookie; los demas
+    metodos invalidan lo guardado de su servicio.
+
+    Cada backend tiene su BackendGuard: con el circuito abierto o demasiadas
+    peticiones en espera la gateway responde 503 con Retry-After al momento, y
+    la espera de las cabeceras se corta con un timeout adaptado a sus latencias."""
 
     def __init__(self):
-                
-        self.config = {
-            "endpoints": {
-                # Microservicio de Gestión de Objetos
-                "/objeto": {
-                    "methods": ["GET", "POST"],
-                    "backend": config.OBJECT_SERVICE_URL
-                },
-                # Microservicio de Data Streams
-                "/Datastreams": {
-                    "methods": ["GET", "POST"],
-                    "backend": config.DATASTREAMS_SERVICE_URL
-                },                
-                # Microservicio de Automatización ECAs
-                "/eca": {
-                    "methods": ["GET", "POST", "PUT", "PATCH", "DELETE"],
-                    "backend": config.ECA_SERVICE_URL
-                },
-                # Microservicio de Personalización
-                "/personalizacion": {
-                    "methods": ["GET", "POST"],
-                    "backend": config.PERSONALIZACION_SERVICE_URL
-                },
-            },
-        }
-
-    async def route(self, request: Request):        
-        path_parts = request.path_params["path_name"].split("/")
-        service = "/" + path_parts[1] if len(path_parts) > 1 else ""
-        logger.info(f"Routing request for service: {service} with method: {request.method}")
-        
-        if service not in self.config["endpoints"]:
+        self.sessions = {}  # backend -> ClientSession
+        self.guards = {}  # backend -> BackendGuard
+        self.cache = ResponseCache(config.CACHE_TTL_SECONDS, config.CACHE_MAX_ENTRIES, config.CACHE_MAX_ENTRY_BYTES)
+        self.table = RouteTable.load()  # Se sustituye entera al recargar (ver reload)
+        self.routes_signature = routes_signature(config.ROUTES_FILE) if config.ROUTES_FILE else None
+        self.watcher = None
+
+    async def start(self):
+        """Abre la sesion compartida de cada backend y, con ROUTES_FILE, vigila el fichero de rutas."""
+        self.open_sessions(self.table)
+        logger.info(f"Sesiones abiertas para {len(self.sessions)} backends")
+        if config.ROUTES_FILE and config.ROUTES_RELOAD_SECONDS > 0:
+            self.watcher = asyncio.create_task(self.watch_routes())
+
+    def open_sessions(self, table):
+        # Sin limite total: la espera de las cabeceras la corta forward() y un cuerpo
+        # en streaming puede durar lo necesario mientras no se quede parado
+        timeout = ClientTimeout(total=None, sock_read=config.UPSTREAM_TIMEOUT_SECONDS)
+        for backend in {route.backend for route in table.routes} - self.sessions.keys():
+            connector = TCPConnector(
+                limit=config.UPSTREAM_CONNECTIONS,
+                limit_per_host=config.UPSTREAM_CONNECTIONS,
+                keepalive_timeout=config.UPSTREAM_KEEPALIVE_SECONDS,
+                use_dns_cache=True,
+                ttl_dns_cache=config.UPSTREAM_DNS_TTL_SECONDS
+            )
+            self.sessions[backend] = ClientSession(connector=connector, timeout=timeout, auto_decompress=False)
+            self.guards[backend] = BackendGuard(backend)
+
+    async def close(self):
+        """Deja de vigilar las rutas y cierra las sesiones y sus conexiones."""
+        if self.watcher is not None:
+            self.watcher.cancel()
+            self.watcher = None
+        sessions, self.sessions = self.sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    def reload(self):
+        """Vuelve a cargar las rutas sin reiniciar; si el fichero no es valido se conservan las actuales.
+        Las sesiones de los backends que ya no se usan siguen abiertas hasta close()."""
+        try:
+            table = RouteTable.load()
+        except Exception as e:
+            logger.error(f"Invalid routes file {config.ROUTES_FILE}, keeping current routes: {e}")
+            return False
+        self.open_sessions(table)
+        self.table = table
+        logger.info(f"Routes reloaded: {', '.join(route.prefix for route in table.routes)}")
+        return True
+
+    async def watch_routes(self):
+        while True:
+            await asyncio.sleep(config.ROUTES_RELOAD_SECONDS)
+            signature = routes_signature(config.ROUTES_FILE)
+            if signature is not None and signature != self.routes_signature:
+                self.routes_signature = signature
+                self.reload()
+
+    async def route(self, request: Request):
+        path = request.path_params["path_name"]
+        route, rest = self.table.lookup(path)
+        logger.info(f"Routing request for service: {route.prefix if route else path} with method: {request.method}")
+
+        if route is None:
             raise RouteNotFoundException("Route not found")
-        
-        methods = self.config["endpoints"][service]["methods"]
-        if request.method not in methods:
+
+        if request.method not in route.methods:
             raise MethodNotAllowedException(f"{request.method} not allowed")
 
-        headers = request.headers.mutablecopy()
+        headers = CIMultiDict((key, value) for key, value in request.headers.items() if key not in HOP_BY_HOP)
         headers["gateway-jwt-token"] = "Some Security Header"
-        
-        method = path_parts[2:] if len(path_parts) > 2 else []
-        base_url = self.config["endpoints"][service]["backend"] + service + "/" + "/".join(method)
-        
+
+        backend = route.backend
+        # Las rutas de un mismo backend comparten la invalidacion de la cache
+        service = backend
+        base_url = route.base_url + rest
+
         # Agregar query parameters si existen
         if request.query_params:
             query_string = str(request.query_params)
             base_url = f"{base_url}?{query_string}"
-        
+
         logger.info(f"Forwarding to: {base_url}")
-        
-        timeout = ClientTimeout(total=30)
 
+        # Con credenciales del cliente la respuesta puede ser solo suya: no se comparte
+        if request.method == "GET" and "authorization" not in headers and "cookie" not in headers:
+            ttl = self.cache.ttl(path)
+            request_directives = parse_cache_control(request.headers.get("cache-control", ""))
+            if ttl > 0 and "no-store" not in request_directives:
+                return await self.cached_get(request, backend, base_url, headers, ttl,
+                                             "no-cache" in request_directives)
+        if request.method in MUTATING_METHODS:
+            # Descarta lo guardado del servicio antes y despues del cambio
+            self.cache.invalidate(service)
         try:
-            async with ClientSession(timeout=timeout) as session:
-                if request.method == "GET":
-                    logger.info(f"Sending GET request")
-                    async with session.get(url=base_url, headers=headers) as response:
-                        data = await response.read()
-                        logger.info(f"GET response: {response.status}")
-                        modified_headers = dict(response.headers)
-                        
-                elif request.method == "POST":
-                    body_bytes = await request.body()
-                    logger.info(f"Sending POST with {len(body_bytes)} bytes")
-                    
-                    async with session.post(
-                        url=base_url, 
-                        data=body_bytes,
-                        headers=headers
-                    ) as response:
-                        data = await response.read()
-                        logger.info(f"POST response: {response.status}")
-                        modified_headers = dict(response.headers)
-                        
-                elif request.method == "PUT":
-                    body_bytes = await request.body()
-                    logger.info(f"Sending PUT with {len(body_bytes)} bytes")
-                    
-                    async with session.put(
-                        url=base_url, 
-                        data=body_bytes,
-                        headers=headers
-                    ) as response:
-                        data = await response.read()
-                        logger.info(f"PUT response: {response.status}")
-                        modified_headers = dict(response.headers)
-                        
-                elif request.method == "PATCH":
-                    body_bytes = await request.body()
-                    logger.info(f"Sending PATCH with {len(body_bytes)} bytes")
-                    
-                    async with session.patch(
-                        url=base_url, 
-                        data=body_bytes,
-                        headers=headers
-                    ) as response:
-                        data = await response.read()
-                        logger.info(f"PATCH response: {response.status}")
-                        modified_headers = dict(response.headers)
-                        
-                elif request.method == "DELETE":
-                    logger.info(f"Sending DELETE request")
-                    async with session.delete(url=base_url, headers=headers) as response:
-                        data = await response.read()
-                        logger.info(f"DELETE response: {response.status}")
-                        modified_headers = dict(response.headers)
-                else:
-                    return Response(content="Method not supported", status_code=405)
-                
-                self.add_headers(modified_headers)
-                return Response(content=data, status_code=response.status, headers=modified_headers)
-                
+            response = await self.forward(request, backend, base_url, headers)
         except Exception as e:
-            logger.error(f"Error forwarding request: {e}")
-            return Response(content=f"Error: {str(e)}", status_code=500)
-                
+            return self.upstream_error(e)
+        if request.method in MUTATING_METHODS:
+            self.cache.invalidate(service)
+        return self.stream(response)
+
+    async def forward(self, request, backend, url, headers):
+        """Envia la peticion al backend y retorna su respuesta con el cuerpo aun sin leer.
+
+        Pasa por el BackendGuard del backend: lanza BackendUnavailableException sin
+        llegar a el si esta abierto o saturado. Sin cuerpo, la espera de las
+        cabeceras se limita con el timeout adaptativo y su duracion alimenta el
+        percentil; con cuerpo (subidas de tamaño variable) el limite es el maximo.
+        Solo cuentan como fallo del backend los errores de conexion, el timeout de
+        sus cabeceras y las respuestas 502/503/504: no un cliente que se desconecta
+        o tarda en subir el cuerpo."""
+        guard = self.guards[backend]
+        probe = guard.acquire()
+        try:
+            upload = None
+            if request.method in BODY_METHODS:
+                # El cuerpo pasa al backend a medida que llega del cliente, sin reunirlo en memoria
+                logger.info(f"Streaming {request.method} body ({request.headers.get('content-length', 'chunked')} bytes)")
+                upload = {"done": False, "failed": False}
+                data = self.client_body(request, upload)
+                timeout = config.UPSTREAM_TIMEOUT_SECONDS
+            else:
+                logger.info(f"Sending {request.method} request")
+                data = None
+                timeout = guard.timeout.current
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self.sessions[backend].request(request.method, url, data=data, headers=headers), timeout)
+            except asyncio.TimeoutError:
+                # Con el cuerpo aun subiendo el lento es el cliente
+                if upload is None or upload["done"]:
+                    guard.failure(timeout if upload is None else None)
+                raise
+            except ClientConnectionError:
+                # aiohttp tambien envuelve asi los errores al leer el cuerpo del cliente
+                if upload is None or not upload["failed"]:
+                    guard.failure()
+                raise
+            logger.info(f"{request.method} response: {response.status}")
+            if response.status in FAILURE_STATUSES:
+                guard.failure()
+            else:
+                guard.success(time.monotonic() - start if upload is None else None)
+            return response
+        finally:
+            guard.release(probe)
+
+    async def client_body(self, request, upload):
+        """Cuerpo del cliente por bloques; anota en upload si se leyo entero o fallo su lectura
+        (p.ej. ClientDisconnect), para no culpar al backend."""
+        try:
+            async for chunk in request.stream():
+                yield chunk
+        except Exception:
+            upload["failed"] = True
+            raise
+        upload["done"] = True
+
+    def upstream_error(self, e):
+        """Respuesta de la gateway cuando no hay respuesta del backend."""
+        if isinstance(e, BackendUnavailableException):
+            logger.warning(f"Rejected without forwarding: {e}")
+            return Response(content=f"Error: {str(e)}", status_code=503, headers={"Retry-After": str(e.retry_after)})
+        if isinstance(e, asyncio.TimeoutError):
+            logger.error("Error forwarding request: upstream timeout")
+            return Response(content="Error: upstream timeout", status_code=504)
+        logger.error(f"Error forwarding request: {e}")
+        return Response(content=f"Error: {str(e)}", status_code=500)
+
+    def stream(self, response, prefix=b""):
+        modified_headers = self.response_headers(response)
+        self.add_headers(modified_headers)
+        return StreamingResponse(self.relay(response, prefix), status_code=response.status, headers=modified_headers)
+
+    def response_headers(self, response):
+        return {key: value for key, value in response.headers.items() if key.lower() not in HOP_BY_HOP}
+
+    async def cached_get(self, request, backend, url, headers, ttl, revalidate):
+        """GET con cache: sirve la entrada fresca, se une a un GET igual en curso o va al backend
+        (con If-None-Match si la entrada caduco) y guarda la respuesta si cabe."""
+        service = backend
+        key = self.cache.key(url, headers)
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh() and not revalidate:
+            return self.from_cache(entry, request, "HIT")
+        future, leader = self.cache.lead(key)
+        if not leader:
+            shared = await asyncio.shield(future)
+            if shared is not None:
+                return self.from_cache(shared, request, "COALESCED")
+            # La respuesta del otro GET no se pudo guardar: este va al backend por su cuenta
+            try:
+                return self.stream(await self.forward(request, backend, url, headers))
+            except Exception as e:
+                return self.upstream_error(e)
+
+        result = None
+        try:
+            generation = self.cache.generation(service)
+            # Las condiciones del cliente las resuelve la cache; al backend solo va la ETag guardada
+            upstream_headers = CIMultiDict((k, v) for k, v in headers.items()
+                                           if k.lower() not in ("if-none-match", "if-modified-since"))
+            if entry is not None and entry.etag:
+                upstream_headers["If-None-Match"] = entry.etag
+            try:
+                response = await self.forward(request, backend, url, upstream_headers)
+            except Exception as e:
+                return self.upstream_error(e)
+
+            if response.status == 304 and entry is not None and entry.etag:
+                response.release()
+                lifetime = self.cache.lifetime(response.headers, ttl) or ttl
+                entry.refresh(lifetime)
+                self.cache.store(key, entry, generation)
+                result = entry
+                return self.from_cache(entry, request, "REVALIDATED")
+
+            lifetime = self.cache.lifetime(response.headers, ttl) if response.status == 200 else 0
+            length = response.content_length
+            if not lifetime or (length is not None and length > self.cache.max_entry_bytes):
+                return self.stream(response)
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                body += chunk
+                if len(body) > self.cache.max_entry_bytes:
+                    # Demasiado grande para guardarla: sigue como streaming desde lo ya leido
+                    return self.stream(response, bytes(body))
+            response.release()
+            result = CachedResponse(service, response.status, self.response_headers(response), bytes(body), lifetime)
+            self.cache.store(key, result, generation)
+            return self.from_cache(result, request, "MISS")
+        finally:
+            self.cache.finish(key, future, result)
+
+    def from_cache(self, entry, request, state):
+        """Respuesta a partir de una entrada de la cache, o 304 si el cliente ya tiene su ETag."""
+        modified_headers = dict(entry.headers)
+        modified_headers["Age"] = str(entry.age())
+        modified_headers["X-Cache"] = state
+        self.add_headers(modified_headers)
+        client_etags = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+        if entry.etag and (entry.etag in client_etags or "*" in client_etags):
+            modified_headers = {k: v for k, v in modified_headers.items() if k.lower() != "content-length"}
+            return Response(status_code=304, headers=modified_headers)
+        return Response(content=entry.body, status_code=entry.status, headers=modified_headers)
+
+    async def relay(self, response, prefix=b""):
+        """Entrega la respuesta del backend por bloques; el siguiente bloque solo se lee
+        cuando el cliente acepto el anterior, asi la memoria no depende del tamaño."""
+        try:
+            if prefix:
+                yield prefix
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                yield chunk
+        except Exception as e:
+            # Las cabeceras ya se enviaron: solo queda cortar la respuesta
+            logger.error(f"Error streaming response: {e}")
+            raise
+        finally:
+            response.release()
+
     def add_headers(self, modified_headers):
         modified_headers['X-XSS-Protection'] = '1; mode=block'
         modified_headers['X-Frame-Options'] = 'DENY'
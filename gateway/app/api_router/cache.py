@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+# Cabeceras de la peticion que cambian la respuesta de un mismo GET
+KEY_HEADERS = ("accept", "accept-encoding")
+
+class CachedResponse:
+    """Respuesta de un GET guardada en la cache: cuerpo completo, cabeceras ya filtradas y caducidad."""
+
+    def __init__(self, service, status, headers, body, lifetime):
+        self.service = service
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = next((value for name, value in headers.items() if name.lower() == "etag"), None)
+        self.refresh(lifetime)
+
+    def refresh(self, lifetime):
+        self.stored = time.monotonic()
+        self.expires = self.stored + lifetime
+
+    def fresh(self):
+        return time.monotonic() < self.expires
+
+    def age(self):
+        return int(time.monotonic() - self.stored)
+
+
+class ResponseCache:
+    """Cache LRU de las respuestas a GET con TTL por ruta.
+
+    - ttl(path): TTL de la ruta, el del prefijo mas largo de la configuracion (0 = sin cache).
+    - lifetime(): respeta Cache-Control (no-store, no-cache, private, max-age,
+      s-maxage), Vary y Set-Cookie de la respuesta del backend; el TTL de la ruta
+      es el maximo.
+    - inflight: un GET en curso por clave; los GET iguales que llegan mientras
+      tanto esperan su resultado en vez de llegar al backend (singleflight).
+    - invalidate(service): un POST/PUT/PATCH/DELETE sobre el servicio descarta
+      sus entradas, y el numero de generacion evita guardar un GET que empezo
+      antes del cambio."""
+
+    def __init__(self, ttls, max_entries, max_entry_bytes):
+        # Prefijos de mas largo a mas corto: el primero que coincide es el mas especifico
+        self.ttls = sorted(ttls.items(), key=lambda item: len(item[0]), reverse=True)
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.entries = OrderedDict()  # clave -> CachedResponse, la mas reciente al final
+        self.inflight = {}  # clave -> Future con la CachedResponse (o None si no se pudo guardar)
+        self.generations = {}  # servicio -> numero de invalidaciones
+
+    def ttl(self, path):
+        for prefix, seconds in self.ttls:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return seconds
+        return 0
+
+    def key(self, url, headers):
+        return (url,) + tuple(headers.get(name, "") for name in KEY_HEADERS)
+
+    def get(self, key):
+        """Entrada de la clave, fresca o caducada (sirve para revalidar con su ETag)."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, entry, generation):
+        if self.generations.get(entry.service, 0) != generation:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def generation(self, service):
+        return self.generations.get(service, 0)
+
+    def invalidate(self, service):
+        self.generations[service] = self.generations.get(service, 0) + 1
+        for key in [key for key, entry in self.entries.items() if entry.service == service]:
+            del self.entries[key]
+
+    def lead(self, key):
+        """Retorna (future, True) si esta peticion debe ir al backend, o (future, False) si hay otra igual en curso."""
+        future = self.inflight.get(key)
+        if future is not None:
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        return future, True
+
+    def finish(self, key, future, entry):
+        if not future.done():
+            future.set_result(entry)
+        if self.inflight.get(key) is future:
+            del self.inflight[key]
+
+    def lifetime(self, headers, ttl):
+        """Segundos que puede guardarse la respuesta segun sus cabeceras, o 0."""
+        if "set-cookie" in headers:
+            return 0
+        vary = {name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()}
+        if not vary <= set(KEY_HEADERS):
+            return 0
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if {"no-store", "no-cache", "private"} & directives.keys():
+            return 0
+        for name in ("s-maxage", "max-age"):
+            if name in directives:
+                try:
+                    return max(0, min(ttl, int(directives[name])))
+                except ValueError:
+                    return 0
+        return ttl
+
+
+def parse_cache_control(value):
+    """{directiva: valor} de una cabecera Cache-Control."""
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"')
+    return directives
@@ -4,4 +4,10 @@ class RouteNotFoundException(Exception):
 
 class MethodNotAllowedException(Exception):
 
-    ...
\ No newline at end of file
+    ...
+
+class BackendUnavailableException(Exception):
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after  # Segundos para la cabecera Retry-After
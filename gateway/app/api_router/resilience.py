@@ -0,0 +1,101 @@
+import math
+import time
+from collections import deque
+from api_router.exceptions import BackendUnavailableException
+from config import config
+from Logging import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class AdaptiveTimeout:
+    """Tiempo maximo de espera de las cabeceras del backend a partir de sus latencias recientes.
+
+    timeout = percentil TIMEOUT_PERCENTILE de las ultimas TIMEOUT_WINDOW latencias
+    por TIMEOUT_MULTIPLIER, entre TIMEOUT_MIN_SECONDS y UPSTREAM_TIMEOUT_SECONDS.
+    Hasta reunir TIMEOUT_MIN_SAMPLES usa el maximo."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=config.TIMEOUT_WINDOW)
+        self.pending = 0  # Muestras desde el ultimo calculo
+        self.current = config.UPSTREAM_TIMEOUT_SECONDS
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+        self.pending += 1
+        # Recalcular cada pocas muestras basta y evita ordenar la ventana en cada peticion
+        if len(self.samples) >= config.TIMEOUT_MIN_SAMPLES and self.pending >= max(1, len(self.samples) // 10):
+            self.pending = 0
+            ordered = sorted(self.samples)
+            percentile = ordered[min(len(ordered) - 1, int(len(ordered) * config.TIMEOUT_PERCENTILE))]
+            self.current = min(config.UPSTREAM_TIMEOUT_SECONDS,
+                               max(config.TIMEOUT_MIN_SECONDS, percentile * config.TIMEOUT_MULTIPLIER))
+
+
+class BackendGuard:
+    """Circuit breaker, bulkhead y timeout adaptativo de un backend.
+
+    - closed: pasan todas las peticiones; BREAKER_FAILURES fallos seguidos
+      (error de conexion, timeout de las cabeceras o 502/503/504) lo abren;
+      no cuentan los errores del cliente (ver APIRouter.forward).
+    - open: se rechaza todo con BackendUnavailableException durante
+      BREAKER_OPEN_SECONDS, sin llegar al backend.
+    - half-open: pasa una sola peticion de prueba; si va bien se cierra y si
+      falla vuelve a abrirse.
+    Ademas nunca hay mas de BACKEND_MAX_CONCURRENCY peticiones esperando al
+    backend: las siguientes se rechazan al momento en lugar de acumularse."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.state = CLOSED
+        self.failures = 0  # Fallos seguidos
+        self.opened_at = 0.0
+        self.in_flight = 0
+        self.probing = False  # Hay una peticion de prueba en curso (half-open)
+        self.timeout = AdaptiveTimeout()
+
+    def acquire(self):
+        """Reserva un hueco para una peticion o lanza BackendUnavailableException.
+        Retorna True si es la peticion de prueba del estado half-open."""
+        if self.state == OPEN:
+            remaining = config.BREAKER_OPEN_SECONDS - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise BackendUnavailableException(f"Circuit open for {self.backend}", math.ceil(remaining))
+            self.transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self.probing:
+                raise BackendUnavailableException(f"Circuit half-open for {self.backend}", 1)
+            self.probing = True
+            self.in_flight += 1
+            return True
+        if self.in_flight >= config.BACKEND_MAX_CONCURRENCY:
+            raise BackendUnavailableException(f"Too many concurrent requests to {self.backend}", 1)
+        self.in_flight += 1
+        return False
+
+    def release(self, probe):
+        self.in_flight -= 1
+        if probe:
+            self.probing = False
+
+    def success(self, latency=None):
+        self.failures = 0
+        if latency is not None:
+            self.timeout.observe(latency)
+        if self.state == HALF_OPEN:
+            self.transition(CLOSED)
+
+    def failure(self, latency=None):
+        """Anota un fallo; latency es el tiempo agotado si fue un timeout, para que
+        el timeout crezca si el backend se volvio mas lento de forma duradera."""
+        self.failures += 1
+        if latency is not None:
+            self.timeout.observe(latency)
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= config.BREAKER_FAILURES):
+            self.opened_at = time.monotonic()
+            self.transition(OPEN)
+
+    def transition(self, state):
+        logger.warning(f"Circuit for {self.backend}: {self.state} -> {state}")
+        self.state = state
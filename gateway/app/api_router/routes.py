@@ -0,0 +1,97 @@
+import json
+import os
+from types import MappingProxyType
+from typing import NamedTuple
+from config import config
+
+class Route(NamedTuple):
+    """Ruta ya compilada: prefijo, backend, metodos y la URL base a la que se añade el resto del path."""
+    prefix: str
+    backend: str
+    methods: frozenset
+    base_url: str
+
+
+def default_routes():
+    """Rutas por defecto a partir de las URL de los microservicios en config. Las demas
+    (p.ej. las de Gestion del Conocimiento) solo se publican si se definen en ROUTES_FILE."""
+    return [
+        # Microservicio de Gestión de Objetos
+        {"prefix": "/objeto", "methods": ["GET", "POST"], "backend": config.OBJECT_SERVICE_URL},
+        # Microservicio de Data Streams
+        {"prefix": "/Datastreams", "methods": ["GET", "POST"], "backend": config.DATASTREAMS_SERVICE_URL},
+        # Microservicio de Automatización ECAs
+        {"prefix": "/eca", "methods": ["GET", "POST", "PUT", "PATCH", "DELETE"], "backend": config.ECA_SERVICE_URL},
+        # Microservicio de Personalización
+        {"prefix": "/personalizacion", "methods": ["GET", "POST"], "backend": config.PERSONALIZACION_SERVICE_URL},
+    ]
+
+
+class RouteTable:
+    """Arbol de prefijos (por segmentos del path) con las rutas compiladas.
+
+    Se construye una vez y no se modifica: recargar las rutas crea otra tabla y
+    APIRouter la sustituye de una vez, asi una peticion en curso nunca ve una
+    tabla a medias. lookup() recorre un nodo por segmento y se queda con la ruta
+    del prefijo mas largo, p.ej. /ontology/consultas antes que /ontology."""
+
+    def __init__(self, definitions):
+        root = ({}, [None])
+        for definition in definitions:
+            prefix = "/" + definition["prefix"].strip("/")
+            backend = definition["backend"].rstrip("/")
+            methods = frozenset(method.upper() for method in definition["methods"])
+            node = root
+            for segment in prefix.strip("/").split("/"):
+                node = node[0].setdefault(segment, ({}, [None]))
+            if node[1][0] is not None:
+                raise ValueError(f"Duplicated route prefix: {prefix}")
+            node[1][0] = Route(prefix, backend, methods, backend + prefix + "/")
+        self.root = self._freeze(root)
+        self.routes = self._collect(self.root)
+
+    def _freeze(self, node):
+        children, route = node
+        return (MappingProxyType({segment: self._freeze(child) for segment, child in children.items()}), route[0])
+
+    def _collect(self, node):
+        children, route = node
+        routes = [route] if route is not None else []
+        for child in children.values():
+            routes.extend(self._collect(child))
+        return tuple(routes)
+
+    def lookup(self, path):
+        """Retorna (ruta, resto del path sin la barra inicial) del prefijo mas largo, o (None, None)."""
+        segments = path.strip("/").split("/")
+        node, found, depth = self.root, None, 0
+        for index, segment in enumerate(segments):
+            node = node[0].get(segment)
+            if node is None:
+                break
+            if node[1] is not None:
+                found, depth = node[1], index + 1
+        if found is None:
+            return None, None
+        rest = "/".join(segments[depth:])
+        if rest and path.endswith("/"):
+            rest += "/"
+        return found, rest
+
+    @classmethod
+    def load(cls, path=None):
+        """Tabla del fichero JSON de rutas ({"routes": [{"prefix", "backend", "methods"}]}) o la por defecto."""
+        path = config.ROUTES_FILE if path is None else path
+        if not path:
+            return cls(default_routes())
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file)["routes"])
+
+
+def routes_signature(path):
+    """(mtime_ns, tamaño) del fichero de rutas, para saber si cambio desde la ultima carga."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -10,6 +10,27 @@ class Settings(BaseSettings):
     ECA_SERVICE_URL : str = "http://localhost:8004"
     PERSONALIZACION_SERVICE_URL : str = "http://localhost:8005"
     PORT: int = 8000
+    # Sesion HTTP compartida por backend (ver APIRouter.start)
+    UPSTREAM_CONNECTIONS: int = 100  # Conexiones simultaneas maximas por backend
+    UPSTREAM_KEEPALIVE_SECONDS: float = 30  # Tiempo que una conexion ociosa se reutiliza
+    UPSTREAM_DNS_TTL_SECONDS: int = 300  # Cache de resolucion DNS de los backends
+    UPSTREAM_TIMEOUT_SECONDS: float = 30  # Maximo de espera de un backend (ver BackendGuard)
+    # Proteccion por backend (ver BackendGuard)
+    BACKEND_MAX_CONCURRENCY: int = 64  # Peticiones esperando a un backend; las siguientes reciben 503
+    BREAKER_FAILURES: int = 5  # Fallos seguidos que abren el circuito
+    BREAKER_OPEN_SECONDS: float = 10  # Tiempo con el circuito abierto antes de probar de nuevo
+    TIMEOUT_PERCENTILE: float = 0.99
+    TIMEOUT_MULTIPLIER: float = 3  # timeout = percentil de las latencias recientes * multiplicador
+    TIMEOUT_MIN_SECONDS: float = 1
+    TIMEOUT_WINDOW: int = 200  # Latencias recientes consideradas
+    TIMEOUT_MIN_SAMPLES: int = 20  # Hasta tenerlas se usa UPSTREAM_TIMEOUT_SECONDS
+    # Fichero JSON de rutas (ver RouteTable.load); vacio = rutas por defecto con las URL anteriores
+    ROUTES_FILE: str = ""
+    ROUTES_RELOAD_SECONDS: float = 5  # Cada cuanto se comprueba si el fichero de rutas cambio
+    # Cache de los GET por prefijo de ruta (ver ResponseCache); 0 o ausente = sin cache
+    CACHE_TTL_SECONDS: dict[str, float] = {"/objeto/Identificator": 60, "/eca": 5}
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024  # Las respuestas mayores siguen en streaming sin guardarse
     model_config = ConfigDict(        
         env_file = ".env",
         env_file_encoding = "utf-8",
@@ -1,10 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends
 from api_router.api_router import APIRouter, RouteNotFoundException, MethodNotAllowedException
 from config import config
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un solo APIRouter por aplicacion: sus sesiones mantienen las conexiones con los backends
+    app.state.api_router = APIRouter()
+    await app.state.api_router.start()
+    yield
+    await app.state.api_router.close()
+
+app = FastAPI(lifespan=lifespan)
+
+def get_api_router(request: Request) -> APIRouter:
+    return request.app.state.api_router
 
 @app.api_route("{path_name:path}", methods=["GET", "POST", "PATCH","DELETE", "PUT"])
-async def route(request: Request, path_name: str, api_router: APIRouter = Depends(APIRouter)):
+async def route(request: Request, path_name: str, api_router: APIRouter = Depends(get_api_router)):
     try:
         response = await api_router.route(request=request)
         return response
@@ -23,4 +36,4 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=config.PORT
-    )
\ No newline at end of file
+    )
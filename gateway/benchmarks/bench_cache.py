@@ -0,0 +1,133 @@
+"""
+    @file bench_cache.py
+    @brief Llamadas al backend y latencia de la gateway con y sin la cache de GET.
+    @details
+    Un backend de prueba (aiohttp.web en localhost) tarda 20 ms en cada GET, como
+    un microservicio que vuelve a leer su ontología, y devuelve una ETag. Se
+    lanzan rondas de GET /objeto/Identificator concurrentes:
+    - antes: CACHE_TTL_SECONDS vacío, cada GET llega al backend.
+    - despues: TTL de 60 s; la primera ronda se resuelve con una sola llamada
+      (singleflight) y las siguientes desde la cache.
+    Al final comprueba que un POST al servicio invalida la entrada y que una
+    entrada caducada se revalida con If-None-Match (304 del backend).
+
+    Uso (desde gateway/):
+        python benchmarks/bench_cache.py [rondas] [concurrencia]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from aiohttp import web  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from config import config  # noqa: E402
+from api_router.api_router import APIRouter  # noqa: E402
+
+llamadas = {"GET": 0, "POST": 0}
+
+
+async def iniciar_backend():
+    """Backend de prueba en un puerto libre; retorna (runner, puerto)."""
+    async def identificador(request):
+        llamadas["GET"] += 1
+        etag = f'"v{llamadas["POST"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        await asyncio.sleep(0.02)
+        return web.json_response({"status": "success", "data": {"id": "obj1", "version": llamadas["POST"]}},
+                                 headers={"ETag": etag})
+
+    async def actualizar(request):
+        llamadas["POST"] += 1
+        return web.json_response({"status": "success"})
+
+    aplicacion = web.Application()
+    aplicacion.router.add_get("/objeto/Identificator", identificador)
+    aplicacion.router.add_post("/objeto/Actualizar", actualizar)
+    runner = web.AppRunner(aplicacion, access_log=None)
+    await runner.setup()
+    sitio = web.TCPSite(runner, "127.0.0.1", 0)
+    await sitio.start()
+    return runner, sitio._server.sockets[0].getsockname()[1]
+
+
+def peticion(metodo, path):
+    scope = {"type": "http", "method": metodo, "path": path, "query_string": b"",
+             "headers": [(b"host", b"gateway")], "path_params": {"path_name": path}}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def enviar(router, metodo, path):
+    respuesta = await router.route(peticion(metodo, path))
+    cuerpo = b""
+    if hasattr(respuesta, "body_iterator"):
+        cuerpo = b"".join([bloque async for bloque in respuesta.body_iterator])
+    return respuesta, cuerpo or respuesta.body
+
+
+async def rondas(router, cantidad, concurrencia):
+    """Retorna (llamadas al backend, p50 ms, p99 ms)."""
+    llamadas["GET"] = 0
+    muestras = []
+
+    async def cliente():
+        inicio = time.perf_counter()
+        respuesta, _ = await enviar(router, "GET", "/objeto/Identificator")
+        muestras.append(time.perf_counter() - inicio)
+        assert respuesta.status_code == 200
+
+    for _ in range(cantidad):
+        await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    ordenadas = sorted(muestras)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    return llamadas["GET"], statistics.median(ordenadas) * 1000, p99 * 1000
+
+
+async def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    concurrencia = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.disable(logging.INFO)
+    runner, puerto = await iniciar_backend()
+    config.OBJECT_SERVICE_URL = f"http://127.0.0.1:{puerto}"
+    try:
+        for nombre, ttls in (("antes (sin cache)", {}), ("despues (cache + singleflight)", {"/objeto/Identificator": 60})):
+            config.CACHE_TTL_SECONDS = ttls
+            router = APIRouter()
+            await router.start()
+            try:
+                backend, p50, p99 = await rondas(router, cantidad, concurrencia)
+            finally:
+                await router.close()
+            print(f"{nombre:<31} {cantidad * concurrencia:5d} GET -> {backend:5d} al backend   "
+                  f"p50={p50:7.2f} ms   p99={p99:7.2f} ms")
+
+        router = APIRouter()
+        await router.start()
+        try:
+            _, antes = await enviar(router, "GET", "/objeto/Identificator")
+            await enviar(router, "POST", "/objeto/Actualizar")
+            respuesta, despues = await enviar(router, "GET", "/objeto/Identificator")
+            assert antes != despues and respuesta.headers["X-Cache"] == "MISS"
+            for entrada in router.cache.entries.values():
+                entrada.expires = 0
+            llamadas["GET"] = 0
+            respuesta, revalidada = await enviar(router, "GET", "/objeto/Identificator")
+            assert revalidada == despues and respuesta.headers["X-Cache"] == "REVALIDATED" and llamadas["GET"] == 1
+            print("invalidacion tras POST y revalidacion con If-None-Match: ok")
+        finally:
+            await router.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+    @file bench_resiliencia.py
+    @brief Tiempo que la gateway retiene las peticiones a un backend ocupado, con y sin BackendGuard.
+    @details
+    Dos backends de prueba (aiohttp.web en localhost): /objeto responde en 5 ms y
+    /ontology/consultas responde en 10 ms hasta que se "ocupa" (como mientras
+    re-serializa la ontología) y entonces tarda 10 s. Tras calentar con el
+    backend sano se lanzan oleadas de GET concurrentes a ambos.
+    - antes: timeout fijo (UPSTREAM_TIMEOUT_SECONDS, aquí 3 s para acortar la
+      prueba), sin circuit breaker ni límite de concurrencia.
+    - despues: timeout adaptativo, circuit breaker y bulkhead por backend.
+    Se cuentan las peticiones que llegan al backend ocupado y los segundos que
+    las peticiones de la gateway pasan esperándolo. /ontology/consultas no es una
+    ruta por defecto: se publica con un ROUTES_FILE temporal.
+
+    Uso (desde gateway/):
+        python benchmarks/bench_resiliencia.py [oleadas] [concurrencia]
+"""
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from aiohttp import web  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from config import config  # noqa: E402
+from api_router.api_router import APIRouter  # noqa: E402
+
+estado = {"ocupado": False, "llamadas": 0}
+
+
+async def iniciar_backend(rutas):
+    """Backend de prueba en un puerto libre con rutas {path: handler}; retorna (runner, puerto)."""
+    aplicacion = web.Application()
+    for path, handler in rutas.items():
+        aplicacion.router.add_get(path, handler)
+    runner = web.AppRunner(aplicacion, access_log=None)
+    await runner.setup()
+    sitio = web.TCPSite(runner, "127.0.0.1", 0)
+    await sitio.start()
+    return runner, sitio._server.sockets[0].getsockname()[1]
+
+
+async def identificador(request):
+    await asyncio.sleep(0.005)
+    return web.json_response({"id": "obj1"})
+
+
+async def consultar_id(request):
+    if estado["ocupado"]:
+        estado["llamadas"] += 1
+        await asyncio.sleep(10)
+    else:
+        await asyncio.sleep(0.01)
+    return web.json_response("obj1")
+
+
+def peticion(path):
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"",
+             "headers": [(b"host", b"gateway")], "path_params": {"path_name": path}}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def enviar(router, path):
+    inicio = time.perf_counter()
+    respuesta = await router.route(peticion(path))
+    if hasattr(respuesta, "body_iterator"):
+        async for _ in respuesta.body_iterator:
+            pass
+    return respuesta.status_code, time.perf_counter() - inicio
+
+
+async def escenario(router, oleadas, concurrencia):
+    for _ in range(30):  ##Calentamiento con el backend sano: latencias para el timeout adaptativo
+        await enviar(router, "/ontology/consultas/consultar_id")
+    estado["ocupado"], estado["llamadas"] = True, 0
+    lentas, rapidas, codigos = [], [], {}
+    inicio = time.perf_counter()
+    for _ in range(oleadas):
+        resultados = await asyncio.gather(*([enviar(router, "/ontology/consultas/consultar_id") for _ in range(concurrencia)] +
+                                            [enviar(router, "/objeto/Identificator") for _ in range(concurrencia)]))
+        for indice, (codigo, segundos) in enumerate(resultados):
+            (lentas if indice < concurrencia else rapidas).append(segundos)
+            if indice < concurrencia:
+                codigos[codigo] = codigos.get(codigo, 0) + 1
+        await asyncio.sleep(0.5)
+    estado["ocupado"] = False
+    return time.perf_counter() - inicio, lentas, rapidas, codigos
+
+
+async def main():
+    oleadas = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrencia = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.disable(logging.CRITICAL)
+    objetos, puertoObjetos = await iniciar_backend({"/objeto/Identificator": identificador})
+    ontologia, puertoOntologia = await iniciar_backend({"/ontology/consultas/consultar_id": consultar_id})
+    rutas = {"routes": [{"prefix": "/objeto", "methods": ["GET"], "backend": f"http://127.0.0.1:{puertoObjetos}"},
+                        {"prefix": "/ontology/consultas", "methods": ["GET"],
+                         "backend": f"http://127.0.0.1:{puertoOntologia}"}]}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fichero:
+        json.dump(rutas, fichero)
+    config.ROUTES_FILE = fichero.name
+    config.CACHE_TTL_SECONDS = {}
+    config.UPSTREAM_TIMEOUT_SECONDS = 3
+    sinProteccion = {"BACKEND_MAX_CONCURRENCY": 10 ** 6, "BREAKER_FAILURES": 10 ** 6, "TIMEOUT_MIN_SAMPLES": 10 ** 6}
+    conProteccion = {nombre: getattr(config, nombre) for nombre in sinProteccion}
+    try:
+        for nombre, ajustes in (("antes (timeout fijo)", sinProteccion), ("despues (BackendGuard)", conProteccion)):
+            for clave, valor in ajustes.items():
+                setattr(config, clave, valor)
+            router = APIRouter()
+            await router.start()
+            try:
+                total, lentas, rapidas, codigos = await escenario(router, oleadas, concurrencia)
+            finally:
+                await router.close()
+            p99 = sorted(rapidas)[int(len(rapidas) * 0.99) - 1] * 1000
+            print(f"{nombre:<23} backend ocupado: {estado['llamadas']:4d} llamadas, espera total {sum(lentas):7.1f} s, "
+                  f"p50 {statistics.median(lentas) * 1000:7.1f} ms, codigos {dict(sorted(codigos.items()))}; "
+                  f"backend sano p99 {p99:6.1f} ms; escenario {total:5.1f} s")
+    finally:
+        await objetos.cleanup()
+        await ontologia.cleanup()
+        os.unlink(fichero.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
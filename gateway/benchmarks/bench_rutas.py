@@ -0,0 +1,63 @@
+"""
+    @file bench_rutas.py
+    @brief Compara la resolución de rutas de la gateway con el dict por petición y con la RouteTable.
+    @details
+    - antes: cada petición construye el dict de endpoints (Depends(APIRouter)),
+      parte el path, comprueba el método en una lista y concatena la URL.
+    - despues: lookup en el árbol de prefijos compilado una vez y URL base ya
+      calculada.
+
+    Uso (desde gateway/):
+        python benchmarks/bench_rutas.py [iteraciones]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from config import config  # noqa: E402
+from api_router.routes import RouteTable  # noqa: E402
+
+PATHS = ["/objeto/Identificator", "/eca/ECA1/estado", "/personalizacion/RecibirOntologia", "/Datastreams/temp/valor",
+         "/ontology/consultas/consultar_id", "/noexiste/x"]
+
+
+def antes(path, metodo):
+    endpoints = {
+        "/objeto": {"methods": ["GET", "POST"], "backend": config.OBJECT_SERVICE_URL},
+        "/Datastreams": {"methods": ["GET", "POST"], "backend": config.DATASTREAMS_SERVICE_URL},
+        "/eca": {"methods": ["GET", "POST", "PUT", "PATCH", "DELETE"], "backend": config.ECA_SERVICE_URL},
+        "/personalizacion": {"methods": ["GET", "POST"], "backend": config.PERSONALIZACION_SERVICE_URL},
+    }
+    partes = path.split("/")
+    servicio = "/" + partes[1] if len(partes) > 1 else ""
+    if servicio not in endpoints or metodo not in endpoints[servicio]["methods"]:
+        return None
+    resto = partes[2:] if len(partes) > 2 else []
+    return endpoints[servicio]["backend"] + servicio + "/" + "/".join(resto)
+
+
+def despues(tabla, path, metodo):
+    ruta, resto = tabla.lookup(path)
+    if ruta is None or metodo not in ruta.methods:
+        return None
+    return ruta.base_url + resto
+
+
+def main():
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tabla = RouteTable.load()
+    for path in PATHS[:4]:
+        assert antes(path, "GET") == despues(tabla, path, "GET"), path
+    for nombre, fn in (("antes (dict por peticion)", lambda p: antes(p, "GET")),
+                       ("despues (RouteTable)", lambda p: despues(tabla, p, "GET"))):
+        inicio = time.perf_counter()
+        for i in range(iteraciones):
+            fn(PATHS[i % len(PATHS)])
+        total = time.perf_counter() - inicio
+        print(f"{nombre:<26} {total / iteraciones * 1e6:7.3f} us/peticion")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+    @file bench_sesiones.py
+    @brief Compara el reenvío de la gateway con una sesión por petición y con las sesiones compartidas.
+    @details
+    Un backend de prueba (aiohttp.web en localhost) responde un JSON pequeño y un
+    generador de carga lanza las peticiones GET /objeto/Identificator con una
+    concurrencia fija directamente sobre APIRouter.route.
+    - antes: cada petición abre y cierra su ClientSession (conector, conexión TCP
+      y resolución DNS nuevos), como hacía la gateway.
+    - despues: un APIRouter abierto una vez reutiliza las conexiones keep-alive.
+
+    Uso (desde gateway/):
+        python benchmarks/bench_sesiones.py [peticiones] [concurrencia]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from aiohttp import web  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+from config import config  # noqa: E402
+from api_router.api_router import APIRouter  # noqa: E402
+
+
+class SesionPorPeticion(APIRouter):
+    """Reenvía como antes: sesiones nuevas para cada petición."""
+
+    async def route(self, request):
+        router = APIRouter()
+        await router.start()
+        try:
+            respuesta = await router.route(request)
+            cuerpo = [bloque async for bloque in respuesta.body_iterator]
+            return Response(b"".join(cuerpo), status_code=respuesta.status_code)
+        finally:
+            await router.close()
+
+
+async def iniciar_backend():
+    """Backend de prueba en un puerto libre; retorna (runner, puerto)."""
+    async def identificador(request):
+        return web.json_response({"status": "success", "data": {"id": "obj1"}})
+
+    aplicacion = web.Application()
+    aplicacion.router.add_get("/objeto/Identificator", identificador)
+    runner = web.AppRunner(aplicacion, access_log=None)
+    await runner.setup()
+    sitio = web.TCPSite(runner, "127.0.0.1", 0)
+    await sitio.start()
+    return runner, sitio._server.sockets[0].getsockname()[1]
+
+
+def peticion():
+    scope = {"type": "http", "method": "GET", "path": "/objeto/Identificator", "query_string": b"",
+             "headers": [(b"host", b"gateway"), (b"accept", b"application/json")],
+             "path_params": {"path_name": "/objeto/Identificator"}}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def carga(router, peticiones, concurrencia):
+    """Retorna (peticiones por segundo, p50 ms, p99 ms)."""
+    muestras = []
+    pendientes = iter(range(peticiones))
+
+    async def cliente():
+        for _ in pendientes:
+            inicio = time.perf_counter()
+            respuesta = await router.route(peticion())
+            if hasattr(respuesta, "body_iterator"):
+                async for _ in respuesta.body_iterator:
+                    pass
+            muestras.append(time.perf_counter() - inicio)
+            assert respuesta.status_code == 200
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    total = time.perf_counter() - inicio
+    ordenadas = sorted(muestras)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    return peticiones / total, statistics.median(ordenadas) * 1000, p99 * 1000
+
+
+async def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrencia = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.disable(logging.INFO)
+    runner, puerto = await iniciar_backend()
+    ##localhost y no 127.0.0.1 para que la resolucion DNS cuente, como con los nombres de docker-compose
+    config.OBJECT_SERVICE_URL = f"http://localhost:{puerto}"
+    config.CACHE_TTL_SECONDS = {}  ##Cada GET debe llegar al backend
+    try:
+        for nombre, router in (("antes (sesion por peticion)", SesionPorPeticion()), ("despues (sesiones compartidas)", APIRouter())):
+            await router.start()
+            try:
+                await carga(router, concurrencia, concurrencia)  ##Calentamiento
+                rps, p50, p99 = await carga(router, peticiones, concurrencia)
+            finally:
+                await router.close()
+            print(f"{nombre:<31} {rps:8.0f} req/s   p50={p50:7.2f} ms   p99={p99:7.2f} ms")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+    @file bench_streaming.py
+    @brief Memoria máxima de la gateway al reenviar subidas y descargas grandes.
+    @details
+    Un backend de prueba (aiohttp.web en localhost) recibe una ontología por
+    POST /personalizacion/RecibirOntologia y entrega un estado de N MB por
+    GET /objeto/SendState. La petición se construye por bloques como llegaría
+    del servidor ASGI y la respuesta se consume bloque a bloque como lo haría
+    uvicorn; tracemalloc mide el máximo de memoria reservada durante el reenvío.
+    - antes: el cuerpo se reúne con request.body() y la respuesta con
+      response.read(), como hacía la gateway.
+    - despues: APIRouter.route reenvía con request.stream() y StreamingResponse.
+
+    Uso (desde gateway/):
+        python benchmarks/bench_streaming.py [MB ...]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from aiohttp import web  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+from config import config  # noqa: E402
+from api_router.api_router import APIRouter, CHUNK_SIZE  # noqa: E402
+
+BLOQUE = b"x" * CHUNK_SIZE
+
+
+class Bufferizado(APIRouter):
+    """Reenvía como antes: el cuerpo de la petición y el de la respuesta enteros en memoria."""
+
+    async def route(self, request):
+        path = request.path_params["path_name"]
+        backend = config.OBJECT_SERVICE_URL
+        data = await request.body() if request.method == "POST" else None
+        async with self.sessions[backend].request(request.method, f"{backend}{path}?{request.query_params}",
+                                                      data=data) as respuesta:
+            return Response(await respuesta.read(), status_code=respuesta.status)
+
+
+async def iniciar_backend():
+    """Backend de prueba en un puerto libre; retorna (runner, puerto)."""
+    async def recibir(request):
+        recibidos = 0
+        async for bloque in request.content.iter_chunked(CHUNK_SIZE):
+            recibidos += len(bloque)
+        return web.json_response({"recibidos": recibidos})
+
+    async def estado(request):
+        respuesta = web.StreamResponse()
+        await respuesta.prepare(request)
+        for _ in range(int(request.query["mb"]) * 1024 * 1024 // CHUNK_SIZE):
+            await respuesta.write(BLOQUE)
+        await respuesta.write_eof()
+        return respuesta
+
+    aplicacion = web.Application(client_max_size=0)
+    aplicacion.router.add_post("/personalizacion/RecibirOntologia", recibir)
+    aplicacion.router.add_get("/objeto/SendState", estado)
+    runner = web.AppRunner(aplicacion, access_log=None)
+    await runner.setup()
+    sitio = web.TCPSite(runner, "127.0.0.1", 0)
+    await sitio.start()
+    return runner, sitio._server.sockets[0].getsockname()[1]
+
+
+def peticion(metodo, path, mb):
+    bloques = mb * 1024 * 1024 // CHUNK_SIZE if metodo == "POST" else 0
+    cabeceras = [(b"host", b"gateway")]
+    if bloques:
+        cabeceras.append((b"content-length", str(bloques * CHUNK_SIZE).encode()))
+    scope = {"type": "http", "method": metodo, "path": path, "query_string": f"mb={mb}".encode(),
+             "headers": cabeceras, "path_params": {"path_name": path}}
+    enviados = 0
+
+    async def receive():
+        nonlocal enviados
+        enviados += 1
+        return {"type": "http.request", "body": BLOQUE if bloques else b"", "more_body": enviados < bloques}
+
+    return Request(scope, receive)
+
+
+async def pico(router, metodo, path, mb):
+    """MB máximos reservados mientras se reenvía la petición y se consume su respuesta."""
+    tracemalloc.start()
+    try:
+        respuesta = await router.route(peticion(metodo, path, mb))
+        if hasattr(respuesta, "body_iterator"):
+            async for _ in respuesta.body_iterator:
+                pass
+        assert respuesta.status_code == 200
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+async def main():
+    tamaños = [int(mb) for mb in sys.argv[1:]] or [10, 50, 100]
+    logging.disable(logging.INFO)
+    runner, puerto = await iniciar_backend()
+    config.OBJECT_SERVICE_URL = config.PERSONALIZACION_SERVICE_URL = f"http://127.0.0.1:{puerto}"
+    try:
+        for nombre, router in (("antes (bufferizado)", Bufferizado()), ("despues (streaming)", APIRouter())):
+            await router.start()
+            try:
+                for mb in tamaños:
+                    subida = await pico(router, "POST", "/personalizacion/RecibirOntologia", mb)
+                    descarga = await pico(router, "GET", "/objeto/SendState", mb)
+                    print(f"{nombre:<20} {mb:4d} MB   pico subida={subida:8.2f} MB   pico descarga={descarga:8.2f} MB")
+            finally:
+                await router.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
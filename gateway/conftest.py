@@ -0,0 +1,78 @@
+# conftest.py
+import sys
+from pathlib import Path
+
+# Los módulos de la gateway se importan relativos a app/ (igual que al ejecutar uvicorn desde ahí)
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "app"))
+
+import pytest
+from aiohttp import web
+from starlette.requests import Request
+
+
+@pytest.fixture
+def config_pruebas(monkeypatch):
+    """Fixture que deja la configuración de la gateway en valores conocidos: rutas por defecto,
+    sin cache y protección por backend con los valores por defecto. Retorna el objeto config."""
+    from config import config
+    monkeypatch.setattr(config, "ROUTES_FILE", "")
+    monkeypatch.setattr(config, "CACHE_TTL_SECONDS", {})
+    monkeypatch.setattr(config, "UPSTREAM_TIMEOUT_SECONDS", 5)
+    monkeypatch.setattr(config, "BACKEND_MAX_CONCURRENCY", 64)
+    monkeypatch.setattr(config, "BREAKER_FAILURES", 5)
+    monkeypatch.setattr(config, "BREAKER_OPEN_SECONDS", 10)
+    monkeypatch.setattr(config, "TIMEOUT_MIN_SAMPLES", 20)
+    return config
+
+
+class Backend:
+    """Backend de prueba (aiohttp.web en localhost) que cuenta las peticiones que recibe por (método, path)."""
+
+    def __init__(self, rutas):
+        self.rutas = rutas  # {(método, path): handler}
+        self.llamadas = {}
+        self.runner = None
+        self.url = None
+
+    async def __aenter__(self):
+        aplicacion = web.Application()
+        for (metodo, path), handler in self.rutas.items():
+            aplicacion.router.add_route(metodo, path, self._contar(metodo, path, handler))
+        self.runner = web.AppRunner(aplicacion, access_log=None)
+        await self.runner.setup()
+        sitio = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await sitio.start()
+        self.url = f"http://127.0.0.1:{sitio._server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.runner.cleanup()
+
+    def _contar(self, metodo, path, handler):
+        async def contado(request):
+            self.llamadas[(metodo, path)] = self.llamadas.get((metodo, path), 0) + 1
+            return await handler(request)
+        return contado
+
+
+def peticion(method, path, headers=(), body=b"", receive=None):
+    """Request de starlette como la que recibe APIRouter.route desde main.py."""
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+             "headers": [(b"host", b"gateway")] + [(k.lower().encode(), v.encode()) for k, v in headers],
+             "path_params": {"path_name": path}}
+
+    async def recibir():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive or recibir)
+
+
+async def leer(respuesta):
+    """(código, cabeceras, cuerpo) de una respuesta de la gateway, en streaming o no."""
+    if hasattr(respuesta, "body_iterator"):
+        cuerpo = b"".join([bloque async for bloque in respuesta.body_iterator])
+    else:
+        cuerpo = respuesta.body
+    return respuesta.status_code, respuesta.headers, cuerpo
@@ -0,0 +1,145 @@
+# tests/unit/test_cache.py
+import asyncio
+from aiohttp import web
+
+from conftest import Backend, leer, peticion
+from api_router.api_router import APIRouter
+from api_router.cache import CachedResponse, ResponseCache
+
+
+def _objeto(cabeceras=None, espera=0):
+    async def handler(request):
+        if espera:
+            await asyncio.sleep(espera)
+        return web.json_response({"id": "obj1"}, headers=cabeceras)
+    return handler
+
+
+async def _con_gateway(config, rutas, escenario, otras=None):
+    """Ejecuta escenario(router, backend[, otro]) con /objeto reenviado al backend de prueba y cache de 60 s."""
+    async with Backend(rutas) as backend, Backend(otras or {}) as otro:
+        config.OBJECT_SERVICE_URL = backend.url
+        config.ECA_SERVICE_URL = otro.url
+        config.CACHE_TTL_SECONDS = {"/objeto": 60, "/eca": 60}
+        router = APIRouter()
+        await router.start()
+        try:
+            return await escenario(router, backend, otro)
+        finally:
+            await router.close()
+
+
+class TestCache:
+    """Pruebas de la cache de los GET de la gateway."""
+
+    def test_get_repetido_desde_cache(self, config_pruebas):
+        """1. Un GET repetido se sirve de la cache; otro Accept es otra entrada."""
+        async def escenario(router, backend, otro):
+            estados = []
+            for cabeceras in ([], [], [("accept", "text/plain")], [("accept", "text/plain")]):
+                codigo, headers, cuerpo = await leer(await router.route(peticion("GET", "/objeto/x", cabeceras)))
+                assert codigo == 200 and b"obj1" in cuerpo
+                estados.append(headers["x-cache"])
+            assert estados == ["MISS", "HIT", "MISS", "HIT"]
+            assert backend.llamadas[("GET", "/objeto/x")] == 2
+            assert int(headers["age"]) >= 0
+
+        asyncio.run(_con_gateway(config_pruebas, {("GET", "/objeto/x"): _objeto()}, escenario))
+
+    def test_respuestas_no_guardadas(self, config_pruebas):
+        """2. no-store, Set-Cookie, Vary: * y las peticiones con Cookie o Authorization no pasan por la cache."""
+        rutas = {("GET", "/objeto/nostore"): _objeto({"Cache-Control": "no-store"}),
+                 ("GET", "/objeto/cookie"): _objeto({"Set-Cookie": "sesion=1"}),
+                 ("GET", "/objeto/vary"): _objeto({"Vary": "*"}),
+                 ("GET", "/objeto/x"): _objeto()}
+
+        async def escenario(router, backend, otro):
+            for path, cabeceras in (("/objeto/nostore", []), ("/objeto/cookie", []), ("/objeto/vary", []),
+                                    ("/objeto/x", [("cookie", "sesion=a")]),
+                                    ("/objeto/x", [("authorization", "Bearer a")])):
+                for _ in range(2):
+                    codigo, headers, _ = await leer(await router.route(peticion("GET", path, cabeceras)))
+                    assert codigo == 200 and headers.get("x-cache") is None, (path, cabeceras)
+            assert backend.llamadas == {("GET", "/objeto/nostore"): 2, ("GET", "/objeto/cookie"): 2,
+                                        ("GET", "/objeto/vary"): 2, ("GET", "/objeto/x"): 4}
+            assert not router.cache.entries
+
+        asyncio.run(_con_gateway(config_pruebas, rutas, escenario))
+
+    def test_fallos_concurrentes_una_llamada(self, config_pruebas):
+        """3. Varios GET iguales a la vez llegan una sola vez al backend (singleflight)."""
+        async def escenario(router, backend, otro):
+            respuestas = await asyncio.gather(*(router.route(peticion("GET", "/objeto/x")) for _ in range(10)))
+            estados = sorted([(await leer(respuesta))[1]["x-cache"] for respuesta in respuestas])
+            assert estados == ["COALESCED"] * 9 + ["MISS"]
+            assert backend.llamadas[("GET", "/objeto/x")] == 1
+            assert not router.cache.inflight
+
+        asyncio.run(_con_gateway(config_pruebas, {("GET", "/objeto/x"): _objeto(espera=0.1)}, escenario))
+
+    def test_escritura_invalida_su_backend(self, config_pruebas):
+        """4. Un POST por un backend descarta sus GET guardados y conserva los de los demás."""
+        async def crear(request):
+            await request.read()
+            return web.json_response({"status": "ok"}, status=201)
+
+        async def escenario(router, backend, otro):
+            for path in ("/objeto/x", "/eca/y"):
+                await leer(await router.route(peticion("GET", path)))
+            codigo, _, _ = await leer(await router.route(peticion("POST", "/objeto/nuevo", body=b"{}")))
+            assert codigo == 201
+            _, objeto, _ = await leer(await router.route(peticion("GET", "/objeto/x")))
+            _, eca, _ = await leer(await router.route(peticion("GET", "/eca/y")))
+            assert objeto["x-cache"] == "MISS" and eca["x-cache"] == "HIT"
+            assert backend.llamadas[("GET", "/objeto/x")] == 2 and otro.llamadas[("GET", "/eca/y")] == 1
+
+        asyncio.run(_con_gateway(config_pruebas, {("GET", "/objeto/x"): _objeto(), ("POST", "/objeto/nuevo"): crear},
+                                 escenario, {("GET", "/eca/y"): _objeto()}))
+
+    def test_etag_y_revalidacion(self, config_pruebas):
+        """5. Con la ETag del cliente responde 304 sin ir al backend; una entrada caducada se revalida con If-None-Match."""
+        condicionales = []
+
+        async def etiquetado(request):
+            condicionales.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.json_response({"id": "obj1"}, headers={"ETag": '"v1"'})
+
+        async def escenario(router, backend, otro):
+            await leer(await router.route(peticion("GET", "/objeto/x")))
+            codigo, _, cuerpo = await leer(await router.route(peticion("GET", "/objeto/x", [("if-none-match", '"v1"')])))
+            assert codigo == 304 and cuerpo == b""
+            for entrada in router.cache.entries.values():
+                entrada.expires = 0
+            codigo, headers, cuerpo = await leer(await router.route(peticion("GET", "/objeto/x")))
+            assert codigo == 200 and headers["x-cache"] == "REVALIDATED" and b"obj1" in cuerpo
+            assert condicionales == [None, '"v1"']
+
+        asyncio.run(_con_gateway(config_pruebas, {("GET", "/objeto/x"): etiquetado}, escenario))
+
+    def test_ttl_lru_y_generaciones(self):
+        """6. TTL del prefijo más largo y acotado por max-age, desalojo LRU y sin guardar un GET anterior a una invalidación."""
+        cache = ResponseCache({"/eca": 5, "/eca/lista": 30, "/objeto": 0}, max_entries=2, max_entry_bytes=1024)
+        assert cache.ttl("/eca/lista/1") == 30 and cache.ttl("/eca/otra") == 5 and cache.ttl("/eca") == 5
+        assert cache.ttl("/ecas") == 0 and cache.ttl("/objeto/x") == 0
+        assert cache.lifetime({"cache-control": "max-age=10"}, 30) == 10
+        assert cache.lifetime({"cache-control": "s-maxage=100"}, 30) == 30
+        assert cache.lifetime({"cache-control": "private"}, 30) == 0
+        assert cache.lifetime({"vary": "Accept-Encoding"}, 30) == 30 and cache.lifetime({"vary": "Origin"}, 30) == 0
+        assert cache.key("http://b/eca", {"accept": "a"}) != cache.key("http://b/eca", {"accept": "b"})
+
+        def entrada():
+            return CachedResponse("http://b", 200, {}, b"{}", 30)
+
+        for clave in ("a", "b"):
+            cache.store(clave, entrada(), cache.generation("http://b"))
+        cache.get("a")
+        cache.store("c", entrada(), cache.generation("http://b"))
+        assert list(cache.entries) == ["a", "c"]
+
+        generacion = cache.generation("http://b")
+        cache.invalidate("http://b")
+        assert not cache.entries
+        cache.store("d", entrada(), generacion)
+        assert not cache.entries
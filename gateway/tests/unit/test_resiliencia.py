@@ -0,0 +1,171 @@
+# tests/unit/test_resiliencia.py
+import asyncio
+import pytest
+from aiohttp import web
+
+from conftest import Backend, leer, peticion
+from api_router import resilience
+from api_router.api_router import APIRouter
+from api_router.exceptions import BackendUnavailableException
+from api_router.resilience import CLOSED, HALF_OPEN, OPEN, AdaptiveTimeout, BackendGuard
+
+
+class Reloj:
+    """Sustituye a time.monotonic en resilience: el tiempo solo avanza con avanzar()."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def monotonic(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(resilience, "time", reloj)
+    return reloj
+
+
+def _rechazo(guard):
+    with pytest.raises(BackendUnavailableException) as rechazo:
+        guard.acquire()
+    return rechazo.value.retry_after
+
+
+class TestResiliencia:
+    """Pruebas del circuit breaker, el límite de concurrencia y el timeout adaptativo por backend."""
+
+    def test_se_abre_tras_fallos_seguidos(self, config_pruebas, reloj):
+        """13. El circuito se abre con BREAKER_FAILURES fallos seguidos; un acierto reinicia la cuenta."""
+        config_pruebas.BREAKER_FAILURES = 3
+        guard = BackendGuard("http://b")
+        for _ in range(2):
+            guard.failure()
+        guard.success()
+        for _ in range(2):
+            guard.failure()
+        assert guard.state == CLOSED
+        guard.failure()
+        assert guard.state == OPEN
+
+    def test_abierto_rechaza_con_retry_after(self, config_pruebas, reloj):
+        """14. Con el circuito abierto se rechaza todo con Retry-After igual al tiempo que le queda abierto."""
+        config_pruebas.BREAKER_FAILURES = 1
+        config_pruebas.BREAKER_OPEN_SECONDS = 10
+        guard = BackendGuard("http://b")
+        guard.failure()
+        assert _rechazo(guard) == 10
+        reloj.avanzar(3.5)
+        assert _rechazo(guard) == 7
+        reloj.avanzar(6)
+        assert _rechazo(guard) == 1
+        assert guard.in_flight == 0
+
+    def test_semiabierto_una_sola_prueba(self, config_pruebas, reloj):
+        """15. Pasado el tiempo abierto pasa una sola petición de prueba: si va bien se cierra y si falla se reabre."""
+        config_pruebas.BREAKER_FAILURES = 1
+        config_pruebas.BREAKER_OPEN_SECONDS = 10
+        guard = BackendGuard("http://b")
+        guard.failure()
+        reloj.avanzar(10)
+        assert guard.acquire() is True and guard.state == HALF_OPEN
+        assert _rechazo(guard) == 1
+        guard.failure()
+        guard.release(True)
+        assert guard.state == OPEN and _rechazo(guard) == 10
+
+        reloj.avanzar(10)
+        assert guard.acquire() is True
+        guard.success(0.01)
+        guard.release(True)
+        assert guard.state == CLOSED and not guard.probing
+        assert guard.acquire() is False and guard.acquire() is False
+
+    def test_limite_de_concurrencia(self, config_pruebas, reloj):
+        """16. Con BACKEND_MAX_CONCURRENCY peticiones esperando al backend las siguientes se rechazan al momento."""
+        config_pruebas.BACKEND_MAX_CONCURRENCY = 2
+        guard = BackendGuard("http://b")
+        guard.acquire()
+        guard.acquire()
+        assert _rechazo(guard) == 1 and guard.in_flight == 2
+        guard.release(False)
+        assert guard.acquire() is False and guard.state == CLOSED
+
+    def test_timeout_adaptativo(self, config_pruebas):
+        """17. Con TIMEOUT_MIN_SAMPLES latencias el timeout es su p99 por el multiplicador, entre el mínimo y el máximo."""
+        config_pruebas.TIMEOUT_MIN_SAMPLES = 10
+        config_pruebas.TIMEOUT_WINDOW = 200
+        config_pruebas.TIMEOUT_PERCENTILE = 0.99
+        config_pruebas.TIMEOUT_MULTIPLIER = 3
+        config_pruebas.TIMEOUT_MIN_SECONDS = 1
+        config_pruebas.UPSTREAM_TIMEOUT_SECONDS = 5
+        timeout = AdaptiveTimeout()
+        for _ in range(9):
+            timeout.observe(0.1)
+        assert timeout.current == 5  # Aún sin muestras suficientes: el máximo
+        timeout.observe(0.1)
+        assert timeout.current == 1  # 0.3 s queda por debajo del mínimo
+
+        timeout.observe(100)  # Un valor atípico no mueve el p99 de 200 muestras
+        for _ in range(199):
+            timeout.observe(0.4)
+        assert timeout.current == pytest.approx(1.2)
+        for _ in range(200):
+            timeout.observe(10)
+        assert timeout.current == 5
+
+    def test_solo_cuentan_los_fallos_del_backend(self, config_pruebas):
+        """18. 4xx, 500, clientes que se desconectan o suben despacio no cuentan; 502/503/504, timeouts y conexiones rechazadas sí."""
+        config_pruebas.UPSTREAM_TIMEOUT_SECONDS = 0.3
+
+        def estado(codigo, espera=0):
+            async def handler(request):
+                await request.read()
+                if espera:
+                    await asyncio.sleep(espera)
+                return web.Response(status=codigo)
+            return handler
+
+        def desconecta():
+            mensajes = iter([{"type": "http.request", "body": b"a" * 100, "more_body": True}])
+
+            async def receive():
+                return next(mensajes, {"type": "http.disconnect"})
+            return receive
+
+        async def subida_lenta():
+            await asyncio.sleep(1)
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def escenario():
+            rutas = {("GET", "/objeto/no"): estado(404), ("GET", "/objeto/error"): estado(500),
+                     ("GET", "/objeto/caido"): estado(503), ("GET", "/objeto/lento"): estado(200, 1),
+                     ("POST", "/objeto/subida"): estado(201)}
+            async with Backend(rutas) as backend:
+                config_pruebas.OBJECT_SERVICE_URL = backend.url
+                config_pruebas.ECA_SERVICE_URL = "http://127.0.0.1:1"  # Nadie escucha: conexión rechazada
+                router = APIRouter()
+                await router.start()
+                guard = router.guards[backend.url]
+                try:
+                    for metodo, path, receive, codigo, fallos in (
+                            ("GET", "/objeto/no", None, 404, 0),
+                            ("GET", "/objeto/error", None, 500, 0),
+                            ("POST", "/objeto/subida", desconecta(), 500, 0),
+                            ("POST", "/objeto/subida", subida_lenta, 504, 0),
+                            ("GET", "/objeto/caido", None, 503, 1),
+                            ("GET", "/objeto/lento", None, 504, 2)):
+                        respuesta = await router.route(peticion(metodo, path, receive=receive))
+                        assert (await leer(respuesta))[0] == codigo, path
+                        assert guard.failures == fallos, path
+                    assert guard.in_flight == 0
+                    assert (await leer(await router.route(peticion("GET", "/eca/x"))))[0] == 500
+                    assert router.guards["http://127.0.0.1:1"].failures == 1
+                finally:
+                    await router.close()
+
+        asyncio.run(escenario())
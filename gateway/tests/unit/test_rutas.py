@@ -0,0 +1,108 @@
+# tests/unit/test_rutas.py
+import asyncio
+import json
+import os
+import pytest
+from aiohttp import web
+
+from conftest import Backend, leer, peticion
+from api_router.api_router import APIRouter
+from api_router.exceptions import RouteNotFoundException
+from api_router.routes import RouteTable
+
+RUTAS = [{"prefix": "/ontology", "methods": ["GET"], "backend": "http://general"},
+         {"prefix": "/ontology/consultas", "methods": ["GET"], "backend": "http://consultas/"},
+         {"prefix": "/eca", "methods": ["get", "DELETE"], "backend": "http://eca"}]
+
+
+def _escribir(path, rutas):
+    with open(path, "w", encoding="utf-8") as fichero:
+        json.dump({"routes": rutas}, fichero)
+    # Firma distinta aunque se reescriba en el mismo instante con el mismo tamaño
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10 ** 9,) * 2)
+
+
+class TestRutas:
+    """Pruebas del árbol de prefijos de rutas de la gateway y de su recarga."""
+
+    def test_prefijo_mas_largo(self):
+        """7. Gana el prefijo más largo, comparando por segmentos y no por texto."""
+        tabla = RouteTable(RUTAS)
+        ruta, resto = tabla.lookup("/ontology/consultas/consultar_id")
+        assert ruta.prefix == "/ontology/consultas" and resto == "consultar_id"
+        assert ruta.base_url + resto == "http://consultas/ontology/consultas/consultar_id"
+        assert tabla.lookup("/ontology/consultas_usuario/x")[0].prefix == "/ontology"
+        assert tabla.lookup("/ontology/otra/y") == (tabla.lookup("/ontology")[0], "otra/y")
+        assert tabla.lookup("/ontologyx/y") == (None, None) and tabla.lookup("/") == (None, None)
+        assert tabla.lookup("/eca")[0].methods == frozenset({"GET", "DELETE"})
+
+    def test_barra_final(self):
+        """8. La barra final del path se conserva en la URL del backend."""
+        tabla = RouteTable(RUTAS)
+        ruta, resto = tabla.lookup("/eca/ECA1/")
+        assert ruta.base_url + resto == "http://eca/eca/ECA1/"
+        assert tabla.lookup("/eca/ECA1")[1] == "ECA1"
+        assert tabla.lookup("/eca/")[1] == "" and tabla.lookup("/eca")[0].base_url == "http://eca/eca/"
+
+    def test_barra_final_hasta_el_backend(self, config_pruebas):
+        """9. Una petición con barra final llega al backend con ella y sin ella a su propio path."""
+        async def ruta(request):
+            return web.Response(text=request.path)
+
+        async def escenario():
+            async with Backend({("GET", "/objeto/x/"): ruta, ("GET", "/objeto/x"): ruta}) as backend:
+                config_pruebas.OBJECT_SERVICE_URL = backend.url
+                router = APIRouter()
+                await router.start()
+                try:
+                    for path in ("/objeto/x/", "/objeto/x"):
+                        codigo, _, cuerpo = await leer(await router.route(peticion("GET", path)))
+                        assert codigo == 200 and cuerpo == path.encode()
+                finally:
+                    await router.close()
+
+        asyncio.run(escenario())
+
+    def test_prefijo_duplicado(self):
+        """10. Dos rutas con el mismo prefijo (aunque difieran las barras) son un error."""
+        with pytest.raises(ValueError):
+            RouteTable(RUTAS + [{"prefix": "eca/", "methods": ["GET"], "backend": "http://otro"}])
+
+    def test_rutas_por_defecto(self, config_pruebas):
+        """11. Por defecto solo se publican los microservicios de siempre; el resto, con ROUTES_FILE."""
+        tabla = RouteTable.load()
+        assert sorted(ruta.prefix for ruta in tabla.routes) == ["/Datastreams", "/eca", "/objeto", "/personalizacion"]
+        assert tabla.lookup("/ontology/consultas/consultar_id") == (None, None)
+        router = APIRouter()
+        with pytest.raises(RouteNotFoundException):
+            asyncio.run(router.route(peticion("GET", "/ontology/consultas/consultar_id")))
+
+    def test_recarga(self, config_pruebas, tmp_path):
+        """12. El fichero de rutas se recarga al cambiar; si no es válido se conservan las rutas actuales."""
+        path = str(tmp_path / "rutas.json")
+        _escribir(path, RUTAS)
+        config_pruebas.ROUTES_FILE = path
+        config_pruebas.ROUTES_RELOAD_SECONDS = 0.02
+
+        async def escenario():
+            router = APIRouter()
+            await router.start()
+            try:
+                tabla = router.table
+                assert router.sessions.keys() == {"http://general", "http://consultas", "http://eca"}
+                for invalido in ("{no es json", json.dumps({"routes": RUTAS + RUTAS[:1]})):
+                    with open(path, "w", encoding="utf-8") as fichero:
+                        fichero.write(invalido)
+                    assert router.reload() is False and router.table is tabla
+
+                _escribir(path, RUTAS + [{"prefix": "/objeto", "methods": ["GET"], "backend": "http://objetos"}])
+                for _ in range(100):
+                    if router.table is not tabla:
+                        break
+                    await asyncio.sleep(0.02)
+                assert router.table.lookup("/objeto/x")[0].backend == "http://objetos"
+                assert "http://objetos" in router.sessions and "http://objetos" in router.guards
+            finally:
+                await router.close()
+
+        asyncio.run(escenario())
@@ -0,0 +1,90 @@
+"""
+    @file cambios.py
+    @brief Controlador REST del historial de cambios de la ontología instanciada.
+    @details
+    La ontología lleva un número de revisión que avanza con cada transacción
+    confirmada (ver RegistroCambios). Un cliente que guarda en caché datos de la
+    ontología (gateway, servicio de ECAs, gestión de objetos) recuerda la época y
+    la revisión de su última lectura y pide solo los cambios posteriores, en lugar
+    de volver a consultarlo todo periódicamente.
+
+    Con espera > 0 la petición es de sondeo largo: si no hay cambios posteriores
+    queda esperando, sin ocupar hilos, hasta que se confirme una revisión nueva o
+    pasen los segundos indicados (como mucho CAMBIOS_ESPERA_MAX).
+
+    Router:
+    - cambios_router (prefix=/ontology): GET /ontology/changes
+
+    @see RegistroCambios Para la revisión y el historial
+"""
+
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Query
+
+from api.ejecutor import consultas
+from config import settings
+from infraestructure.acceso_ontologia import Cambios
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+
+cambios_router = APIRouter(prefix="/ontology", tags=["Cambios de la ontología"])
+"""@var cambios_router Router del historial de cambios de la ontología instanciada."""
+@cambios_router.get("/changes", response_model=dict)
+async def cambios(
+    since: Optional[int] = Query(None, description="Revisión de la última lectura del cliente"),
+    epoca: Optional[str] = Query(None, description="Época de esa revisión"),
+    espera: float = Query(0, ge=0, description="Segundos a esperar una revisión nueva si no hay cambios"),
+    triples: bool = Query(False, description="Incluir los triples agregados y quitados"),
+) -> dict:
+    """
+        @brief Retorna los cambios confirmados en la ontología después de una revisión.
+
+        @param since Revisión de la última lectura; sin ella solo se informa la revisión actual.
+        @param epoca Época de esa revisión; si no coincide con la actual el proceso se reinició.
+        @param espera Segundos de sondeo largo si todavía no hay cambios posteriores.
+        @param triples Incluir, por revisión, los triples ["+"|"-", s, p, o] en notación N3.
+
+        @return dict {epoca, revision, resincronizar, cambios: [{revision, individuos[, triples]}]}.
+                resincronizar es True cuando los cambios desde since ya no se conocen (historial
+                superado, grafo recargado desde disco, otra época o sin since): el cliente
+                debe volver a leer todo y continuar desde la revisión devuelta.
+    """
+    ontologia = await consultas.ejecutar(_ontologiaAlDia)
+    if since is not None and espera > 0 and epoca in (None, ontologia.cambios.epoca):
+        await _esperarRevision(ontologia.cambios, since, min(espera, settings.CAMBIOS_ESPERA_MAX))
+    return await consultas.ejecutar(_respuesta, ontologia.cambios, since, epoca, triples)
+
+def _ontologiaAlDia():
+    ontologia = Ontologia.compartida()
+    ontologia.refrescarSiCambio()
+    return ontologia
+
+##Se suscribe antes de mirar la revision para no perder un aviso que llegue entre medias
+async def _esperarRevision(registro, since, segundos):
+    bucle = asyncio.get_running_loop()
+    evento = asyncio.Event()
+    def aviso():
+        try:
+            bucle.call_soon_threadsafe(evento.set)
+        except RuntimeError:
+            pass  ##El bucle ya se cerro
+    registro.suscribir(aviso)
+    try:
+        if registro.revision == since:
+            await asyncio.wait_for(evento.wait(), segundos)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        registro.desuscribir(aviso)
+
+def _respuesta(registro, since, epoca, conTriples):
+    revision, historial = registro.desde(since) if since is not None else (registro.revision, None)
+    if epoca is not None and epoca != registro.epoca:
+        historial = None
+    cambios = []
+    for numero, operaciones in historial or ():
+        cambio = {"revision": numero, "individuos": Cambios.individuos(operaciones)}
+        if conTriples:
+            cambio["triples"] = Cambios.triples(operaciones)
+        cambios.append(cambio)
+    return {"epoca": registro.epoca, "revision": revision, "resincronizar": historial is None, "cambios": cambios}
@@ -4,16 +4,18 @@
     @details
     Proporciona endpoints para:
     - Consultar propiedades del objeto inteligente (id, title, estado, etc.)
+    - Consultar todos los metadatos del objeto de una vez (snapshot, con ETag)
     - Consultar y gestionar reglas ECA (Event-Condition-Action)
     - Consultar propiedades del perfil de usuario
+    - Consultar interacciones del usuario, incluso las archivadas
     - Verificar contratos entre objetos
     
     Routers:
     - ontologia_router (prefix=/ontology/consultas): consultas de objeto
     - ontologia_usuario_router (prefix=/ontology/consultas_usuario): consultas de usuario
     
-    @note Las consultas pueden ser costosas si requieren razonamiento OWL.
-          Considerar cache y asyncio.to_thread() para operaciones bloqueantes.
+    @note Las consultas son bloqueantes: cada endpoint se ejecuta en el ejecutor
+          de consultas, o en el de escrituras si modifica la ontología.
     
     @author Sistema Objeto Inteligente
     @version 1.0
@@ -21,19 +23,24 @@
     
     @see ConsultasService Para lógica de negocio
     @see ConsultasOntologiaUsuarioService Para consultas de usuario
+    @see api/ejecutor.py Para los ejecutores
 """
 
-from fastapi.responses import JSONResponse
+from typing import Optional
+from fastapi.responses import JSONResponse, Response
 from application.consultas_service import ConsultasOntologiaUsuarioService, ConsultasService
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 
+from api.ejecutor import consultas, escrituras
 from deps import get_consultas_pu_service, get_consultas_pu_service, get_consultas_service
 from application.dtos import ECAStateListDTO
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
 
 ontologia_router = APIRouter(prefix="/ontology/consultas", tags=["Consultas de Base de conocimiento"])
 """@var ontologia_router Router para consultas sobre ontología del objeto inteligente."""
 @ontologia_router.get("/consultar_active", response_model=bool)
-async def consultar_active(service: ConsultasService = Depends(get_consultas_service)) -> bool:
+@consultas.despachar
+def consultar_active(service: ConsultasService = Depends(get_consultas_service)) -> bool:
     """
         @brief Verifica que la ontología instanciada esté activa.
         
@@ -50,91 +57,141 @@ async def consultar_active(service: ConsultasService = Depends(get_consultas_ser
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_id", response_model=str)
-async def consultar_id(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_id(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar el ID del objeto inteligente."""
     try:
         return service.consultarId()
     except Exception as e:        
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_description", response_model=str)
-async def consultar_description(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_description(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar la descripción del estado."""
     try:
         return service.consultarDescription()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_private", response_model=bool)
-async def consultar_private(service: ConsultasService = Depends(get_consultas_service)) -> bool:
+@consultas.despachar
+def consultar_private(service: ConsultasService = Depends(get_consultas_service)) -> bool:
     """Endpoint para consultar si el feed/objeto es privado."""
     try:
         return service.consultarPrivate()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_title", response_model=str)
-async def consultar_title(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_title(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar el título descriptivo del estado."""
     try:
         return service.consultarTitle()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_feed", response_model=str)
-async def consultar_feed(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_feed(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar la URL del feed asociada al estado."""
     try:
         return service.consultarFeed()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_status", response_model=str)
-async def consultar_status(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_status(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar el estado (status) del estado del objeto."""
     try:
         return service.consultarStatus()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_updated", response_model=str)
-async def consultar_updated(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_updated(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar la fecha/hora de la última actualización del estado."""
     try:
         return service.consultarUpdated()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_created", response_model=str)
-async def consultar_created(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_created(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar la fecha de creación del estado."""
     try:
         return service.consultarCreated()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_creator", response_model=str)
-async def consultar_creator(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_creator(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar el creador del estado/objeto."""
     try:
         return service.consultarCreator()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_version", response_model=str)
-async def consultar_version(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_version(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar la versión asociada al estado."""
     try:
         return service.consultarVersion()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_website", response_model=str)
-async def consultar_website(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_website(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar la URL de un sitio web relevante para el feed/objeto."""
     try:
         return service.consultarWebsite()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_router.get("/consultar_service_state", response_model=str)
-async def consultar_service_state(service: ConsultasService = Depends(get_consultas_service)) -> str:
+@consultas.despachar
+def consultar_service_state(service: ConsultasService = Depends(get_consultas_service)) -> str:
     """Endpoint para consultar el estado del servicio básico del objeto."""
     try:
         return service.consultarServiceState()
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
+@ontologia_router.get("/snapshot", response_model=None)
+@consultas.despachar
+def snapshot(if_none_match: Optional[str] = Header(None),
+             service: ConsultasService = Depends(get_consultas_service)) -> Response:
+    """
+        @brief Retorna en una sola respuesta los metadatos del objeto, su State, location y datastreams.
+        
+        @param if_none_match Cabecera If-None-Match con el ETag de una respuesta anterior.
+        @param service Servicio de consultas.
+        
+        @return JSON {object, state, location, datastreams} con cabecera ETag, o 304 sin cuerpo
+                si el ETag recibido sigue vigente.
+        
+        @details
+        Sustituye a las consultas de propiedad por propiedad (consultar_title,
+        consultar_description, ...). La instantánea se mantiene en memoria y solo se
+        recalcula cuando cambia alguno de esos individuos, así que quien la consulta
+        periódicamente debe enviar If-None-Match para recibir 304 mientras no cambie.
+        
+        @see ConsultasService.consultarSnapshot()
+    """
+    try:
+        etag, cuerpo = service.consultarSnapshot()
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match is not None and _coincideEtag(if_none_match, etag):
+        return Response(status_code=304, headers=cabeceras)
+    return Response(content=cuerpo, media_type="application/json", headers=cabeceras)
+
+def _coincideEtag(ifNoneMatch: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): acepta *, listas y validadores W/."""
+    for candidato in ifNoneMatch.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
 @ontologia_router.patch("/set_eca_state")
-async def set_eca_state(valorNuevo: str, nombreECA: str, service: ConsultasService = Depends(get_consultas_service)):
+@escrituras.despachar
+def set_eca_state(valorNuevo: str, nombreECA: str, service: ConsultasService = Depends(get_consultas_service)):
     """
         @brief Actualiza el estado de una regla ECA específica.
         
@@ -151,7 +208,8 @@ async def set_eca_state(valorNuevo: str, nombreECA: str, service: ConsultasServi
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 @ontologia_router.get("/listar_ecas", response_model=list)
-async def listar_ecas(service: ConsultasService = Depends(get_consultas_service)) -> list:
+@consultas.despachar
+def listar_ecas(service: ConsultasService = Depends(get_consultas_service)) -> list:
     """
         @brief Lista todas las reglas ECAs definidas en la ontología.
         
@@ -167,28 +225,32 @@ async def listar_ecas(service: ConsultasService = Depends(get_consultas_service)
         raise HTTPException(status_code=400, detail=str(e))
     
 @ontologia_router.delete("/eliminar_eca")
-async def eliminar_eca(nombreECA: str, service: ConsultasService = Depends(get_consultas_service)):
+@escrituras.despachar
+def eliminar_eca(nombreECA: str, service: ConsultasService = Depends(get_consultas_service)):
     """Endpoint para eliminar una ECA de la ontología."""
     try:
         return service.eliminarECA(nombreECA)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 @ontologia_router.get("/listar_dinamic_estado", response_model=list)
-async def listar_dinamic_estado(eca_state: str, service: ConsultasService = Depends(get_consultas_service)) -> list:
+@consultas.despachar
+def listar_dinamic_estado(eca_state: str, service: ConsultasService = Depends(get_consultas_service)) -> list:
     """Endpoint para listar las ECAs con un estado específico."""
     try:
         return service.listarDinamicEstado(eca_state)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 @ontologia_router.patch("/set_eca_list_state")
-async def set_eca_list_state(listaEcas: ECAStateListDTO, service: ConsultasService = Depends(get_consultas_service)):
+@escrituras.despachar
+def set_eca_list_state(listaEcas: ECAStateListDTO, service: ConsultasService = Depends(get_consultas_service)):
     """Endpoint para actualizar el estado de una lista de ECAs."""
     try:
         return service.setEcaListState(listaEcas.ecas)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 @ontologia_router.get("/verificar_contrato/{osid}/{osidDestino}", response_model=list)
-async def verificar_contrato(osid: str, osidDestino: str, service: ConsultasService = Depends(get_consultas_service)) -> list:
+@consultas.despachar
+def verificar_contrato(osid: str, osidDestino: str, service: ConsultasService = Depends(get_consultas_service)) -> list:
     """Endpoint para verificar si existe un contrato ECA entre dos objetos en la ontología."""
     try:
         return service.verficarContrato(osid, osidDestino)
@@ -198,6 +260,7 @@ async def verificar_contrato(osid: str, osidDestino: str, service: ConsultasServ
 ontologia_usuario_router = APIRouter(prefix="/ontology/consultas_usuario", tags=["Consultas de Usuario"])
 """ Endpoints para consultas sobre la ontología del perfil de usuario."""
 @ontologia_usuario_router.get("/consultar_email_usuario")
+@consultas.despachar
 def consultar_email_usuario(service: ConsultasOntologiaUsuarioService = Depends(get_consultas_pu_service)) -> str:
     """Endpoint para consultar el email del usuario desde su ontología."""
     try:
@@ -205,6 +268,7 @@ def consultar_email_usuario(service: ConsultasOntologiaUsuarioService = Depends(
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_usuario_router.get("/consultar_lista_preferencias/{osid}")
+@consultas.despachar
 def consultar_lista_preferencias(osid: str, service: ConsultasOntologiaUsuarioService = Depends(get_consultas_pu_service)) -> JSONResponse:
     """Endpoint para consultar la lista de preferencias del usuario por OSID."""
     try:
@@ -212,9 +276,46 @@ def consultar_lista_preferencias(osid: str, service: ConsultasOntologiaUsuarioSe
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 @ontologia_usuario_router.get("/consultar_active")
+@consultas.despachar
 def consultar_active(service: ConsultasOntologiaUsuarioService = Depends(get_consultas_pu_service)) -> JSONResponse:
     """Endpoint para consultar si el perfil del usuario está activo en su ontología."""
     try:
         return service.consultarActive()
     except Exception as e:
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+@ontologia_usuario_router.get("/consultar_interacciones")
+@consultas.despachar
+def consultar_interacciones(
+    osid: Optional[str] = Query(None, description="Solo las del objeto con este OSID"),
+    idDataStream: Optional[str] = Query(None, description="Solo las de este recurso"),
+    desde: Optional[str] = Query(None, description="Fecha mínima (ISO 8601 o dd/mm/aa hh:mm:ss)"),
+    hasta: Optional[str] = Query(None, description="Fecha máxima (ISO 8601 o dd/mm/aa hh:mm:ss)"),
+    archivo: bool = Query(False, description="Incluir las interacciones archivadas de esos meses"),
+    service: ConsultasOntologiaUsuarioService = Depends(get_consultas_pu_service),
+) -> JSONResponse:
+    """
+        @brief Consulta las interacciones del usuario con los objetos.
+
+        @return JSON {interacciones: [{osid, idDataStream, comando, fecha}], archivadas: [{osid, idDataStream, archivadas}]}.
+                Sin archivo solo se leen las interacciones que siguen en el perfil; archivadas
+                cuenta, por objeto y recurso, las que se movieron al archivo.
+
+        @exception HTTPException 400 si desde o hasta no tienen un formato de fecha reconocido.
+
+        @see ArchivoInteracciones Para el archivado por meses
+    """
+    try:
+        return service.consultarInteracciones(osid, idDataStream, desde, hasta, archivo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+@ontologia_usuario_router.get("/metricas_pool", response_model=dict)
+async def metricas_pool() -> dict:
+    """
+        @brief Métricas del pool de ontologías de perfil de usuario cargadas en memoria.
+
+        @return dict con ontologías y triples cargados, memoria estimada, perfiles con cambios
+                sin guardar y contadores de aciertos, fallos, recargas, desalojos y escrituras.
+
+        @see PoolOntologiasPU.metricas()
+    """
+    return pool.metricas()
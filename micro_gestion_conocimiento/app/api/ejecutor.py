@@ -0,0 +1,142 @@
+"""
+    @file ejecutor.py
+    @brief Ejecución acotada, fuera del bucle de eventos, de las llamadas bloqueantes a los servicios.
+    @details
+    Los endpoints son async, pero rdflib es síncrono: una consulta lenta o un
+    volcado ejecutados en el bucle de uvicorn detienen todas las demás peticiones.
+    Los endpoints se despachan a uno de dos ejecutores:
+    - consultas: pool de EJECUTOR_HILOS_CONSULTA hilos (lectores concurrentes de Ontologia)
+    - escrituras: un único hilo, así las mutaciones se aplican en orden de llegada
+
+    Cada ejecutor admite como mucho EJECUTOR_MAX_ESPERA llamadas en cola; las
+    siguientes reciben 503 con Retry-After. Una petición que no termina en
+    EJECUTOR_TIMEOUT segundos recibe 504. Si aún estaba en cola se descarta; si
+    ya se estaba ejecutando termina igualmente, porque un hilo no puede
+    interrumpirse (una escritura que responde 504 puede haberse aplicado).
+
+    Uso en un router (el endpoint se escribe síncrono y el decorador lo hace async):
+        @ontologia_router.get("/consultar_id", response_model=str)
+        @consultas.despachar
+        def consultar_id(service: ConsultasService = Depends(get_consultas_service)) -> str:
+            ...
+
+    Router:
+    - ejecutor_router (prefix=/ontology/ejecutor): métricas de espera en cola y de ejecución
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, HTTPException
+
+from config import settings
+
+
+class Ejecutor:
+    """Pool de hilos con cola acotada, tiempo máximo por petición y métricas."""
+
+    def __init__(self, nombre, hilos, maxEspera = None, timeout = None):
+        self.nombre = nombre
+        self.hilos = hilos
+        self.maxEspera = settings.EJECUTOR_MAX_ESPERA if maxEspera is None else maxEspera
+        self.timeout = settings.EJECUTOR_TIMEOUT if timeout is None else timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        self._enCola = 0
+        self._ejecutando = 0
+        self._contadores = {"aceptadas": 0, "rechazadas": 0, "expiradas": 0, "fallidas": 0, "completadas": 0}
+        self._tiempos = {"espera": [0.0, 0.0], "ejecucion": [0.0, 0.0]}  ##[total, maximo] en segundos
+
+    def despachar(self, endpoint):
+        """Decorador: convierte un endpoint síncrono en async que se ejecuta en este ejecutor."""
+        @functools.wraps(endpoint)
+        async def envoltura(*args, **kwargs):
+            return await self.ejecutar(endpoint, *args, **kwargs)
+        return envoltura
+
+    async def ejecutar(self, funcion, *args, **kwargs):
+        """Ejecuta funcion(*args, **kwargs) en el pool y espera su resultado sin bloquear el bucle.
+
+        @exception HTTPException 503 si la cola está llena, 504 si se supera el tiempo máximo."""
+        with self._lock:
+            if self._enCola >= self.maxEspera:
+                self._contadores["rechazadas"] += 1
+                raise HTTPException(status_code=503, detail=f"Servicio saturado ({self.nombre})",
+                                    headers={"Retry-After": "1"})
+            self._enCola += 1
+            self._contadores["aceptadas"] += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="ejecutor-" + self.nombre)
+            futuro = self._pool.submit(self._medir, time.perf_counter(), funcion, args, kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(futuro), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._contadores["expiradas"] += 1
+                ##Cancelada antes de empezar: _medir no llego a sacarla de la cola
+                if futuro.cancelled():
+                    self._enCola -= 1
+            raise HTTPException(status_code=504, detail=f"Tiempo de respuesta agotado ({self.nombre})")
+
+    def _medir(self, encolada, funcion, args, kwargs):
+        inicio = time.perf_counter()
+        with self._lock:
+            self._enCola -= 1
+            self._ejecutando += 1
+            self._anotar("espera", inicio - encolada)
+        completada = False
+        try:
+            resultado = funcion(*args, **kwargs)
+            completada = True
+            return resultado
+        finally:
+            with self._lock:
+                self._ejecutando -= 1
+                self._anotar("ejecucion", time.perf_counter() - inicio)
+                self._contadores["completadas" if completada else "fallidas"] += 1
+
+    def _anotar(self, tiempo, segundos):
+        acumulado = self._tiempos[tiempo]
+        acumulado[0] += segundos
+        acumulado[1] = max(acumulado[1], segundos)
+
+    def metricas(self):
+        """Retorna contadores, ocupación y tiempos de espera en cola frente a tiempos de ejecución."""
+        with self._lock:
+            terminadas = self._contadores["completadas"] + self._contadores["fallidas"]
+            iniciadas = terminadas + self._ejecutando
+            resultado = dict(self._contadores, hilos=self.hilos, max_espera=self.maxEspera,
+                             en_cola=self._enCola, ejecutando=self._ejecutando)
+            for tiempo, divisor in (("espera", iniciadas), ("ejecucion", terminadas)):
+                total, maximo = self._tiempos[tiempo]
+                resultado[tiempo + "_media_ms"] = round(total / divisor * 1000, 3) if divisor else 0.0
+                resultado[tiempo + "_max_ms"] = round(maximo * 1000, 3)
+            return resultado
+
+    def cerrar(self):
+        """Espera a que terminen las llamadas pendientes; un uso posterior crea un pool nuevo."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+consultas = Ejecutor("consultas", settings.EJECUTOR_HILOS_CONSULTA)
+"""@var consultas Ejecutor de las lecturas de las ontologías."""
+escrituras = Ejecutor("escrituras", 1)
+"""@var escrituras Ejecutor de las mutaciones, de una en una."""
+
+ejecutor_router = APIRouter(prefix="/ontology/ejecutor", tags=["Ejecutores"])
+"""@var ejecutor_router Router de las métricas de los ejecutores."""
+@ejecutor_router.get("/metricas", response_model=dict)
+async def metricas() -> dict:
+    """
+        @brief Métricas de los ejecutores de consultas y escrituras.
+
+        @return dict por ejecutor: peticiones aceptadas, rechazadas (503), expiradas (504),
+                completadas y fallidas, ocupación actual, y tiempo medio y máximo en cola
+                frente al de ejecución.
+    """
+    return {ejecutor.nombre: ejecutor.metricas() for ejecutor in (consultas, escrituras)}
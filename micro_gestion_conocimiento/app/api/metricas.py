@@ -0,0 +1,114 @@
+"""
+    @file metricas.py
+    @brief Métricas del servicio en el formato de texto de Prometheus.
+    @details
+    Reúne en GET /metrics lo que el servicio ya mide por separado:
+    - Perfilador: latencia (histograma), filas y consultas lentas por método de
+      consulta, y tiempos de parseo, serialización e instantáneas.
+    - Ontologías compartidas: tripletas, revisión y operaciones en la bitácora.
+    - Ejecutores de consultas y escrituras, pool de perfiles y cola de interacciones
+      (los mismos valores que sus endpoints /metricas, como gauges).
+
+    Router:
+    - metricas_router: GET /metrics
+
+    @see Perfilador Para el perfilado de las consultas y el log de consultas lentas
+"""
+
+import os
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.ejecutor import consultas, escrituras
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.acceso_ontologia.Perfilador import perfilador
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+from infraestructure.adaptadores.ColaInteracciones import cola
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _valor(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(int(valor))
+
+
+def _etiquetas(etiquetas):
+    if not etiquetas:
+        return ""
+    escapar = lambda texto: str(texto).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{clave}="{escapar(valor)}"' for clave, valor in etiquetas.items()) + "}"
+
+
+def _familia(lineas, nombre, tipo, ayuda, muestras):
+    """Añade una familia de métricas: muestras es [(sufijo, etiquetas, valor)]."""
+    if not muestras:
+        return
+    lineas.append(f"# HELP {nombre} {ayuda}")
+    lineas.append(f"# TYPE {nombre} {tipo}")
+    for sufijo, etiquetas, valor in muestras:
+        lineas.append(f"{nombre}{sufijo}{_etiquetas(etiquetas)} {_valor(valor)}")
+
+
+def _histograma(histograma, etiquetas):
+    muestras = [("_bucket", dict(etiquetas, le=_valor(limite)), cantidad) for limite, cantidad in histograma.acumulados()]
+    return muestras + [("_sum", etiquetas, histograma.suma), ("_count", etiquetas, histograma.cuenta)]
+
+
+def _gauges(lineas, prefijo, ayuda, porEtiquetas):
+    """Una familia gauge por clave numérica de los dicts de métricas: porEtiquetas es [(etiquetas, dict)]."""
+    claves = {}
+    for etiquetas, metricas in porEtiquetas:
+        for clave, valor in metricas.items():
+            if isinstance(valor, (int, float)):
+                claves.setdefault(clave, []).append(("", etiquetas, valor))
+    for clave, muestras in claves.items():
+        _familia(lineas, f"{prefijo}_{clave}", "gauge", f"{ayuda} ({clave})", muestras)
+
+
+def exposicion():
+    """Texto de todas las métricas del servicio en el formato de Prometheus."""
+    lineas = []
+    consultasPerfiladas = sorted(perfilador.consultas().items())
+    _familia(lineas, "ontologia_consulta_segundos", "histogram", "Latencia de las consultas a las ontologias por metodo",
+             [muestra for (operacion, consulta), (histograma, _, _) in consultasPerfiladas
+              for muestra in _histograma(histograma, {"operacion": operacion, "consulta": consulta})])
+    _familia(lineas, "ontologia_consulta_filas_total", "counter", "Filas devueltas por las consultas por metodo",
+             [("", {"operacion": operacion, "consulta": consulta}, filas)
+              for (operacion, consulta), (_, filas, _) in consultasPerfiladas])
+    _familia(lineas, "ontologia_consulta_lentas_total", "counter", "Consultas que superaron CONSULTA_LENTA_SEGUNDOS",
+             [("", {"operacion": operacion, "consulta": consulta}, lentas)
+              for (operacion, consulta), (_, _, lentas) in consultasPerfiladas if lentas])
+    _familia(lineas, "ontologia_persistencia_segundos", "histogram",
+             "Duracion del parseo y la serializacion RDF/XML y de las instantaneas binarias",
+             [muestra for (operacion, ontologia), histograma in sorted(perfilador.persistencias().items())
+              for muestra in _histograma(histograma, {"operacion": operacion, "ontologia": ontologia})])
+
+    compartidas = [({"ontologia": os.path.basename(instancia.ontologiaInst)}, instancia)
+                   for instancia in Ontologia.listarCompartidas()]
+    _familia(lineas, "ontologia_triples", "gauge", "Tripletas en memoria de la ontologia compartida",
+             [("", etiquetas, len(instancia.g)) for etiquetas, instancia in compartidas])
+    _familia(lineas, "ontologia_revision", "gauge", "Revision de la ontologia compartida (ver /ontology/changes)",
+             [("", etiquetas, instancia.cambios.revision) for etiquetas, instancia in compartidas])
+    _familia(lineas, "ontologia_bitacora_operaciones", "gauge", "Operaciones en la bitacora pendientes de compactar",
+             [("", etiquetas, instancia.bitacora.operaciones) for etiquetas, instancia in compartidas])
+
+    _gauges(lineas, "ejecutor", "Ejecutor de llamadas a las ontologias",
+            [({"ejecutor": ejecutor.nombre}, ejecutor.metricas()) for ejecutor in (consultas, escrituras)])
+    _gauges(lineas, "pool_perfiles", "Pool de ontologias de perfil de usuario", [({}, pool.metricas())])
+    _gauges(lineas, "cola_interacciones", "Cola de interacciones usuario-objeto", [({}, cola.metricas())])
+    return "\n".join(lineas) + "\n"
+
+
+metricas_router = APIRouter(tags=["Métricas"])
+"""@var metricas_router Router de las métricas en formato Prometheus."""
+@metricas_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+        @brief Métricas del servicio en el formato de texto de Prometheus.
+
+        @return Histogramas de latencia por método de consulta y de persistencia, y
+                gauges de las ontologías, los ejecutores, el pool y la cola.
+    """
+    return PlainTextResponse(exposicion(), media_type=TIPO_CONTENIDO)
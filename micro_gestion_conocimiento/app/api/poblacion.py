@@ -5,16 +5,19 @@
     Proporciona endpoints para:
     - Poblar metadatos del objeto inteligente en la ontología
     - Crear/editar reglas ECA (Event-Condition-Action)
-    - Cargar ontologías de usuario (upload de archivos .owl)
-    - Registrar interacciones usuario-objeto
+    - Aplicar lotes de operaciones de forma atómica
+    - Cargar ontologías de usuario (upload de archivos .owl, por fragmentos y con tamaño máximo)
+    - Registrar interacciones usuario-objeto (encoladas, se escriben por lotes)
+    - Archivar las interacciones antiguas de los perfiles
     - Eliminar ontologías de usuario
     
     Routers:
     - ontologia_router (prefix=/ontology/poblacion): poblamiento de objeto/ECA
     - ontologia_usuario_router (prefix=/ontology/poblacion_usuario): gestión de perfiles
     
-    @note Los endpoints de carga de ontología pueden procesarse de forma asíncrona
-          (recomendado: responder 202 Accepted y procesar en background).
+    @note Los endpoints que modifican la ontología se ejecutan, de uno en uno,
+          en el ejecutor de escrituras (api/ejecutor.py), salvo el registro de
+          interacciones, que se encola.
     
     @author  NexTech
     @version 1.0
@@ -25,16 +28,24 @@
     @see docs/diagrams/flow_diagrams.md Para diagramas de procesos
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from application.poblacion_service import PoblacionOntologiaUsuarioService
-from application.dtos import EcaPayloadDTO, PobladorPayloadDTO, RegistroInteraccionDTO
+import os
+import threading
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from application.poblacion_service import PoblacionOntologiaUsuarioService, rutaOntologiaUsuario
+from application.dtos import EcaPayloadDTO, LotePoblacionDTO, PobladorPayloadDTO, RegistroInteraccionDTO
+from api.ejecutor import escrituras
+from api.subida import fragmentosUploadFile, recibirEnTemporal
+from config import settings
+from infraestructure.adaptadores.ColaInteracciones import cola
 from deps import get_poblacion_pu_service, get_poblacion_service
 from application.poblacion_service import PoblacionService
 
 ontologia_router = APIRouter(prefix="/ontology/poblacion", tags=["Poblacion de Base de conocimiento"])
 """@var ontologia_router Router para operaciones de población del objeto inteligente."""
 @ontologia_router.post("/poblar_metadatos_objeto", response_model=None,status_code=201)
-async def poblar_metadatos_objeto(metadata: PobladorPayloadDTO, service: PoblacionService = Depends(get_poblacion_service)):
+@escrituras.despachar
+def poblar_metadatos_objeto(metadata: PobladorPayloadDTO, service: PoblacionService = Depends(get_poblacion_service)):
     """
         @brief Puebla los metadatos del objeto inteligente en la ontología.
         
@@ -70,7 +81,8 @@ async def poblar_metadatos_objeto(metadata: PobladorPayloadDTO, service: Poblaci
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
 @ontologia_router.post("/poblar_eca", response_model=None,status_code=201)
-async def poblar_eca(eca: EcaPayloadDTO, service: PoblacionService = Depends(get_poblacion_service)):
+@escrituras.despachar
+def poblar_eca(eca: EcaPayloadDTO, service: PoblacionService = Depends(get_poblacion_service)):
     """
         @brief Puebla una nueva regla ECA (Event-Condition-Action) en la ontología.
         
@@ -97,7 +109,8 @@ async def poblar_eca(eca: EcaPayloadDTO, service: PoblacionService = Depends(get
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
 @ontologia_router.post("/editar_eca", response_model=None,status_code=200)
-async def editar_eca(eca: EcaPayloadDTO, service: PoblacionService = Depends(get_poblacion_service)):
+@escrituras.despachar
+def editar_eca(eca: EcaPayloadDTO, service: PoblacionService = Depends(get_poblacion_service)):
     """
         @brief Edita una regla ECA existente en la ontología.
         
@@ -123,13 +136,33 @@ async def editar_eca(eca: EcaPayloadDTO, service: PoblacionService = Depends(get
         return service.editar_eca(eca.model_dump())
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+@ontologia_router.post("/batch", response_model=None,status_code=200)
+@escrituras.despachar
+def poblar_lote(lote: LotePoblacionDTO, service: PoblacionService = Depends(get_poblacion_service)):
+    """
+        @brief Aplica una lista de operaciones sobre la ontología de forma atómica.
+        
+        @param lote DTO LotePoblacionDTO con las operaciones en orden.
+        @param service Servicio de población.
+        
+        @return Status 200 OK con el número de operaciones aplicadas, o 400 si
+                alguna es inválida (en ese caso no se aplica ninguna).
+        
+        @details
+        Todas las operaciones se ejecutan dentro de una única transacción de
+        Ontologia: se persisten con una sola escritura al final y, si una falla,
+        se deshacen las anteriores.
+        
+        @see PoblacionService.poblar_lote()
+    """
+    return service.poblar_lote([op.model_dump() for op in lote.operaciones])
 
 ontologia_usuario_router = APIRouter(prefix="/ontology/poblacion_usuario", tags=["Poblacion de Perfil de Usuario"])
 """@var ontologia_usuario_router Router para operaciones de ontología de usuario."""
 
 @ontologia_usuario_router.post("/cargar_ontologia", response_model=None,status_code=201)
 async def cargar_ontologia(
-    file: UploadFile = File(..., description="Archivo de ontología (.owl)"),
+    file: UploadFile = File(..., description="Archivo de ontología (.owl), opcionalmente comprimido con gzip"),
     nombre: str = Form(..., description="Nombre de la ontología"),
     ipCoordinador: str = Form(..., description="IP del coordinador"),    
     service: PoblacionOntologiaUsuarioService = Depends(get_poblacion_pu_service)
@@ -137,69 +170,140 @@ async def cargar_ontologia(
     """
         @brief Carga una ontología de usuario desde archivo (.owl).
         
-        @param file Archivo .owl a cargar (multipart/form-data).
+        @param file Archivo .owl a cargar (multipart/form-data), en claro o con gzip.
         @param nombre Identificador/nombre de la ontología.
         @param ipCoordinador IP del coordinador (para notificación/registro).
         @param service Servicio de población de usuario (inyectado).
         
-        @return Status 201 Created si exitoso, o error 500 si falla.
-        
-        @exception FileNotFoundError Si el archivo no puede procesarse.
-        @exception RuntimeError Si falla la carga en el motor de ontología.
+        @return Status 201 Created si exitoso, 400 si el nombre o el contenido no son
+                válidos, 413 si supera ONTOLOGIA_PU_MAX_BYTES, o error 500 si falla.
         
         @details
         Carga un archivo OWL de perfil de usuario en el sistema.
         
         Flujo:
-        1. Lee contenido del archivo desde request
-        2. Delega en servicio para parsear e indexar
-        3. Registra en coordinador (opcional)
-        
-        @note Esta es una operación potencialmente larga. Considerar:
-              1. Responder 202 Accepted inmediatamente
-              2. Procesar el archivo en background (Job Queue)
-              3. Exponer endpoint de status del job
+        1. Copia el archivo por fragmentos a un temporal (ver api/subida.py)
+        2. Delega en servicio para dejarlo en disco (fsync y renombrado atómico)
+        3. El primer parseo se hace en segundo plano: responde en cuanto el
+           fichero es durable
         
+        @see cargar_ontologia_stream() Para subir el fichero como cuerpo de la petición
         @see PoblacionOntologiaUsuarioService.cargarOntologia()
         @see docs/diagrams/flow_diagrams.md (B) Cargar ontología sequence
-        
-        @warning No implementar validación de tamaño de archivo podría
-                 causar ataques DoS. Añadir límite MAX_FILE_SIZE.
     """
+    return await _cargarOntologia(fragmentosUploadFile(file), nombre, ipCoordinador, service)
+@ontologia_usuario_router.put("/cargar_ontologia/{nombre}", response_model=None,status_code=201)
+async def cargar_ontologia_stream(
+    nombre: str,
+    request: Request,
+    ipCoordinador: str = Query(..., description="IP del coordinador"),
+    service: PoblacionOntologiaUsuarioService = Depends(get_poblacion_pu_service)
+):
+    """
+        @brief Carga una ontología de usuario enviada como cuerpo de la petición.
+
+        @param nombre Identificador/nombre de la ontología.
+        @param request Petición cuyo cuerpo es el .owl, en claro o con gzip (Content-Encoding: gzip).
+        @param ipCoordinador IP del coordinador.
+        @param service Servicio de población de usuario (inyectado).
+
+        @return Igual que cargar_ontologia().
+
+        @details
+        A diferencia del formulario multipart, que el servidor recibe completo antes
+        de llamar al endpoint, el cuerpo se escribe en el temporal a medida que llega
+        y la subida se corta en cuanto supera el máximo.
+    """
+    return await _cargarOntologia(request.stream(), nombre, ipCoordinador, service)
+
+async def _cargarOntologia(fragmentos, nombre, ipCoordinador, service):
     try:
-        file_content = await file.read()
-        return service.cargarOntologia(file_content, nombre, ipCoordinador)        
+        rutaOntologiaUsuario(nombre)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        temporal = await recibirEnTemporal(fragmentos, settings.PATH_PU_OWL, nombre, settings.ONTOLOGIA_PU_MAX_BYTES)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-@ontologia_usuario_router.post("/registro_interaccion", response_model=None,status_code=200)
+    ##Quien tome primero el cerrojo se queda el temporal: el hilo de escrituras al empezar,
+    ##o la peticion si la rechazan (503), expira en cola (504) o se cancela antes
+    iniciada = threading.Lock()
+
+    def cargar():
+        if not iniciada.acquire(blocking=False):
+            return None  ##La peticion ya se abandono y borro el temporal
+        return service.cargarOntologia(temporal, nombre, ipCoordinador)
+
+    try:
+        return await escrituras.ejecutar(cargar)
+    except BaseException:
+        ##No llego a ejecutarse y ya no lo hara: nadie mas va a borrar el temporal
+        if iniciada.acquire(blocking=False) and os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+@ontologia_usuario_router.post("/registro_interaccion", response_model=None,status_code=202)
 async def registro_interaccion(
     data: RegistroInteraccionDTO,
     service: PoblacionOntologiaUsuarioService = Depends(get_poblacion_pu_service)
 ):
     """
-        @brief Registra una interacción del usuario con un objeto inteligente.
+        @brief Acepta una interacción del usuario con un objeto inteligente.
         
         @param data DTO RegistroInteraccionDTO con detalles de la interacción.
         @param service Servicio de población de usuario.
         
-        @return Status 200 OK si exitoso, o error 500.
-        
-        @exception ValueError Si los datos de interacción son inválidos.
-        @exception RuntimeError Si falla la persistencia de la interacción.
+        @return Status 202 Accepted, o 503 con Retry-After si la cola está llena.
         
         @details
         Registra eventos/interacciones del usuario con objetos en su ontología
         de perfil. Esto permite crear un historial y personalización basada
         en patrones de uso.
+
+        La interacción no se escribe durante la petición: se encola y se
+        registra en el perfil junto con las demás del mismo usuario, en una
+        sola transacción (ver ColaInteracciones). No ocupa el ejecutor de
+        escrituras.
         
-        @see PoblacionOntologiaUsuarioService.registroInteraccionUsuarioObjeto()
+        @see PoblacionOntologiaUsuarioService.encolarInteraccionUsuarioObjeto()
     """
-    try:
-        return service.registroInteraccionUsuarioObjeto(data)        
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return service.encolarInteraccionUsuarioObjeto(data)
+@ontologia_usuario_router.get("/metricas_interacciones", response_model=dict)
+async def metricas_interacciones() -> dict:
+    """
+        @brief Métricas de la cola de interacciones.
+
+        @return dict con interacciones aceptadas, rechazadas (503), registradas y fallidas,
+                lotes escritos, pendientes, antigüedad de la pendiente más antigua y
+                retraso medio y máximo desde la aceptación hasta la escritura.
+    """
+    return cola.metricas()
+@ontologia_usuario_router.post("/archivar_interacciones", response_model=None,status_code=200)
+@escrituras.despachar
+def archivar_interacciones(
+    horizonte_dias: Optional[int] = Query(None, ge=0, description="Días que se conservan en el perfil (por defecto INTERACCIONES_HORIZONTE_DIAS)"),
+    service: PoblacionOntologiaUsuarioService = Depends(get_poblacion_pu_service)
+):
+    """
+        @brief Archiva las interacciones antiguas de todos los perfiles de usuario.
+
+        @param horizonte_dias Las interacciones con fecha anterior a hoy menos estos días se archivan.
+        @param service Servicio de población de usuario.
+
+        @return Status 200 con el número de interacciones archivadas por perfil.
+
+        @details
+        Lo mismo que hace periódicamente el archivador (INTERACCIONES_PERIODO_ARCHIVO).
+        Las interacciones se mueven a ficheros N-Triples comprimidos por mes y en el
+        perfil queda su número por objeto y recurso.
+
+        @see ArchivoInteracciones.archivarPerfiles()
+    """
+    return service.archivarInteracciones(horizonte_dias)
 @ontologia_usuario_router.delete("/eliminar_ontologia_usuario", response_model=None,status_code=200)
-async def eliminar_ontologia_usuario(
+@escrituras.despachar
+def eliminar_ontologia_usuario(
     service: PoblacionOntologiaUsuarioService = Depends(get_poblacion_pu_service)
 ):
     """
@@ -0,0 +1,67 @@
+"""
+    @file subida.py
+    @brief Recepción por fragmentos de ficheros subidos, con tamaño máximo.
+    @details
+    Copia el cuerpo de una subida (multipart o crudo) a un temporal, sin tenerlo
+    completo en memoria, y corta con 413 en cuanto supera el máximo. Si el
+    contenido llega comprimido con gzip (se reconoce por su número mágico) se
+    descomprime al vuelo y el máximo se aplica a los bytes descomprimidos.
+
+    El temporal se crea oculto en el mismo directorio que el destino para que
+    quien lo reciba pueda hacer fsync y renombrarlo de forma atómica.
+"""
+
+import os
+import tempfile
+import zlib
+from fastapi import HTTPException
+
+FRAGMENTO = 64 * 1024  ##Bytes por lectura del cuerpo de la peticion
+_GZIP = b"\x1f\x8b"
+
+
+async def recibirEnTemporal(fragmentos, directorio, prefijo, maxBytes):
+    """
+        @brief Escribe los fragmentos (iterable async de bytes) en un temporal de directorio.
+
+        @return Ruta del temporal con el contenido descomprimido.
+
+        @exception HTTPException 413 si supera maxBytes, 400 si el gzip está dañado o el cuerpo vacío.
+    """
+    descriptor, ruta = tempfile.mkstemp(dir=directorio, prefix="." + prefijo + ".", suffix=".subida")
+    descompresor = None
+    escritos = 0
+    try:
+        with os.fdopen(descriptor, "wb") as temporal:
+            async for fragmento in fragmentos:
+                if not fragmento:
+                    continue
+                if descompresor is None:
+                    descompresor = zlib.decompressobj(wbits=31) if fragmento.startswith(_GZIP) else False
+                if descompresor:
+                    try:
+                        ##Salida limitada a lo que aun cabe: un gzip pequeño no puede inflarse en memoria sin control
+                        fragmento = descompresor.decompress(fragmento, maxBytes - escritos + 1)
+                    except zlib.error as e:
+                        raise HTTPException(status_code=400, detail=f"Contenido gzip inválido: {e}")
+                escritos += len(fragmento)
+                if escritos > maxBytes:
+                    raise HTTPException(status_code=413, detail=f"El fichero supera el máximo de {maxBytes} bytes")
+                temporal.write(fragmento)
+            if descompresor and not descompresor.eof:
+                raise HTTPException(status_code=400, detail="Contenido gzip incompleto")
+            if escritos == 0:
+                raise HTTPException(status_code=400, detail="Fichero vacío")
+    except BaseException:
+        os.remove(ruta)
+        raise
+    return ruta
+
+
+async def fragmentosUploadFile(archivo):
+    """Fragmentos de un UploadFile de un formulario multipart."""
+    while True:
+        fragmento = await archivo.read(FRAGMENTO)
+        if not fragmento:
+            return
+        yield fragmento
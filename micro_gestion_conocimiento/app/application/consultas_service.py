@@ -25,6 +25,7 @@ from typing import Any, List
 
 from fastapi.responses import JSONResponse
 from infraestructure.interfaces.IConsultasPerfilUsuario import IConsultasPerfilUsuario
+from infraestructure.acceso_ontologia import ArchivoInteracciones
 from infraestructure.logging.Logging import logger
 from infraestructure.interfaces.IConsultas import IConsultasOOS
 
@@ -163,6 +164,10 @@ class ConsultasService:
         """Retorna el State del objeto como diccionario con sus propiedades."""
         return self.gestion_base_conocimiento.consultarState()        
     
+    def consultarSnapshot(self):
+        """Retorna (etag, cuerpo JSON) con todos los metadatos del objeto en una sola consulta."""
+        return self.gestion_base_conocimiento.consultarSnapshot()
+
     def consultarTagsObjeto(self):
         """Retorna la lista de tags asociados al objeto/State."""
         return self.gestion_base_conocimiento.consultarTagsObjeto()
@@ -269,4 +274,18 @@ class ConsultasOntologiaUsuarioService:
         if not preferencias:
             logger.warning(f"No se encontraron preferencias para el OSID: {osid}")
             return JSONResponse(content={"preferencias": []}, status_code=404)
-        return JSONResponse(content={"preferencias": preferencias}, status_code=200)
\ No newline at end of file
+        return JSONResponse(content={"preferencias": preferencias}, status_code=200)
+    def consultarInteracciones(self, osid: str = None, idDataStream: str = None, desde: str = None,
+                               hasta: str = None, archivo: bool = False) -> JSONResponse:
+        """Consulta las interacciones del usuario, opcionalmente también las archivadas."""
+        fechas = []
+        for texto in (desde, hasta):
+            cuando = ArchivoInteracciones.fecha(texto) if texto else None
+            if texto and cuando is None:
+                raise ValueError(f"Fecha no reconocida: {texto}")
+            fechas.append(cuando)
+        resultado = self.gestion_base_conocimiento.consultarInteracciones(osid, idDataStream, fechas[0], fechas[1], archivo)
+        if resultado is None:
+            logger.warning("No existe la ontología del perfil de usuario.")
+            return JSONResponse(content={"interacciones": [], "archivadas": []}, status_code=404)
+        return JSONResponse(content=resultado, status_code=200)
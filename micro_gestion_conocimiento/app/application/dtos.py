@@ -183,4 +183,31 @@ class RegistroInteraccionDTO(BaseModel):
                 "osid": "ESP32_Sala",
                 "dateInteraction": "15/09/23 14:30:00"
                 }
-        }
\ No newline at end of file
+        }
+
+class OperacionLoteDTO(BaseModel):
+    """Operación individual de un lote de población."""
+    operacion: Literal[
+        "insertarIndividuo",
+        "insertarDataProperty",
+        "actualizarDataProperty",
+        "insertarObjectProperty",
+        "eliminarDataProperty",
+        "eliminarTodoIndividuo"
+    ] = Field(..., description="Operación a aplicar sobre la ontología")
+    individuo: str = Field(..., description="Nombre local o IRI del individuo")
+    propiedad: Optional[str] = Field(None, description="Nombre local o IRI de la propiedad")
+    valor: Optional[str] = Field(None, description="Clase (insertarIndividuo), individuo destino (ObjectProperty) o literal (DataProperty)")
+class LotePoblacionDTO(BaseModel):
+    """DTO para aplicar varias operaciones de población de forma atómica"""
+    operaciones: List[OperacionLoteDTO] = Field(..., min_length=1, description="Operaciones a aplicar en orden")
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "operaciones": [
+                    {"operacion": "insertarIndividuo", "individuo": "ECA1", "valor": "Dinamic"},
+                    {"operacion": "insertarDataProperty", "individuo": "ECA1", "propiedad": "name_eca", "valor": "ECA1"},
+                    {"operacion": "actualizarDataProperty", "individuo": "ECA1", "propiedad": "state_eca", "valor": "on"}
+                ]
+            }
+        }
@@ -1,4 +1,5 @@
 import os
+import threading
 from infraestructure.interfaces import IPoblacionPerfilUsuario
 from infraestructure.interfaces.IPoblacion import IPoblacion
 from infraestructure.logging.Logging import logger
@@ -7,6 +8,38 @@ from fastapi.responses import JSONResponse
 from config import settings
 from application.dtos import RegistroInteraccionDTO
 from infraestructure.adaptadores.PoblarPerfilUsuario import PoblarPerfilUsuario
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+from infraestructure.adaptadores.ColaInteracciones import cola
+from infraestructure.acceso_ontologia import ArchivoInteracciones
+
+def rutaOntologiaUsuario(nombre: str) -> str:
+    """Ruta del fichero de perfil de usuario; el nombre no puede salir de PATH_PU_OWL.
+
+    Debe terminar en .owl: así no puede reemplazar los ficheros internos que
+    acompañan al perfil (instantánea .owl.bin, .owl.bitacora, temporales .tmp o .subida).
+
+    @exception ValueError Si el nombre no es un nombre de fichero .owl simple."""
+    if (not nombre or os.path.basename(nombre) != nombre or nombre.startswith(".")
+            or not nombre.endswith(".owl")):
+        raise ValueError(f"Nombre de ontología inválido: {nombre}")
+    return settings.PATH_PU_OWL + nombre
+
+def _sincronizarDirectorio(directorio):
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return  ##p.ej. Windows no permite abrir directorios
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+def _precargar(ruta):
+    try:
+        pool.obtener(ruta)
+        logger.info(f"Ontología de usuario cargada en memoria: {ruta}")
+    except Exception as e:
+        logger.error(f"La ontología subida no se pudo cargar: {ruta}: {e}")
 
 class PoblacionService:
     """Clase base para servicios de población."""
@@ -60,24 +93,49 @@ class PoblacionService:
                 status_code=400,
                 content={"status": "Fallo en la edición ECA"}
             )        
+    def poblar_lote(self, operaciones:list) -> JSONResponse:
+        """Aplica un lote de operaciones de población en una sola transacción."""
+        try:
+            self.gestion_poblacion.aplicarLote(operaciones)
+            return JSONResponse(
+                status_code=200,
+                content={"status": "Lote aplicado", "operaciones": len(operaciones)}
+            )
+        except ValueError as e:
+            logger.error("Lote rechazado: " + str(e))
+            return JSONResponse(
+                status_code=400,
+                content={"status": "Lote rechazado, no se aplicó ninguna operación", "detalle": str(e)}
+            )
         
 class PoblacionOntologiaUsuarioService:
     """Servicio de Población para la Ontología del usuario."""
     def __init__(self, gestion_base_conocimiento: IPoblacionPerfilUsuario = None):
         self.gestion_base_conocimiento = gestion_base_conocimiento    
-    def cargarOntologia(self, file_content: bytes, nombre: str, ip_coordinador: str) -> JSONResponse:
-        """Guarda la ontología del perfil de usuario recibida."""
+    def cargarOntologia(self, rutaTemporal: str, nombre: str, ip_coordinador: str) -> JSONResponse:
+        """Guarda la ontología del perfil de usuario recibida en rutaTemporal (ver api/subida.py)."""
         logger.info(f"Cargando ontología para el usuario: {nombre} desde IP: {ip_coordinador}")
         try:            
-            rutaArchivo = settings.PATH_PU_OWL + nombre
+            rutaArchivo = rutaOntologiaUsuario(nombre)
             self.pathActual = rutaArchivo
+            with open(rutaTemporal, 'rb') as temporal:
+                if not temporal.read(4096).lstrip().startswith(b"<"):
+                    return JSONResponse(
+                        status_code=400,
+                        content={"status": "El archivo no es una ontología RDF/XML"}
+                    )
+            ##La ontologia subida reemplaza a la cargada en el pool y a sus cambios sin guardar
+            pool.descartar(rutaArchivo)
             if  os.path.exists(self.pathActual):
                 logger.info(f"El archivo de ontología ya existe. Se reemplazará: {self.pathActual}")
-                os.remove(self.pathActual)
-            archivo=open(rutaArchivo,'wb')
-            archivo.write(file_content)
-            archivo.close()
+            ##Se renombra ya en disco: nunca queda a medio escribir aunque el proceso termine
+            with open(rutaTemporal, 'rb+') as temporal:
+                os.fsync(temporal.fileno())
+            os.replace(rutaTemporal, rutaArchivo)
+            _sincronizarDirectorio(settings.PATH_PU_OWL)
             logger.info(f"Ontología guardada correctamente en: {rutaArchivo}")
+            ##El primer parseo (y la instantanea binaria) no retrasa la respuesta
+            threading.Thread(target=_precargar, args=(rutaArchivo,), name="precarga-ontologia", daemon=True).start()
             return JSONResponse(
                 status_code=201,
                 content={"status": "Ontología cargada exitosamente"}
@@ -89,6 +147,9 @@ class PoblacionOntologiaUsuarioService:
                 status_code=500,
                 content={"status": "Error al cargar la ontología"}
             )
+        finally:
+            if os.path.exists(rutaTemporal):
+                os.remove(rutaTemporal)
     def registroInteraccionUsuarioObjeto(self, data:RegistroInteraccionDTO) -> JSONResponse:
         """Registra una interacción del usuario con un objeto."""
         #Se inicializa de la misma manera que en el sistema legado
@@ -103,9 +164,30 @@ class PoblacionOntologiaUsuarioService:
                 status_code=400,
                 content={"status": "Fallo al registrar la interacción"}
             )
+    def encolarInteraccionUsuarioObjeto(self, data:RegistroInteraccionDTO) -> JSONResponse:
+        """Acepta una interacción del usuario con un objeto para registrarla por lotes."""
+        if cola.encolar(data.mac, data.email, data.idDataStream, data.comando, data.osid, data.dateInteraction):
+            return JSONResponse(
+                status_code=202,
+                content={"status": "Interacción aceptada"}
+            )
+        else:
+            return JSONResponse(
+                status_code=503,
+                content={"status": "Cola de interacciones llena"},
+                headers={"Retry-After": "1"}
+            )
+    def archivarInteracciones(self, horizonteDias: int = None) -> JSONResponse:
+        """Archiva las interacciones de todos los perfiles anteriores al horizonte."""
+        archivadas = ArchivoInteracciones.archivarPerfiles(horizonteDias)
+        return JSONResponse(
+            status_code=200,
+            content={"status": "Interacciones archivadas", "archivadas": archivadas}
+        )
     def eliminarOntologia(self)->JSONResponse:
         """Elimina la ontología del perfil de usuario."""
         try:
+            pool.descartar(settings.ONTOLOGIA_PU)
             if os.path.exists(settings.ONTOLOGIA_PU):
                 os.remove(settings.ONTOLOGIA_PU)
                 logger.info(f"Ontología eliminada correctamente: {settings.ONTOLOGIA_PU}")
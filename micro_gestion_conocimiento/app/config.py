@@ -14,6 +14,25 @@ class Settings(BaseSettings):
     ONTOLOGIA: str = PATH_OWL+'ontologiav18.owl'
     ONTOLOGIA_PU: str = PATH_PU_OWL+'UsuarioActual.owl'
     ONTOLOGIA_INSTANCIADA: str = PATH_OWL+'ontologiaInstanciada.owl'
+    BITACORA_MAX_OPERACIONES: int = 500  ##Operaciones en bitacora antes de compactar en el .owl
+    BITACORA_FSYNC: bool = True
+    INSTANTANEA_BINARIA: bool = True  ##Mantener <ontologia>.owl.bin para cargar sin parsear RDF/XML
+    EJECUTOR_HILOS_CONSULTA: int = 4  ##Hilos para las consultas; las escrituras usan un solo hilo
+    EJECUTOR_MAX_ESPERA: int = 64  ##Llamadas en cola por ejecutor antes de responder 503
+    EJECUTOR_TIMEOUT: float = 30.0  ##Segundos por peticion antes de responder 504
+    CAMBIOS_MAX_REVISIONES: int = 1000  ##Revisiones recientes que se guardan para /ontology/changes
+    CAMBIOS_MAX_OPERACIONES: int = 100000  ##Operaciones guardadas en total entre esas revisiones
+    CAMBIOS_ESPERA_MAX: float = 25.0  ##Segundos maximos que /ontology/changes espera una revision nueva
+    PU_POOL_MAX_ONTOLOGIAS: int = 32  ##Perfiles de usuario cargados en memoria a la vez
+    PU_POOL_MAX_TRIPLES: int = 200000  ##Triples en total entre esos perfiles (~1.2 KB por triple)
+    PU_POOL_MAX_SIN_GUARDAR: int = 50  ##Operaciones de un perfil en memoria antes de escribir su fichero
+    INTERACCIONES_MAX_PENDIENTES: int = 10000  ##Interacciones aceptadas sin escribir antes de responder 503
+    INTERACCIONES_MAX_LOTE: int = 100  ##Interacciones de un perfil que se escriben en una transaccion
+    INTERACCIONES_INTERVALO: float = 1.0  ##Segundos maximos que una interaccion espera a completar su lote
+    ONTOLOGIA_PU_MAX_BYTES: int = 50 * 1024 * 1024  ##Tamano maximo (descomprimido) de una ontologia de usuario subida
+    INTERACCIONES_HORIZONTE_DIAS: int = 90  ##Dias que una interaccion sigue en el perfil antes de archivarse
+    INTERACCIONES_PERIODO_ARCHIVO: float = 86400.0  ##Segundos entre archivados automaticos (0 lo desactiva)
+    CONSULTA_LENTA_SEGUNDOS: float = 0.5  ##Consultas a las ontologias que se registran en el log con su texto (0 lo desactiva)
     model_config = ConfigDict(
         env_file='.env',
         extra='ignore'
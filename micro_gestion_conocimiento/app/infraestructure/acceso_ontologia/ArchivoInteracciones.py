@@ -0,0 +1,247 @@
+"""Archivo por meses de las interacciones usuario-objeto antiguas de los perfiles.
+
+Cada interacción registrada es un individuo Schedule_Interaction que se queda
+para siempre en la ontología del perfil, así que cada consulta, escritura y
+carga de OntologiaPU es más lenta cuanto más se usa el objeto. Las interacciones
+con fecha anterior a INTERACCIONES_HORIZONTE_DIAS se sacan del grafo y se
+guardan en ficheros N-Triples comprimidos con gzip, uno por perfil y mes:
+
+    <PATH_PU_OWL>/archivo/<perfil>/<AAAA-MM>.nt.gz
+
+En el perfil queda, por objeto y recurso, un individuo Interaction_Count con el
+número de interacciones archivadas (archived_interactions), enlazado desde el
+objeto con count_interaction. Se recalcula contando las del archivo tras cada
+archivado, no sumando las movidas.
+
+Los ficheros del archivo se escriben (con fsync) antes de quitar las
+interacciones del grafo y se amplían añadiendo miembros gzip. Si el proceso
+termina entre ambos pasos, el siguiente archivado vuelve a añadir las mismas
+interacciones, que al leerlas se unen en un grafo y no se repiten ni en las
+consultas ni en los conteos.
+
+Las interacciones cuya fecha no tiene un formato conocido no se archivan.
+"""
+import gzip
+import os
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import rdflib
+from rdflib import RDF, Literal, URIRef
+
+from config import settings
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+from infraestructure.logging.Logging import logger
+from infraestructure.util import UrisPu
+
+EXTENSION = ".nt.gz"
+
+_INTERACCION = URIRef(UrisPu.individuoShedule_Interaction)
+_FECHA = URIRef(UrisPu.dp_date_interaction)  ##Misma URI que op_date_interaction (Object -> Schedule_Interaction)
+_RECURSO = URIRef(UrisPu.dp_id_resource_interaction)
+_COMANDO = URIRef(UrisPu.dp_type_command_interaction)
+_CONTEO = URIRef(UrisPu.individuoInteraction_Count)
+_ARCHIVADAS = URIRef(UrisPu.dp_archived_interactions)
+_OP_CONTEO = URIRef(UrisPu.op_count_interaction)
+_FORMATOS = ("%d/%m/%y %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%a %b %d %H:%M:%S %Y")
+
+
+def fecha(texto):
+    """Retorna el datetime de la fecha de una interacción, o None si no se reconoce su formato.
+
+    Admite ISO 8601, "dd/mm/aa hh:mm:ss" y la fecha de time.strftime("%c") con los
+    espacios cambiados por guiones (la que se guarda para "00/00/00 00:00:00")."""
+    try:
+        return datetime.fromisoformat(texto).replace(tzinfo=None)
+    except ValueError:
+        pass
+    normalizado = " ".join(texto.replace("-", " ").split())
+    for formato in _FORMATOS:
+        try:
+            return datetime.strptime(normalizado, formato)
+        except ValueError:
+            continue
+    return None
+
+
+##Los individuos Schedule_Interaction llevan la fecha, con espacios, en su URI: rdflib no los
+##serializa en N-Triples, pero el formato admite escribir esos caracteres como \uXXXX
+def _iri(uri):
+    return "<" + "".join(c if c > " " and c not in '<>"{}|^`\\' else "\\u%04X" % ord(c) for c in str(uri)) + ">"
+
+
+def _termino(termino):
+    if isinstance(termino, URIRef):
+        return _iri(termino)
+    if isinstance(termino, Literal):
+        texto = str(termino).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+        if termino.language:
+            return f'"{texto}"@{termino.language}'
+        return f'"{texto}"^^{_iri(termino.datatype)}' if termino.datatype else f'"{texto}"'
+    return termino.n3()
+
+
+def _ntriples(triples):
+    return "".join(" ".join(_termino(termino) for termino in triple) + " .\n" for triple in triples).encode("utf-8")
+
+
+def directorio(pathPerfil):
+    """Carpeta del archivo de un perfil."""
+    nombre = os.path.splitext(os.path.basename(pathPerfil))[0]
+    return os.path.join(settings.PATH_PU_OWL, "archivo", nombre)
+
+
+def _osid(objeto):
+    texto = str(objeto)
+    return texto[len(UrisPu.individuoObject):] if texto.startswith(UrisPu.individuoObject) else texto
+
+
+def listar(grafo, osid = None, idDataStream = None, desde = None, hasta = None):
+    """Interacciones del grafo como [{osid, idDataStream, comando, fecha}], ordenadas por fecha.
+
+    Con desde/hasta (datetime) se omiten las que quedan fuera o no tienen fecha reconocible."""
+    resultado = []
+    for individuo in grafo.subjects(RDF.type, _INTERACCION):
+        objeto = next(grafo.subjects(_FECHA, individuo), None)
+        interaccion = {"osid": _osid(objeto) if objeto is not None else None,
+                       "idDataStream": str(grafo.value(individuo, _RECURSO) or ""),
+                       "comando": str(grafo.value(individuo, _COMANDO) or ""),
+                       "fecha": str(grafo.value(individuo, _FECHA) or "")}
+        if osid is not None and interaccion["osid"] != osid:
+            continue
+        if idDataStream is not None and interaccion["idDataStream"] != idDataStream:
+            continue
+        if desde is not None or hasta is not None:
+            cuando = fecha(interaccion["fecha"])
+            if cuando is None or (desde is not None and cuando < desde) or (hasta is not None and cuando > hasta):
+                continue
+        resultado.append(interaccion)
+    resultado.sort(key=lambda interaccion: (fecha(interaccion["fecha"]) or datetime.min, interaccion["fecha"]))
+    return resultado
+
+
+def conteos(grafo):
+    """Interacciones archivadas por objeto y recurso: [{osid, idDataStream, archivadas}]."""
+    resultado = []
+    for resumen in grafo.subjects(RDF.type, _CONTEO):
+        objeto = next(grafo.subjects(_OP_CONTEO, resumen), None)
+        resultado.append({"osid": _osid(objeto) if objeto is not None else None,
+                          "idDataStream": str(grafo.value(resumen, _RECURSO) or ""),
+                          "archivadas": int(grafo.value(resumen, _ARCHIVADAS) or 0)})
+    resultado.sort(key=lambda conteo: (str(conteo["osid"]), conteo["idDataStream"]))
+    return resultado
+
+
+def leer(pathPerfil, desde = None, hasta = None):
+    """Grafo con las interacciones archivadas del perfil en los meses entre desde y hasta (datetime)."""
+    grafo = rdflib.Graph()
+    carpeta = directorio(pathPerfil)
+    if not os.path.isdir(carpeta):
+        return grafo
+    for nombre in sorted(os.listdir(carpeta)):
+        if not nombre.endswith(EXTENSION):
+            continue
+        mes = nombre[:-len(EXTENSION)]
+        if (desde is not None and mes < desde.strftime("%Y-%m")) or (hasta is not None and mes > hasta.strftime("%Y-%m")):
+            continue
+        with gzip.open(os.path.join(carpeta, nombre), "rb") as fichero:
+            grafo.parse(data=fichero.read(), format="nt")
+    return grafo
+
+
+##Interacciones distintas del archivo por (objeto, recurso). Contarlas en el archivo y no
+##sumar las movidas mantiene el conteo aunque un archivado interrumpido las añada dos veces
+def _contarArchivadas(pathPerfil):
+    archivo = leer(pathPerfil)
+    return Counter((next(archivo.subjects(_FECHA, individuo), None), str(archivo.value(individuo, _RECURSO) or ""))
+                   for individuo in set(archivo.subjects(RDF.type, _INTERACCION)))
+
+
+def archivar(ontologia, horizonteDias = None, ahora = None):
+    """Mueve al archivo las interacciones de la OntologiaPU anteriores al horizonte y retorna cuántas movió."""
+    horizonteDias = settings.INTERACCIONES_HORIZONTE_DIAS if horizonteDias is None else horizonteDias
+    limite = (ahora or datetime.now()) - timedelta(days=horizonteDias)
+    with ontologia.transaccion():
+        grafo = ontologia.g
+        porMes = defaultdict(set)
+        viejas = []
+        for individuo in set(grafo.subjects(RDF.type, _INTERACCION)):
+            cuando = fecha(str(grafo.value(individuo, _FECHA) or ""))
+            if cuando is None or cuando >= limite:
+                continue
+            mes = porMes[cuando.strftime("%Y-%m")]
+            for triple in list(grafo.triples((individuo, None, None))) + list(grafo.triples((None, None, individuo))):
+                mes.add(triple)
+            viejas.append(individuo)
+        if not viejas:
+            return 0
+        carpeta = directorio(ontologia.path)
+        os.makedirs(carpeta, exist_ok=True)
+        for mes, triples in porMes.items():
+            with open(os.path.join(carpeta, mes + EXTENSION), "ab") as fichero:
+                fichero.write(gzip.compress(_ntriples(triples)))
+                fichero.flush()
+                os.fsync(fichero.fileno())
+        ontologia.eliminarListaTodoIndividuo(viejas)
+        ontologia.eliminarListaReferenciasIndividuo(viejas)
+        for (objeto, recurso), cantidad in _contarArchivadas(ontologia.path).items():
+            osid = _osid(objeto) if objeto is not None else ""
+            resumen = UrisPu.individuoInteraction_Count + "_" + quote(osid, safe="") + "_" + quote(recurso, safe="")
+            ontologia.insertarIndividuo(resumen, UrisPu.individuoInteraction_Count)
+            ontologia.insertarDataProperty(resumen, UrisPu.dp_id_resource_interaction, Literal(recurso))
+            ontologia.eliminarDataProperty(resumen, UrisPu.dp_archived_interactions)
+            ontologia.insertarDataProperty(resumen, UrisPu.dp_archived_interactions, Literal(cantidad))
+            if objeto is not None:
+                ontologia.insertarObjectProperty(str(objeto), UrisPu.op_count_interaction, resumen)
+    ##Un perfil del pool escribe de forma diferida: el archivado debe llegar al fichero ya
+    ontologia.guardarPendientes()
+    logger.info(f"{len(viejas)} interacciones archivadas de {ontologia.path} en {carpeta}")
+    return len(viejas)
+
+
+def archivarPerfiles(horizonteDias = None):
+    """Archiva las interacciones antiguas de todos los perfiles de PATH_PU_OWL; retorna {perfil: archivadas}."""
+    resultado = {}
+    if not os.path.isdir(settings.PATH_PU_OWL):
+        return resultado
+    for nombre in sorted(os.listdir(settings.PATH_PU_OWL)):
+        if not nombre.endswith(".owl"):
+            continue
+        try:
+            resultado[nombre] = archivar(pool.obtener(settings.PATH_PU_OWL + nombre), horizonteDias)
+        except Exception as e:
+            logger.error(f"Error al archivar las interacciones de {nombre}: {e}")
+    return resultado
+
+
+class ArchivadorPeriodico:
+    """Hilo que archiva las interacciones de todos los perfiles cada INTERACCIONES_PERIODO_ARCHIVO segundos."""
+
+    def __init__(self, periodo = None):
+        self.periodo = settings.INTERACCIONES_PERIODO_ARCHIVO if periodo is None else periodo
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        if self.periodo <= 0 or self._hilo is not None:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._trabajar, name="archivo-interacciones", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo; si está archivando espera a que termine."""
+        hilo, self._hilo = self._hilo, None
+        self._detener.set()
+        if hilo is not None:
+            hilo.join()
+
+    def _trabajar(self):
+        while not self._detener.wait(self.periodo):
+            archivarPerfiles()
+
+
+archivador = ArchivadorPeriodico()
+"""@var archivador Archivado periódico de las interacciones del proceso."""
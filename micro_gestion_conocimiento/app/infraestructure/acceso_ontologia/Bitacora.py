@@ -0,0 +1,114 @@
+"""Bitácora de escritura anticipada (write-ahead journal) para la ontología instanciada.
+
+Cada mutación confirmada se agrega al final del fichero como N-Quads, usando el
+nombre de grafo para indicar la operación:
+
+    <s> <p> <o> <urn:bitacora:agregar> .
+    <s> <p> <o> <urn:bitacora:quitar> .
+
+Así una escritura cuesta O(cambios) en lugar de re-serializar todo el grafo.
+La bitácora se compacta en la instantánea RDF/XML periódicamente y se reproduce
+al cargar. Como las operaciones tienen semántica de conjunto, reproducirla sobre
+una instantánea que ya las incluye deja el grafo igual.
+"""
+import os
+import rdflib
+from rdflib import URIRef
+from infraestructure.logging.Logging import logger
+
+AGREGAR = URIRef("urn:bitacora:agregar")
+QUITAR = URIRef("urn:bitacora:quitar")
+
+
+class Bitacora:
+    """Fichero de operaciones pendientes de compactar asociado a una ontología."""
+
+    def __init__(self, path, sincronizar=True):
+        self.path = path
+        self.sincronizar = sincronizar
+        self.operaciones = self._contarLineas()
+
+    def _contarLineas(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as fichero:
+            return sum(1 for linea in fichero if linea.strip())
+
+    ##Recibe [(AGREGAR|QUITAR, (s, p, o))] en el orden en que se aplicaron
+    def registrar(self, operaciones):
+        if not operaciones:
+            return
+        lineas = []
+        for tramo, triples in self._tramos(operaciones):
+            ds = rdflib.Dataset()
+            grafo = ds.graph(tramo)
+            for triple in triples:
+                grafo.add(triple)
+            lineas.append(ds.serialize(format="nquads"))
+        with open(self.path, "a", encoding="utf-8") as fichero:
+            fichero.write("".join(lineas))
+            fichero.flush()
+            if self.sincronizar:
+                os.fsync(fichero.fileno())
+        self.operaciones += len(operaciones)
+
+    ##Aplica sobre el grafo las operaciones registradas, en orden. Retorna cuantas aplico
+    def reproducir(self, grafo):
+        if not os.path.exists(self.path):
+            return 0
+        aplicadas = 0
+        with open(self.path, "r", encoding="utf-8") as fichero:
+            lineas = [linea for linea in fichero if linea.strip()]
+        for tramo, grupo in self._tramosLineas(lineas):
+            for triple in self._parsear(grupo):
+                if tramo == AGREGAR:
+                    grafo.add(triple)
+                else:
+                    grafo.remove(triple)
+                aplicadas += 1
+        return aplicadas
+
+    def vaciar(self):
+        with open(self.path, "w", encoding="utf-8") as fichero:
+            fichero.flush()
+            if self.sincronizar:
+                os.fsync(fichero.fileno())
+        self.operaciones = 0
+
+    ##Agrupa operaciones consecutivas del mismo tipo (el orden solo importa entre tipos distintos)
+    def _tramos(self, operaciones):
+        actual, triples = None, []
+        for operacion, triple in operaciones:
+            if operacion != actual and triples:
+                yield actual, triples
+                triples = []
+            actual = operacion
+            triples.append(triple)
+        if triples:
+            yield actual, triples
+
+    def _tramosLineas(self, lineas):
+        actual, grupo = None, []
+        for linea in lineas:
+            operacion = QUITAR if linea.rstrip().endswith(QUITAR.n3() + " .") else AGREGAR
+            if operacion != actual and grupo:
+                yield actual, grupo
+                grupo = []
+            actual = operacion
+            grupo.append(linea)
+        if grupo:
+            yield actual, grupo
+
+    def _parsear(self, lineas):
+        ds = rdflib.Dataset()
+        try:
+            ds.parse(data="".join(lineas), format="nquads")
+        except Exception:
+            ##Una caida a mitad de escritura deja la ultima linea truncada: se descarta
+            ds = rdflib.Dataset()
+            for linea in lineas:
+                try:
+                    ds.parse(data=linea, format="nquads")
+                except Exception as e:
+                    logger.warning(f"Linea de bitacora descartada en {self.path}: {e}")
+        return [(s, p, o) for s, p, o, _ in ds.quads((None, None, None, None))]
@@ -0,0 +1,111 @@
+"""Número de revisión e historial reciente de cambios de una ontología.
+
+Cada transacción confirmada con cambios incrementa la revisión y guarda sus
+operaciones, así quien ya leyó la ontología puede pedir solo lo que cambió desde
+su revisión en lugar de volver a consultarlo todo.
+
+El historial vive en memoria y está acotado (CAMBIOS_MAX_REVISIONES revisiones y
+CAMBIOS_MAX_OPERACIONES operaciones en total): al superarlo se olvidan las
+revisiones más antiguas. Cuando el grafo se recarga desde disco (otro proceso
+cambió el fichero) no se conocen los cambios: la revisión avanza y el historial
+se vacía. En ambos casos quien pide cambios desde una revisión que ya no está
+completa debe resincronizar (volver a leer todo).
+
+Las revisiones se reinician con el proceso; la época, distinta en cada arranque,
+permite al cliente detectarlo.
+"""
+import threading
+import uuid
+from collections import deque
+
+from config import settings
+from infraestructure.acceso_ontologia.Bitacora import AGREGAR
+
+
+class RegistroCambios:
+    """Revisión monotónica e historial acotado de las operaciones confirmadas."""
+
+    def __init__(self, maxRevisiones = None, maxOperaciones = None):
+        self.maxRevisiones = settings.CAMBIOS_MAX_REVISIONES if maxRevisiones is None else maxRevisiones
+        self.maxOperaciones = settings.CAMBIOS_MAX_OPERACIONES if maxOperaciones is None else maxOperaciones
+        self.epoca = uuid.uuid4().hex[:12]
+        self.revision = 0
+        self._base = 0  ##Revision a partir de la cual el historial esta completo
+        self._historial = deque()  ##(revision, [(AGREGAR|QUITAR, triple)])
+        self._operaciones = 0
+        self._lock = threading.Lock()
+        self._suscriptores = set()
+
+    def registrar(self, operaciones):
+        """Anota una transacción confirmada y retorna su revisión.
+
+        Si las operaciones se anulan entre sí (p.ej. reescribir un valor con el mismo
+        valor) el grafo no cambió y la revisión no avanza."""
+        operaciones = _neto(operaciones)
+        if not operaciones:
+            return self.revision
+        with self._lock:
+            self.revision += 1
+            self._historial.append((self.revision, operaciones))
+            self._operaciones += len(operaciones)
+            ##Se conserva siempre la ultima revision aunque por si sola supere el limite
+            while len(self._historial) > 1 and (len(self._historial) > self.maxRevisiones
+                                                or self._operaciones > self.maxOperaciones):
+                self._base, olvidadas = self._historial.popleft()
+                self._operaciones -= len(olvidadas)
+            revision = self.revision
+        self._avisar()
+        return revision
+
+    def recargado(self):
+        """El grafo se reemplazó completo: nueva revisión sin historial."""
+        with self._lock:
+            self.revision += 1
+            self._base = self.revision
+            self._historial.clear()
+            self._operaciones = 0
+        self._avisar()
+
+    def desde(self, revision):
+        """Retorna (revision actual, [(revision, operaciones)] posteriores a la dada),
+        o (revision actual, None) si el historial ya no cubre esa revisión."""
+        with self._lock:
+            if revision < self._base or revision > self.revision:
+                return self.revision, None
+            return self.revision, [(r, ops) for r, ops in self._historial if r > revision]
+
+    ##Los avisos se llaman desde el hilo que confirma: deben ser rapidos y no tomar el cerrojo de la ontologia
+    def suscribir(self, aviso):
+        with self._lock:
+            self._suscriptores.add(aviso)
+
+    def desuscribir(self, aviso):
+        with self._lock:
+            self._suscriptores.discard(aviso)
+
+    def _avisar(self):
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        for aviso in suscriptores:
+            aviso()
+
+
+##Un triple cambio solo si su primera y su ultima operacion coinciden: quitar y volver a
+##agregar (o agregar y volver a quitar) lo deja como estaba
+def _neto(operaciones):
+    primera, ultima = {}, {}
+    for operacion, triple in operaciones:
+        primera.setdefault(triple, operacion)
+        ultima[triple] = operacion
+    return [(operacion, triple) for triple, operacion in ultima.items() if primera[triple] == operacion]
+
+
+def individuos(operaciones):
+    """Sujetos afectados por las operaciones, sin repetir y en orden de aparición."""
+    return list(dict.fromkeys(str(triple[0]) for _, triple in operaciones))
+
+
+def triples(operaciones):
+    """Operaciones como ["+"|"-", s, p, o] con los términos en notación N3."""
+    return [["+" if operacion == AGREGAR else "-"] + [termino.n3() for termino in triple]
+            for operacion, triple in operaciones]
@@ -0,0 +1,108 @@
+"""Cerrojo de lectores y escritor para el grafo de una ontología.
+
+Muchos hilos pueden consultar a la vez; una escritura espera a que salgan los
+lectores y excluye a todos. Mientras un escritor espera no entran lectores nuevos,
+para que un flujo continuo de consultas no lo deje esperando indefinidamente.
+
+La excepción son las lecturas largas (volcar el grafo a disco): el escritor tiene
+que esperarlas de todos modos, así que durante una lectura larga siguen entrando
+lectores aunque haya escritores esperando. Las consultas no se bloquean por una
+compactación; solo las escrituras.
+
+Es reentrante: el hilo escritor puede volver a tomar la escritura o la lectura, y
+un lector puede anidar lecturas. Un lector no puede pasar a escritor (los dos
+lectores que lo intentaran a la vez se esperarían mutuamente): se lanza RuntimeError.
+"""
+import threading
+from contextlib import contextmanager
+
+
+class CerrojoLectoresEscritor:
+    """Cerrojo reentrante de muchos lectores o un escritor, con preferencia al escritor.
+
+    Usado directamente en un with equivale a escritura()."""
+
+    def __init__(self):
+        self._condicion = threading.Condition(threading.Lock())
+        self._lectores = {}  ##id del hilo -> lecturas anidadas
+        self._largas = 0  ##Lecturas largas en curso
+        self._escritor = None
+        self._escrituras = 0  ##Escrituras anidadas del hilo escritor
+        self._esperando = 0  ##Escritores esperando
+
+    @contextmanager
+    def lectura(self, larga = False):
+        self.adquirirLectura(larga)
+        try:
+            yield
+        finally:
+            self.liberarLectura(larga)
+
+    @contextmanager
+    def escritura(self):
+        self.adquirirEscritura()
+        try:
+            yield
+        finally:
+            self.liberarEscritura()
+
+    def __enter__(self):
+        self.adquirirEscritura()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.liberarEscritura()
+
+    def esEscritor(self):
+        """True si el hilo actual tiene la escritura."""
+        return self._escritor == threading.get_ident()
+
+    def esLector(self):
+        """True si el hilo actual tiene una lectura (y no la escritura)."""
+        return threading.get_ident() in self._lectores and not self.esEscritor()
+
+    def adquirirLectura(self, larga = False):
+        hilo = threading.get_ident()
+        with self._condicion:
+            if self._escritor != hilo and hilo not in self._lectores:
+                while self._escritor is not None or (self._esperando and not self._largas):
+                    self._condicion.wait()
+            self._lectores[hilo] = self._lectores.get(hilo, 0) + 1
+            if larga:
+                self._largas += 1
+
+    def liberarLectura(self, larga = False):
+        hilo = threading.get_ident()
+        with self._condicion:
+            if larga:
+                self._largas -= 1
+            self._lectores[hilo] -= 1
+            if self._lectores[hilo] == 0:
+                del self._lectores[hilo]
+            self._condicion.notify_all()
+
+    def adquirirEscritura(self):
+        hilo = threading.get_ident()
+        with self._condicion:
+            if self._escritor == hilo:
+                self._escrituras += 1
+                return
+            if hilo in self._lectores:
+                raise RuntimeError("Un lector no puede tomar la escritura sin soltar antes la lectura")
+            self._esperando += 1
+            try:
+                while self._escritor is not None or self._lectores:
+                    self._condicion.wait()
+            finally:
+                self._esperando -= 1
+            self._escritor = hilo
+            self._escrituras = 1
+
+    def liberarEscritura(self):
+        with self._condicion:
+            if self._escritor != threading.get_ident():
+                raise RuntimeError("El hilo actual no tiene la escritura")
+            self._escrituras -= 1
+            if self._escrituras == 0:
+                self._escritor = None
+                self._condicion.notify_all()
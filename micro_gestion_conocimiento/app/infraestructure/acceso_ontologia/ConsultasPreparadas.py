@@ -0,0 +1,48 @@
+"""Registro de consultas SPARQL preparadas.
+
+Graph.query(texto) vuelve a parsear y algebrizar el texto de la consulta en cada
+llamada. Aquí cada texto se prepara una única vez con prepareQuery y el objeto
+resultante se reutiliza. Los valores que cambian entre llamadas (osid,
+datastream_id, user_eca...) no se concatenan en el texto: se pasan como
+initBindings, de modo que el texto es constante y no admite inyección SPARQL.
+"""
+import threading
+from rdflib import Literal
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.sparql import Query
+
+##Cota del registro: un texto construido dinamicamente no debe hacerlo crecer sin limite
+MAX_CONSULTAS = 512
+
+_consultas = {}
+_lock = threading.Lock()
+
+
+def preparar(consulta):
+    """Retorna la consulta preparada para el texto dado, preparándola la primera vez."""
+    if isinstance(consulta, Query):
+        return consulta
+    preparada = _consultas.get(consulta)
+    if preparada is None:
+        ##El parser SPARQL de rdflib (pyparsing) no admite dos hilos a la vez: se prepara con el cerrojo tomado
+        with _lock:
+            preparada = _consultas.get(consulta)
+            if preparada is None:
+                preparada = prepareQuery(consulta)
+                if len(_consultas) < MAX_CONSULTAS:
+                    _consultas[consulta] = preparada
+    return preparada
+
+
+def parametros(**valores):
+    """Convierte valores de Python en literales para initBindings; omite los None."""
+    return {nombre: Literal(valor) for nombre, valor in valores.items() if valor is not None}
+
+
+def registradas():
+    return len(_consultas)
+
+
+def limpiar():
+    with _lock:
+        _consultas.clear()
@@ -0,0 +1,95 @@
+"""Instantánea binaria de una ontología para no re-parsear RDF/XML al arrancar.
+
+Junto a cada fichero .owl se mantiene <fichero>.owl.bin con el grafo de rdflib
+serializado con pickle, precedido de una cabecera con la firma (mtime_ns, tamaño)
+del .owl del que proviene y las versiones del formato y de rdflib. Si la firma no
+coincide con la del .owl actual (lo reescribió owlready2, otro proceso o una copia)
+o la cabecera es de otra versión, se parsea el RDF/XML y se regenera la instantánea.
+
+El .owl en RDF/XML sigue siendo la fuente de verdad y el formato de intercambio;
+la instantánea es solo una caché local y puede borrarse en cualquier momento.
+"""
+import gc
+import os
+import pickle
+import tempfile
+import rdflib
+from config import settings
+from infraestructure.acceso_ontologia.Perfilador import perfilador
+from infraestructure.logging.Logging import logger
+
+VERSION = 1
+EXTENSION = ".bin"
+
+
+def firma(pathOwl):
+    try:
+        estado = os.stat(pathOwl)
+    except OSError:
+        return None
+    return (estado.st_mtime_ns, estado.st_size)
+
+
+def _cabecera(firmaOwl):
+    return {"version": VERSION, "rdflib": rdflib.__version__, "firma": firmaOwl}
+
+
+def cargar(pathOwl, firmaOwl = None):
+    """Retorna el grafo del fichero .owl, desde la instantánea si está al día.
+
+    firmaOwl es la firma del .owl que se quiere leer; por defecto la actual."""
+    if firmaOwl is None:
+        firmaOwl = firma(pathOwl)
+    if settings.INSTANTANEA_BINARIA:
+        with perfilador.persistencia("lectura_instantanea", pathOwl):
+            grafo = _leer(pathOwl + EXTENSION, firmaOwl)
+        if grafo is not None:
+            return grafo
+    grafo = rdflib.Graph()
+    with perfilador.persistencia("parseo", pathOwl):
+        grafo.parse(pathOwl)
+    guardar(pathOwl, grafo, firmaOwl)
+    return grafo
+
+
+def guardar(pathOwl, grafo, firmaOwl = None):
+    """Escribe de forma atómica la instantánea de grafo, que debe corresponder al .owl con esa firma."""
+    if not settings.INSTANTANEA_BINARIA:
+        return
+    if firmaOwl is None:
+        firmaOwl = firma(pathOwl)
+    destino = pathOwl + EXTENSION
+    try:
+        ##Temporal propio: otro hilo puede estar escribiendo la instantanea del mismo fichero
+        descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(destino) + ".", suffix=".tmp",
+                                                dir=os.path.dirname(destino) or ".")
+        try:
+            with os.fdopen(descriptor, "wb") as fichero, perfilador.persistencia("escritura_instantanea", pathOwl):
+                pickle.dump(_cabecera(firmaOwl), fichero, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(grafo, fichero, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, destino)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+    except OSError as e:
+        ##Sin instantanea el siguiente arranque parsea el RDF/XML: no es un error de la escritura
+        logger.warning(f"No se pudo escribir la instantanea {destino}: {e}")
+
+
+def _leer(path, firmaOwl):
+    if firmaOwl is None or not os.path.exists(path):
+        return None
+    ##Desactivar el recolector mientras se crean millones de objetos acelera la carga varias veces
+    recolector = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as fichero:
+            if pickle.load(fichero) != _cabecera(firmaOwl):
+                return None
+            return pickle.load(fichero)
+    except Exception as e:
+        logger.warning(f"Instantanea {path} descartada: {e}")
+        return None
+    finally:
+        if recolector:
+            gc.enable()
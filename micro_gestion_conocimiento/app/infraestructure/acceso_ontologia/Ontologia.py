@@ -1,19 +1,93 @@
 
 import rdflib
 from config import settings
-import os, threading
+import os, threading, time
+from contextlib import contextmanager
 from rdflib import *
 from rdflib.namespace import RDF
 from rdflib import Literal
+from infraestructure.acceso_ontologia.Bitacora import Bitacora, AGREGAR, QUITAR
+from infraestructure.acceso_ontologia import Instantanea
+from infraestructure.acceso_ontologia.Cambios import RegistroCambios
+from infraestructure.acceso_ontologia.Cerrojo import CerrojoLectoresEscritor
+from infraestructure.acceso_ontologia.ConsultasPreparadas import preparar
+from infraestructure.acceso_ontologia.Perfilador import perfilador, origen
+from infraestructure.logging.Logging import logger
+
+##Instancias compartidas por proceso, indexadas por la ruta absoluta de la ontologia instanciada
+_compartidas = {}
+_compartidasLock = threading.Lock()
 
 class Ontologia:
     """Gestor de operaciones sobre la ontología perteneciente al objeto.
     Proporciona carga, consultas (SPARQL), inserciones, actualizaciones y
-    operaciones entre ontologías (resta). Cada método realiza la
-    persistencia correspondiente en el fichero RDF asociado."""
+    operaciones entre ontologías (resta). Cada escritura se registra en una
+    bitácora (fichero .bitacora junto a la ontología) que se compacta en el
+    fichero RDF al superar BITACORA_MAX_OPERACIONES o al llamar compactar().
+    Los ficheros RDF/XML se leen a través de su instantánea binaria (.owl.bin,
+    ver Instantanea) cuando está al día.
+
+    Las consultas comparten la lectura de self.lock (ver Cerrojo) y las
+    transacciones toman la escritura. Una recarga desde disco prepara el grafo
+    nuevo aparte y solo lo sustituye al final, y el volcado a disco es una
+    lectura larga: ninguna de las dos deja esperando a las consultas.
+
+    self.cambios lleva la revisión de la ontología, que avanza con cada
+    transacción confirmada, y el historial reciente de operaciones.
+
+    Para evitar parsear el fichero en cada petición se recomienda obtener la
+    instancia con Ontologia.compartida(), que mantiene un único grafo por
+    proceso y solo lo recarga cuando el fichero cambia en disco."""
+
+    @classmethod
+    def compartida(cls, ontologiaIns = None):
+        """Retorna la instancia compartida del proceso para la ontología instanciada dada.
+
+        La primera llamada carga el grafo; las siguientes reutilizan el mismo
+        objeto, que se refresca automáticamente si otro escritor (p.ej. owlready2)
+        modifica el fichero."""
+        if ontologiaIns == None:
+            ontologiaIns = settings.ONTOLOGIA_INSTANCIADA
+        clave = os.path.abspath(ontologiaIns)
+        with _compartidasLock:
+            instancia = _compartidas.get(clave)
+            if instancia is None:
+                instancia = cls(ontologiaIns)
+                _compartidas[clave] = instancia
+        return instancia
+
+    @classmethod
+    def listarCompartidas(cls):
+        """Retorna las instancias compartidas cargadas (p.ej. para las métricas)."""
+        with _compartidasLock:
+            return list(_compartidas.values())
+
+    @classmethod
+    def descartarCompartidas(cls):
+        """Olvida las instancias compartidas (la siguiente llamada a compartida() recarga)."""
+        with _compartidasLock:
+            _compartidas.clear()
+
+    @classmethod
+    def compactarCompartidas(cls):
+        """Compacta la bitácora de todas las instancias compartidas (p.ej. al apagar el servicio)."""
+        with _compartidasLock:
+            instancias = list(_compartidas.values())
+        for instancia in instancias:
+            ##Una instancia que no puede escribirse no impide compactar las demas
+            try:
+                instancia.compactar()
+            except Exception as e:
+                logger.error(f"No se pudo compactar {instancia.ontologiaInst}: {e}")
 
     def __init__(self, ontologiaIns = None, ontologiaOriginal = None):
-        self.lock = threading.Lock()
+        self.lock = CerrojoLectoresEscritor()  ##Lectura para consultas, escritura para transacciones
+        self._guardado = threading.RLock()  ##Un solo volcado a disco a la vez
+        self._volcando = False  ##El fichero esta siendo reemplazado por este proceso
+        self.firma = None  ##(mtime_ns, tamaño) del fichero instanciado cuando se cargo/guardo el grafo
+        self._pendientes = []  ##Operaciones aplicadas al grafo y aun no registradas en la bitacora
+        self._profundidad = 0  ##Nivel de anidamiento de transacciones abiertas
+        self.observadores = []  ##Vistas derivadas del grafo (p.ej. VistaEcas) que se mantienen con cada cambio
         if ontologiaOriginal == None:
             self.ontologia = settings.ONTOLOGIA  ##Path de la ontologia sin instanciar
         else:
@@ -22,6 +96,8 @@ class Ontologia:
             self.ontologiaInst = settings.ONTOLOGIA_INSTANCIADA  ##Path de la ontologia instanciada
         else:
             self.ontologiaInst = ontologiaIns  ##Path de la ontologia instanciada
+        self.bitacora = Bitacora(self.ontologiaInst + ".bitacora", settings.BITACORA_FSYNC)
+        self.cambios = RegistroCambios()  ##Revision e historial de lo confirmado (ver Cambios)
 
 
         self.g = rdflib.Graph()  ##Carga la ontologia en el grafo
@@ -29,11 +105,11 @@ class Ontologia:
 
 
         if os.path.exists(self.ontologiaInst):
-
-            self.g.parse(self.ontologiaInst)
+            self.cargarGrafoNuevo()
         else:
             try:
-                self.g.parse(self.ontologia)
+                self.g = Instantanea.cargar(self.ontologia)
+                self.bitacora.reproducir(self.g)
             except Exception as e:
                 self.g = rdflib.Graph()
                 print( "  Error inicializando la ontologia  ")
@@ -45,100 +121,311 @@ class Ontologia:
     ##Teniendo la direccion de la ontologia, la carga en el grafo g
     def cargarOntologia(self, dirOntologia):
         try:
-            self.g = rdflib.Graph()
-            self.g.parse(dirOntologia)
+            g = rdflib.Graph()
+            g.parse(dirOntologia)
+            with self.lock:
+                self.g = g
+                self._notificarRecarga()
         except Exception as e:
-            self.g = rdflib.Graph()
+            with self.lock:
+                self.g = rdflib.Graph()
             print( "  Error cargando la ontologia  del path " + dirOntologia)
             print( e)
             print( "")
 
-    ##Carga la ontologia instanciada
+    ##Carga la instantanea de la ontologia instanciada y reproduce la bitacora pendiente.
+    ##El grafo nuevo se construye sin bloquear a nadie (las consultas siguen sobre el anterior)
+    ##y se sustituye con la escritura tomada. Retorna False si no se sustituyo por estar en una transaccion
     def cargarGrafoNuevo(self):
-        self.g = rdflib.Graph()
-        self.g.parse(self.ontologiaInst)
+        firma = self._firmaFichero()
+        g = Instantanea.cargar(self.ontologiaInst, firma)
+        with self.lock:
+            if self._profundidad > 0:
+                ##Dentro de una transaccion recargar descartaria los cambios pendientes
+                return False
+            if self._firmaFichero() != firma:
+                ##El fichero volvio a cambiar mientras se cargaba
+                firma = self._firmaFichero()
+                g = Instantanea.cargar(self.ontologiaInst, firma)
+            ##La bitacora solo crece con la escritura tomada: se reproduce completa
+            aplicadas = self.bitacora.reproducir(g)
+            if aplicadas:
+                logger.info(f"Bitacora reproducida sobre {self.ontologiaInst}: {aplicadas} operaciones")
+            self.g = g
+            self.firma = firma
+            self._notificarRecarga()
+        return True
 
     ##Si existe la ontologia instanciada la carga, de lo contrario carga la ontologia
     def cargarGrafoOntologia(self):
-        self.g = rdflib.Graph()
-        if os.path.exists(self.ontologiaInst):
-            self.g.parse(self.ontologiaInst)
-        else:
-            self.g.parse(self.ontologia)
+        with self.lock:
+            if os.path.exists(self.ontologiaInst):
+                self.cargarGrafoNuevo()
+            else:
+                g = Instantanea.cargar(self.ontologia)
+                self.g = g
+                self.firma = None
+                self._notificarRecarga()
 
+    ##Escribe la instantanea completa (RDF/XML) de forma atomica, y su copia binaria para el siguiente arranque
     def guardarGrafoOntologia(self):
-        self.g.serialize(destination=self.ontologiaInst, format='xml')
-        self.cargarGrafoNuevo()
+        with self._volcado():
+            temporal = self.ontologiaInst + ".tmp"
+            with perfilador.persistencia("serializacion", self.ontologiaInst):
+                self.g.serialize(destination=temporal, format='xml')
+            with open(temporal, "rb+") as fichero:
+                os.fsync(fichero.fileno())
+            self._volcando = True
+            try:
+                os.replace(temporal, self.ontologiaInst)
+                self.firma = self._firmaFichero()
+            finally:
+                self._volcando = False
+            Instantanea.guardar(self.ontologiaInst, self.g, self.firma)
+
+    ##Vuelca la bitacora en la instantanea RDF/XML. Debe llamarse antes de que otro
+    ##lector del fichero (owlready2, copias, descargas) lo abra. Retorna True si reescribio el fichero
+    def compactar(self):
+        self.refrescarSiCambio()
+        with self._volcado():
+            if self.bitacora.operaciones == 0 and os.path.exists(self.ontologiaInst):
+                return False
+            self.guardarGrafoOntologia()
+            self.bitacora.vaciar()
+            logger.debug("Bitacora compactada en " + self.ontologiaInst)
+            return True
+
+    ##Volcar el grafo solo lo lee: se hace con una lectura larga, que no frena a las consultas
+    ##y deja esperando a los escritores (la bitacora no puede crecer mientras se vuelca).
+    ##Si el hilo ya tiene la escritura no espera a _guardado: otro volcado que lo tuviera
+    ##estaria esperando la lectura que este hilo impide
+    @contextmanager
+    def _volcado(self):
+        if self.lock.esEscritor():
+            yield
+            return
+        with self._guardado, self.lock.lectura(larga=True):
+            yield
+
+    def _firmaFichero(self):
+        try:
+            estado = os.stat(self.ontologiaInst)
+        except OSError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size)
+
+    ##Recarga el grafo solo si el fichero instanciado cambio desde la ultima carga/guardado
+    ##Un lector no recarga (no puede tomar la escritura): lo hara la siguiente consulta.
+    ##Tampoco se recarga el fichero que este proceso acaba de reemplazar y del que aun no anoto la firma
+    def refrescarSiCambio(self):
+        firma = self._firmaFichero()
+        if firma is None or firma == self.firma or self.lock.esLector():
+            return False
+        if self._volcando:
+            return False
+        return self.cargarGrafoNuevo()
 
     ###################### Consultas #####################################################
-    def consultaInstancias(self, query):
-        self.lock.acquire()
-        ##        self.cargarGrafoNuevo()
-        resultado = []
-        qrest = self.g.query(query)
-        for row in qrest:
-            resultado.append(row[0].split("#")[1].replace("()", ("")))
-        self.lock.release()
+    ##query puede ser texto o una consulta preparada; el texto se prepara una sola vez (ConsultasPreparadas)
+    ##y los valores variables llegan en parametros como initBindings
+    def consultaInstancias(self, query, parametros = None):
+        self.refrescarSiCambio()
+        with self.lock.lectura():
+            inicio = time.perf_counter()
+            resultado = []
+            qrest = self.g.query(preparar(query), initBindings=parametros)
+            for row in qrest:
+                resultado.append(row[0].split("#")[1].replace("()", ("")))
+            self._perfilar("instancias", inicio, len(resultado), query, parametros)
         return resultado
 
     ##retorna una lista con los resultados [[],[]]
-    def consultaDataProperty(self, query):
-        self.lock.acquire()
-        ##        self.cargarGrafoNuevo()
-        resultado = []
-        qrest = self.g.query(query)
-        for row in qrest:
-            aux = []
-            for subrow in row:
-                if not subrow == None:
-                    aux.append(subrow.encode('utf-8'))
-                else:
-                    aux.append("")
-            resultado.append(aux)
-        self.lock.release()
+    def consultaDataProperty(self, query, parametros = None):
+        self.refrescarSiCambio()
+        with self.lock.lectura():
+            inicio = time.perf_counter()
+            resultado = []
+            qrest = self.g.query(preparar(query), initBindings=parametros)
+            for row in qrest:
+                aux = []
+                for subrow in row:
+                    if not subrow == None:
+                        aux.append(subrow.encode('utf-8'))
+                    else:
+                        aux.append("")
+                resultado.append(aux)
+            self._perfilar("select", inicio, len(resultado), query, parametros)
         return resultado
 
+    ##Evalua los patrones (sujeto, predicado, objeto) en el orden dado y retorna las columnas
+    ##pedidas con el mismo formato que consultaDataProperty. Los terminos '?nombre' son variables,
+    ##los demas textos son URIs y los Literal se comparan por igualdad exacta. Cada patron se
+    ##resuelve con g.triples usando lo ya ligado, asi que conviene empezar por el mas selectivo:
+    ##    [("?eca", UrisOOS.dp_name_eca, Literal(nombre)), ("?eca", UrisOOS.dp_state_eca, "?eca_state")]
+    ##Un patron con cuarto elemento True es OPTIONAL. distintos=False conserva filas repetidas (SELECT sin DISTINCT)
+    def consultaPatrones(self, patrones, columnas, distintos = True):
+        self.refrescarSiCambio()
+        with self.lock.lectura():
+            inicio = time.perf_counter()
+            resultado = []
+            vistos = set()
+            for ligadura in self._resolverPatrones(patrones, 0, {}):
+                fila = tuple(ligadura.get(columna) for columna in columnas)
+                if distintos:
+                    if fila in vistos:
+                        continue
+                    vistos.add(fila)
+                resultado.append([valor.encode('utf-8') if valor is not None else "" for valor in fila])
+            self._perfilar("patrones", inicio, len(resultado), str(patrones))
+        return resultado
+
+    ##Anota la consulta en el Perfilador con el metodo que la lanzo; se llama con la lectura tomada
+    def _perfilar(self, operacion, inicio, filas, query, parametros = None):
+        perfilador.consulta(operacion, origen(), time.perf_counter() - inicio, filas, query, parametros, self.g)
+
+    def _resolverPatrones(self, patrones, indice, ligadura):
+        if indice == len(patrones):
+            yield ligadura
+            return
+        patron = patrones[indice]
+        terminos = [self._termino(termino, ligadura) for termino in patron[:3]]
+        encontrado = False
+        for triple in self._sondear(*terminos):
+            nueva = dict(ligadura)
+            for termino, valor in zip(patron[:3], triple):
+                if type(termino) is str and termino.startswith("?"):
+                    if nueva.setdefault(termino[1:], valor) != valor:
+                        break
+            else:
+                encontrado = True
+                yield from self._resolverPatrones(patrones, indice + 1, nueva)
+        if not encontrado and len(patron) > 3 and patron[3]:
+            yield from self._resolverPatrones(patrones, indice + 1, ligadura)
+
+    def _termino(self, termino, ligadura):
+        if type(termino) is str:
+            return ligadura.get(termino[1:]) if termino.startswith("?") else URIRef(termino)
+        return termino
+
+    ##owlready2 escribe los textos como xsd:string y rdflib como literal simple: se buscan ambos
+    def _sondear(self, sujeto, predicado, objeto):
+        if isinstance(objeto, Literal) and objeto.datatype is None and objeto.language is None:
+            yield from self.g.triples((sujeto, predicado, objeto))
+            yield from self.g.triples((sujeto, predicado, Literal(str(objeto), datatype=XSD.string)))
+        else:
+            yield from self.g.triples((sujeto, predicado, objeto))
+
+    ###################### Escritura #####################################################
+    ##Agrupa varias escrituras para registrarlas juntas al cerrar la transaccion mas externa:
+    ##    with ontologia.transaccion():
+    ##        ontologia.insertarListaIndividuos(...)
+    ##        ontologia.insertarListaDataProperty(...)
+    ##Si ocurre una excepcion se deshacen en memoria los cambios de ese nivel y se relanza.
+    ##Toda transaccion parte del grafo vigente en disco para no pisar cambios de otro escritor.
+    ##Las transacciones toman la escritura de self.lock; si hay que compactar se hace al soltarla.
+    @contextmanager
+    def transaccion(self):
+        if not self.lock.esEscritor():
+            self.refrescarSiCambio()
+        compactar = False
+        with self.lock:
+            if self._profundidad == 0:
+                self.refrescarSiCambio()
+            marca = len(self._pendientes)
+            self._profundidad += 1
+            try:
+                yield self
+            except BaseException:
+                self._deshacer(marca)
+                raise
+            finally:
+                self._profundidad -= 1
+            if self._profundidad == 0:
+                compactar = self._confirmar()
+        if compactar:
+            self.compactar()
+
+    def _deshacer(self, marca):
+        for operacion, triple in reversed(self._pendientes[marca:]):
+            if operacion == AGREGAR:
+                self.g.remove(triple)
+            else:
+                self.g.add(triple)
+            self._notificar(triple)
+        del self._pendientes[marca:]
+
+    def _agregar(self, triple):
+        if triple not in self.g:
+            self.g.add(triple)
+            self._pendientes.append((AGREGAR, triple))
+            self._notificar(triple)
+
+    def _quitar(self, patron):
+        for triple in list(self.g.triples(patron)):
+            self.g.remove(triple)
+            self._pendientes.append((QUITAR, triple))
+            self._notificar(triple)
+
+    def _notificar(self, triple):
+        for observador in self.observadores:
+            observador.cambio(triple)
+
+    def _notificarRecarga(self):
+        for observador in self.observadores:
+            observador.recargado()
+        self.cambios.recargado()
+
+    ##Registra en la bitacora lo confirmado. Retorna True si hay que compactar: en la primera
+    ##escritura (aun no hay instantanea; hasta entonces la bitacora se reproduce sobre la
+    ##ontologia base) o con la bitacora llena
+    def _confirmar(self):
+        pendientes, self._pendientes = self._pendientes, []
+        if pendientes:
+            self.bitacora.registrar(pendientes)
+            self.cambios.registrar(pendientes)
+        return not os.path.exists(self.ontologiaInst) or self.bitacora.operaciones >= settings.BITACORA_MAX_OPERACIONES
+
     ###################### Insertar #####################################################
     def insertarIndividuo(self, uriNuevo, uriClase):
         nodoNuevo = URIRef(uriNuevo)
         clase = URIRef(uriClase)
-        self.g.add((nodoNuevo, RDF.type, clase))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._agregar((nodoNuevo, RDF.type, clase))
 
     def insertarListaIndividuos(self, lista):
-        for i in lista:
-            nodoNuevo = URIRef(i[0])
-            clase = URIRef(i[1])
-            self.g.add((nodoNuevo, RDF.type, clase))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for i in lista:
+                nodoNuevo = URIRef(i[0])
+                clase = URIRef(i[1])
+                self._agregar((nodoNuevo, RDF.type, clase))
 
     def insertarDataProperty(self, uriIndividuo, uriData, valor):
         individuo = URIRef(uriIndividuo)
         dataProperty = URIRef(uriData)
-        self.g.add((individuo, dataProperty, valor))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._agregar((individuo, dataProperty, valor))
 
     def insertarListaDataProperty(self, lista):
-        for i in lista:
-            individuo = URIRef(i[0])
-            dataProperty = URIRef(i[1])
-            self.g.add((individuo, dataProperty, i[2]))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for i in lista:
+                individuo = URIRef(i[0])
+                dataProperty = URIRef(i[1])
+                self._agregar((individuo, dataProperty, i[2]))
 
     def insertarObjectProperty(self, uriIndividuo, uriObjectProperty, uriIndividuo2):
         individuo1 = URIRef(uriIndividuo)
         individuo2 = URIRef(uriIndividuo2)
         objectProperty = URIRef(uriObjectProperty)
-        self.g.add((individuo1, objectProperty, individuo2))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._agregar((individuo1, objectProperty, individuo2))
 
     def insertarListaObjectProperty(self, lista):
-        for i in lista:
-            individuo1 = URIRef(i[0])
-            objectProperty = URIRef(i[1])
-            individuo2 = URIRef(i[2])
-            self.g.add((individuo1, objectProperty, individuo2))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for i in lista:
+                individuo1 = URIRef(i[0])
+                objectProperty = URIRef(i[1])
+                individuo2 = URIRef(i[2])
+                self._agregar((individuo1, objectProperty, individuo2))
 
     ###################### Modificar #####################################################
     ##Este metodo modifica un valor en la ontologia
@@ -153,82 +440,76 @@ class Ontologia:
 
     def actualizarDataProperty(self, uriIndividuo, uriDataProperty, valorNuevo):
         ##Primero se elimina de la ontologia y luego se inserta
-        #print( "Inicia a actualizar dataproperty " + time.ctime())
         individuo = URIRef(uriIndividuo)
         dataProperty = URIRef(uriDataProperty)
-        self.g.remove((individuo, dataProperty, None))
-        self.g.add((individuo, dataProperty, Literal(valorNuevo)))
-        self.g.serialize(destination=self.ontologiaInst, format='xml')
-        self.cargarGrafoNuevo()
-       # print( "Fin actualizar dataproperty " + time.ctime())
+        with self.transaccion():
+            self._quitar((individuo, dataProperty, None))
+            self._agregar((individuo, dataProperty, Literal(valorNuevo)))
 
     def actualizarListaDataProperty(self, listaIndividuos):  ##[[uriind, uridata,valornuevo]]
         ##Primero se elimina de la ontologia y luego se inserta
-        for item in listaIndividuos:
-            individuo = URIRef(item[0])
-            dataProperty = URIRef(item[1])
-            valorNuevo = item[2]
-            self.g.remove((individuo, dataProperty, None))
-            self.g.add((individuo, dataProperty, Literal(valorNuevo)))
-        self.g.serialize(destination=self.ontologiaInst, format='xml')
-        self.cargarGrafoNuevo()
+        with self.transaccion():
+            for item in listaIndividuos:
+                individuo = URIRef(item[0])
+                dataProperty = URIRef(item[1])
+                valorNuevo = item[2]
+                self._quitar((individuo, dataProperty, None))
+                self._agregar((individuo, dataProperty, Literal(valorNuevo)))
+
+    ##Deja las tripletas del individuo como sujeto (solo las de `propiedades` si se indican) iguales
+    ##a `tripletas`: quita las que sobran y agrega las que faltan, sin tocar las que no cambian, asi
+    ##la bitacora solo registra la diferencia. Con `referencias` tambien quita las tripletas que lo
+    ##tienen como objeto y no estan en `tripletas` (como eliminarEntidad). Retorna cuantas cambio.
+    def sincronizarIndividuo(self, uriIndividuo, tripletas, propiedades = None, referencias = False):
+        individuo = URIRef(uriIndividuo)
+        deseadas = dict.fromkeys(tripletas)  ##Conserva el orden: el grafo en memoria devuelve en orden de insercion
+        with self.transaccion():
+            marca = len(self._pendientes)
+            if propiedades is None:
+                actuales = list(self.g.triples((individuo, None, None)))
+            else:
+                actuales = [triple for propiedad in propiedades for triple in self.g.triples((individuo, URIRef(propiedad), None))]
+            if referencias:
+                actuales += [triple for triple in self.g.triples((None, None, individuo)) if triple[0] != individuo]
+            for triple in actuales:
+                if triple not in deseadas:
+                    self._quitar(triple)
+            for triple in deseadas:
+                self._agregar(triple)
+            return len(self._pendientes) - marca
 
     ###################### Eliminar #####################################################
     def eliminarTodoIndividuo(self, uriIndividuo):
         try:
-            ontologiaInst = self.ontologiaInst
-            g = rdflib.Graph()
-            g.parse(ontologiaInst)
-            individuo = URIRef(uriIndividuo)
-            g.remove((individuo, None, None))
-            g.serialize(destination=ontologiaInst, format='xml')
-            self.cargarGrafoNuevo()
+            with self.transaccion():
+                self._quitar((URIRef(uriIndividuo), None, None))
         except Exception as e:
-            ontologiaInst = self.ontologiaInst
-            g = rdflib.Graph()
-            g.parse(ontologiaInst)
-            g.serialize(destination=ontologiaInst, format='xml')
-            self.cargarGrafoNuevo()
             print( " Problemas eliminando todo del individuo")
             print( e)
             print( "")
 
     def eliminarListaTodoIndividuo(self, ListauriIndividuo):
         try:
-            ontologiaInst = self.ontologiaInst
-            g = rdflib.Graph()
-            g.parse(ontologiaInst)
-            for uriIndividuo in ListauriIndividuo:
-                individuo = URIRef(uriIndividuo)
-                g.remove((individuo, None, None))
-            g.serialize(destination=ontologiaInst, format='xml')
-            self.cargarGrafoNuevo()
+            with self.transaccion():
+                for uriIndividuo in ListauriIndividuo:
+                    self._quitar((URIRef(uriIndividuo), None, None))
         except Exception as e:
-            ontologiaInst = self.ontologiaInst
-            g = rdflib.Graph()
-            g.parse(ontologiaInst)
-            g.serialize(destination=ontologiaInst, format='xml')
-            self.cargarGrafoNuevo()
             print( " Problemas eliminando todo del individuo")
             print( e)
             print( "")
 
+    ##Equivale a destroy_entity de owlready2: quita el individuo como sujeto y como objeto
+    def eliminarEntidad(self, uriIndividuo):
+        individuo = URIRef(uriIndividuo)
+        with self.transaccion():
+            self._quitar((individuo, None, None))
+            self._quitar((None, None, individuo))
+
     def eliminarDataProperty(self, uriIndividuo, uriDatapropertyP):
         try:
-            ontologiaInst = self.ontologiaInst
-            g = rdflib.Graph()
-            g.parse(ontologiaInst)
-            individuo = URIRef(uriIndividuo)
-            dataProperty = URIRef(uriDatapropertyP)
-            g.remove((individuo, dataProperty, None))
-            g.serialize(destination=ontologiaInst, format='xml')
-            self.cargarGrafoNuevo()
+            with self.transaccion():
+                self._quitar((URIRef(uriIndividuo), URIRef(uriDatapropertyP), None))
         except Exception as e:
-            ontologiaInst = self.ontologiaInst
-            g = rdflib.Graph()
-            g.parse(ontologiaInst)
-            g.serialize(destination=ontologiaInst, format='xml')
-            self.cargarGrafoNuevo()
             print( " Problemas eliminando DataProperty")
             print( e)
             print( "")
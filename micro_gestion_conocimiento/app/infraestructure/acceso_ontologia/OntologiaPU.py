@@ -1,10 +1,17 @@
 import os
+import tempfile
+from contextlib import contextmanager
 import rdflib
 from rdflib import *
 from rdflib import Literal
 from rdflib.namespace import RDF
 import time
 from config import settings
+from infraestructure.acceso_ontologia.ConsultasPreparadas import preparar
+from infraestructure.acceso_ontologia.Perfilador import perfilador, origen
+from infraestructure.acceso_ontologia import Instantanea
+from infraestructure.acceso_ontologia.Cerrojo import CerrojoLectoresEscritor
+from infraestructure.logging.Logging import logger
 from rdflib import URIRef
 
 
@@ -13,16 +20,31 @@ class OntologiaPU:
 
     Proporciona carga, consultas (SPARQL), inserciones, actualizaciones y
     operaciones entre ontologías (resta). Cada método realiza la
-    persistencia correspondiente en el fichero RDF asociado.
+    persistencia correspondiente en el fichero RDF asociado; varias
+    escrituras dentro de ``with ontologia.transaccion():`` se persisten
+    una sola vez al final. Las consultas comparten la lectura de self.lock
+    y las escrituras toman la escritura (ver Cerrojo).
+
+    Las instancias del pool (ver PoolOntologiasPU) trabajan en modo diferido:
+    una transacción solo acumula los cambios en memoria y el fichero se escribe
+    al reunir PU_POOL_MAX_SIN_GUARDAR operaciones, al desalojarla o al apagar.
+    Antes de cada escritura se comprueba la firma del fichero: si otro escritor
+    lo reemplazó (p.ej. una ontología subida) se descartan los cambios en vez de pisarlo.
 
     Args:
         path (str): Ruta al archivo OWL/RDF de la ontología.
     """    
     def __init__(self, path):        
+        self.lock = CerrojoLectoresEscritor()
+        self._pendientes = []  ##[(agregar:bool, triple)] aplicados desde que se abrio la transaccion
+        self.observadores = []  ##Vistas derivadas del grafo (p.ej. VistaEdificios) que se mantienen con cada cambio
+        self._profundidad = 0
+        self.diferido = False  ##True: las transacciones no escriben el fichero (lo hace el pool)
+        self.sinGuardar = 0  ##Operaciones confirmadas que aun no estan en el fichero
         if os.path.exists(path):
             self.path = path
-            self.g = rdflib.Graph()
-            self.g.parse(path)
+            self.firma = Instantanea.firma(path)  ##Firma del fichero cuando se cargo/guardo el grafo
+            self.g = Instantanea.cargar(path, self.firma)
         else:
             raise FileNotFoundError(f"La ontología de usuario no existe en la ruta especificada: {path}")
         
@@ -37,94 +59,194 @@ class OntologiaPU:
         if not os.path.exists(path):
             #TODO en el código original no existe el path de ontologiaPU
             self.g.parse(settings.ONTOLOGIA_PU)
-            self.g.serialize(destination = path, format='xml')
+            self._notificarRecarga()
+            self.guardarGrafoOntologia()
         
         
     def cargarOntologia(self, dirOntologia):
-        self.g = rdflib.Graph()
-        self.g.parse(dirOntologia)
+        g = Instantanea.cargar(dirOntologia)
+        with self.lock:
+            self.g = g
+            self._notificarRecarga()
          
+    ##Serializa en un temporal del mismo directorio y lo renombra: un lector (o una caida)
+    ##nunca ve el perfil a medio escribir
     def guardarGrafoOntologia(self ):
-        self.g.serialize(destination = self.path, format='xml')
+        descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                                                dir=os.path.dirname(self.path) or ".")
+        try:
+            with os.fdopen(descriptor, "wb") as fichero, perfilador.persistencia("serializacion", self.path):
+                self.g.serialize(destination = fichero, format='xml')
+                fichero.flush()
+                os.fsync(fichero.fileno())
+            os.replace(temporal, self.path)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+        self.firma = Instantanea.firma(self.path)
+        self.sinGuardar = 0
+        Instantanea.guardar(self.path, self.g, self.firma)
+
+    ##Escribe los cambios confirmados que el modo diferido no ha escrito. Retorna True si escribio el fichero
+    def guardarPendientes(self):
+        with self.lock:
+            if self.sinGuardar == 0:
+                return False
+            return self._guardarSiNoCambio()
+
+    ##Con la escritura tomada. Si otro escritor reemplazo el fichero desde que se cargo o guardo
+    ##(p.ej. una ontologia subida) no lo pisa: descarta los cambios sin guardar. Retorna True si escribio
+    def _guardarSiNoCambio(self):
+        if Instantanea.firma(self.path) != self.firma:
+            logger.warning(f"{self.path} cambio en disco: se descartan {self.sinGuardar} operaciones sin guardar")
+            self.sinGuardar = 0
+            return False
+        self.guardarGrafoOntologia()
+        return True
     
     def guardarGrafoOntologiaPath(self, path ):
         self.g.serialize(destination = path, format='xml')
         
         
 ###################### Consultas #####################################################
-    def consultaInstancias(self, query):
+    ##query puede ser texto o una consulta preparada; los valores variables llegan en parametros (initBindings)
+    def consultaInstancias(self, query, parametros = None):
 ##        self.cargarGrafoNuevo()
         resultado = []
-        qrest = self.g.query(query)
-        for row in qrest:
+        with self.lock.lectura():
+            inicio = time.perf_counter()
+            qrest = self.g.query(preparar(query), initBindings=parametros)
+            for row in qrest:
                 resultado.append(row[0].split("#")[1].replace("()",("")))
+            self._perfilar("instancias", inicio, len(resultado), query, parametros)
         return resultado
     
     ##retorna una lista con los resultados [[],[]]
-    def consultaDataProperty(self, query):
+    def consultaDataProperty(self, query, parametros = None):
 ##        self.cargarGrafoNuevo()
         ##print "Desde consultaDataProperty Inicia: " + time.ctime() 
         resultado = []
-        qrest = self.g.query(query) 
-        for row in qrest:
-            aux = []
-            for subrow in row:
-                if not subrow == None:
-                    aux.append(subrow.encode('utf-8'))
-                else:
-                    aux.append("")
-            resultado.append(aux)
+        with self.lock.lectura():
+            inicio = time.perf_counter()
+            qrest = self.g.query(preparar(query), initBindings=parametros) 
+            for row in qrest:
+                aux = []
+                for subrow in row:
+                    if not subrow == None:
+                        aux.append(subrow.encode('utf-8'))
+                    else:
+                        aux.append("")
+                resultado.append(aux)
+            self._perfilar("select", inicio, len(resultado), query, parametros)
         ##print "Desde consultaDataProperty Fin: " + time.ctime() 
         return resultado
     
     ##retorna un boolean yes/no Questions
-    def consultasASK(self, query):
+    def consultasASK(self, query, parametros = None):
 ##        self.cargarGrafoNuevo()
-        qrest = self.g.query(query)         
-        return qrest
+        with self.lock.lectura():
+            inicio = time.perf_counter()
+            ##El resultado de un ASK se evalua al construirlo, dentro de la lectura
+            resultado = self.g.query(preparar(query), initBindings=parametros)
+            self._perfilar("ask", inicio, 1, query, parametros)
+            return resultado
+
+    ##Anota la consulta en el Perfilador con el metodo que la lanzo; se llama con la lectura tomada
+    def _perfilar(self, operacion, inicio, filas, query, parametros = None):
+        perfilador.consulta(operacion, origen(), time.perf_counter() - inicio, filas, query, parametros, self.g)
     
+###################### Escritura #####################################################
+    ##Agrupa escrituras en una sola persistencia al cerrar la transaccion mas externa.
+    ##Si ocurre una excepcion se deshacen los cambios de ese nivel y se relanza.
+    @contextmanager
+    def transaccion(self):
+        with self.lock:
+            marca = len(self._pendientes)
+            self._profundidad += 1
+            try:
+                yield self
+            except BaseException:
+                self._deshacer(marca)
+                raise
+            finally:
+                self._profundidad -= 1
+            if self._profundidad == 0:
+                pendientes, self._pendientes = self._pendientes, []
+                self.sinGuardar += len(pendientes)
+                if self.sinGuardar and (not self.diferido or self.sinGuardar >= settings.PU_POOL_MAX_SIN_GUARDAR):
+                    self._guardarSiNoCambio()
+
+    def _deshacer(self, marca):
+        for agregado, triple in reversed(self._pendientes[marca:]):
+            if agregado:
+                self.g.remove(triple)
+            else:
+                self.g.add(triple)
+            self._notificar(triple)
+        del self._pendientes[marca:]
+
+    def _agregar(self, triple):
+        if triple not in self.g:
+            self.g.add(triple)
+            self._pendientes.append((True, triple))
+            self._notificar(triple)
+
+    def _quitar(self, patron):
+        for triple in list(self.g.triples(patron)):
+            self.g.remove(triple)
+            self._pendientes.append((False, triple))
+            self._notificar(triple)
+
+    def _notificar(self, triple):
+        for observador in self.observadores:
+            observador.cambio(triple)
+
+    def _notificarRecarga(self):
+        for observador in self.observadores:
+            observador.recargado()
+
 ###################### Insertar #####################################################
     def insertarIndividuo(self, uriNuevo, uriClase):
         
         nodoNuevo = URIRef(uriNuevo)
         clase = URIRef(uriClase)
-        self.g.add((nodoNuevo,RDF.type, clase))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._agregar((nodoNuevo,RDF.type, clase))
 
     def insertarListaIndividuos(self,lista):
-        for i in lista:
-            nodoNuevo = URIRef(i[0])
-            clase = URIRef(i[1])
-            self.g.add((nodoNuevo,RDF.type, clase))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for i in lista:
+                nodoNuevo = URIRef(i[0])
+                clase = URIRef(i[1])
+                self._agregar((nodoNuevo,RDF.type, clase))
 
     def insertarDataProperty(self, uriIndividuo, uriData, valor):
         individuo = URIRef(uriIndividuo)
         dataProperty = URIRef(uriData)
-        self.g.add ((individuo, dataProperty, valor))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._agregar((individuo, dataProperty, valor))
         
     def insertarListaDataProperty(self,lista):
-        for i in lista:
-            individuo=URIRef(i[0])
-            dataProperty = URIRef(i[1])
-            self.g.add ((individuo, dataProperty, i[2]))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for i in lista:
+                individuo=URIRef(i[0])
+                dataProperty = URIRef(i[1])
+                self._agregar((individuo, dataProperty, i[2]))
        
     def insertarObjectProperty(self, uriIndividuo, uriObjectProperty, uriIndividuo2):
         individuo1 = URIRef(uriIndividuo)
         individuo2 = URIRef(uriIndividuo2)
         objectProperty = URIRef(uriObjectProperty)
-        self.g.add ((individuo1, objectProperty, individuo2))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._agregar((individuo1, objectProperty, individuo2))
 
     def insertarListaObjectProperty(self,lista):
-        for i in lista:
-            individuo1 = URIRef(i[0])
-            objectProperty = URIRef(i[1])
-            individuo2= URIRef(i[2])
-            self.g.add ((individuo1, objectProperty, individuo2))
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for i in lista:
+                individuo1 = URIRef(i[0])
+                objectProperty = URIRef(i[1])
+                individuo2= URIRef(i[2])
+                self._agregar((individuo1, objectProperty, individuo2))
 
 ###################### Modificar #####################################################
     ##Este metodo modifica un valor en la ontologia
@@ -142,52 +264,40 @@ class OntologiaPU:
         print( "Inicia a actualizar dataproperty " + time.ctime())
         individuo = URIRef(uriIndividuo)
         dataProperty = URIRef(uriDataProperty)
-        self.g.remove ((individuo, dataProperty, None))
-        self.g.add((individuo, dataProperty, Literal(valorNuevo)))
-        self.g.serialize(destination = self.path, format='xml')
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._quitar((individuo, dataProperty, None))
+            self._agregar((individuo, dataProperty, Literal(valorNuevo)))
         print( "Fin actualizar dataproperty " + time.ctime())
 
     def actualizarListaDataProperty(self,listaIndividuos): ##[[uriind, uridata,valornuevo]]
         ##Primero se elimina de la ontologia y luego se inserta
-        for item in listaIndividuos:
-            individuo = URIRef(item[0])
-            dataProperty = URIRef(item[1])
-            valorNuevo = item[2]
-            self.g.remove ((individuo, dataProperty, None))
-            self.g.add((individuo, dataProperty, Literal(valorNuevo)))
-        self.g.serialize(destination = self.path, format='xml')
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for item in listaIndividuos:
+                individuo = URIRef(item[0])
+                dataProperty = URIRef(item[1])
+                valorNuevo = item[2]
+                self._quitar((individuo, dataProperty, None))
+                self._agregar((individuo, dataProperty, Literal(valorNuevo)))
         
 ###################### Eliminar #####################################################
     def eliminarTodoIndividuo(self, uriIndividuo):
-        ontologiaInst =self.path
-        g = rdflib.Graph()
-        g.parse(ontologiaInst)
-        individuo = URIRef(uriIndividuo)
-        g.remove ((individuo, None, None))
-        g.serialize(destination = ontologiaInst, format='xml')
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._quitar((URIRef(uriIndividuo), None, None))
 
     def eliminarListaTodoIndividuo(self, ListauriIndividuo):
-        ontologiaInst =self.path
-        g = rdflib.Graph()
-        g.parse(ontologiaInst)
-        for uriIndividuo in ListauriIndividuo:
-            individuo = URIRef(uriIndividuo)
-            g.remove ((individuo, None, None))
-        g.serialize(destination = ontologiaInst, format='xml')
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            for uriIndividuo in ListauriIndividuo:
+                self._quitar((URIRef(uriIndividuo), None, None))
+
+    ##Quita los triples que apuntan a los individuos (p.ej. Object date_interaction Schedule_Interaction)
+    def eliminarListaReferenciasIndividuo(self, ListauriIndividuo):
+        with self.transaccion():
+            for uriIndividuo in ListauriIndividuo:
+                self._quitar((None, None, URIRef(uriIndividuo)))
 
     def eliminarDataProperty(self, uriIndividuo,uriDatapropertyP):
-        ontologiaInst =self.path
-        g = rdflib.Graph()
-        g.parse(ontologiaInst)
-        individuo = URIRef(uriIndividuo)
-        dataProperty = URIRef(uriDatapropertyP)
-        g.remove ((individuo, dataProperty, None))
-        g.serialize(destination = ontologiaInst, format='xml')
-        self.guardarGrafoOntologia()
+        with self.transaccion():
+            self._quitar((URIRef(uriIndividuo), URIRef(uriDatapropertyP), None))
    
 ##    def eliminarObjectProperty(self, uriIndividuo):
 ###################### Operaciones entre ontologias #####################################################
@@ -0,0 +1,133 @@
+"""Perfilado de las consultas y de la persistencia de las ontologías.
+
+Ontologia y OntologiaPU anotan aquí cada consulta (SPARQL SELECT/ASK o por
+patrones) con su duración y número de filas, y cada carga o escritura del
+fichero con su duración. Las consultas se agrupan por el método que las lanzó
+(p.ej. ConsultasOOS.consultarTitle): el primero de la pila fuera de
+acceso_ontologia, así el número de series está acotado por el de métodos.
+
+Las cargas y escrituras se agrupan por operación (parseo o serialización RDF/XML,
+lectura o escritura de la instantánea binaria) y tipo de ontología (oos o perfil).
+
+Las duraciones se acumulan en histogramas con los cubos de Prometheus y se
+exponen en /metrics (ver api/metricas.py). Una consulta que dura
+CONSULTA_LENTA_SEGUNDOS o más se registra en el log con su texto y sus
+parámetros (0 lo desactiva).
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from config import settings
+from infraestructure.logging.Logging import logger
+
+CUBOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+class Histograma:
+    """Cubos acumulados, suma y cuenta de observaciones, como un histograma de Prometheus."""
+
+    def __init__(self):
+        self.cubos = [0] * (len(CUBOS) + 1)  ##El ultimo es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor):
+        self.cubos[bisect.bisect_left(CUBOS, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+
+    def acumulados(self):
+        """[(le, observaciones <= le)] incluyendo +Inf."""
+        total = 0
+        resultado = []
+        for limite, cantidad in zip(CUBOS + (float("inf"),), self.cubos):
+            total += cantidad
+            resultado.append((limite, total))
+        return resultado
+
+
+def origen():
+    """Nombre calificado del primer método de la pila fuera de acceso_ontologia."""
+    marco = sys._getframe(1)
+    while marco is not None and os.path.dirname(os.path.abspath(marco.f_code.co_filename)) == _DIRECTORIO:
+        marco = marco.f_back
+    if marco is None:
+        return "desconocido"
+    return getattr(marco.f_code, "co_qualname", marco.f_code.co_name)
+
+
+def texto(query, parametros = None):
+    """Texto de la consulta en una línea, con sus parámetros."""
+    cuerpo = " ".join(query.split()) if isinstance(query, str) else repr(query)
+    if parametros:
+        cuerpo += " " + str({str(clave): str(valor) for clave, valor in parametros.items()})
+    return cuerpo
+
+
+class Perfilador:
+    """Latencia y filas por consulta y tiempos de carga y escritura de las ontologías del proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._consultas = {}  ##(operacion, consulta) -> [Histograma, filas, lentas]
+        self._persistencia = {}  ##(operacion, ontologia) -> Histograma
+
+    def consulta(self, operacion, consulta, segundos, filas, query = None, parametros = None, grafo = None):
+        """Anota una consulta; si supera el umbral la registra en el log con su texto."""
+        with self._lock:
+            entrada = self._consultas.get((operacion, consulta))
+            if entrada is None:
+                entrada = self._consultas[(operacion, consulta)] = [Histograma(), 0, 0]
+            entrada[0].observar(segundos)
+            entrada[1] += filas
+            umbral = settings.CONSULTA_LENTA_SEGUNDOS
+            lenta = 0 < umbral <= segundos
+            if lenta:
+                entrada[2] += 1
+        if lenta:
+            triples = len(grafo) if grafo is not None else "?"
+            logger.warning(f"Consulta lenta {consulta} ({operacion}): {segundos * 1000:.1f} ms, {filas} filas, "
+                           f"{triples} tripletas en el grafo: {texto(query, parametros) if query is not None else ''}")
+
+    @contextmanager
+    def persistencia(self, operacion, path):
+        """Mide el bloque como la operación ('parseo', 'serializacion', 'lectura_instantanea',
+        'escritura_instantanea') sobre el fichero path; se agrupa por tipo de ontología."""
+        ontologia = "perfil" if os.path.abspath(path).startswith(os.path.abspath(settings.PATH_PU_OWL)) else "oos"
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            with self._lock:
+                self._persistencia.setdefault((operacion, ontologia), Histograma()).observar(segundos)
+
+    def consultas(self):
+        """{(operacion, consulta): (Histograma, filas, lentas)} copiado."""
+        with self._lock:
+            return {clave: (_copia(h), filas, lentas) for clave, (h, filas, lentas) in self._consultas.items()}
+
+    def persistencias(self):
+        """{(operacion, ontologia): Histograma} copiado."""
+        with self._lock:
+            return {clave: _copia(h) for clave, h in self._persistencia.items()}
+
+    def reiniciar(self):
+        with self._lock:
+            self._consultas.clear()
+            self._persistencia.clear()
+
+
+def _copia(histograma):
+    copia = Histograma()
+    copia.cubos, copia.suma, copia.cuenta = list(histograma.cubos), histograma.suma, histograma.cuenta
+    return copia
+
+
+perfilador = Perfilador()
+"""@var perfilador Perfilado de las ontologías del proceso."""
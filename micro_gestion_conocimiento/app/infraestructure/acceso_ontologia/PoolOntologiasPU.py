@@ -0,0 +1,177 @@
+"""Pool acotado de ontologías de perfil de usuario (OntologiaPU) cargadas en memoria.
+
+Cada interacción o consulta de perfil parseaba el fichero PU/<mac>&<email>.owl
+(o UsuarioActual.owl). El pool conserva las ontologías ya cargadas, indexadas por
+ruta, y las reutiliza mientras la firma del fichero (mtime y tamaño) no cambie;
+si otro escritor lo reemplaza se vuelve a cargar.
+
+Está acotado en número de ontologías (PU_POOL_MAX_ONTOLOGIAS) y en triples en
+total (PU_POOL_MAX_TRIPLES), la medida de memoria que importa porque los perfiles
+crecen con cada interacción. Al superarlo desaloja las menos usadas recientemente.
+
+Las ontologías del pool escriben de forma diferida (ver OntologiaPU): sus cambios
+se escriben en el fichero al desalojarlas, al apagar el servicio (vaciar) o al
+reunir PU_POOL_MAX_SIN_GUARDAR operaciones. Una ontología desalojada que aún usa
+una petición en curso vuelve a escribir en cada transacción.
+
+El cerrojo del pool solo protege sus tablas (se toma después del de una ontología,
+nunca antes); las cargas y las escrituras de las desalojadas se hacen fuera de él.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from config import settings
+from infraestructure.acceso_ontologia import Instantanea
+from infraestructure.acceso_ontologia.OntologiaPU import OntologiaPU
+from infraestructure.logging.Logging import logger
+
+BYTES_POR_TRIPLE = 1200  ##Memoria aproximada de un triple en el almacen en memoria de rdflib (medida con tracemalloc)
+
+
+class PoolOntologiasPU:
+    """Ontologías de perfil de usuario cargadas, con desalojo LRU y escritura diferida."""
+
+    def __init__(self, maxOntologias = None, maxTriples = None):
+        self.maxOntologias = settings.PU_POOL_MAX_ONTOLOGIAS if maxOntologias is None else maxOntologias
+        self.maxTriples = settings.PU_POOL_MAX_TRIPLES if maxTriples is None else maxTriples
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  ##ruta absoluta -> OntologiaPU, de la menos a la mas reciente
+        self._triples = {}  ##ruta absoluta -> triples en el ultimo acceso
+        self._desalojadas = {}  ##ruta absoluta -> OntologiaPU desalojada que aun se esta escribiendo
+        self._cargando = {}  ##ruta absoluta -> Future de la carga en curso (fuera del cerrojo)
+        self._contadores = {"aciertos": 0, "fallos": 0, "recargas": 0, "desalojos": 0, "escrituras": 0}
+
+    def obtener(self, path):
+        """Retorna la OntologiaPU del fichero, cargándola si no está en el pool.
+
+        El fichero se parsea fuera del cerrojo del pool: mientras tanto las demás
+        rutas siguen atendiéndose y quien pide la misma espera a esa carga.
+
+        @exception FileNotFoundError Si el fichero no existe."""
+        clave = os.path.abspath(path)
+        while True:
+            firma = Instantanea.firma(clave)
+            with self._lock:
+                instancia = self._entradas.get(clave)
+                if instancia is not None and instancia.firma != firma:
+                    ##Reemplazado en disco por otro escritor: su version prevalece
+                    if instancia.sinGuardar:
+                        logger.warning(f"{clave} cambio en disco: se descartan {instancia.sinGuardar} operaciones sin guardar")
+                    self.__quitar(clave)
+                    instancia.diferido = False
+                    self._contadores["recargas"] += 1
+                    instancia = None
+                if instancia is None:
+                    ##Una desalojada que aun se esta escribiendo sigue siendo la version mas reciente
+                    instancia = self._desalojadas.pop(clave, None)
+                if instancia is not None:
+                    self._contadores["aciertos"] += 1
+                    victimas = self.__registrar(clave, instancia)
+                    break
+                carga = self._cargando.get(clave)
+                propia = carga is None
+                if propia:
+                    carga = self._cargando[clave] = Future()
+            if not propia:
+                ##Otro hilo esta cargando la misma ruta: al terminar ya esta en el pool
+                carga.result()
+                continue
+            try:
+                instancia = OntologiaPU(clave)
+            except BaseException as e:
+                with self._lock:
+                    self._cargando.pop(clave, None)
+                carga.set_exception(e)
+                raise
+            with self._lock:
+                self._contadores["fallos"] += 1
+                victimas = []
+                ##Si se descarto la ruta mientras se cargaba no se publica: queda como no diferida
+                if self._cargando.get(clave) is carga:
+                    del self._cargando[clave]
+                    victimas = self.__registrar(clave, instancia)
+            carga.set_result(instancia)
+            break
+        for victima, instanciaVictima in victimas:
+            self.__liberar(victima, instanciaVictima)
+        return instancia
+
+    def descartar(self, path):
+        """Olvida la ontología del fichero sin escribir sus cambios (p.ej. porque se va a reemplazar o borrar)."""
+        clave = os.path.abspath(path)
+        with self._lock:
+            for instancia in (self._entradas.get(clave), self._desalojadas.pop(clave, None)):
+                if instancia is not None:
+                    instancia.diferido = False
+                    instancia.sinGuardar = 0
+            self.__quitar(clave)
+            self._cargando.pop(clave, None)
+
+    def descartarTodas(self):
+        """Olvida todas las ontologías del pool sin escribir sus cambios."""
+        with self._lock:
+            claves = list(self._entradas) + list(self._desalojadas) + list(self._cargando)
+        for clave in claves:
+            self.descartar(clave)
+
+    def vaciar(self):
+        """Escribe los cambios pendientes de todas las ontologías (p.ej. al apagar el servicio)."""
+        with self._lock:
+            instancias = list(self._entradas.values()) + list(self._desalojadas.values())
+        for instancia in instancias:
+            if instancia.guardarPendientes():
+                with self._lock:
+                    self._contadores["escrituras"] += 1
+
+    def metricas(self):
+        """Retorna ocupación, memoria estimada y contadores de aciertos, fallos, recargas, desalojos y escrituras."""
+        with self._lock:
+            triples = sum(self._triples.values())
+            return dict(self._contadores, ontologias=len(self._entradas), triples=triples,
+                        memoria_estimada_bytes=triples * BYTES_POR_TRIPLE,
+                        sin_guardar=sum(1 for instancia in self._entradas.values() if instancia.sinGuardar),
+                        max_ontologias=self.maxOntologias, max_triples=self.maxTriples)
+
+    ##Con self._lock tomado. Retorna las victimas que hay que liberar fuera de el
+    def __registrar(self, clave, instancia):
+        instancia.diferido = True
+        self._entradas[clave] = instancia
+        self._entradas.move_to_end(clave)
+        self._triples[clave] = len(instancia.g)
+        return self.__desalojar()
+
+    ##Con self._lock tomado. La mas reciente nunca se desaloja aunque sola supere el limite
+    def __desalojar(self):
+        victimas = []
+        while len(self._entradas) > 1 and (len(self._entradas) > self.maxOntologias
+                                           or sum(self._triples.values()) > self.maxTriples):
+            clave, instancia = self._entradas.popitem(last=False)
+            del self._triples[clave]
+            self._desalojadas[clave] = instancia
+            self._contadores["desalojos"] += 1
+            victimas.append((clave, instancia))
+        return victimas
+
+    def __quitar(self, clave):
+        self._entradas.pop(clave, None)
+        self._triples.pop(clave, None)
+
+    ##Con la escritura de la ontologia tomada no puede confirmarse otra transaccion mientras
+    ##se decide si sigue diferida: si volvio al pool entretanto, sigue siendolo
+    def __liberar(self, clave, instancia):
+        with instancia.lock:
+            escrita = instancia.guardarPendientes()
+            with self._lock:
+                if escrita:
+                    self._contadores["escrituras"] += 1
+                if self._entradas.get(clave) is not instancia:
+                    instancia.diferido = False
+                if self._desalojadas.get(clave) is instancia:
+                    del self._desalojadas[clave]
+        logger.debug(f"Ontologia de usuario desalojada del pool: {clave}")
+
+
+pool = PoolOntologiasPU()
+"""@var pool Pool de ontologías de perfil de usuario del proceso."""
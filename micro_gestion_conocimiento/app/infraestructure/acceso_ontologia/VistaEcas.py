@@ -0,0 +1,182 @@
+"""Vista materializada de las reglas ECA de la ontología instanciada.
+
+Cada regla (individuo Dinamic con su evento, condición y acción) se guarda
+aplanada en un diccionario con las mismas claves que devuelve ConsultasOOS.getEca,
+junto con índices secundarios por nombre, usuario y osid del objeto del evento y
+de la acción. Así listar o buscar reglas no recorre el grafo en cada petición.
+
+La vista se registra como observador de la Ontologia: cada triple agregado o
+quitado marca como pendiente la regla a la que pertenece su sujeto, y esa regla
+se recalcula en la siguiente lectura. Si el grafo se recarga desde disco la vista
+se reconstruye completa en la siguiente lectura.
+
+Las lecturas toman la lectura del cerrojo de la Ontologia y además el cerrojo
+propio de la vista, porque recalcular modifica sus tablas. Los avisos de cambio
+llegan con la escritura tomada, cuando no puede haber lectores dentro.
+"""
+import threading
+from rdflib import RDF, URIRef
+from infraestructure.util.UrisOOS import UrisOOS
+
+CLAVES = ['name_eca', 'eca_state', 'user_eca', 'osid_object_event', 'ip_event_object', 'name_event_object',
+          'id_event_resource', 'name_event_resource', 'comparator_condition', 'variable_condition',
+          'type_variable_condition', 'unit_condition', 'meaning_condition', 'osid_object_action',
+          'ip_action_object', 'name_action_object', 'id_action_resource', 'name_action_resource',
+          'comparator_action', 'variable_action', 'type_variable_action', 'unit_action', 'meaning_action']
+_INDIVIDUOS = ["evento", "condicion", "accion"]
+
+_NOMBRE_ECA = URIRef(UrisOOS.dp_name_eca)
+_DINAMIC = URIRef(UrisOOS.clase_dinamic)
+_registro = threading.Lock()
+
+
+class VistaEcas:
+    """Tabla en memoria de reglas ECA aplanadas, mantenida con los cambios del grafo."""
+
+    @classmethod
+    def de(cls, ontologia):
+        """Retorna la vista asociada a la ontología, creándola la primera vez."""
+        with ontologia.lock.lectura(), _registro:
+            for observador in ontologia.observadores:
+                if isinstance(observador, cls):
+                    return observador
+            vista = cls(ontologia)
+            ontologia.observadores.append(vista)
+            return vista
+
+    def __init__(self, ontologia):
+        self.ontologia = ontologia
+        self._lock = threading.Lock()
+        self._filas = None  ##uri del individuo Dinamic -> fila; None mientras no se ha construido
+        self._individuos = {}  ##uri de la regla, su evento, condicion y accion -> uri de la regla
+        self._componentes = {}  ##uri de la regla -> individuos que la componen
+        self._pendientes = set()
+        self._porNombre = {}
+        self._porUsuario = {}
+        self._porEvento = {}
+        self._porAccion = {}
+
+    ###################### Observador de Ontologia #######################################
+    def cambio(self, triple):
+        sujeto, predicado, objeto = triple
+        if self._filas is None:
+            return
+        if sujeto in self._individuos:
+            self._pendientes.add(self._individuos[sujeto])
+        elif predicado == _NOMBRE_ECA or (predicado == RDF.type and objeto == _DINAMIC):
+            ##Regla nueva: sus evento/condicion/accion se descubren al recalcularla
+            self._pendientes.add(sujeto)
+
+    def recargado(self):
+        self._filas = None
+
+    ###################### Consultas #####################################################
+    def obtener(self, nombre):
+        """Retorna la fila de la regla con ese name_eca o None si no existe."""
+        filas = self.__buscar("_porNombre", nombre)
+        return filas[0] if filas else None
+
+    def listar(self):
+        self.ontologia.refrescarSiCambio()
+        with self.ontologia.lock.lectura(), self._lock:
+            self.__actualizar()
+            return [dict(fila) for fila in self._filas.values()]
+
+    def porUsuario(self, user_eca):
+        return self.__buscar("_porUsuario", user_eca)
+
+    def porObjetoEvento(self, osid):
+        return self.__buscar("_porEvento", osid)
+
+    def porObjetoAccion(self, osid):
+        return self.__buscar("_porAccion", osid)
+
+    ##indice es el nombre del atributo: __actualizar puede reemplazar los diccionarios
+    def __buscar(self, indice, valor):
+        self.ontologia.refrescarSiCambio()
+        with self.ontologia.lock.lectura(), self._lock:
+            self.__actualizar()
+            return [dict(self._filas[eca]) for eca in getattr(self, indice).get(valor, ())]
+
+    ###################### Mantenimiento #################################################
+    def __actualizar(self):
+        if self._filas is None:
+            self._filas = {}
+            self._individuos, self._componentes = {}, {}
+            self._porNombre, self._porUsuario, self._porEvento, self._porAccion = {}, {}, {}, {}
+            self._pendientes = set()
+            for eca in list(self.ontologia.g.subjects(RDF.type, _DINAMIC)):
+                self.__recalcular(eca)
+        while self._pendientes:
+            self.__recalcular(self._pendientes.pop())
+
+    def __recalcular(self, eca):
+        self.__olvidar(eca)
+        if (eca, None, None) not in self.ontologia.g:
+            return
+        ##Aun incompleta la regla sigue observada para detectar cuando se le enlace el evento
+        self._individuos[eca] = eca
+        self._componentes[eca] = [eca]
+        filas = self.ontologia.consultaPatrones(self.__patrones(eca), CLAVES + _INDIVIDUOS)
+        if not filas:
+            return
+        valores = [valor.decode("utf-8") if isinstance(valor, bytes) else valor for valor in filas[0]]
+        fila = dict(zip(CLAVES, valores))
+        self._filas[eca] = fila
+        for individuo in valores[len(CLAVES):]:
+            self._individuos[URIRef(individuo)] = eca
+            self._componentes[eca].append(URIRef(individuo))
+        self.__indexar(self._porNombre, fila["name_eca"], eca)
+        self.__indexar(self._porUsuario, fila["user_eca"], eca)
+        self.__indexar(self._porEvento, fila["osid_object_event"], eca)
+        self.__indexar(self._porAccion, fila["osid_object_action"], eca)
+
+    def __olvidar(self, eca):
+        for individuo in self._componentes.pop(eca, ()):
+            self._individuos.pop(individuo, None)
+        fila = self._filas.pop(eca, None)
+        if fila is None:
+            return
+        for indice, clave in ((self._porNombre, "name_eca"), (self._porUsuario, "user_eca"),
+                              (self._porEvento, "osid_object_event"), (self._porAccion, "osid_object_action")):
+            reglas = indice.get(fila[clave])
+            if reglas is not None:
+                reglas.pop(eca, None)
+                if not reglas:
+                    del indice[fila[clave]]
+
+    def __indexar(self, indice, valor, eca):
+        indice.setdefault(valor, {})[eca] = None  ##dict como conjunto ordenado por insercion
+
+    ##Misma forma que la consulta de getEca, partiendo del individuo de la regla
+    def __patrones(self, eca):
+        return [(eca, RDF.type, UrisOOS.clase_dinamic),
+                (eca, UrisOOS.dp_name_eca, "?name_eca"),
+                (eca, UrisOOS.dp_state_eca, "?eca_state"),
+                (eca, UrisOOS.dp_user_eca, "?user_eca", True),
+                (eca, UrisOOS.op_starts_with, "?evento"),
+                ("?evento", RDF.type, UrisOOS.clase_event),
+                ("?evento", UrisOOS.dp_id_event_object, "?osid_object_event"),
+                ("?evento", UrisOOS.dp_ip_event_object, "?ip_event_object"),
+                ("?evento", UrisOOS.dp_id_event_resource, "?id_event_resource"),
+                ("?evento", UrisOOS.dp_name_event_object, "?name_event_object"),
+                ("?evento", UrisOOS.dp_name_event_resource, "?name_event_resource", True),
+                ("?evento", UrisOOS.op_check, "?condicion"),
+                ("?condicion", RDF.type, UrisOOS.clase_condition),
+                ("?condicion", UrisOOS.dp_comparator_condition, "?comparator_condition"),
+                ("?condicion", UrisOOS.dp_variable_condition, "?variable_condition"),
+                ("?condicion", UrisOOS.dp_type_variable_condition, "?type_variable_condition"),
+                ("?condicion", UrisOOS.dp_unit_condition, "?unit_condition"),
+                ("?condicion", UrisOOS.dp_meaning_condition, "?meaning_condition"),
+                ("?condicion", UrisOOS.op_is_related_with, "?accion"),
+                ("?accion", RDF.type, UrisOOS.clase_Action),
+                ("?accion", UrisOOS.dp_id_action_object, "?osid_object_action"),
+                ("?accion", UrisOOS.dp_name_action_object, "?name_action_object"),
+                ("?accion", UrisOOS.dp_ip_action_object, "?ip_action_object"),
+                ("?accion", UrisOOS.dp_comparator_action, "?comparator_action"),
+                ("?accion", UrisOOS.dp_type_variable_action, "?type_variable_action"),
+                ("?accion", UrisOOS.dp_variable_action, "?variable_action"),
+                ("?accion", UrisOOS.dp_meaning_action, "?meaning_action"),
+                ("?accion", UrisOOS.dp_id_action_resource, "?id_action_resource"),
+                ("?accion", UrisOOS.dp_name_action_resource, "?name_action_resource"),
+                ("?accion", UrisOOS.dp_unit_action, "?unit_action", True)]
@@ -0,0 +1,194 @@
+"""Índice de contención espacial de la ontología de perfil de usuario.
+
+Las consultas de edificio de ConsultasPerfilUsuario recorrían con SPARQL el
+grafo del edificio (edificio -> pisos -> partes -> objetos relacionados) en cada
+llamada. El índice guarda, recorriendo una sola vez el grafo, los nombres de
+cada espacio, quién contiene a quién (dogont:contains), los objetos relacionados
+con cada espacio o cosa (related), las cosas ubicadas en cada espacio
+(isUbicated) y las filas (name_object, ip_object, id_object) de cada objeto,
+así cada consulta solo visita lo que devuelve.
+
+El nombre del edificio se busca como texto dentro de los nombres, lo que hacía
+el FILTER regex de las consultas SPARQL con un nombre sin caracteres
+especiales; no se compila como expresión regular, así que un nombre mal formado
+no falla y uno malicioso no puede provocar un retroceso catastrófico. Las filas
+de objetos de edificio no se deduplican (la consulta no tenía DISTINCT). La
+consulta SPARQL de cosas no enlazaba ninguna de las variables que seleccionaba
+y nunca devolvía nada: el índice responde lo que pretendía, los objetos
+relacionados con las cosas ubicadas en las partes de los pisos del edificio.
+
+Como VistaObjeto, se registra como observador de la OntologiaPU: un cambio en
+alguna de las propiedades o clases indexadas descarta el índice y la siguiente
+consulta lo reconstruye. Las interacciones y demás cambios del perfil no lo
+afectan.
+"""
+import threading
+from collections import defaultdict
+from rdflib import Literal, RDF, RDFS, URIRef, XSD
+from infraestructure.util import UrisPu
+
+_NOMBRE = URIRef(UrisPu.dp_name_building_environment)
+_CONTIENE = URIRef(UrisPu.op_contains)
+_RELACIONADO = URIRef(UrisPu.op_related)
+_EDIFICIO = URIRef(UrisPu.individuoBuilding)
+_PISO = URIRef(UrisPu.individuoFlat)
+_ESPACIO = URIRef(UrisPu.individuoBuildingEnvironment)
+_OBJETO = URIRef(UrisPu.individuoObject)
+_COSA = URIRef(UrisPu.individuoThhings)
+_NOMBRE_COSA = URIRef(UrisPu.dp_name_thing)
+_UBICADA = URIRef(UrisPu.op_isUbicated)
+_FILA_OBJETO = (URIRef(UrisPu.dp_name_object), URIRef(UrisPu.dp_ip_object), URIRef(UrisPu.dp_id_object))
+
+_PREDICADOS = {_NOMBRE, _CONTIENE, _RELACIONADO, _NOMBRE_COSA, _UBICADA, RDFS.subClassOf} | set(_FILA_OBJETO)
+_CLASES = {_EDIFICIO, _PISO, _OBJETO}
+_registro = threading.Lock()
+
+CLAVES_OBJETOS = ["name_object", "ipobjeto", "idobjeto"]
+CLAVES_PARTES = ["nombreparte", "name_object", "ipobjeto", "idobjeto"]
+CLAVES_COSAS = ["name_thing", "name_object", "ipobjeto", "idobjeto"]
+
+
+class VistaEdificios:
+    """Índice edificio -> pisos -> partes -> objetos, mantenido con los cambios del grafo."""
+
+    @classmethod
+    def de(cls, ontologia):
+        """Retorna la vista asociada a la ontología, creándola la primera vez."""
+        with ontologia.lock.lectura(), _registro:
+            for observador in ontologia.observadores:
+                if isinstance(observador, cls):
+                    return observador
+            vista = cls(ontologia)
+            ontologia.observadores.append(vista)
+            return vista
+
+    def __init__(self, ontologia):
+        self.ontologia = ontologia
+        self._lock = threading.Lock()
+        self._indice = None  ##_Indice vigente; None mientras no se ha construido
+        self._clasesEspacio = {_ESPACIO}  ##Subclases de BuildingEnvironment en la ultima construccion
+        self._clasesCosa = {_COSA}  ##Subclases de Thing en la ultima construccion
+
+    ###################### Observador de OntologiaPU #####################################
+    def cambio(self, triple):
+        _, predicado, objeto = triple
+        if predicado in _PREDICADOS or (predicado == RDF.type and (objeto in _CLASES or objeto in self._clasesEspacio
+                                                                   or objeto in self._clasesCosa)):
+            self._indice = None
+
+    def recargado(self):
+        self._indice = None
+
+    ###################### Consultas #####################################################
+    def objetosEdificio(self, nombreEdificio):
+        """Filas (name_object, ipobjeto, idobjeto) de los objetos relacionados con el edificio."""
+        indice = self.__vigente()
+        filas = []
+        for edificio, coincidencias in indice.edificios(nombreEdificio):
+            for objeto in indice.relacionados.get(edificio, ()):
+                filas.extend(indice.filas.get(objeto, ()) * coincidencias)
+        return _diccionarios(filas, CLAVES_OBJETOS)
+
+    def partesEdificioConObjetos(self, nombreEdificio):
+        """Filas distintas (nombreparte, name_object, ipobjeto, idobjeto) de las partes de los pisos del edificio."""
+        indice = self.__vigente()
+        filas = {}
+        for parte in indice.partes(nombreEdificio):
+            for nombreParte in indice.nombres.get(parte, ()):
+                for objeto in indice.relacionados.get(parte, ()):
+                    for fila in indice.filas.get(objeto, ()):
+                        filas[(str(nombreParte),) + fila] = None
+        return _diccionarios(list(filas), CLAVES_PARTES)
+
+    def objetosCosasEdificio(self, nombreEdificio):
+        """Filas distintas (name_thing, name_object, ipobjeto, idobjeto) de los objetos relacionados con las
+        cosas ubicadas en las partes de los pisos del edificio (las mismas partes que partesEdificioConObjetos)."""
+        indice = self.__vigente()
+        filas = {}
+        for parte in indice.partes(nombreEdificio):
+            for cosa in indice.ubicadas.get(parte, ()):
+                for nombreCosa in indice.nombresCosa.get(cosa, ()):
+                    for objeto in indice.relacionados.get(cosa, ()):
+                        for fila in indice.filas.get(objeto, ()):
+                            filas[(str(nombreCosa),) + fila] = None
+        return _diccionarios(list(filas), CLAVES_COSAS)
+
+    ###################### Construccion ##################################################
+    def __vigente(self):
+        with self.ontologia.lock.lectura(), self._lock:
+            if self._indice is None:
+                self._indice = _Indice(self.ontologia.g)
+                self._clasesEspacio = self._indice.clasesEspacio
+                self._clasesCosa = self._indice.clasesCosa
+            return self._indice
+
+
+class _Indice:
+    def __init__(self, grafo):
+        self.clasesEspacio = set(grafo.transitive_subjects(RDFS.subClassOf, _ESPACIO))
+        self.clasesCosa = set(grafo.transitive_subjects(RDFS.subClassOf, _COSA))
+        self.nombres = defaultdict(list)
+        for espacio, nombre in grafo.subject_objects(_NOMBRE):
+            self.nombres[espacio].append(nombre)
+        self.contiene = defaultdict(set)
+        for contenedor, contenido in grafo.subject_objects(_CONTIENE):
+            self.contiene[contenedor].add(contenido)
+        self.relacionados = defaultdict(list)
+        for espacio, objeto in grafo.subject_objects(_RELACIONADO):
+            self.relacionados[espacio].append(objeto)
+        self.edificiosConNombre = [(edificio, self.nombres.get(edificio, [])) for edificio in grafo.subjects(RDF.type, _EDIFICIO)]
+        self.pisos = set(grafo.subjects(RDF.type, _PISO))
+        ##Espacios con algun tipo BuildingEnvironment o subclase (rdfs:subClassOf*)
+        self.espacios = set()
+        for clase in self.clasesEspacio:
+            self.espacios.update(grafo.subjects(RDF.type, clase))
+        ##Cosas (algun tipo Thing o subclase) con sus nombres, por espacio en el que estan ubicadas
+        cosas = set()
+        for clase in self.clasesCosa:
+            cosas.update(grafo.subjects(RDF.type, clase))
+        self.nombresCosa = defaultdict(list)
+        for cosa, nombre in grafo.subject_objects(_NOMBRE_COSA):
+            if cosa in cosas:
+                self.nombresCosa[cosa].append(nombre)
+        self.ubicadas = defaultdict(list)
+        for cosa, espacio in grafo.subject_objects(_UBICADA):
+            if cosa in self.nombresCosa:
+                self.ubicadas[espacio].append(cosa)
+        ##Objeto -> filas (name_object, ip_object, id_object): una por combinacion de valores
+        self.filas = {}
+        for objeto in grafo.subjects(RDF.type, _OBJETO):
+            filas = [()]
+            for propiedad in _FILA_OBJETO:
+                filas = [fila + (str(valor),) for fila in filas for valor in grafo.objects(objeto, propiedad)]
+            if filas:
+                self.filas[objeto] = filas
+
+    def edificios(self, nombreEdificio):
+        """Pares (edificio, nombres que contienen nombreEdificio) con al menos uno."""
+        resultado = []
+        for edificio, nombres in self.edificiosConNombre:
+            coincidencias = sum(1 for nombre in nombres if _esTexto(nombre) and nombreEdificio in str(nombre))
+            if coincidencias:
+                resultado.append((edificio, coincidencias))
+        return resultado
+
+    def partes(self, nombreEdificio):
+        """Partes con nombre (BuildingEnvironment o subclase) de los pisos con nombre de los edificios,
+        que el edificio también contiene."""
+        partes = set()
+        for edificio, _ in self.edificios(nombreEdificio):
+            contenidos = self.contiene.get(edificio, set())
+            for piso in contenidos:
+                if piso not in self.pisos or not self.nombres.get(piso):
+                    continue
+                partes.update(parte for parte in self.contiene.get(piso, set()) & contenidos
+                              if parte in self.espacios and self.nombres.get(parte))
+        return partes
+
+
+def _esTexto(termino):
+    return isinstance(termino, Literal) and termino.datatype in (None, XSD.string)
+
+
+def _diccionarios(filas, claves):
+    return [dict(zip(claves, fila)) for fila in filas]
@@ -0,0 +1,132 @@
+"""Instantánea de los metadatos del objeto inteligente de la ontología instanciada.
+
+Reúne en un único diccionario lo que responden por separado las consultas de
+ConsultasOOS sobre el Object, el State, la location y los datastreams (con sus
+tags y su unidad). Se construye recorriendo una sola vez las propiedades de esos
+individuos y se guarda ya serializada en JSON junto con su ETag (hash del JSON),
+así una petición repetida no toca el grafo ni vuelve a serializar.
+
+Como VistaEcas, se registra como observador de la Ontologia: un cambio en alguno
+de los individuos leídos, o un individuo nuevo de alguna de esas clases, descarta
+la instantánea y la siguiente lectura la reconstruye. Los cambios en reglas ECA
+no la afectan.
+"""
+import hashlib
+import json
+import threading
+from decimal import Decimal
+from rdflib import Literal, RDF, URIRef
+from infraestructure.util.UrisOOS import UrisOOS
+
+##Propiedad -> clave, por seccion. Las claves en _MULTIVALOR acumulan sus valores en una lista
+_OBJECT = {UrisOOS.dp_id_objeto: "id", UrisOOS.dp_ip_objeto: "ip_object"}
+_STATE = {UrisOOS.dp_title: "title", UrisOOS.dp_description: "description", UrisOOS.dp_created: "created",
+          UrisOOS.dp_creator: "creator", UrisOOS.dp_feed: "feed", UrisOOS.dp_private: "private",
+          UrisOOS.dp_status: "status", UrisOOS.dp_updated: "updated", UrisOOS.dp_version: "version",
+          UrisOOS.dp_website: "website", UrisOOS.dp_service_state: "service_state", UrisOOS.dp_tags: "tags"}
+_LOCATION = {UrisOOS.dp_lon: "lon", UrisOOS.dp_lat: "lat", UrisOOS.dp_name_location: "name",
+             UrisOOS.dp_domain: "domain", UrisOOS.dp_ele: "ele"}
+_DATASTREAM = {UrisOOS.dp_datastream_id: "datastream_id", UrisOOS.dp_min_value: "min_value",
+               UrisOOS.dp_max_value: "max_value", UrisOOS.dp_datastream_format: "datastream_format",
+               UrisOOS.dp_datastream_type: "datastream_type", UrisOOS.dp_tags: "tags",
+               UrisOOS.op_datastream_unit: "unit"}
+_UNIT = {UrisOOS.dp_unit_label: "label", UrisOOS.dp_unit_symbol: "symbol"}
+_MULTIVALOR = {"tags"}
+
+_CLASES = {URIRef(clase) for clase in (UrisOOS.clase_Object, UrisOOS.clase_state, UrisOOS.clase_location,
+                                       UrisOOS.clase_datastreams, UrisOOS.clase_unit)}
+_registro = threading.Lock()
+
+
+class VistaObjeto:
+    """Instantánea JSON de los metadatos del objeto, con su ETag, mantenida con los cambios del grafo."""
+
+    @classmethod
+    def de(cls, ontologia):
+        """Retorna la vista asociada a la ontología, creándola la primera vez."""
+        with ontologia.lock.lectura(), _registro:
+            for observador in ontologia.observadores:
+                if isinstance(observador, cls):
+                    return observador
+            vista = cls(ontologia)
+            ontologia.observadores.append(vista)
+            return vista
+
+    def __init__(self, ontologia):
+        self.ontologia = ontologia
+        self._lock = threading.Lock()
+        self._instantanea = None  ##(etag, json en bytes); None mientras no se ha construido
+        self._sujetos = set()  ##Individuos leidos en la ultima construccion
+
+    ###################### Observador de Ontologia #######################################
+    def cambio(self, triple):
+        sujeto, predicado, objeto = triple
+        if sujeto in self._sujetos or (predicado == RDF.type and objeto in _CLASES):
+            self._instantanea = None
+
+    def recargado(self):
+        self._instantanea = None
+
+    ###################### Consultas #####################################################
+    def obtener(self):
+        """Retorna (etag, cuerpo JSON en bytes) de la instantánea vigente."""
+        self.ontologia.refrescarSiCambio()
+        with self.ontologia.lock.lectura(), self._lock:
+            if self._instantanea is None:
+                self._instantanea = self.__construir()
+            return self._instantanea
+
+    ###################### Construccion ##################################################
+    def __construir(self):
+        self._sujetos = set()
+        datastreams = []
+        for individuo in self.__individuos(UrisOOS.clase_datastreams):
+            datastream = self.__leer(individuo, _DATASTREAM)
+            unidad = datastream.get("unit")
+            if unidad is not None:
+                datastream["unit"] = self.__leer(URIRef(unidad), _UNIT)
+            datastreams.append(datastream)
+        instantanea = {
+            "object": self.__primero(UrisOOS.clase_Object, _OBJECT),
+            "state": self.__primero(UrisOOS.clase_state, _STATE),
+            "location": self.__primero(UrisOOS.clase_location, _LOCATION),
+            "datastreams": sorted(datastreams, key=lambda d: str(d.get("datastream_id", ""))),
+        }
+        cuerpo = json.dumps(instantanea, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return '"' + hashlib.sha256(cuerpo).hexdigest()[:32] + '"', cuerpo
+
+    ##Ordenados para que la instantanea (y su ETag) no dependa del orden interno del grafo
+    def __individuos(self, clase):
+        return sorted(self.ontologia.g.subjects(RDF.type, URIRef(clase)))
+
+    def __primero(self, clase, propiedades):
+        individuos = self.__individuos(clase)
+        return self.__leer(individuos[0], propiedades) if individuos else {}
+
+    def __leer(self, individuo, propiedades):
+        self._sujetos.add(individuo)
+        campos = {clave: [] for clave in _MULTIVALOR if clave in propiedades.values()}
+        for predicado, valor in self.ontologia.g.predicate_objects(individuo):
+            clave = propiedades.get(str(predicado))
+            if clave is None:
+                continue
+            if clave in _MULTIVALOR:
+                campos[clave].append(_valor(valor))
+            else:
+                campos[clave] = _valor(valor)
+        for clave in campos:
+            if clave in _MULTIVALOR:
+                campos[clave].sort(key=str)
+        return campos
+
+
+def _valor(termino):
+    """Valor JSON de un literal (los tipos sin equivalente en JSON pasan a texto) o el IRI de un recurso."""
+    if not isinstance(termino, Literal):
+        return str(termino)
+    valor = termino.toPython()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (bool, int, float, str)):
+        return valor
+    return str(termino)
@@ -0,0 +1,153 @@
+"""Índice de las preferencias de la ontología de perfil de usuario por OSID.
+
+consultarListaPreferenciasporOSID lanzaba dos consultas SPARQL iguales salvo por
+el FILTER regex (una sobre el objeto del evento y otra sobre el de la acción),
+cada una con todo el recorrido Preference -> Event -> Condition -> Action y el
+OPTIONAL de la actividad, y concatenaba sus resultados con las preferencias
+repetidas cuando el objeto es a la vez evento y acción.
+
+El índice lanza esa consulta una sola vez, sin filtro, y guarda sus filas por
+OSID del objeto del evento y por OSID del objeto de la acción. El OSID se
+compara por igualdad exacta, como en las consultas indexadas de ConsultasOOS
+(obj1 ya no devuelve las preferencias de obj10).
+
+Como VistaEcas, se registra como observador de la OntologiaPU: un cambio en
+alguno de los individuos de las clases recorridas, o un individuo nuevo de esas
+clases, descarta el índice y la siguiente consulta lo reconstruye. Las
+interacciones y demás cambios del perfil no lo afectan.
+"""
+import threading
+from collections import defaultdict
+from rdflib import RDF, URIRef
+from infraestructure.acceso_ontologia.ConsultasPreparadas import preparar
+from infraestructure.util import UrisPu
+
+CLAVES = ['name_eca', 'state_eca', 'id_event_object', 'ip_event_object', 'name_event_object', 'id_event_resource',
+          'name_event_resource', 'comparator_condition', 'variable_condition', 'type_variable_condition',
+          'unit_condition', 'meaning_condition', 'id_action_object', 'ip_action_object', 'name_action_object',
+          'id_action_resource', 'name_action_resource', 'comparator_action', 'variable_action',
+          'type_variable_action', 'unit_action', 'meaning_action', 'name_activity', 'start_date_activity',
+          'end_date_activity']
+
+##Clases de los individuos recorridos; Activity y Shedule_Activity con el prefijo que usaba la consulta
+_CLASES = {URIRef(clase) for clase in (UrisPu.individuoPreference, UrisPu.individuoEvent, UrisPu.individuoCondition,
+                                       UrisPu.individuoAction, "http://localhost/default#Activity",
+                                       "http://localhost/default#Shedule_Activity")}
+_registro = threading.Lock()
+
+QUERY = """ PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
+            PREFIX : <http://localhost/default#>
+            PREFIX upo:<http://localhost/UPO#>
+            SELECT DISTINCT ?name_eca ?eca_state
+            ?osid_object_event ?ip_event_object ?name_event_object ?id_event_resource ?name_event_resource
+            ?comparator_condition ?variable_condition ?type_variable_condition ?unit_condition ?meaning_condition
+            ?osid_object_action ?ip_action_object  ?name_action_object ?id_action_resource ?name_action_resource ?comparator_action ?variable_action ?type_variable_action  ?unit_action ?meaning_action
+            ?name_activity ?start_date_activity ?end_date_activity
+            WHERE{
+                ?eca :name_preference ?name_eca.
+                ?eca :state_preference ?eca_state.
+                ?eca rdf:type upo:Preference.
+                ?evento oos:id_event_object ?osid_object_event.
+                ?evento oos:ip_event_object ?ip_event_object.
+                ?evento oos:id_event_resource ?id_event_resource.
+                ?evento oos:name_event_object ?name_event_object.
+                ?evento oos:name_event_resource ?name_event_resource.
+                ?evento rdf:type oos:Event.
+                ?condicion oos:comparator_condition ?comparator_condition.
+                ?condicion oos:variable_condition ?variable_condition.
+                ?condicion oos:type_variable_condition ?type_variable_condition.
+                OPTIONAL{
+                    ?condicion oos:unit_condition ?unit_condition
+                }.
+                ?condicion oos:meaning_condition ?meaning_condition.
+                ?condicion rdf:type oos:Condition.
+                ?accion oos:id_action_object ?osid_object_action.
+                ?accion oos:name_action_object ?name_action_object.
+                ?accion oos:ip_action_object ?ip_action_object.
+                ?accion oos:comparator_action ?comparator_action.
+                ?accion oos:variable_action ?variable_action.
+                ?accion oos:meaning_action ?meaning_action.
+                ?accion oos:type_variable_action ?type_variable_action.
+                ?accion oos:id_action_resource ?id_action_resource.
+                OPTIONAL{
+                    ?accion oos:unit_action ?unit_action
+                }.
+                ?accion oos:name_action_resource ?name_action_resource.
+                ?accion rdf:type oos:Action.
+                ?eca oos:StartsWith ?evento.
+                ?evento oos:Check ?condicion.
+                ?condicion oos:isRelatedWith ?accion.
+                OPTIONAL{
+                    ?activity :name_activity  ?name_activity.
+                    ?activity rdf:type :Activity.
+                    ?shedule :start_date_activity ?start_date_activity.
+                    ?shedule :end_date_activity ?end_date_activity.
+                    ?shedule rdf:type :Shedule_Activity.
+                    ?activity :realize ?shedule.
+                    ?eca  oos:StartsWith ?activity.
+                }
+            }"""
+
+
+class VistaPreferencias:
+    """Preferencias del perfil por OSID del objeto del evento y de la acción, mantenidas con los cambios del grafo."""
+
+    @classmethod
+    def de(cls, ontologia):
+        """Retorna la vista asociada a la ontología, creándola la primera vez."""
+        with ontologia.lock.lectura(), _registro:
+            for observador in ontologia.observadores:
+                if isinstance(observador, cls):
+                    return observador
+            vista = cls(ontologia)
+            ontologia.observadores.append(vista)
+            return vista
+
+    def __init__(self, ontologia):
+        self.ontologia = ontologia
+        self._lock = threading.Lock()
+        self._indice = None  ##(porEvento, porAccion): OSID -> filas; None mientras no se ha construido
+        self._sujetos = set()  ##Individuos de _CLASES en la ultima construccion
+
+    ###################### Observador de OntologiaPU #####################################
+    def cambio(self, triple):
+        sujeto, predicado, objeto = triple
+        if sujeto in self._sujetos or (predicado == RDF.type and objeto in _CLASES):
+            self._indice = None
+
+    def recargado(self):
+        self._indice = None
+
+    ###################### Consultas #####################################################
+    def porEvento(self, osid):
+        """Preferencias cuyo evento es del objeto osid."""
+        return [dict(fila) for fila in self.__vigente()[0].get(osid, ())]
+
+    def porAccion(self, osid):
+        """Preferencias cuya acción es sobre el objeto osid."""
+        return [dict(fila) for fila in self.__vigente()[1].get(osid, ())]
+
+    def porObjeto(self, osid):
+        """Preferencias con el objeto osid como acción y después como evento, sin repetir."""
+        porEvento, porAccion = self.__vigente()
+        filas = {id(fila): fila for fila in porAccion.get(osid, ())}
+        filas.update((id(fila), fila) for fila in porEvento.get(osid, ()))
+        return [dict(fila) for fila in filas.values()]
+
+    ###################### Construccion ##################################################
+    def __vigente(self):
+        with self.ontologia.lock.lectura(), self._lock:
+            if self._indice is None:
+                self._indice = self.__construir()
+            return self._indice
+
+    def __construir(self):
+        grafo = self.ontologia.g
+        self._sujetos = {sujeto for clase in _CLASES for sujeto in grafo.subjects(RDF.type, clase)}
+        porEvento = defaultdict(list)
+        porAccion = defaultdict(list)
+        for resultado in grafo.query(preparar(QUERY)):
+            fila = dict(zip(CLAVES, ("" if valor is None else str(valor) for valor in resultado)))
+            porEvento[fila['id_event_object']].append(fila)
+            porAccion[fila['id_action_object']].append(fila)
+        return porEvento, porAccion
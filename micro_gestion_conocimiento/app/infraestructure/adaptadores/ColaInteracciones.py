@@ -0,0 +1,145 @@
+"""Cola de ingesta de las interacciones usuario-objeto.
+
+Las interacciones llegan en ráfagas (cada vez que el usuario acciona un
+dispositivo) y cada una se escribía en su perfil en una transacción propia
+mientras el cliente esperaba. La cola las acepta de inmediato, las agrupa por
+perfil (mac y email) y un hilo las escribe en una sola transacción por lote
+cuando el lote reúne INTERACCIONES_MAX_LOTE interacciones o cuando la primera
+lleva INTERACCIONES_INTERVALO segundos esperando.
+
+Está acotada a INTERACCIONES_MAX_PENDIENTES interacciones sin escribir; al
+superarlas encolar() las rechaza. Al cerrarla (al apagar el servicio) escribe
+todas las pendientes antes de retornar. Las interacciones aceptadas y aún no
+escritas se pierden si el proceso termina de forma abrupta.
+
+La fecha "00/00/00 00:00:00" (fecha actual) se resuelve al aceptar la
+interacción, no al escribirla.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config import settings
+from infraestructure.adaptadores.PoblarPerfilUsuario import PoblarPerfilUsuario, fechaInteraccion
+from infraestructure.logging.Logging import logger
+
+
+class ColaInteracciones:
+    """Cola acotada de interacciones que se escriben por lotes en cada perfil de usuario."""
+
+    def __init__(self, maxPendientes = None, maxLote = None, intervalo = None):
+        self.maxPendientes = settings.INTERACCIONES_MAX_PENDIENTES if maxPendientes is None else maxPendientes
+        self.maxLote = settings.INTERACCIONES_MAX_LOTE if maxLote is None else maxLote
+        self.intervalo = settings.INTERACCIONES_INTERVALO if intervalo is None else intervalo
+        self._condicion = threading.Condition()
+        self._lotes = OrderedDict()  ##(mac, email) -> [(interaccion, instante de llegada)]
+        self._pendientes = 0
+        self._escribiendo = 0
+        self._cerrando = False
+        self._hilo = None
+        self._contadores = {"aceptadas": 0, "rechazadas": 0, "registradas": 0, "fallidas": 0, "lotes": 0}
+        self._retraso = [0.0, 0.0]  ##[total, maximo] en segundos desde la llegada hasta la escritura
+
+    def encolar(self, mac, email, idDataStream, comando, osid, dateInteraction):
+        """Acepta una interacción para escribirla en el perfil de (mac, email).
+
+        Retorna False si la cola está llena o cerrándose."""
+        interaccion = (email, idDataStream, comando, osid, fechaInteraccion(dateInteraction))
+        with self._condicion:
+            if self._cerrando or self._pendientes >= self.maxPendientes:
+                self._contadores["rechazadas"] += 1
+                return False
+            lote = self._lotes.setdefault((mac, email), [])
+            lote.append((interaccion, time.monotonic()))
+            self._pendientes += 1
+            self._contadores["aceptadas"] += 1
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._trabajar, name="cola-interacciones", daemon=True)
+                self._hilo.start()
+            ##Solo hace falta despertar al hilo si cambia lo que espera: un primer pendiente o un lote completo
+            if self._pendientes == 1 or len(lote) == self.maxLote:
+                self._condicion.notify()
+        return True
+
+    def cerrar(self):
+        """Escribe todas las interacciones pendientes y detiene el hilo; un uso posterior lo vuelve a crear."""
+        with self._condicion:
+            hilo = self._hilo
+            self._cerrando = True
+            self._condicion.notify()
+        if hilo is not None:
+            hilo.join()
+        with self._condicion:
+            self._cerrando = False
+            self._hilo = None
+
+    def metricas(self):
+        """Retorna contadores, ocupación, retraso de la interacción pendiente más antigua y retraso de escritura."""
+        with self._condicion:
+            ahora = time.monotonic()
+            llegadas = [lote[0][1] for lote in self._lotes.values()]
+            escritas = self._contadores["registradas"] + self._contadores["fallidas"]
+            total, maximo = self._retraso
+            return dict(self._contadores, pendientes=self._pendientes, escribiendo=self._escribiendo,
+                        perfiles=len(self._lotes), max_pendientes=self.maxPendientes,
+                        max_lote=self.maxLote, intervalo_s=self.intervalo,
+                        retraso_pendiente_s=round(ahora - min(llegadas), 3) if llegadas else 0.0,
+                        retraso_medio_ms=round(total / escritas * 1000, 3) if escritas else 0.0,
+                        retraso_max_ms=round(maximo * 1000, 3))
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                listos = self.__listos()
+                while not listos and not (self._cerrando and not self._lotes):
+                    self._condicion.wait(self.__espera())
+                    listos = self.__listos()
+                if not listos:
+                    return
+                self._escribiendo = sum(len(lote) for _, lote in listos)
+            for clave, lote in listos:
+                self.__escribir(clave, lote)
+            with self._condicion:
+                self._escribiendo = 0
+
+    ##Con self._condicion tomada. Saca de la cola los lotes completos o vencidos (todos al cerrar),
+    ##de a lo sumo maxLote interacciones para acotar cuanto se retiene el cerrojo del perfil
+    def __listos(self):
+        limite = time.monotonic() - self.intervalo
+        listos = []
+        for clave, lote in list(self._lotes.items()):
+            if self._cerrando or len(lote) >= self.maxLote or lote[0][1] <= limite:
+                listos.append((clave, lote[:self.maxLote]))
+                del lote[:self.maxLote]
+                if not lote:
+                    del self._lotes[clave]
+        self._pendientes -= sum(len(lote) for _, lote in listos)
+        return listos
+
+    ##Segundos hasta que venza el lote mas antiguo; None (sin limite) si no hay pendientes
+    def __espera(self):
+        if not self._lotes:
+            return None
+        return max(0.0, min(lote[0][1] for lote in self._lotes.values()) + self.intervalo - time.monotonic())
+
+    def __escribir(self, clave, lote):
+        mac, email = clave
+        try:
+            escrito = PoblarPerfilUsuario(mac, email, "CARGAR").registroInteraccionesUsuarioObjeto(
+                [interaccion for interaccion, _ in lote])
+        except Exception as e:
+            logger.error(f"Error al cargar el perfil {mac}&{email}: {e}")
+            escrito = False
+        if not escrito:
+            logger.error(f"No se registraron {len(lote)} interacciones del perfil {mac}&{email}")
+        ahora = time.monotonic()
+        with self._condicion:
+            self._contadores["registradas" if escrito else "fallidas"] += len(lote)
+            self._contadores["lotes"] += 1
+            for _, llegada in lote:
+                self._retraso[0] += ahora - llegada
+                self._retraso[1] = max(self._retraso[1], ahora - llegada)
+
+
+cola = ColaInteracciones()
+"""@var cola Cola de interacciones usuario-objeto del proceso."""
@@ -8,6 +8,9 @@ import os
 
 from infraestructure.logging.Logging import logger
 from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.acceso_ontologia.VistaEcas import VistaEcas
+from infraestructure.acceso_ontologia.VistaObjeto import VistaObjeto
+from rdflib import Literal, RDF
 from infraestructure.util.UrisOOS import UrisOOS
 from config import settings
 from infraestructure.interfaces.IConsultas import IConsultasOOS
@@ -17,12 +20,14 @@ class ConsultasOOS(IConsultasOOS):
 
     def __init__(self):
         if os.path.exists(settings.ONTOLOGIA_INSTANCIADA):
-            self.ontologia = Ontologia(settings.ONTOLOGIA_INSTANCIADA)
+            self.ontologia = Ontologia.compartida(settings.ONTOLOGIA_INSTANCIADA)
             self.ontoExists = True
         else:
             logger.error(f"La ontologia instanciada no existe en la ruta especificada: {settings.ONTOLOGIA_INSTANCIADA}")
             self.ontoExists = False
-            self.ontologia = Ontologia(settings.ONTOLOGIA_PU)
+            self.ontologia = Ontologia.compartida(settings.ONTOLOGIA_PU)
+        self.vistaEcas = VistaEcas.de(self.ontologia)
+        self.vistaObjeto = VistaObjeto.de(self.ontologia)
 
     ## ---->  El metodo ontologia.consultaDataProperty retorna una lista con los resultados [[],[]]
 
@@ -140,14 +145,10 @@ class ConsultasOOS(IConsultasOOS):
         if not self.consultarOntoActiva():
             logger.error("La ontología no está activa.")
             raise Exception("La ontología no está activa.")
-        queryTags = """PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT ?tags
-                    WHERE {
-                        ?entity oos:tags ?tags .
-                        ?entity oos:datastream_id ?datastream_id.
-                        FILTER regex(?datastream_id,""" + "'" + idDatastream + """')
-                        ?entity rdf:type  oos:datastreams.}"""
-        resultadoTags = self.ontologia.consultaDataProperty(queryTags)
+        patrones = [("?entity", UrisOOS.dp_datastream_id, Literal(idDatastream)),
+                    ("?entity", RDF.type, UrisOOS.clase_datastreams),
+                    ("?entity", UrisOOS.dp_tags, "?tags")]
+        resultadoTags = self.ontologia.consultaPatrones(patrones, ["tags"], distintos=False)
         return resultadoTags
 
     ##Retorna un diccionario {label, symbol}
@@ -155,18 +156,13 @@ class ConsultasOOS(IConsultasOOS):
         if not self.consultarOntoActiva():
             logger.error("La ontología no está activa.")
             raise Exception("La ontología no está activa.")
-        queryUnit = """PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
-                    PREFIX kos:<http://localhost/kos#>
-                    SELECT ?label ?symbol 
-                    WHERE {
-                        ?unidad oos:label ?label .
-                        ?unidad oos:Symbol ?symbol.     
-                        ?datastream  oos:isMeasured ?unidad.	             
-                        ?unidad rdf:type  kos:Unit.
-                        ?datastream oos:datastream_id ?datastream_id. 
-                        FILTER regex(?datastream_id,""" + "'" + idDatastream + """').}"""
+        patrones = [("?datastream", UrisOOS.dp_datastream_id, Literal(idDatastream)),
+                    ("?datastream", UrisOOS.op_datastream_unit, "?unidad"),
+                    ("?unidad", RDF.type, UrisOOS.clase_unit),
+                    ("?unidad", UrisOOS.dp_unit_label, "?label"),
+                    ("?unidad", UrisOOS.dp_unit_symbol, "?symbol")]
         keysUnit = ['label', 'symbol']
-        resultadoUnit = self.ontologia.consultaDataProperty(queryUnit)
+        resultadoUnit = self.ontologia.consultaPatrones(patrones, keysUnit, distintos=False)
         dicUnit = self.pasarListaDiccionario(resultadoUnit, keysUnit)
         return dicUnit
 
@@ -181,22 +177,19 @@ class ConsultasOOS(IConsultasOOS):
             logger.error("La ontología no está activa.")
             raise Exception("La ontología no está activa.")
         keys = ['min_value', 'max_value', 'datastream_id', "datastream_format", "datastream_type", 'tags', 'unit']
-        query = """ PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
-                    PREFIX kos:<http://localhost/kos#>
-                    SELECT ?min_value ?max_value  ?datastream_id ?datastream_format ?datastream_type ?label ?symbol
-                    WHERE {  
-                            ?entity oos:min_value ?min_value.
-                            ?entity oos:max_value ?max_value.
-                            ?entity oos:datastream_id ?datastream_id.
-                            ?entity oos:datastream_format ?datastream_format.
-                            ?unidad oos:label ?label .
-                            ?unidad oos:Symbol ?symbol.     
-                            ?entity  oos:isMeasured ?unidad.	             
-                            ?unidad rdf:type  kos:Unit.
-                            ?entity oos:datastream_type ?datastream_type.
-                            FILTER regex(?datastream_id,""" + "'" + idDatastream + """')
-                            ?entity rdf:type  oos:datastreams.}"""
-        resultado = self.ontologia.consultaDataProperty(query)
+        patrones = [("?entity", UrisOOS.dp_datastream_id, Literal(idDatastream)),
+                    ("?entity", RDF.type, UrisOOS.clase_datastreams),
+                    ("?entity", UrisOOS.dp_min_value, "?min_value"),
+                    ("?entity", UrisOOS.dp_max_value, "?max_value"),
+                    ("?entity", UrisOOS.dp_datastream_id, "?datastream_id"),
+                    ("?entity", UrisOOS.dp_datastream_format, "?datastream_format"),
+                    ("?entity", UrisOOS.dp_datastream_type, "?datastream_type"),
+                    ("?entity", UrisOOS.op_datastream_unit, "?unidad"),
+                    ("?unidad", RDF.type, UrisOOS.clase_unit),
+                    ("?unidad", UrisOOS.dp_unit_label, "?label"),
+                    ("?unidad", UrisOOS.dp_unit_symbol, "?symbol")]
+        columnas = ["min_value", "max_value", "datastream_id", "datastream_format", "datastream_type", "label", "symbol"]
+        resultado = self.ontologia.consultaPatrones(patrones, columnas, distintos=False)
         ##Consulta para los tags
         resultadoTags = self.consultarTagsDatastream(idDatastream)
         resultado.append(resultadoTags)
@@ -405,15 +398,11 @@ class ConsultasOOS(IConsultasOOS):
         if not self.consultarOntoActiva():
             logger.error("La ontología no está activa.")
             raise Exception("La ontología no está activa.")
-        query = """PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT ?datastream_id ?datastream_format
-                    WHERE {
-                        ?entity oos:datastream_id  ?datastream_id ;
-                        oos:datastream_format ?datastream_format.
-                        FILTER regex(?datastream_id, """ + "'" + datastream_id + """').
-                        ?entity rdf:type  oos:datastreams.
-                    }"""
-        resultado = self.ontologia.consultaDataProperty(query)
+        patrones = [("?entity", UrisOOS.dp_datastream_id, Literal(datastream_id)),
+                    ("?entity", RDF.type, UrisOOS.clase_datastreams),
+                    ("?entity", UrisOOS.dp_datastream_id, "?datastream_id"),
+                    ("?entity", UrisOOS.dp_datastream_format, "?datastream_format")]
+        resultado = self.ontologia.consultaPatrones(patrones, ["datastream_id", "datastream_format"], distintos=False)
         return resultado
 
     def consultarServiceIntelligent(self):
@@ -525,6 +514,14 @@ class ConsultasOOS(IConsultasOOS):
         diccionario = self.decodificar(diccionario)
         return diccionario
 
+    ##Retorna (etag, cuerpo JSON) con los metadatos del Object, State, location y datastreams
+    ##en un diccionario {object, state, location, datastreams}, leidos de una sola pasada
+    def consultarSnapshot(self):
+        if not self.consultarOntoActiva():
+            logger.error("La ontología no está activa.")
+            raise Exception("La ontología no está activa.")
+        return self.vistaObjeto.obtener()
+
     ##Retorna una lista de diccionarios
     ##cada diccionario tiene las claves:
     # [("datastream_id", ("label", ("symbol", ("datastream_type",("min_value"("max_value"]
@@ -539,25 +536,18 @@ class ConsultasOOS(IConsultasOOS):
         self.consultarOntoActiva()
         keys = ["id", "id_action_resource", "comparator_action", "variable_action", "type_variable_action"]
         # [['708637323', 'calefactor', 'igual', '1']]
-        query = """ PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?id ?id_action_resource ?comparator_action ?variable_action ?type_variable_action
-                    where{
-                            {
-                                ?evento :id_event_object ?id.
-                                FILTER regex(?id, """ + "'" + osidDestino + """').
-                                ?entity rdf:type :Event}
-                        UNION {
-                                ?accion :id_action_object ?id.
-                                ?action :id_action_resource ?id_action_resource.
-                                ?action :comparator_action ?comparator_action.
-                                ?action :variable_action ?variable_action.
-                                ?action :type_variable_action ?type_variable_action.
-                                FILTER regex(?id, """ + "'" + osidDestino + """').
-                                ?entity rdf:type :Action
-                                }
-                              }"""
-
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
+        eventos = [("?evento", UrisOOS.dp_id_event_object, Literal(osidDestino)),
+                   ("?evento", RDF.type, UrisOOS.clase_event),
+                   ("?evento", UrisOOS.dp_id_event_object, "?id")]
+        acciones = [("?accion", UrisOOS.dp_id_action_object, Literal(osidDestino)),
+                    ("?accion", RDF.type, UrisOOS.clase_Action),
+                    ("?accion", UrisOOS.dp_id_action_object, "?id"),
+                    ("?accion", UrisOOS.dp_id_action_resource, "?id_action_resource"),
+                    ("?accion", UrisOOS.dp_comparator_action, "?comparator_action"),
+                    ("?accion", UrisOOS.dp_variable_action, "?variable_action"),
+                    ("?accion", UrisOOS.dp_type_variable_action, "?type_variable_action")]
+        resultadoConsulta = self.ontologia.consultaPatrones(eventos, keys)
+        resultadoConsulta += [fila for fila in self.ontologia.consultaPatrones(acciones, keys) if fila not in resultadoConsulta]
         listaDic = []
         for item in resultadoConsulta:
             listaDic.append(self.pasarListaDiccionario(item, keys))
@@ -581,44 +571,13 @@ class ConsultasOOS(IConsultasOOS):
         keys = ["osid", "osidDestino", "id_action_resource", "comparator_action", 
                 "variable_action", "type_variable_action", "eca_state", "name_eca"]
         
-        # Consulta corregida: relaciona evento, condición y acción a través del ECA
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?osid ?osidDestino ?id_action_resource ?comparator_action 
-                           ?variable_action ?type_variable_action ?eca_state ?name_eca
-                    WHERE {
-                        # El ECA inicia con un evento
-                        ?eca :StartsWith ?evento.
-                        ?eca :state_eca ?eca_state.
-                        ?eca :name_eca ?name_eca.
-                        ?eca rdf:type :Dinamic.
-                        
-                        # El evento tiene el objeto origen
-                        ?evento :id_event_object ?osid.
-                        FILTER (?osid = '""" + osid + """').
-                        ?evento rdf:type :Event.
-                        
-                        # El evento verifica una condición
-                        ?evento :Check ?condicion.
-                        ?condicion rdf:type :Condition.
-                        
-                        # La condición está relacionada con una acción
-                        ?condicion :isRelatedWith ?accion.
-                        ?accion rdf:type :Action.
-                        
-                        # La acción tiene el objeto destino
-                        ?accion :id_action_object ?osidDestino.
-                        FILTER (?osidDestino = '""" + osidDestino + """').
-                        ?accion :id_action_resource ?id_action_resource.
-                        ?accion :comparator_action ?comparator_action.
-                        ?accion :variable_action ?variable_action.
-                        ?accion :type_variable_action ?type_variable_action.
-                    }"""
-
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
-        listaDic = []
-        for item in resultadoConsulta:
-            listaDic.append(self.pasarListaDiccionario(item, keys))
-        return listaDic
+        # Reglas cuyo evento es del objeto origen y cuya acción es sobre el objeto destino
+        contratos = []
+        for eca in self.vistaEcas.porObjetoEvento(osid):
+            if eca["osid_object_action"] == osidDestino:
+                eca["osid"], eca["osidDestino"] = eca["osid_object_event"], eca["osid_object_action"]
+                contratos.append(eca)
+        return self.__proyectar(contratos, keys)
 
     ##    [[]]
     def listarDinamicEstado(self, eca_state):
@@ -626,15 +585,11 @@ class ConsultasOOS(IConsultasOOS):
             logger.error("La ontología no está activa.")
             raise Exception("La ontología no está activa.")
         keys = ["eca_state", "name_eca"]
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                SELECT DISTINCT ?eca_state ?name_eca 
-                where{
-                ?eca :name_eca ?name_eca.
-                ?eca :state_eca ?eca_state.
-                FILTER regex(?eca_state, """ + "'" + eca_state + """').
-                ?eca rdf:type :Dinamic.
-                }"""
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
+        patrones = [("?eca", UrisOOS.dp_state_eca, Literal(eca_state)),
+                    ("?eca", RDF.type, UrisOOS.clase_dinamic),
+                    ("?eca", UrisOOS.dp_state_eca, "?eca_state"),
+                    ("?eca", UrisOOS.dp_name_eca, "?name_eca")]
+        resultadoConsulta = self.ontologia.consultaPatrones(patrones, keys)
         listaDic = []
         for item in resultadoConsulta:
             listaDic.append(self.pasarListaDiccionario(item, keys))
@@ -643,15 +598,11 @@ class ConsultasOOS(IConsultasOOS):
     def estadoEca(self, eca_name):
         self.consultarOntoActiva()
         keys = ["eca_state", "name_eca"]
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                SELECT DISTINCT ?eca_state ?name_eca 
-                where{
-                ?eca :name_eca ?name_eca.
-                ?eca :state_eca ?eca_state.
-                FILTER regex(?name_eca, """ + "'" + eca_name + """').
-                ?eca rdf:type :Dinamic.
-                }"""
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
+        patrones = [("?eca", UrisOOS.dp_name_eca, Literal(eca_name)),
+                    ("?eca", RDF.type, UrisOOS.clase_dinamic),
+                    ("?eca", UrisOOS.dp_name_eca, "?name_eca"),
+                    ("?eca", UrisOOS.dp_state_eca, "?eca_state")]
+        resultadoConsulta = self.ontologia.consultaPatrones(patrones, keys)
         listaDic = []
         for item in resultadoConsulta:
             listaDic.append(self.pasarListaDiccionario(item, keys))
@@ -660,15 +611,11 @@ class ConsultasOOS(IConsultasOOS):
     def usuarioEca(self, eca_name):
         self.consultarOntoActiva()
         keys = ["user_eca", "name_eca"]
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                SELECT DISTINCT ?user_eca ?name_eca 
-                where{
-                ?eca :name_eca ?name_eca.
-                ?eca :user_eca ?user_eca.
-                FILTER regex(?name_eca, """ + "'" + eca_name + """').
-                ?eca rdf:type :Dinamic.
-                }"""
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
+        patrones = [("?eca", UrisOOS.dp_name_eca, Literal(eca_name)),
+                    ("?eca", RDF.type, UrisOOS.clase_dinamic),
+                    ("?eca", UrisOOS.dp_name_eca, "?name_eca"),
+                    ("?eca", UrisOOS.dp_user_eca, "?user_eca")]
+        resultadoConsulta = self.ontologia.consultaPatrones(patrones, keys)
         listaDic = []
         for item in resultadoConsulta:
             listaDic.append(self.pasarListaDiccionario(item, keys))
@@ -681,50 +628,8 @@ class ConsultasOOS(IConsultasOOS):
                 "osid_object_action", "name_action_object", "comparator_action", "type_variable_action",
                 "variable_action", "meaning_action", "id_action_resource", "name_action_resource", "name_eca",
                 "name_event_object", "name_event_resource", "user_eca"]
-        # [['708637323', 'calefactor', 'igual', '1']]
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?eca_state ?id_event_resource ?comparator_condition ?variable_condition ?type_variable_condition 
-                    ?unit_condition ?meaning_condition ?ip_action_object ?osid_object_action ?name_action_object ?comparator_action
-                    ?type_variable_action ?variable_action ?meaning_action ?id_action_resource ?name_action_resource ?name_eca
-                    ?name_event_object ?name_event_resource
-                    ?user_eca
-                where{               	
-                    ?evento :id_event_resource ?id_event_resource. 
-                    ?evento :id_event_object ?osid.
-                    ?evento :name_event_resource ?name_event_resource.
-                    ?evento :name_event_object ?name_event_object.
-                    FILTER regex(?osid, """ + "'" + osid + """').
-                    ?evento rdf:type :Event.
-                    ?eca :name_eca ?name_eca.
-                    ?eca :state_eca ?eca_state.
-                    OPTIONAL{?eca :user_eca ?user_eca}.
-                    FILTER regex(?eca_state, """ + "'" + eca_state + """').
-                    ?eca rdf:type :Dinamic. 
-                    ?condicion :comparator_condition ?comparator_condition. 
-                    ?condicion :variable_condition ?variable_condition. 
-                    ?condicion :type_variable_condition ?type_variable_condition. 
-                    ?condicion :unit_condition ?unit_condition. 
-                    ?condicion :meaning_condition ?meaning_condition. 
-                    ?condicion rdf:type :Condition. 
-                    ?accion :id_action_object ?osid_object_action.
-                    ?accion :name_action_object ?name_action_object.
-                    ?accion :ip_action_object ?ip_action_object.
-                    ?accion :comparator_action ?comparator_action.
-                    ?accion :type_variable_action ?type_variable_action.
-                    ?accion :variable_action ?variable_action. 
-                    ?accion :meaning_action ?meaning_action.
-                    ?accion :id_action_resource ?id_action_resource.
-                    ?accion :name_action_resource ?name_action_resource.
-                    ?accion rdf:type :Action.
-                    ?eca :StartsWith ?evento.
-                    ?evento :Check ?condicion.
-                    ?condicion ?isRelatedWith ?accion.
-               }"""
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
-        listaDic = []
-        for item in resultadoConsulta:
-            listaDic.append(self.pasarListaDiccionario(item, keys))
-        return listaDic
+        ecas = [eca for eca in self.vistaEcas.porObjetoEvento(osid) if eca["eca_state"] == eca_state]
+        return self.__proyectar(ecas, keys)
 
     def listarEcasEventoSegunUsuario(self, osid, state_eca, usuario_eca):
         self.consultarOntoActiva()
@@ -733,186 +638,34 @@ class ConsultasOOS(IConsultasOOS):
                 "osid_object_action", "name_action_object", "comparator_action", "type_variable_action",
                 "variable_action", "meaning_action", "id_action_resource", "name_action_resource", "name_eca",
                 "name_event_object", "name_event_resource", "user_eca"]
-        # [['708637323', 'calefactor', 'igual', '1']]
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?eca_state ?id_event_resource ?comparator_condition ?variable_condition ?type_variable_condition 
-                    ?unit_condition ?meaning_condition ?ip_action_object ?osid_object_action ?name_action_object ?comparator_action
-                    ?type_variable_action ?variable_action ?meaning_action ?id_action_resource ?name_action_resource ?name_eca
-                    ?name_event_object ?name_event_resource
-                    ?user_eca
-                where{       
-                ?eca :name_eca ?name_eca.
-                    ?eca :state_eca ?eca_state.
-                    ?eca :user_eca ?user_eca.
-                        FILTER regex(?user_eca, """ + "'" + usuario_eca + """').
-                    FILTER regex(?eca_state, """ + "'" + state_eca + """').
-                    ?eca rdf:type :Dinamic.         	
-                    ?evento :id_event_resource ?id_event_resource. 
-                    ?evento :id_event_object ?osid.
-                    ?evento :name_event_resource ?name_event_resource.
-                    ?evento :name_event_object ?name_event_object.
-                    FILTER regex(?osid, '""" + osid + """').
-                    ?evento rdf:type :Event.
-                    
-                    ?condicion :comparator_condition ?comparator_condition. 
-                    ?condicion :variable_condition ?variable_condition. 
-                    ?condicion :type_variable_condition ?type_variable_condition. 
-                    ?condicion :unit_condition ?unit_condition. 
-                    ?condicion :meaning_condition ?meaning_condition. 
-                    ?condicion rdf:type :Condition. 
-                    ?accion :id_action_object ?osid_object_action.
-                    ?accion :name_action_object ?name_action_object.
-                    ?accion :ip_action_object ?ip_action_object.
-                    ?accion :comparator_action ?comparator_action.
-                    ?accion :type_variable_action ?type_variable_action.
-                    ?accion :variable_action ?variable_action. 
-                    ?accion :meaning_action ?meaning_action.
-                    ?accion :id_action_resource ?id_action_resource.
-                    ?accion :name_action_resource ?name_action_resource.
-                    ?accion rdf:type :Action.
-                    ?eca :StartsWith ?evento.
-                    
-                    ?evento :Check ?condicion.
-                    ?condicion ?isRelatedWith ?accion.
-               }"""
-        resultadoConsulta = self.ontologia.consultaDataProperty(query)
-        listaDic = []
-        for item in resultadoConsulta:
-            listaDic.append(self.pasarListaDiccionario(item, keys))
-        return listaDic
+        ecas = [eca for eca in self.vistaEcas.porObjetoEvento(osid)
+                if eca["eca_state"] == state_eca and eca["user_eca"] == usuario_eca]
+        return self.__proyectar(ecas, keys)
 
     def listarEcas(self):
         self.consultarOntoActiva()
-        # keys=['name_eca','eca_state','id_event_resource', 'ip_event_object','comparator_condition','variable_condition','type_variable_condition','unit_condition','meaning_condition','ip_action_object','osid_object_action','name_action_object' ,'comparator_action','type_variable_action','variable_action','meaning_action','id_action_resource','name_action_resource']
-        keys = ['name_eca', 'eca_state', 'user_eca', 'osid_object_event', 'ip_event_object', 'name_event_object',
-                'id_event_resource', 'name_event_resource', 'comparator_condition', 'variable_condition',
-                'type_variable_condition', 'unit_condition', 'meaning_condition', 'osid_object_action',
-                'ip_action_object', 'name_action_object', 'id_action_resource', 'name_action_resource',
-                'comparator_action', 'variable_action', 'type_variable_action', 'unit_action', 'meaning_action']
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?name_eca ?eca_state ?user_eca
-                    ?osid_object_event ?ip_event_object ?name_event_object
-                    ?id_event_resource ?name_event_resource
-                    ?comparator_condition ?variable_condition ?type_variable_condition ?unit_condition ?meaning_condition
-                    ?osid_object_action ?ip_action_object  ?name_action_object
-                    ?id_action_resource ?name_action_resource 
-                    ?comparator_action ?variable_action ?type_variable_action  ?unit_action ?meaning_action 
-                where{
-                    ?eca :name_eca ?name_eca.
-                    ?eca :state_eca ?eca_state.
-                    OPTIONAL{?eca :user_eca ?user_eca}.
-                    ?eca rdf:type :Dinamic.
-                    ?evento :id_event_object ?osid_object_event.
-                    ?evento :ip_event_object ?ip_event_object.
-                    ?evento :id_event_resource ?id_event_resource.
-                    ?evento :name_event_object ?name_event_object.
-                    ?evento rdf:type :Event.
-                    ?condicion :comparator_condition ?comparator_condition. 
-                    ?condicion :variable_condition ?variable_condition. 
-                    ?condicion :type_variable_condition ?type_variable_condition. 
-                    ?condicion :unit_condition ?unit_condition. 
-                    ?condicion :meaning_condition ?meaning_condition. 
-                    ?condicion rdf:type :Condition.
-                    ?accion :id_action_object ?osid_object_action.
-                    ?accion :name_action_object ?name_action_object.
-                    ?accion :ip_action_object ?ip_action_object.
-                    ?accion :comparator_action ?comparator_action.
-                    ?accion :type_variable_action ?type_variable_action.
-                    ?accion :variable_action ?variable_action. 
-                    ?accion :meaning_action ?meaning_action.
-                    ?accion :id_action_resource ?id_action_resource.
-                    ?accion :unit_action ?unit_action.
-                    ?accion :name_action_resource ?name_action_resource.
-                    ?accion rdf:type :Action.
-                    ?eca :StartsWith ?evento.
-                    ?evento :Check ?condicion.
-                    ?condicion ?isRelatedWith ?accion.
-               }"""
         try:
-            resultadoConsulta = self.ontologia.consultaDataProperty(query)
-            diccionarioEcas = []
-            for eca in resultadoConsulta:
-                diccionarioEcas.append(self.pasarListaDiccionario(eca, keys))
-            return diccionarioEcas
+            return self.vistaEcas.listar()
         except Exception as e:
             print( "Error en listarontologios ontologias pck")
             print( e)
 
     def listarEcasUsuario(self, user_eca):
         self.consultarOntoActiva()
-        # keys=['name_eca','eca_state','id_event_resource', 'ip_event_object','comparator_condition','variable_condition','type_variable_condition','unit_condition','meaning_condition','ip_action_object','osid_object_action','name_action_object' ,'comparator_action','type_variable_action','variable_action','meaning_action','id_action_resource','name_action_resource']
-        keys = ['name_eca', 'eca_state', 'user_eca', 'osid_object_event', 'ip_event_object', 'name_event_object',
-                'id_event_resource', 'name_event_resource', 'comparator_condition', 'variable_condition',
-                'type_variable_condition', 'unit_condition', 'meaning_condition', 'osid_object_action',
-                'ip_action_object', 'name_action_object', 'id_action_resource', 'name_action_resource',
-                'comparator_action', 'variable_action', 'type_variable_action', 'unit_action', 'meaning_action']
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?name_eca ?eca_state ?user_eca
-                    ?osid_object_event ?ip_event_object ?name_event_object
-                    ?id_event_resource ?name_event_resource
-                    ?comparator_condition ?variable_condition ?type_variable_condition ?unit_condition ?meaning_condition
-                    ?osid_object_action ?ip_action_object  ?name_action_object
-                    ?id_action_resource ?name_action_resource 
-                    ?comparator_action ?variable_action ?type_variable_action  ?unit_action ?meaning_action 
-                where{
-                    ?eca :name_eca ?name_eca.
-                    ?eca :state_eca ?eca_state.
-                    ?eca :user_eca ?user_eca.
-                    FILTER regex(?user_eca, """ + "'" + user_eca + """').
-                    ?eca rdf:type :Dinamic.
-                    
-                    ?evento :id_event_object ?osid_object_event.
-                    ?evento :ip_event_object ?ip_event_object.
-                    ?evento :id_event_resource ?id_event_resource.
-                    ?evento :name_event_object ?name_event_object.
-                    ?evento rdf:type :Event.
-                    
-                    ?condicion :comparator_condition ?comparator_condition. 
-                    ?condicion :variable_condition ?variable_condition. 
-                    ?condicion :type_variable_condition ?type_variable_condition. 
-                    ?condicion :unit_condition ?unit_condition. 
-                    ?condicion :meaning_condition ?meaning_condition. 
-                    ?condicion rdf:type :Condition.
-                    
-                    ?accion :id_action_object ?osid_object_action.
-                    ?accion :name_action_object ?name_action_object.
-                    ?accion :ip_action_object ?ip_action_object.
-                    ?accion :comparator_action ?comparator_action.
-                    ?accion :type_variable_action ?type_variable_action.
-                    ?accion :variable_action ?variable_action. 
-                    ?accion :meaning_action ?meaning_action.
-                    ?accion :id_action_resource ?id_action_resource.
-                    ?accion :unit_action ?unit_action.
-                    ?accion :name_action_resource ?name_action_resource.
-                    ?accion rdf:type :Action.
-                    
-                    ?eca :StartsWith ?evento.
-                    ?evento :Check ?condicion.
-                    ?condicion ?isRelatedWith ?accion.
-               }"""
         try:
-            resultadoConsulta = self.ontologia.consultaDataProperty(query)
-            diccionarioEcas = []
-            for eca in resultadoConsulta:
-                diccionarioEcas.append(self.pasarListaDiccionario(eca, keys))
-            return diccionarioEcas
+            return self.vistaEcas.porUsuario(user_eca)
         except Exception as e:
             print( "Error en listarontologios ontologias pck")
             print( e)
 
     def listarNombresEcasUsuario(self, user_eca):
         self.consultarOntoActiva()
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?name_eca ?eca_state 
-                where{
-                    ?eca :name_eca ?name_eca.
-                    ?eca :state_eca ?eca_state.
-                    OPTIONAL{?eca :user_eca ?user_eca}.
-                    FILTER regex(?user_eca, """ + "'" + user_eca + """').
-                    ?eca rdf:type :Dinamic.
-               }"""
+        patrones = [("?eca", UrisOOS.dp_user_eca, Literal(user_eca)),
+                    ("?eca", RDF.type, UrisOOS.clase_dinamic),
+                    ("?eca", UrisOOS.dp_name_eca, "?name_eca"),
+                    ("?eca", UrisOOS.dp_state_eca, "?eca_state")]
         try:
-            resultadoConsulta = self.ontologia.consultaDataProperty(query)
+            resultadoConsulta = self.ontologia.consultaPatrones(patrones, ["name_eca", "eca_state"])
             return resultadoConsulta
         except Exception as e:
             print( "Error en listarontologios ontologias pck")
@@ -920,68 +673,21 @@ class ConsultasOOS(IConsultasOOS):
 
     def getEca(self, nombreEca):
         self.consultarOntoActiva()
-        self.ontologia = Ontologia()
-        # keys=['name_eca','eca_state', 'user_eca','id_event_resource', 'ip_event_object','comparator_condition','variable_condition','type_variable_condition','unit_condition','meaning_condition','ip_action_object','osid_object_action','name_action_object' ,'comparator_action','type_variable_action','variable_action','meaning_action','id_action_resource','name_action_resource']
-        keys = ['name_eca', 'eca_state', 'user_eca', 'osid_object_event', 'ip_event_object', 'name_event_object',
-                'id_event_resource', 'name_event_resource', 'comparator_condition', 'variable_condition',
-                'type_variable_condition', 'unit_condition', 'meaning_condition', 'osid_object_action',
-                'ip_action_object', 'name_action_object', 'id_action_resource', 'name_action_resource',
-                'comparator_action', 'variable_action', 'type_variable_action', 'unit_action', 'meaning_action']
-        query = """PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
-                    SELECT DISTINCT ?name_eca ?eca_state ?user_eca
-                    ?osid_object_event ?ip_event_object ?name_event_object
-                    ?id_event_resource ?name_event_resource
-                    ?comparator_condition ?variable_condition ?type_variable_condition ?unit_condition ?meaning_condition
-                    ?osid_object_action ?ip_action_object  ?name_action_object
-                    ?id_action_resource ?name_action_resource 
-                    ?comparator_action ?variable_action ?type_variable_action  ?unit_action ?meaning_action 
-                where{
-                    ?eca :name_eca ?name_eca.
-                    FILTER regex(?name_eca, """ + "'" + nombreEca + """').
-                    ?eca :state_eca ?eca_state.
-                    OPTIONAL{?eca :user_eca ?user_eca}.
-                    ?eca rdf:type :Dinamic.
-                    ?evento :id_event_object ?osid_object_event.
-                    ?evento :ip_event_object ?ip_event_object.
-                    ?evento :id_event_resource ?id_event_resource.
-                    ?evento :name_event_object ?name_event_object.
-                    ?evento :name_event_resource ?name_event_resource.
-                    ?evento rdf:type :Event.
-                    
-                    ?condicion :comparator_condition ?comparator_condition. 
-                    ?condicion :variable_condition ?variable_condition. 
-                    ?condicion :type_variable_condition ?type_variable_condition. 
-                    ?condicion :unit_condition ?unit_condition. 
-                    ?condicion :meaning_condition ?meaning_condition. 
-                    ?condicion rdf:type :Condition.
-                    
-                    ?accion :id_action_object ?osid_object_action.
-                    ?accion :name_action_object ?name_action_object.
-                    ?accion :ip_action_object ?ip_action_object.
-                    ?accion :comparator_action ?comparator_action.
-                    ?accion :type_variable_action ?type_variable_action.
-                    ?accion :variable_action ?variable_action. 
-                    ?accion :meaning_action ?meaning_action.
-                    ?accion :id_action_resource ?id_action_resource.
-                    ?accion :unit_action ?unit_action.
-                    ?accion :name_action_resource ?name_action_resource.
-                    ?accion rdf:type :Action.
-                    
-                    ?eca :StartsWith ?evento.
-                    ?evento :Check ?condicion.
-                    ?condicion :isRelatedWith ?accion.
-               }"""
-        ###try:
-        req = self.ontologia.consultaDataProperty(query)
-        #print()
-        #print(query)
-        resultadoConsulta = req[0]
-        diccionarioEcas = self.pasarListaDiccionario(resultadoConsulta, keys)
+        diccionarioEcas = self.vistaEcas.obtener(nombreEca)
+        if diccionarioEcas is None:
+            raise IndexError(f"No existe la regla ECA {nombreEca}")
         return diccionarioEcas
-        # except Exception as e:
-        #     print( "Error en getECA ontologias pck")
-        #     print( e)
-        #     return {}
+
+    ##Retorna un diccionario con las claves pedidas por cada fila, sin repetir (como SELECT DISTINCT)
+    def __proyectar(self, filas, keys):
+        listaDic = []
+        vistos = set()
+        for fila in filas:
+            valores = tuple(fila[key] for key in keys)
+            if valores not in vistos:
+                vistos.add(valores)
+                listaDic.append(dict(zip(keys, valores)))
+        return listaDic
 
     def setServiceIntelligent(self, valorNuevo):
         # self.ontologia = Ontologia()
@@ -1,7 +1,11 @@
 """Adaptador para consultas en la ontología del perfil de usuario."""
 
 from infraestructure.interfaces.IConsultasPerfilUsuario import IConsultasPerfilUsuario
-from infraestructure.acceso_ontologia.OntologiaPU import OntologiaPU
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+from infraestructure.acceso_ontologia.ConsultasPreparadas import parametros
+from infraestructure.acceso_ontologia import ArchivoInteracciones
+from infraestructure.acceso_ontologia.VistaEdificios import VistaEdificios
+from infraestructure.acceso_ontologia.VistaPreferencias import VistaPreferencias
 from itertools import groupby
 from operator import itemgetter
 from config import settings 
@@ -17,7 +21,7 @@ class ConsultasPerfilUsuario(IConsultasPerfilUsuario):
                 os.mkdir(settings.PATH_PU_OWL, 0o777)
             try:              
                 self.path = settings.PATH_PU_OWL + self.usuarioActual #se espera que el pathOWL haya solo un archivo, la ontologia del usuario actual
-                self.ontologia = OntologiaPU(self.path)
+                self.ontologia = pool.obtener(self.path)
                 self.ontoExists = True
             except:
                 logger.error("DESDE INIT CONSULTAS PERFIL USUARIO ERROR AL CARGAR LA ONTOLOGIA")
@@ -151,106 +155,19 @@ class ConsultasPerfilUsuario(IConsultasPerfilUsuario):
             listaIpID.append(self.pasarListaDiccionario(item, keys))
         return listaIpID
         
+    ##Las tres consultas de edificio se responden con el indice de contencion de VistaEdificios
     def consultarListaObjetosRelacionadosEdificio(self, nombreEdificio):
         try:
             nombreEdificio = nombreEdificio.decode('utf-8')
         except:
             pass
-        keys = [ "name_object", "ipobjeto", "idobjeto"]
-        query="""
-                PREFIX pu: <http://localhost/default#> 
-                PREFIX dogont: <http://elite.polito.it/ontologies/dogont.owl#> 
-                PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
-                SELECT  
-                        ?nameobjeto ?ipobjeto ?idobjeto  
-                WHERE{   
-                    OPTIONAL{
-                        ?objeto oos:ip_object ?ipobjeto.                         
-                        ?objeto pu:name_object ?nameobjeto.                        
-                        ?objeto oos:id_object ?idobjeto .                        
-                        ?objeto rdf:type oos:Object.
-                        ?edificio pu:related ?objeto. 
-                        ?edificio pu:name_building_environment ?nombedificio. 
-                        FILTER regex(?nombedificio ,'""" + nombreEdificio + """'). 
-                        ?edificio rdf:type dogont:Building.
-                    }.       
-                }"""
-        resultado = self.ontologia.consultaDataProperty(query)
-        listaDiccionarios = []
-        for item in resultado:
-                diccionarioEcas = {}
-                diccionarioEcas = self.pasarListaDiccionario(item, keys)
-                listaDiccionarios.append(diccionarioEcas)
-        return listaDiccionarios
+        return VistaEdificios.de(self.ontologia).objetosEdificio(nombreEdificio)
         
     def consultarPartesEdificioConObjetosRelacionados(self, nombreEdificio):
-        keys = [ "nombreparte",  "name_object", "ipobjeto", "idobjeto"]
-        query = """
-                     PREFIX pu: <http://localhost/default#> 
-                     PREFIX dogont: <http://elite.polito.it/ontologies/dogont.owl#> 
-                     PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#> 
-                     SELECT DISTINCT ?nombreparte       
-                     ?nameobjeto ?ipobjeto ?idobjeto  
-                     WHERE  {   
-                       OPTIONAL {                                    
-                                   ?edificio pu:name_building_environment ?nombedificio.   
-                                   
-                        FILTER regex(?nombedificio ,'""" + nombreEdificio + """').       
-                                   ?edificio rdf:type dogont:Building. 
-                                   ?piso pu:name_building_environment ?nombrepiso.   ?piso rdf:type dogont:Flat.   
-                                    ?parteCasa pu:name_building_environment ?nombreparte.
-                                    ?parteCasa rdf:type ?typeParte.    
-                                    ?typeParte rdfs:subClassOf* dogont:BuildingEnvironment.
-                                    ?piso dogont:contains ?parteCasa. 
-                                    ?edificio dogont:contains ?piso.
-                                    ?objeto oos:ip_object ?ipobjeto.                         
-                                    ?objeto pu:name_object ?nameobjeto.                        
-                                    ?objeto oos:id_object ?idobjeto .                        
-                                    ?objeto rdf:type oos:Object.
-                                    ?parteCasa pu:related ?objeto. 
-                                    ?edificio dogont:contains ?parteCasa
-                        }. 
-                    }
-                """
-        resultado = self.ontologia.consultaDataProperty(query)
-        listaDiccionarios = []
-        for item in resultado:
-                diccionarioEcas = {}
-                diccionarioEcas = self.pasarListaDiccionario(item, keys)
-                listaDiccionarios.append(diccionarioEcas)
-        return listaDiccionarios
+        return VistaEdificios.de(self.ontologia).partesEdificioConObjetos(nombreEdificio)
         
     def consultarObjetosRelacionadosACosasDeEdificio(self, nombreEdificio): # 
-        keys = [  "name_thing", "name_object", "ipobjeto", "idobjeto"]
-        query = """
-                PREFIX pu: <http://localhost/default#> 
-                PREFIX dogont: <http://elite.polito.it/ontologies/dogont.owl#> 
-                PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#>
-                SELECT  
-                        ?nombreCosa   
-                        ?nameobjeto ?ipobjeto ?idobjeto  
-                WHERE{OPTIONAL {
-                    ?edificio pu:name_building_environment ?nombedificio.  
-                    ?edificio rdf:type dogont:Building.  
-                    
-                        FILTER regex(?nombedificio ,'""" + nombreEdificio + """').                   
-                    
-                        ?piso pu:name_building_environment ?nombrepiso.                          
-                        ?piso rdf:type dogont:Flat.                           
-                        ?parteCasa pu:name_building_environment ?nombreparte.
-                        ?parteCasa rdf:type ?typeParte.                            
-                        ?typeParte rdfs:subClassOf* dogont:BuildingEnvironment.                        
-                        ?piso dogont:contains ?parteCasa.                         
-                       
-                    }.       
-                }"""
-        resultado = self.ontologia.consultaDataProperty(query)
-        listaDiccionarios = []
-        for item in resultado:
-                diccionarioEcas = {}
-                diccionarioEcas = self.pasarListaDiccionario(item, keys)
-                listaDiccionarios.append(diccionarioEcas)
-        return listaDiccionarios
+        return VistaEdificios.de(self.ontologia).objetosCosasEdificio(nombreEdificio)
 
     def consultarListaIpIdObjectosEdificio(self, nombreEdificio): # sale tmbn el coordinador
         listaIps = []
@@ -277,154 +194,54 @@ class ConsultasPerfilUsuario(IConsultasPerfilUsuario):
                     WHERE {
                         OPTIONAL {?objeto oos:ip_object ?ipobjeto}.
                         OPTIONAL {?objeto oos:id_object ?idobjeto}.
-                        FILTER regex(?idobjeto ,'""" + idObjeto + """').
+                        FILTER regex(?idobjeto, ?patron).
                         ?objeto rdf:type oos:Object.
                         ?edificio pu:name_building_environment ?nombedificio.
                         ?edificio rdf:type dogont:Building.
                         ?edificio pu:related ?objeto
                     }"""
-        listaIps = self.ontologia.consultaDataProperty(query)
+        listaIps = self.ontologia.consultaDataProperty(query, parametros(patron=idObjeto))
         #print (colored("la lista de ips edificio relacionado ", 'green'))
         #print (listaIps)
         return listaIps
     
     
+    ##Las preferencias por OSID se responden con el indice de VistaPreferencias (una sola consulta SPARQL por cambio)
     def consultarListaPreferenciasObjetoEventoporOSID(self, idObjeto):
-        keys = ['name_eca','state_eca','id_event_object','ip_event_object','name_event_object','id_event_resource','name_event_resource', 'comparator_condition','variable_condition','type_variable_condition','unit_condition','meaning_condition','id_action_object','ip_action_object','name_action_object','id_action_resource','name_action_resource','comparator_action','variable_action','type_variable_action','unit_action','meaning_action', 'name_activity', 'start_date_activity','end_date_activity' ]
-        query = """ PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#> 
-                    PREFIX : <http://localhost/default#>                    
-                    PREFIX upo:<http://localhost/UPO#>
-                    SELECT DISTINCT ?name_eca ?eca_state 
-                    ?osid_object_event ?ip_event_object ?name_event_object ?id_event_resource ?name_event_resource 
-                    ?comparator_condition ?variable_condition ?type_variable_condition ?unit_condition ?meaning_condition 
-                    ?osid_object_action ?ip_action_object  ?name_action_object ?id_action_resource ?name_action_resource ?comparator_action ?variable_action ?type_variable_action  ?unit_action ?meaning_action 
-                    ?name_activity ?start_date_activity ?end_date_activity
-                    WHERE{
-                        ?eca :name_preference ?name_eca. 
-                        ?eca :state_preference ?eca_state. 
-                        ?eca rdf:type upo:Preference.
-                        ?evento oos:id_event_object ?osid_object_event.  
-                        FILTER regex(?osid_object_event, '""" + idObjeto + """').
-                        ?evento oos:ip_event_object ?ip_event_object. 
-                        ?evento oos:id_event_resource ?id_event_resource. 
-                        ?evento oos:name_event_object ?name_event_object.
-                        ?evento oos:name_event_resource ?name_event_resource. 
-                        ?evento rdf:type oos:Event.
-                        ?condicion oos:comparator_condition ?comparator_condition. 
-                        ?condicion oos:variable_condition ?variable_condition.  
-                        ?condicion oos:type_variable_condition ?type_variable_condition. 
-                        OPTIONAL{
-                            ?condicion oos:unit_condition ?unit_condition
-                        }.  
-                        ?condicion oos:meaning_condition ?meaning_condition.   
-                        ?condicion rdf:type oos:Condition.
-                        ?accion oos:id_action_object ?osid_object_action. 
-                        ?accion oos:name_action_object ?name_action_object.
-                        ?accion oos:ip_action_object 
-                        ?ip_action_object. ?accion oos:comparator_action ?comparator_action. 
-                        ?accion oos:variable_action ?variable_action.  
-                        ?accion oos:meaning_action ?meaning_action. 
-                        ?accion oos:type_variable_action ?type_variable_action. 
-                        ?accion oos:id_action_resource ?id_action_resource. 
-                        OPTIONAL{
-                            ?accion oos:unit_action ?unit_action
-                        }. 
-                        ?accion oos:name_action_resource ?name_action_resource.
-                        ?accion rdf:type oos:Action.
-                        ?eca oos:StartsWith ?evento. 
-                        ?evento oos:Check ?condicion. 
-                        ?condicion oos:isRelatedWith ?accion.
-                        OPTIONAL{ 
-                            ?activity :name_activity  ?name_activity. 
-                            ?activity rdf:type :Activity.
-                            ?shedule :start_date_activity ?start_date_activity. 
-                            ?shedule :end_date_activity ?end_date_activity.
-                            ?shedule rdf:type :Shedule_Activity. 
-                            ?activity :realize ?shedule.
-                            ?eca  oos:StartsWith ?activity.
-                        }   
-                    }"""
-        try:
-            resultadoConsulta = self.ontologia.consultaDataProperty(query)
-            diccionarioEcas = []
-            for eca in resultadoConsulta:
-                diccionarioEcas.append(self.pasarListaDiccionario(eca, keys))            
-            return diccionarioEcas
-        except Exception as e:
-            print( "Error en listarontologios ontologias pck")
-            print( e)
+        if not self.ontoExists:
+            logger.error("ONTLOGIA PERFIL USUARIO NO EXISTE EN CONSULTAR LISTA PREFERENCIAS EVENTO POR OSID")
+            return []
+        return VistaPreferencias.de(self.ontologia).porEvento(idObjeto)
             
     def consultarListaPreferenciasObjetoAccionporOSID(self, idObjeto):
-        keys = ['name_eca','state_eca','id_event_object','ip_event_object','name_event_object','id_event_resource','name_event_resource', 'comparator_condition','variable_condition','type_variable_condition','unit_condition','meaning_condition','id_action_object','ip_action_object','name_action_object','id_action_resource','name_action_resource','comparator_action','variable_action','type_variable_action','unit_action','meaning_action', 'name_activity', 'start_date_activity','end_date_activity' ]
-        query = """ PREFIX  oos: <http://semanticsearchiot.net/sswot/Ontologies#> 
-                    PREFIX : <http://localhost/default#>
-                    PREFIX upo:<http://localhost/UPO#>
-                    SELECT DISTINCT ?name_eca ?eca_state 
-                    ?osid_object_event ?ip_event_object ?name_event_object ?id_event_resource ?name_event_resource 
-                    ?comparator_condition ?variable_condition ?type_variable_condition ?unit_condition ?meaning_condition 
-                    ?osid_object_action ?ip_action_object  ?name_action_object ?id_action_resource ?name_action_resource ?comparator_action ?variable_action ?type_variable_action  ?unit_action ?meaning_action 
-                    ?name_activity ?start_date_activity ?end_date_activity
-                    WHERE{
-                        ?eca :name_preference ?name_eca. 
-                        ?eca :state_preference ?eca_state. 
-                        ?eca rdf:type upo:Preference.
-                        ?evento oos:id_event_object ?osid_object_event.  
-                        ?evento oos:ip_event_object ?ip_event_object. 
-                        ?evento oos:id_event_resource ?id_event_resource. 
-                        ?evento oos:name_event_object ?name_event_object.
-                        ?evento oos:name_event_resource ?name_event_resource. 
-                        ?evento rdf:type oos:Event.
-                        ?condicion oos:comparator_condition ?comparator_condition. 
-                        ?condicion oos:variable_condition ?variable_condition.  
-                        ?condicion oos:type_variable_condition ?type_variable_condition. 
-                        OPTIONAL{
-                            ?condicion oos:unit_condition ?unit_condition
-                        }.  
-                        ?condicion oos:meaning_condition ?meaning_condition.   
-                        ?condicion rdf:type oos:Condition.
-                        ?accion oos:id_action_object ?osid_object_action. 
-                        FILTER regex(?osid_object_action, '""" + idObjeto + """').
-                        ?accion oos:name_action_object ?name_action_object.
-                        ?accion oos:ip_action_object ?ip_action_object. 
-                        ?accion oos:comparator_action ?comparator_action. 
-                        ?accion oos:variable_action ?variable_action.  
-                        ?accion oos:meaning_action ?meaning_action. 
-                        ?accion oos:type_variable_action ?type_variable_action. 
-                        ?accion oos:id_action_resource ?id_action_resource. 
-                        OPTIONAL{
-                            ?accion oos:unit_action ?unit_action
-                        }. 
-                        ?accion oos:name_action_resource ?name_action_resource.
-                        ?accion rdf:type oos:Action.
-                        ?eca oos:StartsWith ?evento. 
-                        ?evento oos:Check ?condicion. 
-                        ?condicion oos:isRelatedWith ?accion.
-                        OPTIONAL{ 
-                            ?activity :name_activity  ?name_activity. 
-                            ?activity rdf:type :Activity.
-                            ?shedule :start_date_activity ?start_date_activity. 
-                            ?shedule :end_date_activity ?end_date_activity.
-                            ?shedule rdf:type :Shedule_Activity. 
-                            ?activity :realize ?shedule.
-                            ?eca  oos:StartsWith ?activity.
-                        }   
-                    }"""
-        try:
-            resultadoConsulta = self.ontologia.consultaDataProperty(query)
-            diccionarioEcas = []
-            for eca in resultadoConsulta:
-                diccionarioEcas.append(self.pasarListaDiccionario(eca, keys))            
-            return diccionarioEcas
-        except Exception as e:
-            print( "Error en listarontologios ontologias pck")
-            print( e)
+        if not self.ontoExists:
+            logger.error("ONTLOGIA PERFIL USUARIO NO EXISTE EN CONSULTAR LISTA PREFERENCIAS ACCION POR OSID")
             return []
+        return VistaPreferencias.de(self.ontologia).porAccion(idObjeto)
             
     def consultarListaPreferenciasporOSID(self, idObjeto):
         if not self.ontoExists:
             logger.error("ONTLOGIA PERFIL USUARIO NO EXISTE EN CONSULTAR LISTA PREFERENCIAS POR OSID")
             return []
-        return self.consultarListaPreferenciasObjetoAccionporOSID(idObjeto)+self.consultarListaPreferenciasObjetoEventoporOSID(idObjeto)
+        return VistaPreferencias.de(self.ontologia).porObjeto(idObjeto)
+
+    def consultarInteracciones(self, osid=None, idDataStream=None, desde=None, hasta=None, archivo=False):
+        if not self.ontoExists:
+            logger.error("ONTLOGIA PERFIL USUARIO NO EXISTE EN CONSULTAR INTERACCIONES")
+            return None
+        with self.ontologia.lock.lectura():
+            interacciones = ArchivoInteracciones.listar(self.ontologia.g, osid, idDataStream, desde, hasta)
+            conteos = ArchivoInteracciones.conteos(self.ontologia.g)
+        if archivo:
+            archivadas = ArchivoInteracciones.listar(ArchivoInteracciones.leer(self.path, desde, hasta), osid, idDataStream, desde, hasta)
+            ##Las que quedaron en el perfil por un archivado interrumpido ya estan en interacciones
+            vistas = {tuple(interaccion.values()) for interaccion in interacciones}
+            interacciones = [interaccion for interaccion in archivadas if tuple(interaccion.values()) not in vistas] + interacciones
+        if osid is not None:
+            conteos = [conteo for conteo in conteos if conteo["osid"] == osid]
+        if idDataStream is not None:
+            conteos = [conteo for conteo in conteos if conteo["idDataStream"] == idDataStream]
+        return {"interacciones": interacciones, "archivadas": conteos}
 ########################################################################################################################
     def pasarListaDiccionario(self, lista, keys):
         dicAux = {}
@@ -1,25 +1,32 @@
 """Adaptador de Población de la Ontología OOS"""
 from config import settings
 import os, shutil
+import traceback
 from infraestructure.interfaces.IPoblacion import IPoblacion
 from infraestructure.acceso_ontologia.Ontologia import Ontologia
-from owlready2 import *
 from infraestructure.logging.Logging import logger
-from rdflib import Literal
+from rdflib import Literal, RDF, URIRef, XSD
 from infraestructure.util.UrisOOS import UrisOOS
 
-onto_path = [settings.PATH_OWL]
 logger.info("Ruta Ontologias: " + settings.PATH_OWL)
 
 
+##Mismos tipos de literal que escribia owlready2: texto como xsd:string y float como xsd:decimal
+def _literal(valor):
+    if isinstance(valor, str):
+        return Literal(valor, datatype=XSD.string)
+    if isinstance(valor, float):
+        return Literal(repr(valor), datatype=XSD.decimal)
+    return Literal(valor)
+
+
 class PobladorOOS(IPoblacion):
+    """Escribe sobre el mismo grafo compartido (Ontologia.compartida) que leen las consultas,
+    sin un segundo almacén de owlready2 ni ida y vuelta por el fichero .owl."""
     def __init__(self):
-        self.individuoObjecto = None
-        self.individuoEstado = None
-        self.location = None
         self.uris = UrisOOS()
-        self.ontologia = Ontologia()
         self._inicializar_ontologia_instanciada()
+        self.ontologia = Ontologia.compartida()
 
     def _inicializar_ontologia_instanciada(self):        
         if not os.path.exists(settings.PATH_OWL):
@@ -31,175 +38,123 @@ class PobladorOOS(IPoblacion):
             except Exception as e:
                 logger.error("Fallo al copiar ontologia base a ontologia instanciada")
                 logger.error(e)
-        self._cargar_ontologia()
-
-    def _cargar_ontologia(self):
-        """Carga la ontología instanciada."""
-        self.onto = get_ontology("file://" + settings.ONTOLOGIA_INSTANCIADA).load(reload_if_newer=True)
-        logger.info("Ontologia Cargada (owlready2): " + str(self.onto.loaded))
 
-    def _recargar_ontologia(self):
-        """Recarga la ontología instanciada después de cambios."""
-        self.onto = get_ontology("file://" + settings.ONTOLOGIA_INSTANCIADA).load(reload=True)
-        logger.debug("Ontologia recargada desde archivo")
+    def poblarMetadatosObjeto(self, diccionarioObjeto:dict, listaRecursos:dict):
+        """Pobla los metadatos del objeto inteligente y sus datastreams en una sola transacción.
 
-    def _get_class(self, class_name: str):
-        """Obtiene una clase de la ontología instanciada por nombre."""
-        return self.onto.search_one(iri=f"*{class_name}")
+        Compara el feed con los individuos actuales y solo agrega o quita las
+        tripletas que difieren: repoblar con el mismo feed no escribe nada."""
+        individuoObjecto = self.uris.prefijo + "Objeto"
+        individuoEstado = self.uris.prefijo + "Estado"
+        location = self.uris.prefijo + "Localizacion"
+        try:
+            with self.ontologia.transaccion():
+                # Otros objetos con el mismo ID se eliminan; si es el propio Objeto queda solo lo del feed
+                existentes = self.ontologia.consultaPatrones(
+                    [("?objeto", self.uris.dp_id_objeto, Literal(str(diccionarioObjeto["id"])))], ["objeto"])
+                existentes = {fila[0].decode("utf-8") for fila in existentes}
+                for iri in existentes - {individuoObjecto}:
+                    self.ontologia.eliminarEntidad(iri)
 
-    def poblarMetadatosObjeto(self, diccionarioObjeto:dict, listaRecursos:dict):
-        """Pobla los metadatos del objeto inteligente usando owlready2."""        
-        try:            
-            # Limpiar objetos existentes
-            try:
-                existing_objects = self.onto.search(id_object=str(diccionarioObjeto["id"]))
-                for obj in existing_objects:
-                    destroy_entity(obj)
-                logger.info(f"Limpiados objetos existentes con ID {diccionarioObjeto['id']}")
-            except Exception as cleanup_error:
-                logger.warning(f"Error durante limpieza: {cleanup_error}")
-            
-            # Obtener las clases de la ontología instanciada
-            StateClass = self.onto.search_one(iri=self.uris.ns_oos + "State")
-            ObjectClass = self.onto.search_one(iri=self.uris.ns_oos + "Object")
-            LocationClass = self.onto.search_one(iri=self.uris.ns_oos + "location")
-            
-            if not all([StateClass, ObjectClass, LocationClass]):
-                logger.error("No se encontraron las clases necesarias en la ontología")
-                return False
-            
-            # Crear individuos en la ontología instanciada
-            with self.onto:
-                self.individuoEstado = StateClass("Estado")
-                self.individuoObjecto = ObjectClass("Objeto")
-                self.location = LocationClass("Localizacion")
-
-            self.__poblarObjecto(diccionarioObjeto)
-            self.__poblarEstado(diccionarioObjeto)
-            self.__poblarLocation(diccionarioObjeto)
-            self.__poblarDataStreams(listaRecursos)
-            
-            # Guardar la ontología instanciada
-            self.onto.save(file=settings.ONTOLOGIA_INSTANCIADA, format="rdfxml")
-            logger.info("Ontología guardada correctamente")
-            
-            logger.info("Población de metadatos exitosa")
+                cambios = self.__sincronizar(individuoObjecto, self.uris.clase_Object,
+                                             self.__poblarObjecto(diccionarioObjeto, individuoObjecto),
+                                             completo=individuoObjecto in existentes)
+                ##Las etiquetas se acumulan sobre las que ya tuviera el estado
+                etiquetas = [[individuoEstado, self.uris.dp_tags, _literal(item)] for item in diccionarioObjeto.get("tags", [])]
+                cambios += self.__sincronizar(individuoEstado, self.uris.clase_state,
+                                              self.__poblarEstado(diccionarioObjeto, individuoEstado), etiquetas)
+                cambios += self.__sincronizar(location, self.uris.clase_location,
+                                              self.__poblarLocation(diccionarioObjeto, location))
+                cambios += self.__poblarDataStreams(listaRecursos)
+            logger.info(f"Población de metadatos exitosa ({cambios} tripletas cambiadas)")
             return True
-            
         except Exception as e:
+            ##La transaccion ya deshizo los cambios parciales
             logger.error(f"Error en poblarMetadatosObjeto: {e}")
-            import traceback
             logger.error(traceback.format_exc())
-            
-            # Limpieza en caso de error
-            try:
-                if hasattr(self, 'individuoEstado') and self.individuoEstado is not None:
-                    destroy_entity(self.individuoEstado)
-                if hasattr(self, 'individuoObjecto') and self.individuoObjecto is not None:
-                    destroy_entity(self.individuoObjecto)
-                if hasattr(self, 'location') and self.location is not None:
-                    destroy_entity(self.location)
-            except:
-                pass
-            
             return False
 
-    def __poblarObjecto(self, diccionarioObjeto):
+    ##Las propiedades de `lista` son funcionales: sustituyen el valor anterior, como al asignarlas en
+    ##owlready2; los tipos y `acumular` se agregan. Con `completo` el individuo queda solo con lo dado
+    def __sincronizar(self, individuo, clase, lista, acumular = (), completo = False):
+        nodo = URIRef(individuo)
+        tripletas = [(nodo, RDF.type, URIRef(clase)), (nodo, RDF.type, URIRef(self.uris.clase_NamedIndividual))]
+        tripletas += [(URIRef(i), URIRef(p), v) for i, p, v in list(lista) + list(acumular)]
+        if completo:
+            return self.ontologia.sincronizarIndividuo(individuo, tripletas, referencias=True)
+        return self.ontologia.sincronizarIndividuo(individuo, tripletas, propiedades={p for _, p, _ in lista})
+
+    def __poblarObjecto(self, diccionarioObjeto, individuoObjecto):
         """Pobla propiedades del objeto."""
-        self.individuoObjecto.id_object = [diccionarioObjeto["id"]]
+        objeto = [[individuoObjecto, self.uris.dp_id_objeto, _literal(diccionarioObjeto["id"])]]
         if "ip_object" in diccionarioObjeto:
-            self.individuoObjecto.ip_object = [diccionarioObjeto["ip_object"]]
+            objeto.append([individuoObjecto, self.uris.dp_ip_objeto, _literal(diccionarioObjeto["ip_object"])])
         logger.debug(f"Objeto poblado: id={diccionarioObjeto['id']}")
+        return objeto
 
-    def __poblarEstado(self, diccionarioObjeto):
+    def __poblarEstado(self, diccionarioObjeto, individuoEstado):
         """Pobla propiedades del estado."""
-        self.individuoEstado.version = [diccionarioObjeto["version"]]
-        self.individuoEstado.creator = [diccionarioObjeto["creator"]]
-        self.individuoEstado.status = [diccionarioObjeto["status"]]
-        
-        if "tags" in diccionarioObjeto:
-            for item in diccionarioObjeto["tags"]:
-                self.individuoEstado.tags.append(item)
-        
-        self.individuoEstado.title = [diccionarioObjeto["title"]]
-        self.individuoEstado.private = [diccionarioObjeto["private"]]
-        self.individuoEstado.description = [diccionarioObjeto["description"]]
-        self.individuoEstado.updated = [diccionarioObjeto["updated"]]
-        self.individuoEstado.website = [diccionarioObjeto["website"]]
-        self.individuoEstado.feed = [diccionarioObjeto["feed"]]
-        self.individuoEstado.created = [diccionarioObjeto["created"]]
+        estado = []
+        for clave, propiedad in (("version", self.uris.dp_version), ("creator", self.uris.dp_creator),
+                                 ("status", self.uris.dp_status), ("title", self.uris.dp_title),
+                                 ("private", self.uris.dp_private), ("description", self.uris.dp_description),
+                                 ("updated", self.uris.dp_updated), ("website", self.uris.dp_website),
+                                 ("feed", self.uris.dp_feed), ("created", self.uris.dp_created)):
+            estado.append([individuoEstado, propiedad, _literal(diccionarioObjeto[clave])])
         logger.debug(f"Estado poblado: title={diccionarioObjeto['title']}")
+        return estado
 
-    def __poblarLocation(self, ds):
+    def __poblarLocation(self, ds, location):
         """Pobla propiedades de la localización."""
-        self.location.lon = [ds["lon"]]
-        self.location.lat = [ds["lat"]]
-        self.location.name_location = [ds["name"]]
-        self.location.domain = [ds["domain"]]
-        self.location.ele = [ds["ele"]]
+        localizacion = [[location, self.uris.dp_lon, _literal(ds["lon"])],
+                        [location, self.uris.dp_lat, _literal(ds["lat"])],
+                        [location, self.uris.dp_name_location, _literal(ds["name"])],
+                        [location, self.uris.dp_domain, _literal(ds["domain"])],
+                        [location, self.uris.dp_ele, _literal(ds["ele"])]]
         logger.debug(f"Localización poblada: {ds['name']}")
+        return localizacion
 
     def __poblarDataStreams(self, listaRecursos):
-        """Pobla los datastreams del objeto."""
+        """Pobla los datastreams del objeto; retorna cuántas tripletas cambiaron."""
         logger.info("Poblando DataStreams...")
-        
-        # Obtener clases de la ontología instanciada
-        DatastreamsClass = self.onto.search_one(iri=self.uris.ns_oos + "datastreams")
-        UnitClass = self.onto.search_one(iri=self.uris.ns_kos + "Unit")
-        EntitiesOfInterestClass = self.onto.search_one(iri=self.uris.ns_oos + "EntitiesOfInterest")
-        FeatureOfInterestClass = self.onto.search_one(iri=self.uris.ns_ssn + "FeatureOfInterest")
-        
-        if not all([DatastreamsClass, UnitClass, EntitiesOfInterestClass, FeatureOfInterestClass]):
-            logger.error("No se encontraron las clases necesarias para DataStreams")
-            return
-        
+        cambios = 0
         for item in listaRecursos:            
-            dataStreamsIRI = item["datastream_id"]
+            dataStreamsIRI = self.uris.prefijo + item["datastream_id"]
             unidadIRI = dataStreamsIRI + "_unidad"
             entityIRI = dataStreamsIRI + "_entity_of_interest"
             featureIRI = dataStreamsIRI + "_feature_of_interest"
             
-            # Limpiar recursos existentes
-            try:
-                for iri in [dataStreamsIRI, unidadIRI, entityIRI, featureIRI]:
-                    existing = self.onto.search(iri="*" + iri)
-                    for entity in existing:
-                        destroy_entity(entity)
-                        logger.debug(f"Limpiado recurso existente: {iri}")
-            except Exception as cleanup_error:
-                logger.warning(f"Error durante limpieza de recursos: {cleanup_error}")
-            
-            # Crear individuos con las clases de la ontología instanciada
-            with self.onto:
-                datastreamObj = DatastreamsClass(dataStreamsIRI)
-                unidadObj = UnitClass(unidadIRI)
-                entityObj = EntitiesOfInterestClass(entityIRI)
-                featureObj = FeatureOfInterestClass(featureIRI)
+            tipos = [[dataStreamsIRI, self.uris.clase_datastreams], [unidadIRI, self.uris.clase_unit],
+                     [entityIRI, self.uris.clase_EntitiesOfInterest], [featureIRI, self.uris.clase_FeatureOfInterest]]
+            tripletas = [(URIRef(iri), RDF.type, URIRef(clase)) for iri, clase in tipos]
+            tripletas += [(URIRef(iri), RDF.type, URIRef(self.uris.clase_NamedIndividual)) for iri, _ in tipos]
 
             # Propiedades del datastream
-            datastreamObj.min_value = [str(item["min_value"])]
-            datastreamObj.max_value = [str(item["max_value"])]
-            datastreamObj.datastream_id = [item["datastream_id"]]
-            datastreamObj.datastream_type = [item["datastream_type"]]
-            datastreamObj.datastream_format = [item["datastream_format"]]
-
-            if "tags" in item:
-                for tag in item['tags']:
-                    datastreamObj.tags.append(tag)
-
-            unidadObj.label = [item["label"]]
-            unidadObj.symbol = [item["symbol"]]
-
-            featureObj.name_feature = [item["featureofinterest"]]
-            entityObj.name_entity = [item["entityofinterest"]]
+            datos = [[dataStreamsIRI, self.uris.dp_min_value, _literal(str(item["min_value"]))],
+                     [dataStreamsIRI, self.uris.dp_max_value, _literal(str(item["max_value"]))],
+                     [dataStreamsIRI, self.uris.dp_datastream_id, _literal(item["datastream_id"])],
+                     [dataStreamsIRI, self.uris.dp_datastream_type, _literal(item["datastream_type"])],
+                     [dataStreamsIRI, self.uris.dp_datastream_format, _literal(item["datastream_format"])]]
+            for tag in item.get("tags", []):
+                datos.append([dataStreamsIRI, self.uris.dp_tags, _literal(tag)])
+            ##"symbol" no es una propiedad de la ontologia (es Symbol): owlready2 tampoco lo guardaba
+            datos.append([unidadIRI, self.uris.dp_unit_label, _literal(item["label"])])
+            datos.append([featureIRI, self.uris.dp_name_feature, _literal(item["featureofinterest"])])
+            datos.append([entityIRI, self.uris.dp_name_entity, _literal(item["entityofinterest"])])
+            tripletas += [(URIRef(i), URIRef(p), v) for i, p, v in datos]
 
             # Relaciones
-            datastreamObj.isMeasured.append(unidadObj)
-            entityObj.isDefinedBy.append(featureObj)
+            tripletas += [(URIRef(dataStreamsIRI), URIRef(self.uris.op_datastream_unit), URIRef(unidadIRI)),
+                          (URIRef(entityIRI), URIRef(self.uris.op_is_defined_by), URIRef(featureIRI))]
+
+            ##Los cuatro individuos quedan solo con lo del feed (antes se destruian y se recreaban)
+            for iri, _ in tipos:
+                cambios += self.ontologia.sincronizarIndividuo(iri, tripletas, referencias=True)
             
             logger.debug(f"DataStream poblado: {item['datastream_id']}")
             
         logger.info(f"DataStreams poblados correctamente ({len(listaRecursos)} recursos)")
+        return cambios
 
     def poblarECA(self, diccionarioECA:dict):  
         """Pobla una regla ECA usando RDFLib (clase Ontologia)."""      
@@ -221,26 +176,71 @@ class PobladorOOS(IPoblacion):
         listaIndividuos.append([individuoEvento, self.uris.clase_event])
         listaIndividuos.append([individuoAccion, self.uris.clase_Action])
         listaIndividuos.append([individuoCondicion, self.uris.clase_condition])
-        self.ontologia.insertarListaIndividuos(listaIndividuos)
 
         dinamic = self.__poblarDinamic(diccionarioECA, individuoECA)
         event = self.__poblarEvent(diccionarioECA, individuoEvento)
         accion = self.__poblarAction(diccionarioECA, individuoAccion)
         condicion = self.__poblarCondition(diccionarioECA, individuoCondicion)
-        self.ontologia.insertarListaDataProperty(dinamic + event + accion + condicion)
 
         listaObjectProperty = []
         listaObjectProperty.append([individuoECA, self.uris.op_starts_with, individuoEvento])
         listaObjectProperty.append([individuoEvento, self.uris.op_check, individuoCondicion])
         listaObjectProperty.append([individuoCondicion, self.uris.op_is_related_with, individuoAccion])
-        self.ontologia.insertarListaObjectProperty(listaObjectProperty)
-        
-        # CRÍTICO: Recargar owlready2 después de que RDFLib guardó
-        self._recargar_ontologia()
-        
+
+        ##La regla completa se persiste de una vez (o no se persiste)
+        with self.ontologia.transaccion():
+            self.ontologia.insertarListaIndividuos(listaIndividuos)
+            self.ontologia.insertarListaDataProperty(dinamic + event + accion + condicion)
+            self.ontologia.insertarListaObjectProperty(listaObjectProperty)
+
         logger.info("Regla ECA poblada correctamente.")
         return True
 
+    def aplicarLote(self, operaciones:list)->bool:
+        """Aplica una lista de operaciones sobre la ontología instanciada de forma atómica.
+
+        Cada operación es un diccionario con 'operacion', 'individuo' y, según el
+        caso, 'propiedad' y 'valor' (clase, individuo destino o literal). Los
+        nombres sin esquema se resuelven contra el espacio de nombres OOS. Si
+        alguna operación es inválida no se aplica ninguna y se lanza ValueError."""
+        with self.ontologia.transaccion():
+            for indice, item in enumerate(operaciones):
+                operacion = item.get("operacion")
+                individuo = self.__resolverIri(item.get("individuo"))
+                propiedad = self.__resolverIri(item.get("propiedad"))
+                valor = item.get("valor")
+                self.__exigir(indice, individuo)
+                if operacion == "insertarIndividuo":
+                    self.__exigir(indice, valor)
+                    self.ontologia.insertarIndividuo(individuo, self.__resolverIri(valor))
+                elif operacion == "insertarDataProperty":
+                    self.__exigir(indice, propiedad, valor)
+                    self.ontologia.insertarDataProperty(individuo, propiedad, Literal(valor))
+                elif operacion == "actualizarDataProperty":
+                    self.__exigir(indice, propiedad, valor)
+                    self.ontologia.actualizarDataProperty(individuo, propiedad, valor)
+                elif operacion == "insertarObjectProperty":
+                    self.__exigir(indice, propiedad, valor)
+                    self.ontologia.insertarObjectProperty(individuo, propiedad, self.__resolverIri(valor))
+                elif operacion == "eliminarDataProperty":
+                    self.__exigir(indice, propiedad)
+                    self.ontologia.eliminarDataProperty(individuo, propiedad)
+                elif operacion == "eliminarTodoIndividuo":
+                    self.ontologia.eliminarTodoIndividuo(individuo)
+                else:
+                    raise ValueError(f"Operación {indice}: '{operacion}' no soportada")
+        logger.info(f"Lote de {len(operaciones)} operaciones aplicado")
+        return True
+
+    def __resolverIri(self, nombre):
+        if nombre is None or "://" in nombre:
+            return nombre
+        return self.uris.prefijo + nombre
+
+    def __exigir(self, indice, *campos):
+        if any(campo is None for campo in campos):
+            raise ValueError(f"Operación {indice}: faltan campos requeridos")
+
     def __poblarDinamic(self, diccionarioECA, individuoECA):
         dinamic = []
         nombreEca = diccionarioECA['name_eca'].replace(" ", "_")
@@ -286,7 +286,7 @@ class PobladorOOS(IPoblacion):
         return condition
         
     def editarECA(self, diccionarioECA)->bool:
-        """Edita una regla ECA usando owlready2."""               
+        """Edita una regla ECA; solo cambian las propiedades presentes en el diccionario."""               
         try:
             user_eca = diccionarioECA.get("user_eca", "default")
             nombreEca = diccionarioECA['name_eca'].replace(" ", "_") + user_eca
@@ -297,101 +297,61 @@ class PobladorOOS(IPoblacion):
             iri_accion = self.uris.prefijo + nombreEca + "accion"
             iri_condicion = self.uris.prefijo + nombreEca + "condicion"
             
-            # Buscar con owlready2
-            individuoECA_list = self.onto.search(iri=iri_eca)
-            individuoEvento_list = self.onto.search(iri=iri_evento)
-            individuoAccion_list = self.onto.search(iri=iri_accion)
-            individuoCondicion_list = self.onto.search(iri=iri_condicion)
-            
-            if not individuoECA_list:
-                logger.error(f"No se encontró la regla ECA con IRI: {iri_eca}")
-                logger.info("Reglas ECA disponibles en la ontología:")
-                dinamics = self.onto.search(type=self.onto.search_one(iri=self.uris.clase_dinamic))
-                for d in dinamics:
-                    logger.info(f"  - {d.iri} (name: {d.name_eca if hasattr(d, 'name_eca') else 'N/A'})")
-                return False
-            
-            if not individuoEvento_list or not individuoAccion_list or not individuoCondicion_list:
-                logger.error(f"No se encontraron todos los componentes del ECA")
-                return False
-            
-            individuoECA = individuoECA_list[0]
-            individuoEvento = individuoEvento_list[0]
-            individuoAccion = individuoAccion_list[0]
-            individuoCondicion = individuoCondicion_list[0]
-            
-            logger.info("Todos los individuos encontrados. Procediendo a editar...")
-            
-            self.__editarDinamic(diccionarioECA, individuoECA)
-            self.__editarEvent(diccionarioECA, individuoEvento)
-            self.__editarAction(diccionarioECA, individuoAccion)
-            self.__editarCondition(diccionarioECA, individuoCondicion)
-            
-            # Guardar con owlready2 y recargar
-            self.onto.save(file=settings.ONTOLOGIA_INSTANCIADA, format="rdfxml")
-            self._recargar_ontologia()
+            with self.ontologia.transaccion():
+                existe = lambda iri: (URIRef(iri), None, None) in self.ontologia.g
+                if not existe(iri_eca):
+                    logger.error(f"No se encontró la regla ECA con IRI: {iri_eca}")
+                    logger.info("Reglas ECA disponibles en la ontología:")
+                    for d in self.ontologia.g.subjects(RDF.type, URIRef(self.uris.clase_dinamic)):
+                        logger.info(f"  - {d} (name: {self.ontologia.g.value(d, URIRef(self.uris.dp_name_eca), default='N/A')})")
+                    return False
+                
+                if not existe(iri_evento) or not existe(iri_accion) or not existe(iri_condicion):
+                    logger.error(f"No se encontraron todos los componentes del ECA")
+                    return False
+                
+                logger.info("Todos los individuos encontrados. Procediendo a editar...")
+                
+                self.ontologia.actualizarListaDataProperty(
+                    self.__editarDinamic(diccionarioECA, iri_eca) + self.__editarEvent(diccionarioECA, iri_evento)
+                    + self.__editarAction(diccionarioECA, iri_accion) + self.__editarCondition(diccionarioECA, iri_condicion))
             
             logger.info(f"Regla ECA '{diccionarioECA['name_eca']}' editada correctamente.")
             return True
             
         except Exception as e:
             logger.error(f"Error inesperado al editar el ECA: {e}")
-            import traceback
             logger.error(traceback.format_exc())
             return False
 
+    def __editar(self, diccionarioECA, individuo, propiedades):
+        return [[individuo, uri, diccionarioECA[clave]] for clave, uri in propiedades if clave in diccionarioECA]
+
     def __editarDinamic(self, diccionarioECA, individuoECA):
-        if "interest_entity_eca" in diccionarioECA:
-            individuoECA.interest_entity_eca = [diccionarioECA["interest_entity_eca"]]
-        if "name_eca" in diccionarioECA:
-            individuoECA.name_eca = [diccionarioECA["name_eca"]]
-        if "state_eca" in diccionarioECA:
-            individuoECA.state_eca = [diccionarioECA["state_eca"]]
-        user_eca = diccionarioECA.get("user_eca", "default")
-        individuoECA.user_eca = [user_eca]
+        dinamic = self.__editar(diccionarioECA, individuoECA, [
+            ("interest_entity_eca", self.uris.dp_interest_entity_eca), ("name_eca", self.uris.dp_name_eca),
+            ("state_eca", self.uris.dp_state_eca)])
+        dinamic.append([individuoECA, self.uris.dp_user_eca, diccionarioECA.get("user_eca", "default")])
+        return dinamic
 
     def __editarEvent(self, diccionarioECA, individuoEvento):
-        if "id_event_object" in diccionarioECA:
-            individuoEvento.id_event_object = [diccionarioECA["id_event_object"]]
-        if "ip_event_object" in diccionarioECA:
-            individuoEvento.ip_event_object = [diccionarioECA["ip_event_object"]]
-        if "id_event_resource" in diccionarioECA:
-            individuoEvento.id_event_resource = [diccionarioECA["id_event_resource"]]
-        if "name_event_resource" in diccionarioECA:
-            individuoEvento.name_event_resource = [diccionarioECA["name_event_resource"]]
-        if "name_event_object" in diccionarioECA:
-            individuoEvento.name_event_object = [diccionarioECA["name_event_object"]]
+        return self.__editar(diccionarioECA, individuoEvento, [
+            ("id_event_object", self.uris.dp_id_event_object), ("ip_event_object", self.uris.dp_ip_event_object),
+            ("id_event_resource", self.uris.dp_id_event_resource), ("name_event_resource", self.uris.dp_name_event_resource),
+            ("name_event_object", self.uris.dp_name_event_object)])
 
     def __editarAction(self, diccionarioECA, individuoAccion):
-        if "comparator_action" in diccionarioECA:
-            individuoAccion.comparator_action = [diccionarioECA["comparator_action"]]
-        if "id_action_resource" in diccionarioECA:
-            individuoAccion.id_action_resource = [diccionarioECA["id_action_resource"]]
-        if "id_action_object" in diccionarioECA:
-            individuoAccion.id_action_object = [diccionarioECA["id_action_object"]]
-        if "ip_action_object" in diccionarioECA:
-            individuoAccion.ip_action_object = [diccionarioECA["ip_action_object"]]
-        if "meaning_action" in diccionarioECA:
-            individuoAccion.meaning_action = [diccionarioECA["meaning_action"]]
-        if "name_action_object" in diccionarioECA:
-            individuoAccion.name_action_object = [diccionarioECA["name_action_object"]]
-        if "name_action_resource" in diccionarioECA:
-            individuoAccion.name_action_resource = [diccionarioECA["name_action_resource"]]
-        if "type_variable_action" in diccionarioECA:
-            individuoAccion.type_variable_action = [diccionarioECA["type_variable_action"]]
-        if "unit_action" in diccionarioECA:
-            individuoAccion.unit_action = [diccionarioECA["unit_action"]]
-        if "variable_action" in diccionarioECA:
-            individuoAccion.variable_action = [diccionarioECA["variable_action"]]
+        return self.__editar(diccionarioECA, individuoAccion, [
+            ("comparator_action", self.uris.dp_comparator_action), ("id_action_resource", self.uris.dp_id_action_resource),
+            ("id_action_object", self.uris.dp_id_action_object), ("ip_action_object", self.uris.dp_ip_action_object),
+            ("meaning_action", self.uris.dp_meaning_action), ("name_action_object", self.uris.dp_name_action_object),
+            ("name_action_resource", self.uris.dp_name_action_resource),
+            ("type_variable_action", self.uris.dp_type_variable_action), ("unit_action", self.uris.dp_unit_action),
+            ("variable_action", self.uris.dp_variable_action)])
 
     def __editarCondition(self, diccionarioECA, individuoCondicion):
-        if "comparator_condition" in diccionarioECA:
-            individuoCondicion.comparator_condition = [diccionarioECA["comparator_condition"]]
-        if "meaning_condition" in diccionarioECA:
-            individuoCondicion.meaning_condition = [diccionarioECA["meaning_condition"]]
-        if "type_variable_condition" in diccionarioECA:
-            individuoCondicion.type_variable_condition = [diccionarioECA["type_variable_condition"]]
-        if "unit_condition" in diccionarioECA:
-            individuoCondicion.unit_condition = [diccionarioECA["unit_condition"]]
-        if "variable_condition" in diccionarioECA:
-            individuoCondicion.variable_condition = [diccionarioECA["variable_condition"]]
\ No newline at end of file
+        return self.__editar(diccionarioECA, individuoCondicion, [
+            ("comparator_condition", self.uris.dp_comparator_condition),
+            ("meaning_condition", self.uris.dp_meaning_condition),
+            ("type_variable_condition", self.uris.dp_type_variable_condition),
+            ("unit_condition", self.uris.dp_unit_condition), ("variable_condition", self.uris.dp_variable_condition)])
@@ -4,11 +4,19 @@ from os import listdir
 import time
 from config import settings
 from infraestructure.acceso_ontologia.OntologiaPU import OntologiaPU
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
 from infraestructure.interfaces.IPoblacionPerfilUsuario import IPoblarPerfilUsuario
 from infraestructure.util import UrisPu
 from infraestructure.logging.Logging import logger
 
 pathUsuActual = settings.ONTOLOGIA_PU
+
+def fechaInteraccion(dateInteraction):
+    """Fecha de la interacción; "00/00/00 00:00:00" significa la fecha actual."""
+    if dateInteraction == "00/00/00 00:00:00":
+        horayfecha=str(time.strftime("%c"))
+        return horayfecha.replace(" ", "-" )
+    return dateInteraction
     
 class PoblarPerfilUsuario(IPoblarPerfilUsuario):
     def __init__(self, mac, idUsuario, accion):
@@ -20,11 +28,11 @@ class PoblarPerfilUsuario(IPoblarPerfilUsuario):
             try:    
                 self.path = settings.PATH_PU_OWL + mac + "&" + idUsuario + ".owl"
                 #self.path = AppUtil.pathOWL + mac +  ".owl"
-                self.ontologia = OntologiaPU(self.path)
+                self.ontologia = pool.obtener(self.path)
                 logger.info(f"Ruta de ontología cargada: {self.path}")
             except:
                 logger.error("Desde PobladorPU. El path es incorrecto, cargando ontologia de prueba")
-                self.ontologia = OntologiaPU(settings.ONTOLOGIA_PU)
+                self.ontologia = pool.obtener(settings.ONTOLOGIA_PU)
 
         elif accion == "CREAR":
             self.path = settings.PATH_OWL + mac + "&" + idUsuario + ".owl"
@@ -34,7 +42,7 @@ class PoblarPerfilUsuario(IPoblarPerfilUsuario):
             try:
                 self.path = pathUsuActual
                 #self.path = AppUtil.pathOWL + mac +  ".owl"
-                self.ontologia = OntologiaPU(self.path)
+                self.ontologia = pool.obtener(self.path)
                 logger.info(f"Ruta de ontología cargada: {self.path}")
             except:
                 logger.error("Desde PobladorPU. El path es incorrecto")
@@ -42,22 +50,24 @@ class PoblarPerfilUsuario(IPoblarPerfilUsuario):
   
     
     def registroInteraccionUsuarioObjeto(self, email, idDataStream, comando, osid, dateInteraction):
-        try:  
-            if dateInteraction == "00/00/00 00:00:00":
-                horayfecha=str(time.strftime("%c"))
-                horayfecha = horayfecha.replace(" ", "-" )
-            else:
-                horayfecha=dateInteraction
-            uriIndividuoObject = UrisPu.individuoObject + osid
-            uriShedule=UrisPu.individuoShedule_Interaction+email +horayfecha
-            self.ontologia.insertarIndividuo(uriShedule,UrisPu.individuoShedule_Interaction)
-            listaShedule=[]
-            listaShedule.append([uriShedule, UrisPu.dp_id_resource_interaction, Literal(idDataStream)])
-            listaShedule.append([uriShedule, UrisPu.dp_type_command_interaction, Literal(comando)])
-            listaShedule.append([uriShedule, UrisPu.dp_date_interaction, Literal(horayfecha)])
-            
-            self.ontologia.insertarListaDataProperty(listaShedule)
-            self.ontologia.insertarObjectProperty(uriIndividuoObject, UrisPu.op_date_interaction, uriShedule)      
+        return self.registroInteraccionesUsuarioObjeto([(email, idDataStream, comando, osid, dateInteraction)])
+
+    def registroInteraccionesUsuarioObjeto(self, interacciones):
+        """Registra varias interacciones (email, idDataStream, comando, osid, dateInteraction) en una sola transacción."""
+        try:
+            ##Una sola escritura del perfil para todas las inserciones
+            with self.ontologia.transaccion():
+                for email, idDataStream, comando, osid, dateInteraction in interacciones:
+                    horayfecha = fechaInteraccion(dateInteraction)
+                    uriIndividuoObject = UrisPu.individuoObject + osid
+                    uriShedule=UrisPu.individuoShedule_Interaction+email +horayfecha
+                    listaShedule=[]
+                    listaShedule.append([uriShedule, UrisPu.dp_id_resource_interaction, Literal(idDataStream)])
+                    listaShedule.append([uriShedule, UrisPu.dp_type_command_interaction, Literal(comando)])
+                    listaShedule.append([uriShedule, UrisPu.dp_date_interaction, Literal(horayfecha)])
+                    self.ontologia.insertarIndividuo(uriShedule,UrisPu.individuoShedule_Interaction)
+                    self.ontologia.insertarListaDataProperty(listaShedule)
+                    self.ontologia.insertarObjectProperty(uriIndividuoObject, UrisPu.op_date_interaction, uriShedule)
             return True
         except Exception as e:
             logger.error("Error:")
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class IConsultasOOS(ABC):
@@ -132,6 +132,10 @@ class IConsultasOOS(ABC):
     def listaMetaDatosDataStreams(self) -> List[Dict[str, Any]]:
         """Retorna lista de metadatos de los datastreams."""
 
+    @abstractmethod
+    def consultarSnapshot(self) -> Tuple[str, bytes]:
+        """Retorna (etag, cuerpo JSON) con los metadatos del objeto, su State, location y datastreams."""
+
     # ---- ECAs (Eventos-Condición-Acción) ----
     @abstractmethod
     def tieneContrato(self, osidDestino: str) -> List[Dict[str, Any]]:
@@ -1,6 +1,7 @@
 """Interfaz para consultas en la ontología del perfil de usuario."""
 
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List, Dict, Any
 
 
@@ -159,7 +160,28 @@ class IConsultasPerfilUsuario(ABC):
             
         Returns:
             List[Dict[str, str]]: Lista combinada de preferencias donde el objeto
-                es evento o acción.
+                es acción o evento, sin repetir las que lo tienen como ambos.
+        """
+        pass
+
+    @abstractmethod
+    def consultarInteracciones(self, osid: str = None, idDataStream: str = None, desde: datetime = None,
+                               hasta: datetime = None, archivo: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Consulta las interacciones del usuario con los objetos.
+        
+        Args:
+            osid: Solo las del objeto con este OSID.
+            idDataStream: Solo las de este recurso.
+            desde: Solo las de esta fecha o posteriores.
+            hasta: Solo las de esta fecha o anteriores.
+            archivo: Incluir las interacciones archivadas (ver ArchivoInteracciones).
+            
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 'interacciones' con las claves 'osid',
+                'idDataStream', 'comando' y 'fecha', ordenadas por fecha, y 'archivadas'
+                con el número de interacciones archivadas por 'osid' e 'idDataStream'.
+                None si la ontología no existe.
         """
         pass
 
@@ -12,4 +12,6 @@ class IPoblacion(ABC):
     @abstractmethod
     def editarECA(self, diccionarioECA:dict)->bool:
         """Edita un ECA en la base del conocimiento."""
-    
\ No newline at end of file
+    @abstractmethod
+    def aplicarLote(self, operaciones:list)->bool:
+        """Aplica una lista de operaciones de población de forma atómica."""
@@ -60,6 +60,8 @@ class UrisOOS:
     clase_datastreams = "http://semanticsearchiot.net/sswot/Ontologies#datastreams"
     clase_unit = "http://localhost/kos#Unit"
     clase_Object = "http://semanticsearchiot.net/sswot/Ontologies#Object"
+    clase_EntitiesOfInterest = "http://semanticsearchiot.net/sswot/Ontologies#EntitiesOfInterest"
+    clase_NamedIndividual = "http://www.w3.org/2002/07/owl#NamedIndividual"
 
     ##DataProperties
     dp_id_objeto = "http://semanticsearchiot.net/sswot/Ontologies#id_object"
@@ -81,6 +83,7 @@ class UrisOOS:
     dp_lon = "http://semanticsearchiot.net/sswot/Ontologies#lon"
     dp_lat = "http://semanticsearchiot.net/sswot/Ontologies#lat"
     dp_name = "http://semanticsearchiot.net/sswot/Ontologies#name"
+    dp_name_location = "http://semanticsearchiot.net/sswot/Ontologies#name_location"
     dp_domain = "http://semanticsearchiot.net/sswot/Ontologies#domain"
     dp_ele = "http://semanticsearchiot.net/sswot/Ontologies#ele"
 
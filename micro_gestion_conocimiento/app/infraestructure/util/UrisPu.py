@@ -17,6 +17,7 @@ individuoPreference = "http://localhost/UPO#Preference"
 individuoProfession = "http://localhost/default#Profession"
 individuoShedule_Activity = "http://localhost/Lin#Schedule_Activity"
 individuoShedule_Interaction="http://localhost/UPO#Schedule_Interaction"
+individuoInteraction_Count="http://localhost/UPO#Interaction_Count"
 individuoService = "http://semanticsearchiot.net/sswot/Ontologies#Service"
 individuoThhings = "http://localhost/OntoProfile#Thing"
 individuoLiving_Thing = "http://localhost/OntoProfile#Living_Thing"
@@ -85,6 +86,7 @@ op_receive_command="http://localhost/default#receive_command"
 op_id_resource_interaction ="http://localhost/default#id_resource_interaction"
 op_type_command_interaction="http://localhost/default#type_command_interaction"
 op_date_interaction="http://localhost/default#date_interaction"
+op_count_interaction="http://localhost/default#count_interaction"
 op_Check = "http://semanticsearchiot.net/sswot/Ontologies#Check"
 op_StartsWith = "http://semanticsearchiot.net/sswot/Ontologies#StartsWith"
 
@@ -268,3 +270,4 @@ dp_years_of_experience = "http://localhost/default#years_of_experience"
 ##"http://semanticsearchiot.net/sswot/Ontologies#ip_object"
 dp_id_resource_interaction ="http://localhost/default#id_resource_interaction"
 dp_type_command_interaction="http://localhost/default#type_command_interaction"
+dp_archived_interactions="http://localhost/default#archived_interactions"
@@ -5,23 +5,57 @@
     @version 1.0.0
 """
 
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from api.consultas import ontologia_router as consultas_router
 from api.consultas import ontologia_usuario_router as consultas_usuario_router
 from api.poblacion import ontologia_router as poblacion_router
+from api.ejecutor import consultas, escrituras, ejecutor_router
+from api.cambios import cambios_router
+from api.metricas import metricas_router
 from config import settings
 from api.poblacion import ontologia_usuario_router as poblacion_usuario_router
+from infraestructure.acceso_ontologia.ArchivoInteracciones import archivador
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool as poolPerfiles
+from infraestructure.acceso_ontologia.VistaEcas import VistaEcas
+from infraestructure.adaptadores.ColaInteracciones import cola as colaInteracciones
+from infraestructure.logging.Logging import logger
+
+## @brief Carga una única vez el grafo compartido y la vista de reglas ECA antes de
+##        atender peticiones e inicia el archivado periódico de interacciones. Al apagar
+##        detiene el archivado, espera a las llamadas en curso de los ejecutores,
+##        registra las interacciones encoladas, escribe los perfiles de usuario con
+##        cambios pendientes y compacta la bitácora de escrituras en el fichero .owl
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.path.exists(settings.ONTOLOGIA_INSTANCIADA):
+        VistaEcas.de(Ontologia.compartida()).listar()
+        logger.info("Ontologia instanciada cargada en memoria: " + settings.ONTOLOGIA_INSTANCIADA)
+    archivador.iniciar()
+    yield
+    archivador.detener()
+    consultas.cerrar()
+    escrituras.cerrar()
+    colaInteracciones.cerrar()
+    poolPerfiles.vaciar()
+    Ontologia.compactarCompartidas()
 
 app = FastAPI(
     prefix="/ontology",
     title="Microservicio de Gestión de Base del Conocimiento",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
     )
 app.include_router(consultas_router)
 app.include_router(poblacion_router)
 app.include_router(poblacion_usuario_router)
 app.include_router(consultas_usuario_router)
+app.include_router(ejecutor_router)
+app.include_router(cambios_router)
+app.include_router(metricas_router)
 
 ## @brief Redirige raíz a documentación Swagger
 @app.get('/', include_in_schema=False)
@@ -0,0 +1,77 @@
+"""
+    @file bench_consultar_id.py
+    @brief Compara la latencia de consultar_id antes y después del grafo compartido.
+    @details
+    - antes: cada petición construye una Ontologia nueva (parseo RDF/XML completo).
+    - despues: todas las peticiones usan Ontologia.compartida().
+
+    Uso (desde micro_gestion_conocimiento/):
+        python benchmarks/bench_consultar_id.py [iteraciones]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from rdflib import URIRef, Literal, RDF  # noqa: E402
+from config import settings  # noqa: E402
+from infraestructure.acceso_ontologia.Ontologia import Ontologia  # noqa: E402
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS  # noqa: E402
+from infraestructure.util.UrisOOS import UrisOOS  # noqa: E402
+
+
+def preparar_ontologia(directorio):
+    """Crea una ontología instanciada mínima con un objeto."""
+    destino = os.path.join(directorio, "ontologiaInstanciada.owl")
+    shutil.copyfile(settings.ONTOLOGIA, destino)
+    ontologia = Ontologia(destino)
+    objeto = UrisOOS.prefijo + "Objeto"
+    ontologia.insertarIndividuo(objeto, UrisOOS.clase_Object)
+    ontologia.insertarDataProperty(objeto, UrisOOS.dp_id_objeto, Literal("objeto_bench"))
+    settings.ONTOLOGIA_INSTANCIADA = destino
+    return destino
+
+
+def percentiles(muestras):
+    ordenadas = sorted(muestras)
+    p50 = statistics.median(ordenadas)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+
+def medir(fn, iteraciones):
+    muestras = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        fn()
+        muestras.append(time.perf_counter() - inicio)
+    return percentiles(muestras)
+
+
+def main():
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    settings.ONTOLOGIA = os.path.join(os.path.dirname(__file__), "..", "app", "infraestructure", "OWL", "ontologiav18.owl")
+    with tempfile.TemporaryDirectory() as directorio:
+        destino = preparar_ontologia(directorio)
+
+        def antes():
+            consultas = ConsultasOOS()
+            consultas.ontologia = Ontologia(destino)
+            return consultas.consultarId()
+
+        def despues():
+            return ConsultasOOS().consultarId()
+
+        Ontologia.compartida(destino)
+        assert antes() == despues() == "objeto_bench"
+        for nombre, fn in (("antes (parseo por peticion)", antes), ("despues (grafo compartido)", despues)):
+            p50, p99 = medir(fn, iteraciones)
+            print(f"{nombre:<32} p50={p50:8.2f} ms   p99={p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+    @file bench_consultas_indexadas.py
+    @brief Escalado de las consultas por id/nombre con 1k y 10k reglas ECA y datastreams.
+    @details
+    - regex: la consulta SPARQL anterior (FILTER regex), que recorre todas las ligaduras.
+    - indices: ConsultasOOS actual, que resuelve la igualdad con sondas g.triples o,
+      para las reglas completas, con la vista materializada VistaEcas.
+    Las consultas que unen ECA, evento, condición y acción (listarEcasUsuario, getEca,
+    tieneContrato, verificarContrato, listarEcasEvento) solo se miden en su versión
+    actual: la SPARQL evaluaba el producto de las cuatro clases y no termina con 1k reglas.
+    La primera llamada (que construye la vista) no se incluye en la medición.
+
+    Uso (desde micro_gestion_conocimiento/):
+        python benchmarks/bench_consultas_indexadas.py [tamaños] [iteraciones]
+        python benchmarks/bench_consultas_indexadas.py 1000,10000 20
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from datos_sinteticos import poblar  # noqa: E402
+from infraestructure.acceso_ontologia.ConsultasPreparadas import parametros  # noqa: E402
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS  # noqa: E402
+from infraestructure.logging.Logging import logger  # noqa: E402
+
+PREFIJOS = "PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>\n"
+REGEX = {
+    "estadoEca": ("SELECT DISTINCT ?eca_state ?name_eca WHERE { ?eca :name_eca ?name_eca. ?eca :state_eca ?eca_state. "
+                  "FILTER regex(?name_eca, ?patron). ?eca rdf:type :Dinamic. }"),
+    "usuarioEca": ("SELECT DISTINCT ?user_eca ?name_eca WHERE { ?eca :name_eca ?name_eca. ?eca :user_eca ?user_eca. "
+                   "FILTER regex(?name_eca, ?patron). ?eca rdf:type :Dinamic. }"),
+    "listarNombresEcasUsuario": ("SELECT DISTINCT ?name_eca ?eca_state WHERE { ?eca :name_eca ?name_eca. "
+                                 "?eca :state_eca ?eca_state. OPTIONAL{?eca :user_eca ?user_eca}. "
+                                 "FILTER regex(?user_eca, ?patron). ?eca rdf:type :Dinamic. }"),
+    "consultarDataStreamFormatPorId": ("SELECT ?datastream_id ?datastream_format WHERE { "
+                                       "?entity :datastream_id ?datastream_id; :datastream_format ?datastream_format. "
+                                       "FILTER regex(?datastream_id, ?patron). ?entity rdf:type :datastreams. }"),
+    "consultarTagsDatastream": ("SELECT ?tags WHERE { ?entity :tags ?tags. ?entity :datastream_id ?datastream_id. "
+                                "FILTER regex(?datastream_id, ?patron) ?entity rdf:type :datastreams.}"),
+}
+
+
+def llamadas(n):
+    medio = n // 2
+    return [
+        ("estadoEca", (f"ECA{medio}",)), ("usuarioEca", (f"ECA{medio}",)),
+        ("listarNombresEcasUsuario", ("user1@x.com",)), ("consultarDataStreamFormatPorId", (f"ds{medio}",)),
+        ("consultarTagsDatastream", (f"ds{medio}",)), ("listarEcasUsuario", ("user1@x.com",)),
+        ("getEca", (f"ECA{medio}",)), ("tieneContrato", ("obj1",)), ("verificarContrato", ("obj1", "obj2")),
+        ("listarEcasEvento", ("obj1", "off")),
+    ]
+
+
+def medir(fn, iteraciones):
+    muestras = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        fn()
+        muestras.append(time.perf_counter() - inicio)
+    return statistics.median(muestras) * 1000
+
+
+def main():
+    tamanos = [int(t) for t in (sys.argv[1] if len(sys.argv) > 1 else "1000,10000").split(",")]
+    iteraciones = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    logger.setLevel("WARNING")
+    for n in tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            inicio = time.perf_counter()
+            ##Pocos usuarios y objetos: muchas reglas por usuario y por osid
+            poblar(directorio, ecas=n, datastreams=n, usuarios=50, objetos=n // 10)
+            print(f"\n{n} ECAs y {n} datastreams (generados en {time.perf_counter() - inicio:.1f}s)")
+            consultas = ConsultasOOS()
+            print(f"{'metodo':<34}{'filas':>7}{'regex p50':>12}{'indices p50':>13}")
+            for nombre, args in llamadas(n):
+                resultado = getattr(consultas, nombre)(*args)
+                filas = len(resultado) if isinstance(resultado, list) else 1
+                if nombre in REGEX:
+                    consulta = PREFIJOS + REGEX[nombre]
+                    regex = medir(lambda: consultas.ontologia.consultaDataProperty(consulta, parametros(patron=args[0])),
+                                  max(1, iteraciones // 10))
+                    regex = f"{regex:.2f}ms"
+                else:
+                    regex = "-"
+                indices = medir(lambda: getattr(consultas, nombre)(*args), iteraciones)
+                print(f"{nombre:<34}{filas:>7}{regex:>12}{indices:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+    @file bench_consultas_preparadas.py
+    @brief Compara cada método de consulta con y sin el registro de consultas preparadas.
+    @details
+    - texto: el comportamiento anterior; Graph.query(texto) parsea y algebriza en cada llamada.
+    - preparada: ConsultasPreparadas.preparar reutiliza la consulta ya parseada.
+    Recorre los métodos de ConsultasOOS y ConsultasPerfilUsuario sobre una
+    ontología sintética pequeña, donde el coste de parseo domina.
+
+    Uso (desde micro_gestion_conocimiento/):
+        python benchmarks/bench_consultas_preparadas.py [iteraciones]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from datos_sinteticos import poblar  # noqa: E402
+from rdflib.plugins.sparql import prepareQuery  # noqa: E402
+from config import settings  # noqa: E402
+from infraestructure.acceso_ontologia import Ontologia as moduloOntologia  # noqa: E402
+from infraestructure.acceso_ontologia import OntologiaPU as moduloOntologiaPU  # noqa: E402
+from infraestructure.acceso_ontologia import ConsultasPreparadas  # noqa: E402
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS  # noqa: E402
+from infraestructure.adaptadores.ConsultasPerfilUsuario import ConsultasPerfilUsuario  # noqa: E402
+from infraestructure.logging.Logging import logger  # noqa: E402
+
+PERFIL_EJEMPLO = os.path.join(os.path.dirname(__file__), "..", "..", "Ejemplo", "UsuarioActual.owl")
+
+CONSULTAS_OOS = [
+    ("consultarId", ()), ("consultarDescription", ()), ("consultarPrivate", ()), ("consultarTitle", ()),
+    ("consultarFeed", ()), ("consultarStatus", ()), ("consultarUpdated", ()), ("consultarCreated", ()),
+    ("consultarCreator", ()), ("consultarVersion", ()), ("consultarWebsite", ()), ("consultarServiceState", ()),
+    ("consultarTagsDatastream", ("ds1",)), ("consultarUnitDatastream", ("ds1",)), ("consultarDatastreams", ("ds1",)),
+    ("consultarTagsTodosDatastreams", ()), ("consultarUnitTodosDatastreams", ()), ("consultarTodosDatastreams", ()),
+    ("consultarListaIdDatastreams", ()), ("consultarState", ()), ("consultarTagsObjeto", ()),
+    ("consultarDataStreamFormat", ()), ("consultarDataStreamFormatPorId", ("ds1",)), ("consultarServiceIntelligent", ()),
+    ("consultarMetodosExternal", ()), ("diccionarioMetaDatosObjeto", ()), ("tieneContrato", ("obj1",)),
+    ("verificarContrato", ("obj1", "obj2")), ("listarDinamicEstado", ("on",)), ("estadoEca", ("ECA1",)),
+    ("usuarioEca", ("ECA1",)), ("listarEcasEvento", ("obj1", "on")),
+    ("listarEcasEventoSegunUsuario", ("obj1", "on", "user1@x.com")), ("listarEcas", ()),
+    ("listarEcasUsuario", ("user1@x.com",)), ("listarNombresEcasUsuario", ("user1@x.com",)), ("getEca", ("ECA1",)),
+]
+CONSULTAS_PU = [
+    ("consultarEmailUsuario", ()), ("consultarListaIpObjectos", ()), ("consultarListaIpIdObjectosUsuario", ()),
+    ("consultarListaIpIdObjectosEdificio", ("Casa",)), ("consultarEdificioRelacionadoObjeto", ("ESP32_Sala",)),
+    ("consultarListaPreferenciasporOSID", ("ESP32_Sala",)), ("consultarObjetivoUsuario", ()),
+    ("consultarActosObjetivosUsuario", ()), ("consultarRecursosObjetivosUsuario", ()),
+    ("consultarActosUsuario", ()), ("consultarRecursosUsuario", ()),
+]
+
+
+def sin_registro(consulta):
+    """Equivalente a pasar el texto a Graph.query: se prepara en cada llamada."""
+    return prepareQuery(consulta) if isinstance(consulta, str) else consulta
+
+
+def medir(fn, iteraciones):
+    muestras = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            pass  ##Algunos metodos fallan sin ciertos datos; se mide igual el coste de la consulta
+        muestras.append(time.perf_counter() - inicio)
+    return statistics.median(muestras) * 1000
+
+
+def main():
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    logger.setLevel("WARNING")
+    with tempfile.TemporaryDirectory() as directorio:
+        poblar(directorio, ecas=20, datastreams=10)
+        settings.PATH_PU_OWL = directorio + "/"
+        shutil.copyfile(PERFIL_EJEMPLO, os.path.join(directorio, "UsuarioActual.owl"))
+        objetivos = [(ConsultasOOS(), CONSULTAS_OOS), (ConsultasPerfilUsuario(), CONSULTAS_PU)]
+
+        total = {"texto": 0.0, "preparada": 0.0}
+        print(f"{'metodo':<46}{'texto':>10}{'preparada':>12}")
+        for consultas, metodos in objetivos:
+            for nombre, args in metodos:
+                fn = lambda: getattr(consultas, nombre)(*args)  # noqa: E731
+                moduloOntologia.preparar = moduloOntologiaPU.preparar = sin_registro
+                texto = medir(fn, iteraciones)
+                moduloOntologia.preparar = moduloOntologiaPU.preparar = ConsultasPreparadas.preparar
+                medir(fn, 1)
+                preparada = medir(fn, iteraciones)
+                total["texto"] += texto
+                total["preparada"] += preparada
+                print(f"{nombre:<46}{texto:>9.2f}ms{preparada:>10.2f}ms")
+        print(f"{'TOTAL (' + str(len(CONSULTAS_OOS) + len(CONSULTAS_PU)) + ' metodos, p50)':<46}"
+              f"{total['texto']:>9.2f}ms{total['preparada']:>10.2f}ms")
+        print(f"consultas en el registro: {ConsultasPreparadas.registradas()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+    @file bench_edificios.py
+    @brief Compara consultarListaIpIdObjectosEdificio con SPARQL y con el índice VistaEdificios.
+    @details
+    Perfil sintético con un edificio de 10 pisos y 500 partes, cada parte con un
+    objeto relacionado.
+    - antes: las tres consultas SPARQL de edificio (regex sobre el nombre y
+      rdfs:subClassOf* en cada llamada).
+    - despues: el índice de contención de VistaEdificios (se construye en la
+      primera llamada y se mide ya construido).
+
+    Uso (desde micro_gestion_conocimiento/):
+        python benchmarks/bench_edificios.py [iteraciones] [partes]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from rdflib import Literal, RDFS  # noqa: E402
+from config import settings  # noqa: E402
+from infraestructure.acceso_ontologia.ConsultasPreparadas import parametros  # noqa: E402
+from infraestructure.acceso_ontologia.OntologiaPU import OntologiaPU  # noqa: E402
+from infraestructure.acceso_ontologia.VistaEdificios import VistaEdificios  # noqa: E402
+from infraestructure.util import UrisPu  # noqa: E402
+
+PREFIJOS = """PREFIX pu: <http://localhost/default#>
+              PREFIX dogont: <http://elite.polito.it/ontologies/dogont.owl#>
+              PREFIX oos: <http://semanticsearchiot.net/sswot/Ontologies#>
+              PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>"""
+OBJETO = "?objeto oos:ip_object ?ipobjeto; pu:name_object ?nameobjeto; oos:id_object ?idobjeto; rdf:type oos:Object."
+PARTES = """?piso pu:name_building_environment ?nombrepiso. ?piso rdf:type dogont:Flat.
+            ?parteCasa pu:name_building_environment ?nombreparte. ?parteCasa rdf:type ?typeParte.
+            ?typeParte rdfs:subClassOf* dogont:BuildingEnvironment. ?piso dogont:contains ?parteCasa."""
+EDIFICIO = """?edificio pu:name_building_environment ?nombedificio. FILTER regex(?nombedificio, ?patron).
+              ?edificio rdf:type dogont:Building."""
+CONSULTAS = [
+    PREFIJOS + "SELECT ?nameobjeto ?ipobjeto ?idobjeto WHERE { OPTIONAL { " + OBJETO
+    + " ?edificio pu:related ?objeto. " + EDIFICIO + " } }",
+    PREFIJOS + "SELECT DISTINCT ?nombreparte ?nameobjeto ?ipobjeto ?idobjeto WHERE { OPTIONAL { " + EDIFICIO + PARTES
+    + " ?edificio dogont:contains ?piso. " + OBJETO + " ?parteCasa pu:related ?objeto. ?edificio dogont:contains ?parteCasa } }",
+    PREFIJOS + "SELECT ?nombreCosa ?nameobjeto ?ipobjeto ?idobjeto WHERE { OPTIONAL { " + EDIFICIO + PARTES + " } }",
+]
+
+
+def preparar_perfil(directorio, partes):
+    """Crea un perfil con un edificio de 10 pisos y `partes` partes con un objeto cada una."""
+    destino = os.path.join(directorio, "perfil.owl")
+    shutil.copyfile(settings.ONTOLOGIA, destino)
+    ontologia = OntologiaPU(destino)
+    edificio = UrisPu.individuoDogont + "edificio"
+    with ontologia.transaccion():
+        ontologia.insertarObjectProperty(UrisPu.individuoRoom, str(RDFS.subClassOf), UrisPu.individuoBuildingEnvironment)
+        ontologia.insertarIndividuo(edificio, UrisPu.individuoBuilding)
+        ontologia.insertarDataProperty(edificio, UrisPu.dp_name_building_environment, Literal("Edificio Central"))
+        for p in range(10):
+            piso = UrisPu.individuoDogont + f"piso{p}"
+            ontologia.insertarIndividuo(piso, UrisPu.individuoFlat)
+            ontologia.insertarDataProperty(piso, UrisPu.dp_name_building_environment, Literal(f"piso {p}"))
+            ontologia.insertarObjectProperty(edificio, UrisPu.op_contains, piso)
+        for h in range(partes):
+            piso = UrisPu.individuoDogont + f"piso{h % 10}"
+            parte = UrisPu.individuoDogont + f"sala{h}"
+            objeto = UrisPu.individuoObject + f"_obj{h}"
+            ontologia.insertarIndividuo(parte, UrisPu.individuoRoom)
+            ontologia.insertarDataProperty(parte, UrisPu.dp_name_building_environment, Literal(f"sala {h}"))
+            ontologia.insertarObjectProperty(piso, UrisPu.op_contains, parte)
+            ontologia.insertarObjectProperty(edificio, UrisPu.op_contains, parte)
+            ontologia.insertarIndividuo(objeto, UrisPu.individuoObject)
+            ontologia.insertarDataProperty(objeto, UrisPu.dp_name_object, Literal(f"objeto {h}"))
+            ontologia.insertarDataProperty(objeto, UrisPu.dp_ip_object, Literal(f"10.0.{h // 250}.{h % 250}"))
+            ontologia.insertarDataProperty(objeto, UrisPu.dp_id_object, Literal(f"obj{h}"))
+            ontologia.insertarObjectProperty(parte, UrisPu.op_related, objeto)
+            if h % 50 == 0:
+                ontologia.insertarObjectProperty(edificio, UrisPu.op_related, objeto)
+    return ontologia
+
+
+def percentiles(muestras):
+    ordenadas = sorted(muestras)
+    p50 = statistics.median(ordenadas)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+
+def medir(fn, iteraciones):
+    muestras = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        fn()
+        muestras.append(time.perf_counter() - inicio)
+    return percentiles(muestras)
+
+
+def main():
+    iteraciones = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    partes = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    settings.ONTOLOGIA_PU = os.path.join(os.path.dirname(__file__), "..", "app", "infraestructure", "OWL", "ontologiav18.owl")
+    settings.ONTOLOGIA = settings.ONTOLOGIA_PU
+    with tempfile.TemporaryDirectory() as directorio:
+        ontologia = preparar_perfil(directorio, partes)
+        vista = VistaEdificios.de(ontologia)
+
+        def antes():
+            return [fila for query in CONSULTAS
+                    for fila in ontologia.consultaDataProperty(query, parametros(patron="Central"))]
+
+        def despues():
+            return (vista.objetosEdificio("Central") + vista.partesEdificioConObjetos("Central")
+                    + vista.objetosCosasEdificio("Central"))
+
+        inicio = time.perf_counter()
+        filas = despues()
+        print(f"construccion del indice: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+        assert len(antes()) == len(filas) == partes + partes // 50
+        for nombre, fn in (("antes (SPARQL)", antes), ("despues (VistaEdificios)", despues)):
+            p50, p99 = medir(fn, iteraciones)
+            print(f"{nombre:<26} p50={p50:9.2f} ms   p99={p99:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
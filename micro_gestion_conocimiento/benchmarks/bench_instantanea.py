@@ -0,0 +1,55 @@
+"""
+    @file bench_instantanea.py
+    @brief Tiempo de carga en frío de la ontología instanciada: RDF/XML frente a la instantánea .owl.bin.
+    @details
+    Genera una ontología con N reglas ECA y datastreams, y mide Instantanea.cargar
+    parseando el RDF/XML (INSTANTANEA_BINARIA desactivado) y leyendo el .owl.bin.
+    También informa del tamaño en disco de ambos ficheros.
+
+    Uso (desde micro_gestion_conocimiento/):
+        python benchmarks/bench_instantanea.py [tamaños] [iteraciones]
+        python benchmarks/bench_instantanea.py 1000,10000 3
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from datos_sinteticos import poblar  # noqa: E402
+from config import settings  # noqa: E402
+from infraestructure.acceso_ontologia import Instantanea  # noqa: E402
+from infraestructure.logging.Logging import logger  # noqa: E402
+
+
+def medir(fn, iteraciones):
+    muestras = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        fn()
+        muestras.append(time.perf_counter() - inicio)
+    return statistics.median(muestras)
+
+
+def main():
+    tamanos = [int(t) for t in (sys.argv[1] if len(sys.argv) > 1 else "1000,10000").split(",")]
+    iteraciones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    logger.setLevel("WARNING")
+    print(f"{'ECAs':>7}{'triples':>10}{'owl MB':>9}{'bin MB':>9}{'RDF/XML':>10}{'.owl.bin':>10}")
+    for n in tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            poblar(directorio, ecas=n, datastreams=n, usuarios=50, objetos=n // 10)
+            owl = settings.ONTOLOGIA_INSTANCIADA
+            triples = len(Instantanea.cargar(owl))
+            settings.INSTANTANEA_BINARIA = False
+            rdfxml = medir(lambda: Instantanea.cargar(owl), iteraciones)
+            settings.INSTANTANEA_BINARIA = True
+            binario = medir(lambda: Instantanea.cargar(owl), iteraciones)
+            print(f"{n:>7}{triples:>10}{os.path.getsize(owl) / 1e6:>9.1f}"
+                  f"{os.path.getsize(owl + Instantanea.EXTENSION) / 1e6:>9.1f}{rdfxml:>9.2f}s{binario:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
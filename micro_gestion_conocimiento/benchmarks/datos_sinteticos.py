@@ -0,0 +1,84 @@
+"""
+    @file datos_sinteticos.py
+    @brief Genera ontologías instanciadas sintéticas para los benchmarks.
+    @details
+    Las reglas ECA se pueblan con PobladorOOS.poblarECA (mismos triples que el
+    servicio) dentro de una sola transacción. El objeto y sus datastreams se
+    escriben con literales xsd:string, igual que poblarMetadatosObjeto.
+"""
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from rdflib import Literal, XSD  # noqa: E402
+from config import settings  # noqa: E402
+from infraestructure.acceso_ontologia.Ontologia import Ontologia  # noqa: E402
+from infraestructure.adaptadores.PobladorOOS import PobladorOOS  # noqa: E402
+from infraestructure.util.UrisOOS import UrisOOS  # noqa: E402
+
+ONTOLOGIA_BASE = os.path.join(os.path.dirname(__file__), "..", "app", "infraestructure", "OWL", "ontologiav18.owl")
+
+
+def eca(nombre, usuario, osidEvento, osidAccion, estado="on"):
+    """Diccionario ECA con el formato de EcaPayloadDTO."""
+    return {
+        "name_eca": nombre, "state_eca": estado, "interest_entity_eca": "Ambiente", "user_eca": usuario,
+        "id_event_object": osidEvento, "ip_event_object": "192.168.1.10", "name_event_object": "Sensor " + osidEvento,
+        "id_event_resource": "temp", "name_event_resource": "Temperatura",
+        "comparator_condition": "mayor", "meaning_condition": "threshold", "unit_condition": "C",
+        "variable_condition": "30.5", "type_variable_condition": "float",
+        "id_action_object": osidAccion, "ip_action_object": "192.168.1.11", "name_action_object": "Actuador " + osidAccion,
+        "id_action_resource": "ventilador", "name_action_resource": "Ventilador",
+        "comparator_action": "igual", "unit_action": "state", "meaning_action": "turn_on",
+        "variable_action": "on", "type_variable_action": "string",
+    }
+
+
+def _texto(valor):
+    return Literal(str(valor), datatype=XSD.string)
+
+
+def poblar(directorio, ecas=10, datastreams=10, usuarios=5, objetos=10):
+    """Crea en directorio una ontología instanciada y apunta settings a ella.
+
+    Genera ecas reglas ECA repartidas entre usuarios y objetos (osids obj0..objN,
+    de modo que obj1 es prefijo de obj10...) y datastreams ds0..dsM."""
+    settings.ONTOLOGIA = ONTOLOGIA_BASE
+    settings.PATH_OWL = directorio + "/"
+    settings.ONTOLOGIA_INSTANCIADA = os.path.join(directorio, "ontologiaInstanciada.owl")
+    shutil.copyfile(settings.ONTOLOGIA, settings.ONTOLOGIA_INSTANCIADA)
+    Ontologia.descartarCompartidas()
+    ontologia = Ontologia.compartida()
+    p = UrisOOS.prefijo
+    with ontologia.transaccion():
+        ontologia.insertarListaIndividuos([[p + "Objeto", UrisOOS.clase_Object], [p + "Estado", UrisOOS.clase_state],
+                                           [p + "Localizacion", UrisOOS.clase_location]])
+        datos = [[p + "Objeto", UrisOOS.dp_id_objeto, _texto("obj0")], [p + "Objeto", UrisOOS.dp_ip_objeto, _texto("192.168.1.10")]]
+        for propiedad in ("title", "description", "created", "creator", "feed", "status", "updated", "version", "website"):
+            datos.append([p + "Estado", p + propiedad, _texto(propiedad)])
+        datos.append([p + "Estado", UrisOOS.dp_private, Literal(False)])
+        datos.append([p + "Estado", UrisOOS.dp_service_state, _texto("on")])
+        for propiedad, valor in (("lon", -76.6), ("lat", 2.44), ("name_location", "Sala"), ("domain", 1), ("ele", 1760.0)):
+            datos.append([p + "Localizacion", p + propiedad, Literal(valor)])
+        individuos = []
+        enlaces = []
+        for i in range(datastreams):
+            ds, unidad = p + f"ds{i}", p + f"ds{i}_unidad"
+            individuos += [[ds, UrisOOS.clase_datastreams], [unidad, UrisOOS.clase_unit]]
+            datos += [[ds, UrisOOS.dp_datastream_id, _texto(f"ds{i}")], [ds, UrisOOS.dp_datastream_format, _texto("float")],
+                      [ds, UrisOOS.dp_datastream_type, _texto("sensor")], [ds, UrisOOS.dp_min_value, _texto("0")],
+                      [ds, UrisOOS.dp_max_value, _texto("50")], [ds, UrisOOS.dp_tags, _texto(f"tag{i}")],
+                      [unidad, UrisOOS.dp_unit_label, _texto("Celsius")]]
+            enlaces.append([ds, UrisOOS.op_datastream_unit, unidad])
+        ontologia.insertarListaIndividuos(individuos)
+        ontologia.insertarListaDataProperty(datos)
+        ontologia.insertarListaObjectProperty(enlaces)
+    poblador = PobladorOOS()
+    with ontologia.transaccion():
+        for i in range(ecas):
+            poblador.poblarECA(eca(f"ECA{i}", f"user{i % usuarios}@x.com", f"obj{i % objetos}",
+                                   f"obj{(i + 1) % objetos}", "on" if i % 2 == 0 else "off"))
+    ontologia.compactar()
+    return settings.ONTOLOGIA_INSTANCIADA
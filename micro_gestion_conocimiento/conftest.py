@@ -6,6 +6,8 @@ from pathlib import Path
 # Añadir el directorio del proyecto al path para imports
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
+# Los módulos de la aplicación se importan relativos a app/ (igual que al ejecutar uvicorn desde ahí)
+sys.path.insert(0, str(project_root / "app"))
 
 # Configuración mínima de pytest
 import pytest
@@ -15,4 +17,76 @@ def temp_test_dir():
     """Fixture para directorio temporal de pruebas."""
     import tempfile
     with tempfile.TemporaryDirectory() as tmpdir:
-        yield tmpdir
\ No newline at end of file
+        yield tmpdir
+
+@pytest.fixture
+def ontologia_temporal(tmp_path, monkeypatch):
+    """Fixture que apunta la configuración a una copia temporal de la ontología base.
+
+    Retorna la ruta de la ontología instanciada (aún no creada) y limpia las
+    instancias compartidas de Ontologia antes y después de cada prueba.
+    """
+    import shutil
+    from config import settings
+    from infraestructure.acceso_ontologia.Ontologia import Ontologia
+    from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+
+    path_owl = tmp_path / "OWL"
+    (path_owl / "PU").mkdir(parents=True)
+    base = path_owl / "ontologiav18.owl"
+    shutil.copyfile(project_root / "app" / "infraestructure" / "OWL" / "ontologiav18.owl", base)
+    monkeypatch.setattr(settings, "PATH_OWL", str(path_owl) + "/")
+    monkeypatch.setattr(settings, "PATH_PU_OWL", str(path_owl / "PU") + "/")
+    monkeypatch.setattr(settings, "ONTOLOGIA", str(base))
+    monkeypatch.setattr(settings, "ONTOLOGIA_INSTANCIADA", str(path_owl / "ontologiaInstanciada.owl"))
+    Ontologia.descartarCompartidas()
+    pool.descartarTodas()
+    yield str(path_owl / "ontologiaInstanciada.owl")
+    Ontologia.descartarCompartidas()
+    pool.descartarTodas()
+
+
+def _eca(nombre, usuario, osidEvento, osidAccion, estado="on"):
+    return {
+        "name_eca": nombre, "state_eca": estado, "interest_entity_eca": "Ambiente", "user_eca": usuario,
+        "id_event_object": osidEvento, "ip_event_object": "192.168.1.10", "name_event_object": "Sensor " + osidEvento,
+        "id_event_resource": "temp", "name_event_resource": "Temperatura",
+        "comparator_condition": "mayor", "meaning_condition": "threshold", "unit_condition": "C",
+        "variable_condition": "30.5", "type_variable_condition": "float",
+        "id_action_object": osidAccion, "ip_action_object": "192.168.1.11", "name_action_object": "Actuador " + osidAccion,
+        "id_action_resource": "ventilador", "name_action_resource": "Ventilador",
+        "comparator_action": "igual", "unit_action": "state", "meaning_action": "turn_on",
+        "variable_action": "on", "type_variable_action": "string",
+    }
+
+def _objeto():
+    return {
+        "id": "obj1", "ip_object": "192.168.1.10", "version": "1.0", "creator": "Juan", "status": 1,
+        "tags": ["casa", "sala"], "title": "Sensor sala", "private": False, "description": "Objeto de prueba",
+        "updated": "2025-01-01", "website": "https://ejemplo.com", "feed": "https://ejemplo.com/feed",
+        "created": "2025-01-01", "name": "Sala", "domain": 1, "lat": 2.44, "lon": -76.6, "ele": 1760.0,
+    }
+
+def _recursos():
+    recursos = []
+    for ds, formato in (("temp", "float"), ("temp2", "float"), ("luz", "bool")):
+        recursos.append({
+            "datastream_id": ds, "datastream_format": formato, "datastream_type": "sensor",
+            "max_value": 50, "min_value": 0, "tags": [ds + "_tag"], "symbol": "C", "label": "Celsius",
+            "featureofinterest": "Ambiente", "entityofinterest": "Sala",
+        })
+    return recursos
+
+@pytest.fixture
+def ontologia_poblada(ontologia_temporal):
+    """Fixture con la ontología instanciada poblada: metadatos del objeto 'obj1',
+    datastreams 'temp', 'temp2' y 'luz', y reglas ECA cuyos nombres, usuarios y
+    osids son prefijos unos de otros (ECA1/ECA10, obj1/obj10)."""
+    from infraestructure.adaptadores.PobladorOOS import PobladorOOS
+
+    poblador = PobladorOOS()
+    assert poblador.poblarMetadatosObjeto(_objeto(), _recursos())
+    poblador.poblarECA(_eca("ECA1", "a@x.com", "obj1", "obj2"))
+    poblador.poblarECA(_eca("ECA10", "a@x.com.co", "obj10", "obj1", "off"))
+    poblador.poblarECA(_eca("ECA2", "b@x.com", "obj2", "obj1"))
+    yield ontologia_temporal
@@ -0,0 +1,68 @@
+# tests/unit/test_archivo_interacciones.py
+import os
+import shutil
+from datetime import datetime
+
+from config import settings
+from infraestructure.acceso_ontologia import ArchivoInteracciones
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+from infraestructure.adaptadores.ConsultasPerfilUsuario import ConsultasPerfilUsuario
+from infraestructure.adaptadores.PoblarPerfilUsuario import PoblarPerfilUsuario
+
+
+class TestArchivoInteracciones:
+    """Pruebas del archivo por meses de las interacciones de los perfiles."""
+
+    def test_archivar_y_consultar(self, ontologia_temporal):
+        """48. Las interacciones antiguas pasan al archivo mensual, quedan sus conteos y se pueden consultar."""
+        shutil.copyfile(settings.ONTOLOGIA, settings.PATH_PU_OWL + "mac1&a@x.com.owl")
+        poblador = PoblarPerfilUsuario("mac1", "a@x.com", "CARGAR")
+        assert poblador.registroInteraccionesUsuarioObjeto([
+            ("a@x.com", "relay", "on", "obj1", "15/01/25 10:00:00"),
+            ("a@x.com", "relay", "off", "obj1", "20/01/25 10:00:00"),
+            ("a@x.com", "luz", "on", "obj1", "Sat-Feb--1-09:30:00-2025"),
+            ("a@x.com", "relay", "on", "obj1", "01/06/25 08:00:00"),
+        ])
+        ontologia = poblador.ontologia
+        antes = len(ontologia.g)
+
+        assert ArchivoInteracciones.archivar(ontologia, 90, ahora=datetime(2025, 6, 2)) == 3
+        carpeta = ArchivoInteracciones.directorio(ontologia.path)
+        assert sorted(os.listdir(carpeta)) == ["2025-01.nt.gz", "2025-02.nt.gz"]
+        assert len(ontologia.g) < antes and ontologia.sinGuardar == 0
+        ## Nada más que archivar: no cambia nada
+        assert ArchivoInteracciones.archivar(ontologia, 90, ahora=datetime(2025, 6, 2)) == 0
+
+        consultas = ConsultasPerfilUsuario("mac1&a@x.com.owl")
+        vivas = consultas.consultarInteracciones(osid="obj1")
+        assert [i["fecha"] for i in vivas["interacciones"]] == ["01/06/25 08:00:00"]
+        assert vivas["archivadas"] == [{"osid": "obj1", "idDataStream": "luz", "archivadas": 1},
+                                       {"osid": "obj1", "idDataStream": "relay", "archivadas": 2}]
+        enero = consultas.consultarInteracciones(idDataStream="relay", desde=datetime(2025, 1, 1),
+                                                 hasta=datetime(2025, 1, 31), archivo=True)
+        assert [(i["comando"], i["fecha"]) for i in enero["interacciones"]] == [
+            ("on", "15/01/25 10:00:00"), ("off", "20/01/25 10:00:00")]
+        todas = consultas.consultarInteracciones(archivo=True)["interacciones"]
+        assert [i["idDataStream"] for i in todas] == ["relay", "relay", "luz", "relay"]
+
+        ## Los conteos se acumulan entre archivados y llegan al fichero del perfil
+        poblador.registroInteraccionUsuarioObjeto("a@x.com", "relay", "on", "obj1", "02/06/25 08:00:00")
+        assert ArchivoInteracciones.archivarPerfiles(0) == {"mac1&a@x.com.owl": 2}
+        pool.descartarTodas()
+        recargado = ConsultasPerfilUsuario("mac1&a@x.com.owl").consultarInteracciones(idDataStream="relay", archivo=True)
+        assert recargado["archivadas"] == [{"osid": "obj1", "idDataStream": "relay", "archivadas": 4}]
+        assert len(recargado["interacciones"]) == 4
+
+    def test_archivado_repetido_no_duplica_los_conteos(self, ontologia_temporal):
+        """56. Volver a archivar interacciones que ya están en el archivo (p.ej. reenviadas de nuevo) no las cuenta dos veces."""
+        shutil.copyfile(settings.ONTOLOGIA, settings.PATH_PU_OWL + "mac2&b@x.com.owl")
+        poblador = PoblarPerfilUsuario("mac2", "b@x.com", "CARGAR")
+        interacciones = [("b@x.com", "relay", "on", "obj2", "15/01/25 10:00:00"),
+                         ("b@x.com", "relay", "off", "obj2", "20/01/25 10:00:00")]
+        for _ in range(2):
+            poblador.registroInteraccionesUsuarioObjeto(interacciones)
+            assert ArchivoInteracciones.archivar(poblador.ontologia, 90, ahora=datetime(2025, 6, 2)) == 2
+
+        ontologia = poblador.ontologia
+        assert ArchivoInteracciones.conteos(ontologia.g) == [{"osid": "obj2", "idDataStream": "relay", "archivadas": 2}]
+        assert len(ArchivoInteracciones.listar(ArchivoInteracciones.leer(ontologia.path))) == 2
@@ -0,0 +1,60 @@
+# tests/unit/test_bitacora.py
+import os
+import shutil
+import rdflib
+from rdflib import URIRef, Literal
+
+from config import settings
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.util.UrisOOS import UrisOOS
+
+ECA = URIRef(UrisOOS.prefijo + "ECA1")
+ESTADO = URIRef(UrisOOS.dp_state_eca)
+
+
+class TestBitacora:
+    """Pruebas de la bitácora de escrituras de Ontologia."""
+
+    def test_escritura_no_reescribe_la_instantanea(self, ontologia_temporal):
+        """27. Una inserción se agrega a la bitácora sin reserializar el .owl."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        ontologia = Ontologia.compartida()
+        antes = os.stat(ontologia_temporal).st_mtime_ns
+
+        ontologia.insertarIndividuo(str(ECA), UrisOOS.clase_dinamic)
+        ontologia.insertarDataProperty(str(ECA), str(ESTADO), Literal("on"))
+
+        assert os.stat(ontologia_temporal).st_mtime_ns == antes
+        assert ontologia.bitacora.operaciones == 2
+        assert (ECA, ESTADO, Literal("on")) in ontologia.g
+
+    def test_reproduce_bitacora_al_reiniciar(self, ontologia_temporal):
+        """28. Un proceso nuevo recupera inserciones, actualizaciones y borrados de la bitácora."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        ontologia = Ontologia.compartida()
+        ontologia.insertarIndividuo(str(ECA), UrisOOS.clase_dinamic)
+        ontologia.insertarDataProperty(str(ECA), str(ESTADO), Literal("on"))
+        ontologia.actualizarDataProperty(str(ECA), str(ESTADO), "off")
+        ontologia.insertarIndividuo(UrisOOS.prefijo + "ECA2", UrisOOS.clase_dinamic)
+        ontologia.eliminarTodoIndividuo(UrisOOS.prefijo + "ECA2")
+
+        reiniciada = Ontologia(ontologia_temporal)
+        assert (ECA, ESTADO, Literal("off")) in reiniciada.g
+        assert (ECA, ESTADO, Literal("on")) not in reiniciada.g
+        assert (URIRef(UrisOOS.prefijo + "ECA2"), None, None) not in reiniciada.g
+        assert len(reiniciada.g) == len(ontologia.g)
+
+    def test_compactar_vuelca_bitacora_en_instantanea(self, ontologia_temporal, monkeypatch):
+        """29. Al superar el umbral la bitácora se compacta en el .owl y queda vacía."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        monkeypatch.setattr(settings, "BITACORA_MAX_OPERACIONES", 3)
+        ontologia = Ontologia.compartida()
+        for i in range(3):
+            ontologia.insertarIndividuo(UrisOOS.prefijo + f"ECA{i}", UrisOOS.clase_dinamic)
+
+        assert ontologia.bitacora.operaciones == 0
+        assert os.path.getsize(ontologia_temporal + ".bitacora") == 0
+        en_disco = rdflib.Graph()
+        en_disco.parse(ontologia_temporal)
+        assert (URIRef(UrisOOS.prefijo + "ECA2"), rdflib.RDF.type, URIRef(UrisOOS.clase_dinamic)) in en_disco
+        assert ontologia.compactar() is False
@@ -0,0 +1,58 @@
+# tests/unit/test_cambios.py
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.cambios import cambios_router
+from infraestructure.acceso_ontologia.Bitacora import AGREGAR
+from infraestructure.acceso_ontologia.Cambios import RegistroCambios
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+from infraestructure.util.UrisOOS import UrisOOS
+
+
+class TestCambios:
+    """Pruebas de la revisión y el historial de cambios de la ontología."""
+
+    def test_revisiones_y_sondeo_largo(self, ontologia_poblada):
+        """45. Cada transacción avanza la revisión, /ontology/changes entrega lo posterior y despierta al confirmar."""
+        ontologia = Ontologia.compartida()
+        consultas = ConsultasOOS()
+        app = FastAPI()
+        app.include_router(cambios_router)
+        with TestClient(app) as cliente:
+            inicial = cliente.get("/ontology/changes").json()
+            assert inicial["resincronizar"] and inicial["cambios"] == []
+            revision, epoca = inicial["revision"], inicial["epoca"]
+
+            consultas.setEcaState("off", "ECA1a@x.com")
+            ## Reescribir el mismo valor no es un cambio
+            consultas.setEcaState("off", "ECA1a@x.com")
+            respuesta = cliente.get("/ontology/changes", params={"since": revision, "epoca": epoca, "triples": True}).json()
+            assert respuesta["revision"] == revision + 1 and not respuesta["resincronizar"]
+            [cambio] = respuesta["cambios"]
+            assert cambio["individuos"] == [UrisOOS.prefijo + "ECA1a@x.com"]
+            assert sorted(op for op, *_ in cambio["triples"]) == ["+", "-"]
+            assert cliente.get("/ontology/changes", params={"since": revision, "epoca": "otra"}).json()["resincronizar"]
+
+            ## Sin cambios posteriores la peticion espera hasta que se confirme una revision
+            def escribir():
+                time.sleep(0.3)
+                ontologia.actualizarDataProperty(UrisOOS.prefijo + "Estado", UrisOOS.dp_title, "Sensor patio")
+            escritor = threading.Thread(target=escribir)
+            escritor.start()
+            inicio = time.monotonic()
+            respuesta = cliente.get("/ontology/changes", params={"since": revision + 1, "espera": 10}).json()
+            escritor.join()
+            assert time.monotonic() - inicio < 5
+            assert [c["individuos"] for c in respuesta["cambios"]] == [[UrisOOS.prefijo + "Estado"]]
+
+            ## Una recarga desde disco invalida el historial anterior
+            ontologia.cargarGrafoOntologia()
+            assert cliente.get("/ontology/changes", params={"since": revision + 2}).json()["resincronizar"]
+
+        registro = RegistroCambios(maxRevisiones=2)
+        for n in range(3):
+            registro.registrar([(AGREGAR, ("s%d" % n, "p", "o"))])
+        assert registro.desde(0)[1] is None and [r for r, _ in registro.desde(1)[1]] == [2, 3]
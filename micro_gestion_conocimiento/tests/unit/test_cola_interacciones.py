@@ -0,0 +1,48 @@
+# tests/unit/test_cola_interacciones.py
+import shutil
+import time
+from rdflib import RDF, URIRef
+
+from config import settings
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+from infraestructure.adaptadores.ColaInteracciones import ColaInteracciones
+from infraestructure.util import UrisPu
+
+TIPO = URIRef(UrisPu.individuoShedule_Interaction)
+
+
+class TestColaInteracciones:
+    """Pruebas de la cola de ingesta de interacciones usuario-objeto."""
+
+    def test_lotes_limite_y_cierre(self, ontologia_temporal):
+        """47. La cola escribe las interacciones por lotes de cada perfil, rechaza al llenarse y vacía al cerrar."""
+        perfil = settings.PATH_PU_OWL + "mac1&a@x.com.owl"
+        shutil.copyfile(settings.ONTOLOGIA, perfil)
+        cola = ColaInteracciones(maxPendientes=3, maxLote=2, intervalo=60)
+
+        ## Un lote completo se escribe en una transacción sin esperar el intervalo
+        assert cola.encolar("mac1", "a@x.com", "relay", "on", "obj1", "01/01/25-10:00:00")
+        assert cola.encolar("mac1", "a@x.com", "relay", "off", "obj1", "01/01/25-10:00:01")
+        for _ in range(200):
+            if cola.metricas()["registradas"] == 2:
+                break
+            time.sleep(0.01)
+        metricas = cola.metricas()
+        assert metricas["registradas"] == 2 and metricas["lotes"] == 1 and metricas["pendientes"] == 0
+
+        ## Incompletos esperan el intervalo; la cola acotada rechaza el excedente
+        assert cola.encolar("mac1", "a@x.com", "luz", "on", "obj1", "01/01/25-10:00:02")
+        assert cola.encolar("mac2", "b@x.com", "luz", "on", "obj1", "01/01/25-10:00:03")
+        assert cola.encolar("mac3", "c@x.com", "luz", "on", "obj1", "01/01/25-10:00:04")
+        assert not cola.encolar("mac1", "a@x.com", "luz", "off", "obj1", "01/01/25-10:00:05")
+        metricas = cola.metricas()
+        assert metricas["pendientes"] == 3 and metricas["perfiles"] == 3 and metricas["rechazadas"] == 1
+
+        ## Al cerrar se escriben todos; sin su perfil (ni UsuarioActual.owl) fallan sin perder los demás
+        cola.cerrar()
+        metricas = cola.metricas()
+        assert metricas["pendientes"] == 0 and metricas["registradas"] == 3 and metricas["fallidas"] == 2
+        grafo = pool.obtener(perfil).g
+        assert len(list(grafo.subjects(RDF.type, TIPO))) == 3
+        assert cola.encolar("mac1", "a@x.com", "luz", "off", "obj1", "01/01/25-10:00:05")
+        cola.cerrar()
@@ -0,0 +1,83 @@
+# tests/unit/test_concurrencia.py
+import os
+import threading
+import time
+import traceback
+from rdflib import BNode, URIRef
+
+from conftest import _eca
+from config import settings
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+from infraestructure.adaptadores.PobladorOOS import PobladorOOS
+from infraestructure.util.UrisOOS import UrisOOS
+
+DURACION = 1.5
+
+
+class TestConcurrencia:
+    """Pruebas de carga mixta de consultas y escrituras desde varios hilos."""
+
+    def test_lectores_y_escritores_concurrentes(self, ontologia_poblada, monkeypatch):
+        """42. Consultas, transacciones, compactaciones y recargas simultáneas no se pisan."""
+        ##Bitacora pequeña para que las compactaciones ocurran durante la prueba
+        monkeypatch.setattr(settings, "BITACORA_MAX_OPERACIONES", 25)
+        ontologia = Ontologia.compartida()
+        consultas = ConsultasOOS()
+        errores = []
+        lecturas = []
+        fin = time.monotonic() + DURACION
+
+        def hilo(trabajo):
+            def ejecutar():
+                try:
+                    while time.monotonic() < fin:
+                        trabajo()
+                except Exception:
+                    errores.append(traceback.format_exc())
+            return threading.Thread(target=ejecutar)
+
+        def leer():
+            ##Las dos reglas cambian de estado en la misma transaccion: nunca se ven distintas
+            with ontologia.lock.lectura():
+                estados = {consultas.getEca(nombre)["eca_state"] for nombre in ("ECA1", "ECA2")}
+            assert len(estados) == 1, estados
+            assert consultas.consultarTagsObjeto() == [b"casa", b"sala"]
+            assert consultas.consultarDataStreamFormatPorId("temp") == [[b"temp", b"float"]]
+            nombres = {eca["name_eca"] for eca in consultas.listarEcas()}
+            assert {"ECA1", "ECA10", "ECA2"} <= nombres
+            lecturas.append(1)
+
+        def cambiarEstados():
+            estado = "off" if consultas.getEca("ECA1")["eca_state"] == "on" else "on"
+            with ontologia.transaccion():
+                consultas.setEcaState(estado, "ECA1a@x.com")
+                consultas.setEcaState(estado, "ECA2b@x.com")
+
+        def poblarYEliminar(usuario):
+            def trabajo():
+                PobladorOOS().poblarECA(_eca("ECAW", usuario, "obj5", "obj6"))
+                assert consultas.getEca("ECAW")["name_eca"] == "ECAW"
+                consultas.eliminarEca("ECAW" + usuario)
+            return trabajo
+
+        def recargar():
+            ##Otro escritor toca el fichero: la siguiente consulta recarga el grafo
+            time.sleep(0.2)
+            os.utime(ontologia_poblada)
+
+        hilos = [hilo(leer) for _ in range(6)]
+        hilos += [hilo(cambiarEstados), hilo(poblarYEliminar("w1@x.com")), hilo(poblarYEliminar("w2@x.com")),
+                  hilo(recargar)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        assert errores == [], "\n".join(errores)
+        assert lecturas
+        ontologia.compactar()
+        enDisco = Ontologia(ontologia_poblada)
+        sinNodosAnonimos = lambda g: {t for t in g if not any(isinstance(x, BNode) for x in t)}
+        assert sinNodosAnonimos(enDisco.g) == sinNodosAnonimos(ontologia.g)
+        assert (URIRef(UrisOOS.prefijo + "ECAWw1@x.com"), None, None) not in ontologia.g
@@ -0,0 +1,51 @@
+# tests/unit/test_consultas_indexadas.py
+from rdflib import Literal, URIRef, XSD
+
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+from infraestructure.util.UrisOOS import UrisOOS
+
+
+class TestConsultasIndexadas:
+    """Pruebas de las consultas por igualdad exacta sobre los índices del grafo."""
+
+    def test_ids_prefijo_de_otros_no_se_mezclan(self, ontologia_poblada):
+        """35. ECA1/ECA10, temp/temp2, obj1/obj10 y a@x.com/a@x.com.co se distinguen."""
+        consultas = ConsultasOOS()
+        assert consultas.estadoEca("ECA1") == [{"eca_state": "on", "name_eca": "ECA1"}]
+        assert consultas.usuarioEca("ECA1") == [{"user_eca": "a@x.com", "name_eca": "ECA1"}]
+        assert [e["name_eca"] for e in consultas.listarEcasUsuario("a@x.com")] == ["ECA1"]
+        assert consultas.listarNombresEcasUsuario("a@x.com") == [[b"ECA1", b"on"]]
+        assert consultas.consultarTagsDatastream("temp") == [[b"temp_tag"]]
+        assert consultas.consultarDataStreamFormatPorId("temp") == [[b"temp", b"float"]]
+        assert [c["id"] for c in consultas.tieneContrato("obj1")] == ["obj1", "obj1"]
+        assert [e["name_eca"] for e in consultas.listarEcasEvento("obj1", "on")] == ["ECA1"]
+        assert consultas.estadoEca("ECA") == []
+
+    def test_resultados_iguales_a_sparql(self, ontologia_poblada):
+        """36. Las reglas ECA recorridas por índices coinciden con la consulta SPARQL equivalente."""
+        consultas = ConsultasOOS()
+        sparql = consultas.ontologia.consultaDataProperty("""PREFIX : <http://semanticsearchiot.net/sswot/Ontologies#>
+            SELECT DISTINCT ?name_eca ?eca_state ?user_eca ?osid_event ?osid_action ?variable_action
+            WHERE { ?eca :name_eca ?name_eca; :state_eca ?eca_state; :user_eca ?user_eca; :StartsWith ?evento.
+                    ?evento :id_event_object ?osid_event; :Check ?condicion.
+                    ?condicion :isRelatedWith ?accion.
+                    ?accion :id_action_object ?osid_action; :variable_action ?variable_action. }""")
+        esperado = {tuple(v.decode() for v in fila) for fila in sparql}
+        obtenido = {(e["name_eca"], e["eca_state"], e["user_eca"], e["osid_object_event"],
+                     e["osid_object_action"], e["variable_action"]) for e in consultas.listarEcas()}
+        assert obtenido == esperado and len(obtenido) == 3
+        assert consultas.getEca("ECA10")["osid_object_event"] == "obj10"
+        contrato = consultas.verificarContrato("obj2", "obj1")
+        assert [(c["name_eca"], c["osid"], c["osidDestino"]) for c in contrato] == [("ECA2", "obj2", "obj1")]
+
+    def test_literales_simples_y_xsd_string(self, ontologia_poblada):
+        """37. La búsqueda encuentra el valor tanto como literal simple como xsd:string (owlready2)."""
+        ontologia = Ontologia.compartida()
+        eca = URIRef(UrisOOS.prefijo + "ECA2b@x.com")
+        assert (eca, URIRef(UrisOOS.dp_name_eca), Literal("ECA2")) in ontologia.g
+        ontologia.actualizarDataProperty(str(eca), UrisOOS.dp_name_eca, Literal("ECA2", datatype=XSD.string))
+        assert ConsultasOOS().estadoEca("ECA2") == [{"eca_state": "on", "name_eca": "ECA2"}]
+        datastream_id = Literal("temp", datatype=XSD.string)
+        assert next(ontologia.g.subjects(URIRef(UrisOOS.dp_datastream_id), datastream_id), None) is not None
+        assert ConsultasOOS().consultarDataStreamFormatPorId("temp") == [[b"temp", b"float"]]
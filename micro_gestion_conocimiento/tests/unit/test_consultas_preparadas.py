@@ -0,0 +1,23 @@
+# tests/unit/test_consultas_preparadas.py
+from infraestructure.acceso_ontologia import ConsultasPreparadas
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+
+
+class TestConsultasPreparadas:
+    """Pruebas del registro de consultas SPARQL preparadas."""
+
+    def test_consulta_se_prepara_una_vez(self, ontologia_poblada):
+        """33. El mismo texto de consulta se prepara una sola vez y se reutiliza."""
+        ConsultasPreparadas.limpiar()
+        consultas = ConsultasOOS()
+        assert consultas.consultarTagsObjeto() == [b"casa", b"sala"]
+        registradas = ConsultasPreparadas.registradas()
+        consultas.consultarTagsObjeto()
+        consultas.consultarTagsTodosDatastreams()
+        assert ConsultasPreparadas.registradas() == registradas + 1
+
+    def test_parametros_no_se_interpretan_como_sparql(self, ontologia_poblada):
+        """34. Un identificador con comillas y llaves no altera la consulta."""
+        consultas = ConsultasOOS()
+        assert consultas.listarEcasUsuario("b@x.com' } UNION { ?s ?p ?o } #") == []
+        assert consultas.estadoEca("\"} #") == []
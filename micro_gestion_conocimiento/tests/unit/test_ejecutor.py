@@ -0,0 +1,54 @@
+# tests/unit/test_ejecutor.py
+import asyncio
+import threading
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api.ejecutor import Ejecutor
+
+
+class TestEjecutor:
+    """Pruebas de los ejecutores de las llamadas bloqueantes de la API."""
+
+    def test_cola_acotada_timeout_y_metricas(self):
+        """43. Con la cola llena responde 503, al agotar el tiempo 504, y el endpoint conserva sus dependencias."""
+        ejecutor = Ejecutor("prueba", 1, maxEspera=1, timeout=0.2)
+        liberar = threading.Event()
+
+        async def saturar():
+            ocupado = asyncio.ensure_future(ejecutor.ejecutar(liberar.wait, 5))
+            await asyncio.sleep(0.05)
+            enCola = asyncio.ensure_future(ejecutor.ejecutar(lambda: "tarde"))
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as rechazo:
+                await ejecutor.ejecutar(lambda: "rechazada")
+            assert rechazo.value.status_code == 503 and rechazo.value.headers["Retry-After"] == "1"
+            for tarea in (ocupado, enCola):
+                with pytest.raises(HTTPException) as expirada:
+                    await tarea
+                assert expirada.value.status_code == 504
+            liberar.set()
+            return await ejecutor.ejecutar(lambda: "libre")
+
+        try:
+            assert asyncio.run(saturar()) == "libre"
+        finally:
+            liberar.set()
+            ejecutor.cerrar()
+        metricas = ejecutor.metricas()
+        assert metricas["aceptadas"] == 3 and metricas["rechazadas"] == 1 and metricas["expiradas"] == 2
+        assert metricas["completadas"] == 2 and metricas["en_cola"] == 0 and metricas["ejecutando"] == 0
+        assert metricas["ejecucion_max_ms"] >= 200
+
+        hilos = []
+        app = FastAPI()
+        @app.get("/eco")
+        @ejecutor.despachar
+        def eco(texto: str, prefijo: str = Depends(lambda: ">")) -> str:
+            hilos.append(threading.current_thread().name)
+            return prefijo + texto
+        with TestClient(app) as cliente:
+            assert cliente.get("/eco", params={"texto": "hola"}).json() == ">hola"
+            assert cliente.get("/eco").status_code == 422
+        assert hilos == ["ejecutor-prueba_0"]
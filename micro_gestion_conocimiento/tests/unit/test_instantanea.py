@@ -0,0 +1,48 @@
+# tests/unit/test_instantanea.py
+import os
+import shutil
+import rdflib
+from rdflib import URIRef, Literal
+
+from config import settings
+from infraestructure.acceso_ontologia import Instantanea
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.util.UrisOOS import UrisOOS
+
+ECA = URIRef(UrisOOS.prefijo + "ECA1")
+ESTADO = URIRef(UrisOOS.dp_state_eca)
+
+
+class TestInstantanea:
+    """Pruebas de la instantánea binaria de las ontologías."""
+
+    def test_instantanea_se_reutiliza_y_se_invalida(self, ontologia_temporal, monkeypatch):
+        """40. El .owl.bin evita el parseo mientras el .owl no cambia y se descarta si cambia o está dañado."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        ontologia = Ontologia.compartida()
+        ontologia.insertarIndividuo(str(ECA), UrisOOS.clase_dinamic)
+        ontologia.insertarDataProperty(str(ECA), str(ESTADO), Literal("on"))
+        ontologia.compactar()
+        binario = ontologia_temporal + Instantanea.EXTENSION
+        assert os.path.exists(binario)
+
+        parseo = rdflib.Graph.parse
+        def sinParseo(*args, **kwargs):
+            raise AssertionError("se parseó el RDF/XML")
+        monkeypatch.setattr(rdflib.Graph, "parse", sinParseo)
+        grafo = Instantanea.cargar(ontologia_temporal)
+        assert (ECA, ESTADO, Literal("on")) in grafo
+        assert len(grafo) == len(ontologia.g)
+
+        ## Otro proceso reescribe el .owl: la firma ya no coincide y se vuelve a parsear
+        monkeypatch.setattr(rdflib.Graph, "parse", parseo)
+        ontologia.g.remove((ECA, ESTADO, None))
+        ontologia.g.serialize(destination=ontologia_temporal, format='xml')
+        assert (ECA, ESTADO, Literal("on")) not in Instantanea.cargar(ontologia_temporal)
+
+        with open(binario, "r+b") as fichero:
+            fichero.seek(os.path.getsize(binario) // 2)
+            fichero.write(b"\x00" * 64)
+        assert (ECA, None, None) in Instantanea.cargar(ontologia_temporal)
+        monkeypatch.setattr(rdflib.Graph, "parse", sinParseo)
+        assert (ECA, None, None) in Instantanea.cargar(ontologia_temporal)
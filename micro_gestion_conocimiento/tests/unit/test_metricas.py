@@ -0,0 +1,45 @@
+# tests/unit/test_metricas.py
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metricas import TIPO_CONTENIDO, metricas_router
+from config import settings
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.acceso_ontologia.Perfilador import perfilador
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+
+
+class TestMetricas:
+    """Pruebas del perfilado de las consultas y de GET /metrics."""
+
+    def test_perfil_por_consulta_y_consultas_lentas(self, ontologia_poblada, monkeypatch, caplog):
+        """53. Cada consulta se anota por método, las lentas van al log y /metrics las expone con las ontologías."""
+        perfilador.reiniciar()
+        monkeypatch.setattr(settings, "CONSULTA_LENTA_SEGUNDOS", 1e-9)
+        with caplog.at_level(logging.WARNING):
+            assert ConsultasOOS().consultarId() == "obj1"
+        lentas = [r.getMessage() for r in caplog.records if "Consulta lenta" in r.getMessage()]
+        assert lentas and "ConsultasOOS.consultarId (select)" in lentas[0] and "oos:id_object ?id" in lentas[0]
+
+        monkeypatch.setattr(settings, "CONSULTA_LENTA_SEGUNDOS", 0)
+        Ontologia.compartida().guardarGrafoOntologia()
+        app = FastAPI()
+        app.include_router(metricas_router)
+        respuesta = TestClient(app).get("/metrics")
+        assert respuesta.status_code == 200 and respuesta.headers["content-type"] == TIPO_CONTENIDO
+        lineas = respuesta.text.splitlines()
+        etiquetas = '{operacion="select",consulta="ConsultasOOS.consultarId"}'
+        assert f"ontologia_consulta_segundos_count{etiquetas} 1" in lineas
+        assert f"ontologia_consulta_filas_total{etiquetas} 1" in lineas
+        assert f"ontologia_consulta_lentas_total{etiquetas} 1" in lineas
+        assert '# TYPE ontologia_consulta_segundos histogram' in lineas
+        assert any(l.startswith('ontologia_consulta_segundos_bucket{operacion="select",consulta="ConsultasOOS.consultarId",le="+Inf"} 1')
+                   for l in lineas)
+        assert any(l.startswith('ontologia_persistencia_segundos_count{operacion="serializacion",ontologia="oos"}')
+                   for l in lineas)
+        triples = len(Ontologia.compartida().g)
+        assert f'ontologia_triples{{ontologia="ontologiaInstanciada.owl"}} {triples}' in lineas
+        assert any(l.startswith('ejecutor_aceptadas{ejecutor="consultas"}') for l in lineas)
+        assert any(l.startswith("pool_perfiles_") for l in lineas)
+        assert any(l.startswith("cola_interacciones_") for l in lineas)
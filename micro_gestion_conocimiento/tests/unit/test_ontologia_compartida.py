@@ -0,0 +1,53 @@
+# tests/unit/test_ontologia_compartida.py
+import shutil
+import rdflib
+from rdflib import URIRef, Literal
+
+from config import settings
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.util.UrisOOS import UrisOOS
+
+
+class TestOntologiaCompartida:
+    """Pruebas del grafo compartido por proceso."""
+
+    def test_misma_instancia_por_ruta(self, ontologia_temporal):
+        """24. compartida() reutiliza el grafo en lugar de parsear de nuevo."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        primera = Ontologia.compartida()
+        segunda = Ontologia.compartida(ontologia_temporal)
+        assert primera is segunda
+        assert primera.refrescarSiCambio() is False
+
+    def test_refresca_si_otro_escritor_modifica_el_fichero(self, ontologia_temporal):
+        """25. El grafo compartido se recarga solo cuando cambia el fichero."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        ontologia = Ontologia.compartida()
+        query = """PREFIX oos: <http://semanticsearchiot.net/sswot/Ontologies#>
+                   SELECT ?id WHERE { ?e oos:id_object ?id . }"""
+        assert ontologia.consultaDataProperty(query) == []
+
+        # Otro escritor (p.ej. owlready2) reescribe el fichero
+        externo = rdflib.Graph()
+        externo.parse(ontologia_temporal)
+        externo.add((URIRef(UrisOOS.prefijo + "Objeto"), URIRef(UrisOOS.dp_id_objeto), Literal("obj1")))
+        externo.serialize(destination=ontologia_temporal, format="xml")
+
+        assert ontologia.consultaDataProperty(query) == [[b"obj1"]]
+
+    def test_escritura_no_pisa_cambios_externos(self, ontologia_temporal):
+        """26. Una inserción parte del fichero vigente y no de un grafo obsoleto."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        ontologia = Ontologia.compartida()
+
+        externo = rdflib.Graph()
+        externo.parse(ontologia_temporal)
+        externo.add((URIRef(UrisOOS.prefijo + "Objeto"), URIRef(UrisOOS.dp_id_objeto), Literal("obj1")))
+        externo.serialize(destination=ontologia_temporal, format="xml")
+
+        ontologia.insertarIndividuo(UrisOOS.prefijo + "ECA1", UrisOOS.clase_dinamic)
+
+        ## Instantanea + bitacora, tal como la veria otro proceso al arrancar
+        en_disco = Ontologia(ontologia_temporal).g
+        assert (URIRef(UrisOOS.prefijo + "Objeto"), URIRef(UrisOOS.dp_id_objeto), Literal("obj1")) in en_disco
+        assert (URIRef(UrisOOS.prefijo + "ECA1"), rdflib.RDF.type, URIRef(UrisOOS.clase_dinamic)) in en_disco
@@ -0,0 +1,82 @@
+# tests/unit/test_poblador_oos.py
+import os
+
+from rdflib import URIRef
+
+from conftest import _eca, _objeto, _recursos
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.acceso_ontologia.VistaObjeto import VistaObjeto
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+from infraestructure.adaptadores.PobladorOOS import PobladorOOS, _literal
+from infraestructure.util.UrisOOS import UrisOOS
+
+
+class TestPobladorOOS:
+    """Pruebas del poblado sobre el grafo compartido con las consultas."""
+
+    def test_poblado_y_edicion_sin_reescribir_el_fichero(self, ontologia_poblada):
+        """41. Repoblar metadatos y editar una ECA se ven en las consultas sin reserializar el .owl."""
+        consultas = ConsultasOOS()
+        assert consultas.getEca("ECA1")["eca_state"] == "on"
+        filas = consultas.vistaEcas._filas
+        antes = os.stat(ontologia_poblada).st_mtime_ns
+
+        poblador = PobladorOOS()
+        objeto = {
+            "id": "obj1", "version": "2.0", "creator": "Ana", "status": 1, "tags": ["patio"], "title": "Sensor patio",
+            "private": True, "description": "Repoblado", "updated": "2025-02-01", "website": "https://ejemplo.com",
+            "feed": "https://ejemplo.com/feed", "created": "2025-01-01", "name": "Patio", "domain": 1,
+            "lat": 2.5, "lon": -76.5, "ele": 1700.0,
+        }
+        recurso = {
+            "datastream_id": "temp", "datastream_format": "int", "datastream_type": "sensor", "max_value": 40,
+            "min_value": 5, "tags": ["nuevo"], "symbol": "C", "label": "Celsius",
+            "featureofinterest": "Ambiente", "entityofinterest": "Patio",
+        }
+        assert poblador.poblarMetadatosObjeto(objeto, [recurso])
+        assert poblador.editarECA({"name_eca": "ECA1", "user_eca": "a@x.com", "state_eca": "off"})
+        assert not poblador.editarECA({"name_eca": "ECA9", "user_eca": "a@x.com", "state_eca": "off"})
+
+        assert consultas.consultarTitle() == b"Sensor patio"
+        assert consultas.consultarTagsObjeto() == [b"casa", b"sala", b"patio"]
+        assert consultas.consultarDataStreamFormatPorId("temp") == [[b"temp", b"int"]]
+        assert consultas.consultarTagsDatastream("temp") == [[b"nuevo"]]
+        assert consultas.getEca("ECA1")["eca_state"] == "off"
+        assert consultas.vistaEcas._filas is filas
+        assert os.stat(ontologia_poblada).st_mtime_ns == antes
+
+        ## Un metadato inválido no deja el objeto a medio poblar
+        del objeto["title"]
+        assert not poblador.poblarMetadatosObjeto(dict(objeto, id="obj9"), [])
+        assert consultas.consultarId() == "obj1"
+
+    def test_repoblado_solo_escribe_la_diferencia(self, ontologia_poblada):
+        """52. Repoblar con el mismo feed no cambia nada y con otro feed solo cambian las tripletas distintas."""
+        ontologia = Ontologia.compartida()
+        vista = VistaObjeto.de(ontologia)
+        etag = vista.obtener()[0]
+        antes = set(ontologia.g)
+        operaciones = ontologia.bitacora.operaciones
+
+        assert PobladorOOS().poblarMetadatosObjeto(_objeto(), _recursos())
+        assert set(ontologia.g) == antes and ontologia.bitacora.operaciones == operaciones
+        assert vista.obtener()[0] == etag
+
+        ## Una propiedad ajena en la unidad desaparece, como al destruir y recrear el datastream
+        unidad = UrisOOS.prefijo + "temp_unidad"
+        ontologia.insertarDataProperty(unidad, UrisOOS.dp_unit_symbol, _literal("X"))
+        antes = set(ontologia.g)
+        operaciones = ontologia.bitacora.operaciones
+        objeto = dict(_objeto(), title="Sensor comedor")
+        recursos = _recursos()
+        recursos[0].update(max_value=60, tags=["otro"])
+        assert PobladorOOS().poblarMetadatosObjeto(objeto, recursos[:1])
+
+        estado, temp = URIRef(UrisOOS.prefijo + "Estado"), URIRef(UrisOOS.prefijo + "temp")
+        assert set(ontologia.g) ^ antes == {
+            (estado, URIRef(UrisOOS.dp_title), _literal("Sensor sala")), (estado, URIRef(UrisOOS.dp_title), _literal("Sensor comedor")),
+            (temp, URIRef(UrisOOS.dp_max_value), _literal("50")), (temp, URIRef(UrisOOS.dp_max_value), _literal("60")),
+            (temp, URIRef(UrisOOS.dp_tags), _literal("temp_tag")), (temp, URIRef(UrisOOS.dp_tags), _literal("otro")),
+            (URIRef(unidad), URIRef(UrisOOS.dp_unit_symbol), _literal("X"))}
+        assert ontologia.bitacora.operaciones == operaciones + 7
+        assert vista.obtener()[0] != etag
@@ -0,0 +1,108 @@
+# tests/unit/test_pool_perfiles.py
+import os
+import shutil
+import threading
+import rdflib
+from rdflib import Literal, URIRef
+
+from config import settings
+from infraestructure.acceso_ontologia import PoolOntologiasPU as modulo_pool
+from infraestructure.acceso_ontologia.PoolOntologiasPU import BYTES_POR_TRIPLE, PoolOntologiasPU
+from infraestructure.util.UrisOOS import UrisOOS
+
+ECA = URIRef(UrisOOS.prefijo + "ECA1")
+ESTADO = URIRef(UrisOOS.dp_state_eca)
+
+
+class TestPoolPerfiles:
+    """Pruebas del pool de ontologías de perfil de usuario."""
+
+    def test_lru_escritura_diferida_y_recarga(self, ontologia_temporal):
+        """46. El pool reutiliza los perfiles, escribe los cambios al desalojar y recarga si el fichero cambia."""
+        perfiles = []
+        for nombre in ("a", "b", "c"):
+            path = settings.PATH_PU_OWL + nombre + ".owl"
+            shutil.copyfile(settings.ONTOLOGIA, path)
+            perfiles.append(path)
+        a, b, c = perfiles
+        pool = PoolOntologiasPU(maxOntologias=2)
+
+        perfilA = pool.obtener(a)
+        assert pool.obtener(a) is perfilA
+        antes = os.stat(a).st_mtime_ns
+        perfilA.insertarDataProperty(str(ECA), str(ESTADO), Literal("on"))
+        assert perfilA.sinGuardar == 1 and os.stat(a).st_mtime_ns == antes
+
+        ## Al cargar un tercer perfil se desaloja el menos usado, escribiendo sus cambios
+        pool.obtener(b)
+        pool.obtener(c)
+        assert (ECA, ESTADO, Literal("on")) in rdflib.Graph().parse(a)
+        assert not perfilA.diferido
+        metricas = pool.metricas()
+        assert metricas["ontologias"] == 2 and metricas["desalojos"] == 1 and metricas["escrituras"] == 1
+        assert metricas["aciertos"] == 1 and metricas["fallos"] == 3
+        assert metricas["memoria_estimada_bytes"] == metricas["triples"] * BYTES_POR_TRIPLE
+
+        ## Otro escritor reemplaza el fichero: se vuelve a cargar
+        perfilC = pool.obtener(c)
+        shutil.copyfile(a, c)
+        assert (ECA, ESTADO, None) in pool.obtener(c).g
+        assert pool.obtener(c) is not perfilC and pool.metricas()["recargas"] == 1
+
+        ## Acotado por triples: solo cabe el más reciente
+        pequeño = PoolOntologiasPU(maxTriples=len(perfilC.g) + 1)
+        pequeño.obtener(a)
+        pequeño.obtener(b)
+        assert pequeño.metricas()["ontologias"] == 1
+
+    def test_instancia_descartada_no_pisa_el_fichero_reemplazado(self, ontologia_temporal):
+        """54. Una transacción de un perfil ya reemplazado en disco descarta sus cambios y no deja temporales."""
+        path = settings.PATH_PU_OWL + "subido.owl"
+        shutil.copyfile(settings.ONTOLOGIA, path)
+        pool = PoolOntologiasPU()
+        perfil = pool.obtener(path)
+        pool.descartar(path)
+
+        ## Se sube otra ontología mientras una petición aún usa la instancia descartada
+        subida = rdflib.Graph().parse(settings.ONTOLOGIA)
+        subida.add((ECA, ESTADO, Literal("subida")))
+        subida.serialize(destination=path, format="xml")
+        perfil.insertarDataProperty(str(ECA), str(ESTADO), Literal("on"))
+
+        leida = rdflib.Graph().parse(path)
+        assert (ECA, ESTADO, Literal("subida")) in leida and (ECA, ESTADO, Literal("on")) not in leida
+        assert perfil.sinGuardar == 0
+        assert not [nombre for nombre in os.listdir(settings.PATH_PU_OWL) if nombre.endswith(".tmp")]
+
+    def test_carga_fuera_del_cerrojo_del_pool(self, ontologia_temporal, monkeypatch):
+        """55. Mientras se parsea un perfil el pool atiende otras rutas y quien pide la misma espera a esa carga."""
+        lento, rapido = settings.PATH_PU_OWL + "lento.owl", settings.PATH_PU_OWL + "rapido.owl"
+        for path in (lento, rapido):
+            shutil.copyfile(settings.ONTOLOGIA, path)
+        pool = PoolOntologiasPU()
+        cargando, seguir, cargas = threading.Event(), threading.Event(), []
+        original = modulo_pool.OntologiaPU
+
+        def cargar(path):
+            cargas.append(path)
+            if path == os.path.abspath(lento):
+                cargando.set()
+                seguir.wait(5)
+            return original(path)
+
+        monkeypatch.setattr(modulo_pool, "OntologiaPU", cargar)
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(pool.obtener(lento))) for _ in range(2)]
+        hilos[0].start()
+        assert cargando.wait(5)
+        hilos[1].start()
+        otro = threading.Thread(target=pool.obtener, args=(rapido,))
+        otro.start()
+        otro.join(2)
+        assert not otro.is_alive()  ## No espera al parseo del otro perfil
+        seguir.set()
+        for hilo in hilos:
+            hilo.join(5)
+
+        assert len(resultados) == 2 and resultados[0] is resultados[1]
+        assert cargas.count(os.path.abspath(lento)) == 1
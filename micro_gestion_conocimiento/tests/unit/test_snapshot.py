@@ -0,0 +1,43 @@
+# tests/unit/test_snapshot.py
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.consultas import ontologia_router
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+from infraestructure.util.UrisOOS import UrisOOS
+
+
+class TestSnapshot:
+    """Pruebas de la instantánea de metadatos del objeto con ETag."""
+
+    def test_snapshot_con_etag(self, ontologia_poblada):
+        """44. El snapshot reúne los metadatos, responde 304 con su ETag y solo cambia si cambian esos individuos."""
+        consultas = ConsultasOOS()
+        etag, cuerpo = consultas.consultarSnapshot()
+        datos = json.loads(cuerpo)
+        assert datos["object"] == {"id": "obj1", "ip_object": "192.168.1.10"}
+        assert datos["state"]["title"] == "Sensor sala" and datos["state"]["private"] is False
+        assert datos["state"]["tags"] == ["casa", "sala"]
+        assert datos["location"] == {"lon": -76.6, "lat": 2.44, "name": "Sala", "domain": 1, "ele": 1760.0}
+        assert [d["datastream_id"] for d in datos["datastreams"]] == ["luz", "temp", "temp2"]
+        assert datos["datastreams"][1]["tags"] == ["temp_tag"] and datos["datastreams"][1]["unit"] == {"label": "Celsius"}
+
+        ## Cambiar una regla ECA no invalida la instantánea
+        consultas.setEcaState("off", "ECA1a@x.com")
+        assert consultas.consultarSnapshot()[1] is cuerpo
+
+        app = FastAPI()
+        app.include_router(ontologia_router)
+        with TestClient(app) as cliente:
+            respuesta = cliente.get("/ontology/consultas/snapshot")
+            assert respuesta.status_code == 200 and respuesta.headers["etag"] == etag
+            assert respuesta.json() == datos
+            noModificado = cliente.get("/ontology/consultas/snapshot", headers={"If-None-Match": 'W/"x", ' + etag})
+            assert noModificado.status_code == 304 and noModificado.content == b""
+
+            ## Cambiar el State sí: nuevo ETag, y el anterior ya no produce 304
+            consultas.ontologia.actualizarDataProperty(UrisOOS.prefijo + "Estado", UrisOOS.dp_title, "Sensor patio")
+            cambiado = cliente.get("/ontology/consultas/snapshot", headers={"If-None-Match": etag})
+            assert cambiado.status_code == 200 and cambiado.headers["etag"] != etag
+            assert cambiado.json()["state"]["title"] == "Sensor patio"
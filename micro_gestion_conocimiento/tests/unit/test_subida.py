@@ -0,0 +1,105 @@
+# tests/unit/test_subida.py
+import asyncio
+import gzip
+import os
+import threading
+import time
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api import poblacion
+from api.ejecutor import Ejecutor
+from api.poblacion import ontologia_usuario_router
+from application.poblacion_service import rutaOntologiaUsuario
+from config import settings
+from infraestructure.acceso_ontologia.PoolOntologiasPU import pool
+
+
+class TestSubida:
+    """Pruebas de la subida por fragmentos de ontologías de usuario."""
+
+    def test_subida_por_fragmentos(self, ontologia_temporal, monkeypatch):
+        """49. La ontología subida (en claro o con gzip) se escribe de forma atómica, con tamaño máximo, y se carga en segundo plano."""
+        with open(settings.ONTOLOGIA, "rb") as fichero:
+            owl = fichero.read()
+        destino = settings.PATH_PU_OWL + "mac1&a@x.com.owl"
+        app = FastAPI()
+        app.include_router(ontologia_usuario_router)
+        with TestClient(app) as cliente:
+            respuesta = cliente.post("/ontology/poblacion_usuario/cargar_ontologia",
+                                     files={"file": ("perfil.owl", owl)},
+                                     data={"nombre": "mac1&a@x.com.owl", "ipCoordinador": "10.0.0.1"})
+            assert respuesta.status_code == 201
+            with open(destino, "rb") as fichero:
+                assert fichero.read() == owl
+            for _ in range(200):
+                if pool.metricas()["ontologias"] == 1:
+                    break
+                time.sleep(0.01)
+            assert pool.metricas()["ontologias"] == 1
+
+            ## Cuerpo crudo comprimido con gzip
+            respuesta = cliente.put("/ontology/poblacion_usuario/cargar_ontologia/UsuarioActual.owl",
+                                    params={"ipCoordinador": "10.0.0.1"}, content=gzip.compress(owl),
+                                    headers={"Content-Encoding": "gzip"})
+            assert respuesta.status_code == 201
+            with open(settings.PATH_PU_OWL + "UsuarioActual.owl", "rb") as fichero:
+                assert fichero.read() == owl
+
+            ## Límites: tamaño (también descomprimido), nombre y contenido; el fichero anterior no cambia
+            monkeypatch.setattr(settings, "ONTOLOGIA_PU_MAX_BYTES", len(owl) - 1)
+            grande = cliente.put("/ontology/poblacion_usuario/cargar_ontologia/mac1&a@x.com.owl",
+                                 params={"ipCoordinador": "10.0.0.1"}, content=owl)
+            bomba = cliente.put("/ontology/poblacion_usuario/cargar_ontologia/mac1&a@x.com.owl",
+                                params={"ipCoordinador": "10.0.0.1"}, content=gzip.compress(b" " * 10 * len(owl)))
+            assert grande.status_code == 413 and bomba.status_code == 413
+            ruta = cliente.post("/ontology/poblacion_usuario/cargar_ontologia", files={"file": ("x.owl", b"<rdf/>")},
+                                data={"nombre": "../x.owl", "ipCoordinador": "10.0.0.1"})
+            texto = cliente.put("/ontology/poblacion_usuario/cargar_ontologia/mac1&a@x.com.owl",
+                                params={"ipCoordinador": "10.0.0.1"}, content=b"no es xml")
+            assert ruta.status_code == 400 and texto.status_code == 400
+        with open(destino, "rb") as fichero:
+            assert fichero.read() == owl
+        assert not [nombre for nombre in os.listdir(settings.PATH_PU_OWL) if nombre.endswith(".subida")]
+
+    def test_subida_no_ejecutada_borra_el_temporal(self, ontologia_temporal, monkeypatch):
+        """57. Una subida rechazada (503) o que expira en cola (504) no deja el temporal en PATH_PU_OWL."""
+        ejecutor = Ejecutor("prueba", 1, maxEspera=1, timeout=0.2)
+        monkeypatch.setattr(poblacion, "escrituras", ejecutor)
+        liberar = threading.Event()
+        codigos = []
+
+        ## Ocupa el único hilo: su propia espera expira (504) aunque la llamada siga ejecutándose
+        def ocupar():
+            try:
+                asyncio.run(ejecutor.ejecutar(liberar.wait, 5))
+            except HTTPException as e:
+                codigos.append(e.status_code)
+
+        ocupado = threading.Thread(target=ocupar)
+        app = FastAPI()
+        app.include_router(ontologia_usuario_router)
+        try:
+            ocupado.start()
+            time.sleep(0.05)
+            with TestClient(app) as cliente:
+                expirada = cliente.put("/ontology/poblacion_usuario/cargar_ontologia/mac1&a@x.com.owl",
+                                       params={"ipCoordinador": "10.0.0.1"}, content=b"<rdf/>")
+                monkeypatch.setattr(ejecutor, "maxEspera", 0)
+                rechazada = cliente.put("/ontology/poblacion_usuario/cargar_ontologia/mac1&a@x.com.owl",
+                                        params={"ipCoordinador": "10.0.0.1"}, content=b"<rdf/>")
+        finally:
+            liberar.set()
+            ocupado.join(5)
+            ejecutor.cerrar()
+        assert codigos == [504] and expirada.status_code == 504 and rechazada.status_code == 503
+        assert not [nombre for nombre in os.listdir(settings.PATH_PU_OWL) if nombre.endswith(".subida")]
+
+    def test_nombre_de_perfil(self, ontologia_temporal):
+        """58. Solo se aceptan nombres .owl simples: nunca los ficheros internos que acompañan al perfil."""
+        assert rutaOntologiaUsuario("mac1&a@x.com.owl") == settings.PATH_PU_OWL + "mac1&a@x.com.owl"
+        for nombre in ("", "../x.owl", ".owl", "x", "x.owl.bin", "x.owl.bitacora", "x.owl.tmp", "x.owl.1234.tmp",
+                       ".x.owl.abc.subida"):
+            with pytest.raises(ValueError):
+                rutaOntologiaUsuario(nombre)
@@ -0,0 +1,73 @@
+# tests/unit/test_transaccion.py
+import shutil
+import pytest
+from rdflib import URIRef, Literal, RDF
+
+from config import settings
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.acceso_ontologia.OntologiaPU import OntologiaPU
+from infraestructure.adaptadores.PobladorOOS import PobladorOOS
+from infraestructure.util.UrisOOS import UrisOOS
+
+ECA = URIRef(UrisOOS.prefijo + "ECA1")
+
+
+class TestTransaccion:
+    """Pruebas de escrituras agrupadas en una transacción."""
+
+    def test_transaccion_registra_una_vez_y_deshace_si_falla(self, ontologia_temporal, monkeypatch):
+        """30. Una transacción confirma todo junto; una excepción la deshace por completo."""
+        shutil.copyfile(settings.ONTOLOGIA, ontologia_temporal)
+        ontologia = Ontologia.compartida()
+        registros = []
+        registrar = ontologia.bitacora.registrar
+        monkeypatch.setattr(ontologia.bitacora, "registrar", lambda ops: (registros.append(len(ops)), registrar(ops)))
+
+        with ontologia.transaccion():
+            ontologia.insertarIndividuo(str(ECA), UrisOOS.clase_dinamic)
+            ontologia.insertarDataProperty(str(ECA), UrisOOS.dp_state_eca, Literal("on"))
+        assert registros == [2]
+
+        with pytest.raises(RuntimeError):
+            with ontologia.transaccion():
+                ontologia.actualizarDataProperty(str(ECA), UrisOOS.dp_state_eca, "off")
+                ontologia.eliminarTodoIndividuo(str(ECA))
+                raise RuntimeError("fallo a mitad de la transaccion")
+        assert registros == [2]
+        assert (ECA, URIRef(UrisOOS.dp_state_eca), Literal("on")) in ontologia.g
+        assert (ECA, RDF.type, URIRef(UrisOOS.clase_dinamic)) in ontologia.g
+
+    def test_transaccion_pu_persiste_una_sola_vez(self, ontologia_temporal, monkeypatch):
+        """31. OntologiaPU escribe el perfil una sola vez por transacción."""
+        path = settings.PATH_PU_OWL + "perfil.owl"
+        shutil.copyfile(settings.ONTOLOGIA, path)
+        ontologia = OntologiaPU(path)
+        guardados = []
+        monkeypatch.setattr(ontologia, "guardarGrafoOntologia", lambda: guardados.append(1))
+
+        with ontologia.transaccion():
+            ontologia.insertarIndividuo(str(ECA), UrisOOS.clase_dinamic)
+            ontologia.insertarListaDataProperty([[str(ECA), UrisOOS.dp_state_eca, Literal("on")]])
+            ontologia.insertarObjectProperty(str(ECA), UrisOOS.op_starts_with, UrisOOS.prefijo + "ECA1evento")
+        assert guardados == [1]
+
+        ontologia.eliminarTodoIndividuo(str(ECA))
+        assert guardados == [1, 1]
+        assert (ECA, None, None) not in ontologia.g
+
+    def test_lote_invalido_no_aplica_ninguna_operacion(self, ontologia_temporal):
+        """32. Un lote con una operación inválida se rechaza sin cambios en la ontología."""
+        poblador = PobladorOOS()
+        antes = len(poblador.ontologia.g)
+        with pytest.raises(ValueError):
+            poblador.aplicarLote([
+                {"operacion": "insertarIndividuo", "individuo": "ECA1", "valor": "Dinamic"},
+                {"operacion": "insertarDataProperty", "individuo": "ECA1", "propiedad": "state_eca"},
+            ])
+        assert len(poblador.ontologia.g) == antes
+
+        assert poblador.aplicarLote([
+            {"operacion": "insertarIndividuo", "individuo": "ECA1", "valor": "Dinamic"},
+            {"operacion": "insertarDataProperty", "individuo": "ECA1", "propiedad": "state_eca", "valor": "on"},
+        ])
+        assert (ECA, URIRef(UrisOOS.dp_state_eca), Literal("on")) in Ontologia(ontologia_temporal).g
@@ -0,0 +1,52 @@
+# tests/unit/test_vista_ecas.py
+import pytest
+
+from conftest import _eca
+from infraestructure.acceso_ontologia.Ontologia import Ontologia
+from infraestructure.adaptadores.ConsultasOOS import ConsultasOOS
+from infraestructure.adaptadores.PobladorOOS import PobladorOOS
+
+
+class TestVistaEcas:
+    """Pruebas de la vista materializada de reglas ECA."""
+
+    def test_vista_se_mantiene_sin_reconstruir(self, ontologia_poblada):
+        """38. Poblar, cambiar el estado y eliminar reglas actualiza la vista sin reconstruirla."""
+        consultas = ConsultasOOS()
+        assert len(consultas.listarEcas()) == 3
+        filas = consultas.vistaEcas._filas
+
+        PobladorOOS().poblarECA(_eca("ECA3", "b@x.com", "obj3", "obj2"))
+        assert consultas.getEca("ECA3")["osid_object_action"] == "obj2"
+        assert [e["name_eca"] for e in consultas.listarEcasUsuario("b@x.com")] == ["ECA2", "ECA3"]
+
+        consultas.setEcaState("off", "ECA3b@x.com")
+        assert consultas.listarEcasEvento("obj3", "on") == []
+        assert [e["name_eca"] for e in consultas.listarEcasEvento("obj3", "off")] == ["ECA3"]
+
+        consultas.eliminarEca("ECA1a@x.com")
+        assert consultas.verificarContrato("obj1", "obj2") == []
+        with pytest.raises(IndexError):
+            consultas.getEca("ECA1")
+        assert consultas.vistaEcas._filas is filas
+
+    def test_vista_sigue_transacciones_y_recargas(self, ontologia_poblada):
+        """39. Una transacción deshecha no deja rastro en la vista y una recarga del fichero la reconstruye."""
+        consultas = ConsultasOOS()
+        assert consultas.getEca("ECA2")["eca_state"] == "on"
+        with pytest.raises(RuntimeError):
+            with consultas.ontologia.transaccion():
+                consultas.setEcaState("off", "ECA2b@x.com")
+                assert consultas.getEca("ECA2")["eca_state"] == "off"
+                raise RuntimeError("fallo")
+        assert consultas.getEca("ECA2")["eca_state"] == "on"
+
+        PobladorOOS().aplicarLote([{"operacion": "actualizarDataProperty", "individuo": "ECA2b@x.comaccion",
+                                    "propiedad": "id_action_object", "valor": "obj9"}])
+        assert [e["name_eca"] for e in consultas.vistaEcas.porObjetoAccion("obj9")] == ["ECA2"]
+        assert consultas.vistaEcas.porObjetoAccion("obj1") == [consultas.getEca("ECA10")]
+
+        consultas.ontologia.compactar()
+        Ontologia.compartida().cargarGrafoNuevo()
+        assert consultas.vistaEcas._filas is None
+        assert [e["name_eca"] for e in consultas.listarEcasUsuario("a@x.com")] == ["ECA1"]
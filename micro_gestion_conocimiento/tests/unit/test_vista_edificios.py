@@ -0,0 +1,131 @@
+# tests/unit/test_vista_edificios.py
+import re
+import shutil
+from collections import Counter
+from rdflib import Literal, RDF, RDFS, URIRef, XSD
+
+from config import settings
+from infraestructure.acceso_ontologia.ConsultasPreparadas import parametros
+from infraestructure.acceso_ontologia.VistaEdificios import VistaEdificios
+from infraestructure.adaptadores.ConsultasPerfilUsuario import ConsultasPerfilUsuario
+from infraestructure.util import UrisPu
+
+PREFIJOS = """PREFIX pu: <http://localhost/default#>
+              PREFIX dogont: <http://elite.polito.it/ontologies/dogont.owl#>
+              PREFIX oos: <http://semanticsearchiot.net/sswot/Ontologies#>
+              PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+              PREFIX ontoprofile: <http://localhost/OntoProfile#>"""
+OBJETO = "?objeto oos:ip_object ?ipobjeto; pu:name_object ?nameobjeto; oos:id_object ?idobjeto; rdf:type oos:Object."
+PARTES = """?piso pu:name_building_environment ?nombrepiso. ?piso rdf:type dogont:Flat.
+            ?parteCasa pu:name_building_environment ?nombreparte. ?parteCasa rdf:type ?typeParte.
+            ?typeParte rdfs:subClassOf* dogont:BuildingEnvironment. ?piso dogont:contains ?parteCasa."""
+EDIFICIO = """?edificio pu:name_building_environment ?nombedificio. FILTER regex(?nombedificio, ?patron).
+              ?edificio rdf:type dogont:Building."""
+## Consultas SPARQL que respondían ConsultasPerfilUsuario antes del índice (la de cosas, corregida
+## para que enlace lo que selecciona); el patrón se pasa escapado porque el índice busca el nombre como texto
+SPARQL = {
+    "objetosEdificio": (["name_object", "ipobjeto", "idobjeto"], PREFIJOS + """SELECT ?nameobjeto ?ipobjeto ?idobjeto
+        WHERE { OPTIONAL { """ + OBJETO + " ?edificio pu:related ?objeto. " + EDIFICIO + " } }"),
+    "partesEdificioConObjetos": (["nombreparte", "name_object", "ipobjeto", "idobjeto"], PREFIJOS + """
+        SELECT DISTINCT ?nombreparte ?nameobjeto ?ipobjeto ?idobjeto
+        WHERE { OPTIONAL { """ + EDIFICIO + PARTES + " ?edificio dogont:contains ?piso. " + OBJETO
+        + " ?parteCasa pu:related ?objeto. ?edificio dogont:contains ?parteCasa } }"),
+    "objetosCosasEdificio": (["name_thing", "name_object", "ipobjeto", "idobjeto"], PREFIJOS + """
+        SELECT DISTINCT ?nombreCosa ?nameobjeto ?ipobjeto ?idobjeto
+        WHERE { OPTIONAL { """ + EDIFICIO + PARTES + """ ?edificio dogont:contains ?piso. ?edificio dogont:contains ?parteCasa.
+            ?entity pu:name_thing ?nombreCosa; rdf:type ?type. ?type rdfs:subClassOf* ontoprofile:Thing.
+            ?entity oos:isUbicated ?parteCasa. ?entity pu:related ?objeto. """ + OBJETO + " } }"),
+}
+
+
+def _uri(nombre):
+    return UrisPu.individuoDogont + nombre
+
+
+def _edificio(ontologia):
+    """Dos edificios con pisos, partes de varias clases y objetos, y algún caso raro (dos nombres, objeto en dos sitios)."""
+    with ontologia.transaccion():
+        ontologia.insertarObjectProperty(UrisPu.individuoRoom, str(RDFS.subClassOf), UrisPu.individuoBuildingEnvironment)
+        ontologia.insertarObjectProperty(UrisPu.individuoBedroom, str(RDFS.subClassOf), UrisPu.individuoRoom)
+        for edificio, nombres in (("casa1", ["Casa Azul", "Azulejo"]), ("casa2", ["Casa Roja"])):
+            ontologia.insertarIndividuo(_uri(edificio), UrisPu.individuoBuilding)
+            for nombre in nombres:
+                ontologia.insertarDataProperty(_uri(edificio), UrisPu.dp_name_building_environment, Literal(nombre))
+            for p in range(2):
+                piso = f"{edificio}_piso{p}"
+                ontologia.insertarIndividuo(_uri(piso), UrisPu.individuoFlat)
+                ontologia.insertarDataProperty(_uri(piso), UrisPu.dp_name_building_environment, Literal(piso))
+                ontologia.insertarObjectProperty(_uri(edificio), UrisPu.op_contains, _uri(piso))
+                for h, clase in enumerate((UrisPu.individuoRoom, UrisPu.individuoBedroom, UrisPu.individuoBuildingEnvironment)):
+                    parte = f"{piso}_parte{h}"
+                    ontologia.insertarIndividuo(_uri(parte), clase)
+                    ontologia.insertarDataProperty(_uri(parte), UrisPu.dp_name_building_environment,
+                                                   Literal(parte, datatype=XSD.string))
+                    ontologia.insertarObjectProperty(_uri(piso), UrisPu.op_contains, _uri(parte))
+                    if h != 2:
+                        ontologia.insertarObjectProperty(_uri(edificio), UrisPu.op_contains, _uri(parte))
+                    objeto = UrisPu.individuoObject + f"_{parte}"
+                    ontologia.insertarIndividuo(objeto, UrisPu.individuoObject)
+                    for propiedad, valor in ((UrisPu.dp_name_object, "obj " + parte), (UrisPu.dp_ip_object, "10.0.0.1"),
+                                             (UrisPu.dp_id_object, parte)):
+                        ontologia.insertarDataProperty(objeto, propiedad, Literal(valor))
+                    ontologia.insertarObjectProperty(_uri(parte), UrisPu.op_related, objeto)
+                    ontologia.insertarObjectProperty(_uri(edificio), UrisPu.op_related, objeto)
+        ## Cosas: una con dos nombres en una parte, otra en una parte que el edificio no contiene y otra sin nombre
+        ontologia.insertarObjectProperty(UrisPu.individuoNon_living_Thing, str(RDFS.subClassOf), UrisPu.individuoThhings)
+        for cosa, parte, nombres in (("lampara", "casa1_piso0_parte0", ["lampara", "luz"]),
+                                     ("sofa", "casa1_piso0_parte2", ["sofa"]), ("mesa", "casa2_piso1_parte1", [])):
+            ontologia.insertarIndividuo(_uri(cosa), UrisPu.individuoNon_living_Thing)
+            for nombre in nombres:
+                ontologia.insertarDataProperty(_uri(cosa), UrisPu.dp_name_thing, Literal(nombre))
+            ontologia.insertarObjectProperty(_uri(cosa), UrisPu.op_isUbicated, _uri(parte))
+            ontologia.insertarObjectProperty(_uri(cosa), UrisPu.op_related, UrisPu.individuoObject + "_" + parte)
+        ## Un piso más con dos nombres y la misma parte en los dos edificios
+        ontologia.insertarDataProperty(_uri("casa1_piso0"), UrisPu.dp_name_building_environment, Literal("planta baja"))
+        ontologia.insertarObjectProperty(_uri("casa2"), UrisPu.op_contains, _uri("casa1_piso0_parte0"))
+
+
+class TestVistaEdificios:
+    """Pruebas del índice de edificios de la ontología del perfil de usuario."""
+
+    def test_mismos_resultados_que_sparql(self, ontologia_temporal):
+        """50. Las consultas de edificio sobre el índice devuelven las mismas filas que las SPARQL y siguen los cambios."""
+        shutil.copyfile(settings.ONTOLOGIA, settings.PATH_PU_OWL + "UsuarioActual.owl")
+        consultas = ConsultasPerfilUsuario()
+        ontologia = consultas.ontologia
+        _edificio(ontologia)
+        vista = VistaEdificios.de(ontologia)
+        assert VistaEdificios.de(ontologia) is vista
+
+        def comparar(patron):
+            for metodo, (claves, query) in SPARQL.items():
+                filas = ontologia.consultaDataProperty(query, parametros(patron=re.escape(patron)))
+                esperado = Counter(tuple(consultas.pasarListaDiccionario(fila, claves).items()) for fila in filas)
+                obtenido = Counter(tuple(fila.items()) for fila in getattr(vista, metodo)(patron))
+                assert obtenido == esperado, (metodo, patron)
+
+        for patron in ("Casa", "Azul", "^Casa Roja$", "Roj", "nada", "", "[", "(a+)+$"):
+            comparar(patron)
+        assert len(consultas.consultarPartesEdificioConObjetosRelacionados("Azul")) == 4
+        assert sorted(fila["name_thing"] for fila in consultas.consultarObjetosRelacionadosACosasDeEdificio("Azul")) == [
+            "lampara", "luz"]
+        assert consultas.consultarListaIpIdObjectosEdificio("[") == []
+        assert consultas.consultarListaObjetosRelacionadosEdificio(b"nada") == []
+
+        ## Las interacciones no afectan al índice; los cambios de contención, nombres y clases sí
+        indice = vista._indice
+        with ontologia.transaccion():
+            ontologia.insertarIndividuo(UrisPu.individuoShedule_Interaction + "_x", UrisPu.individuoShedule_Interaction)
+        assert vista._indice is indice
+        with ontologia.transaccion():
+            ontologia.eliminarListaReferenciasIndividuo([UrisPu.individuoObject + "_casa2_piso1_parte1"])
+            ontologia.insertarDataProperty(_uri("casa2"), UrisPu.dp_name_building_environment, Literal("Casa Azul 2"))
+        comparar("Azul")
+        with ontologia.transaccion():
+            ontologia._quitar((URIRef(UrisPu.individuoBedroom), RDFS.subClassOf, URIRef(UrisPu.individuoRoom)))
+        comparar("Casa")
+        with ontologia.transaccion():
+            ontologia._quitar((URIRef(_uri("casa1_piso1")), RDF.type, None))
+            ontologia.eliminarDataProperty(_uri("lampara"), UrisPu.dp_name_thing)
+        comparar("Casa")
+        assert consultas.consultarObjetosRelacionadosACosasDeEdificio("Casa") == []
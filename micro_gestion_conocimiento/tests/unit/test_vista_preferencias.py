@@ -0,0 +1,84 @@
+# tests/unit/test_vista_preferencias.py
+import shutil
+from rdflib import Literal
+
+from config import settings
+from infraestructure.acceso_ontologia.ConsultasPreparadas import parametros
+from infraestructure.acceso_ontologia.VistaPreferencias import CLAVES, QUERY, VistaPreferencias
+from infraestructure.adaptadores.ConsultasPerfilUsuario import ConsultasPerfilUsuario
+from infraestructure.util import UrisPu
+
+OOS = "http://semanticsearchiot.net/sswot/Ontologies#"
+PU = "http://localhost/default#"
+
+
+def _preferencia(ontologia, nombre, osidEvento, osidAccion, unidad=True):
+    """Inserta una preferencia completa (Preference -> Event -> Condition -> Action)."""
+    eca, evento, condicion, accion = (UrisPu.individuoPreference + "_" + nombre + sufijo for sufijo in ("", "_ev", "_co", "_ac"))
+    with ontologia.transaccion():
+        for individuo, clase in ((eca, UrisPu.individuoPreference), (evento, UrisPu.individuoEvent),
+                                 (condicion, UrisPu.individuoCondition), (accion, UrisPu.individuoAction)):
+            ontologia.insertarIndividuo(individuo, clase)
+        valores = [(eca, PU + "name_preference", nombre), (eca, PU + "state_preference", "on"),
+                   (evento, OOS + "id_event_object", osidEvento), (evento, OOS + "ip_event_object", "10.0.0.1"),
+                   (evento, OOS + "id_event_resource", "temp"), (evento, OOS + "name_event_object", "sensor"),
+                   (evento, OOS + "name_event_resource", "temperatura")]
+        valores += [(condicion, OOS + p, v) for p, v in (("comparator_condition", ">"), ("variable_condition", "30"),
+                                                          ("type_variable_condition", "float"), ("meaning_condition", "calor"))]
+        valores += [(accion, OOS + p, v) for p, v in (("id_action_object", osidAccion), ("name_action_object", "aire"),
+                                                       ("ip_action_object", "10.0.0.2"), ("comparator_action", "="),
+                                                       ("variable_action", "on"), ("meaning_action", "encender"),
+                                                       ("type_variable_action", "string"), ("id_action_resource", "relay"),
+                                                       ("name_action_resource", "rele"))]
+        if unidad:
+            valores.append((condicion, OOS + "unit_condition", "C"))
+        for individuo, propiedad, valor in valores:
+            ontologia.insertarDataProperty(individuo, propiedad, Literal(valor))
+        ontologia.insertarObjectProperty(eca, OOS + "StartsWith", evento)
+        ontologia.insertarObjectProperty(evento, OOS + "Check", condicion)
+        ontologia.insertarObjectProperty(condicion, OOS + "isRelatedWith", accion)
+
+
+class TestVistaPreferencias:
+    """Pruebas del índice de preferencias por OSID de la ontología del perfil de usuario."""
+
+    def test_una_consulta_sin_repetidas(self, ontologia_temporal):
+        """51. Las preferencias por OSID salen del índice, sin repetir, iguales a las SPARQL y siguiendo los cambios."""
+        shutil.copyfile(settings.ONTOLOGIA, settings.PATH_PU_OWL + "UsuarioActual.owl")
+        consultas = ConsultasPerfilUsuario()
+        ontologia = consultas.ontologia
+        _preferencia(ontologia, "P1", "obj1", "obj2")
+        _preferencia(ontologia, "P2", "obj2", "obj2", unidad=False)
+        _preferencia(ontologia, "P3", "obj10", "obj1")
+
+        def sparql(variable, osid):
+            query = QUERY.replace(f"?{variable}.", f"?{variable}. FILTER regex(?{variable}, ?patron).", 1)
+            filas = ontologia.consultaDataProperty(query, parametros(patron=f"^{osid}$"))
+            return [consultas.pasarListaDiccionario(fila, CLAVES) for fila in filas]
+
+        for osid in ("obj1", "obj2", "obj10", "obj3"):
+            assert consultas.consultarListaPreferenciasObjetoEventoporOSID(osid) == sparql("osid_object_event", osid)
+            assert consultas.consultarListaPreferenciasObjetoAccionporOSID(osid) == sparql("osid_object_action", osid)
+        assert [p["name_eca"] for p in consultas.consultarListaPreferenciasporOSID("obj1")] == ["P3", "P1"]
+        assert sorted(p["name_eca"] for p in consultas.consultarListaPreferenciasporOSID("obj2")) == ["P1", "P2"]
+        assert {p["name_eca"]: p["unit_condition"] for p in consultas.consultarListaPreferenciasporOSID("obj2")} == {
+            "P1": "C", "P2": ""}
+
+        ## Una interacción no toca el índice; un cambio en una preferencia o una preferencia nueva sí
+        vista = VistaPreferencias.de(ontologia)
+        indice = vista._indice
+        with ontologia.transaccion():
+            ontologia.insertarIndividuo(UrisPu.individuoShedule_Interaction + "_x", UrisPu.individuoShedule_Interaction)
+        assert vista._indice is indice
+        ontologia.actualizarDataProperty(UrisPu.individuoPreference + "_P1", PU + "state_preference", Literal("off"))
+        assert [p["state_eca"] for p in consultas.consultarListaPreferenciasObjetoEventoporOSID("obj1")] == ["off"]
+        _preferencia(ontologia, "P4", "obj3", "obj1")
+        assert [p["name_eca"] for p in consultas.consultarListaPreferenciasporOSID("obj3")] == ["P4"]
+
+    def test_perfil_inexistente(self, ontologia_temporal):
+        """59. Sin ontología de perfil las consultas de preferencias por OSID devuelven [] en vez de fallar."""
+        consultas = ConsultasPerfilUsuario("no_existe.owl")
+        assert not consultas.ontoExists
+        assert consultas.consultarListaPreferenciasObjetoEventoporOSID("obj1") == []
+        assert consultas.consultarListaPreferenciasObjetoAccionporOSID("obj1") == []
+        assert consultas.consultarListaPreferenciasporOSID("obj1") == []
@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     IP_SERVIDOR_PERFIL_USUARIO : str = "localhost"
     # Timeouts para llamadas a microservicios
     MS_TIMEOUT :int = 30
+    ONTOLOGIAS_SUBIDA_GZIP: bool = True  # Comprimir con gzip las ontologias enviadas al microservicio de ontologias
     PORT: int = 8005
     BROKER_HOST: str = "localhost"
     BROKER_PORT: int = 1883
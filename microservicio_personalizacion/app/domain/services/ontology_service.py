@@ -1,5 +1,7 @@
 from infrastructure.logging.Logging import logger
 from fastapi import UploadFile
+from urllib.parse import quote
+import zlib
 import requests
 from config.settings import settings
 from application.dtos.request_dtos import RegistroInteraccionDTO
@@ -26,6 +28,9 @@ def get_osid():
 def cargar_ontologia(file: UploadFile, nombre: str, ipCoordinador: str) -> bool:
     """Envia la ontologia del usuario al microservicio de ontologías.
 
+    El archivo se envía por fragmentos como cuerpo de la petición (sin leerlo
+    completo en memoria) y, si ONTOLOGIAS_SUBIDA_GZIP, comprimido con gzip.
+
     Args:
         file (UploadFile): Archivo de ontología (.owl)
         nombre (str): Nombre de la ontología
@@ -34,18 +39,19 @@ def cargar_ontologia(file: UploadFile, nombre: str, ipCoordinador: str) -> bool:
     Returns:
         bool: Indica si la carga fue exitosa o no
     """
-    files = {
-        "file": (file.filename, file.file, file.content_type)
-    }
-    data = {
-        "nombre": nombre,
-        "ipCoordinador": ipCoordinador
-    }
+    file.file.seek(0)
+    headers = {"Content-Type": file.content_type or "application/rdf+xml"}
+    if settings.ONTOLOGIAS_SUBIDA_GZIP:
+        cuerpo = _fragmentos_gzip(file.file)
+        headers["Content-Encoding"] = "gzip"
+    else:
+        cuerpo = file.file
     try:
-        response = requests.post(
-            f"{settings.ONTOLOGIAS_MS_URL}poblacion_usuario/cargar_ontologia",
-            files=files,
-            data=data,
+        response = requests.put(
+            f"{settings.ONTOLOGIAS_MS_URL}poblacion_usuario/cargar_ontologia/{quote(nombre, safe='')}",
+            params={"ipCoordinador": ipCoordinador},
+            data=cuerpo,
+            headers=headers,
             timeout=30.0
         )
     except requests.RequestException as e:
@@ -56,6 +62,17 @@ def cargar_ontologia(file: UploadFile, nombre: str, ipCoordinador: str) -> bool:
     else:
         logger.error(f"Error cargando ontología: {response.text}")
         return False
+def _fragmentos_gzip(archivo, tamano=64 * 1024):
+    """Comprime con gzip el archivo a medida que se lee (la petición se envía por partes)."""
+    compresor = zlib.compressobj(wbits=31)
+    while True:
+        fragmento = archivo.read(tamano)
+        if not fragmento:
+            break
+        comprimido = compresor.compress(fragmento)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
 def consultar_email_usuario():
     """Consulta el email del usuario al microservicio de ontologias
 
@@ -162,7 +179,8 @@ def registrar_interaccion(data:RegistroInteraccionDTO)->bool:
     except requests.RequestException as e:
         logger.error(f"Error conectando al microservicio de ontologías: {e}")
         return False
-    if response.status_code == 201:
+    ##202: la interaccion se acepto y se registrara por lotes
+    if response.status_code in (201, 202):
         return True
     else:
         logger.error(f"Error registrando interacción del usuario: {response.text}")